@@ -0,0 +1,85 @@
+# bench_buffer_parsing.py
+#
+# Compares lexing and parsing a large Grin source file by decoding it and
+# splitting it into lines first, against scanning the memory-mapped file
+# directly with grin.lexing.to_tokens_from_buffer and grin.parsing.parse_file.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_buffer_parsing [megabytes]
+
+import os
+import sys
+import tempfile
+import time
+from benchmarks.programs import generated_lines
+from grin.lexing import to_tokens, to_tokens_from_buffer
+from grin.parsing import parse, parse_file
+import mmap
+
+
+def _write_source(path: str, megabytes: float) -> None:
+    chunk = ('\n'.join(generated_lines(10_000)) + '\n').encode('utf-8')
+    remaining = int(megabytes * 1_000_000)
+
+    with open(path, 'wb') as file:
+        while remaining > 0:
+            file.write(chunk)
+            remaining -= len(chunk)
+
+        file.write(b'.\n')
+
+
+def _parse_lines(path: str) -> int:
+    with open(path, 'rb') as file:
+        lines = file.read().decode('utf-8').splitlines()
+
+    return sum(len(tokens) for tokens in parse(lines))
+
+
+def _parse_mapped(path: str) -> int:
+    return sum(len(tokens) for tokens in parse_file(path))
+
+
+def _lex_lines(path: str) -> int:
+    with open(path, 'rb') as file:
+        lines = file.read().decode('utf-8').splitlines()
+
+    return sum(
+        len(list(to_tokens(line, line_number)))
+        for line_number, line in enumerate(lines, start = 1))
+
+
+def _lex_mapped(path: str) -> int:
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) as source:
+        return sum(len(tokens) for _, tokens, _ in to_tokens_from_buffer(source))
+
+
+_CONTENDERS = [
+    ('to_tokens(splitlines())', _lex_lines),
+    ('to_tokens_from_buffer()', _lex_mapped),
+    ('parse(splitlines())', _parse_lines),
+    ('parse_file()', _parse_mapped)
+]
+
+
+def main() -> None:
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'program.grin')
+        _write_source(path, megabytes)
+        size = os.path.getsize(path)
+
+        for name, parser in _CONTENDERS:
+            start = time.perf_counter()
+            count = parser(path)
+            elapsed = time.perf_counter() - start
+
+            print(
+                f'{name:>24}: {elapsed:.2f} s, {size / elapsed / 1_000_000:.2f} MB/s, '
+                f'{count / elapsed / 1_000_000:.2f} M tokens/s')
+
+
+if __name__ == '__main__':
+    main()
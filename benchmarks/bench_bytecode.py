@@ -0,0 +1,53 @@
+# bench_bytecode.py
+#
+# Compares the size and speed of grin.interpreter.bytecode's binary format
+# against pickling the statement objects that parse_statements_into_objects
+# builds for a large Grin program, as they'd be sent between processes.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_bytecode [line_count]
+
+import gc
+import pickle
+import sys
+import time
+from benchmarks.programs import generated_lines
+from grin.interpreter import bytecode
+from grin.interpreter.parser import parse_statements_into_objects
+from grin.parsing import parse
+
+
+def _time(function) -> tuple[float, object]:
+    # The garbage collector is disabled while timing, as pickle.loads would
+    # otherwise be dominated by it and the comparison wouldn't be fair.
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = function()
+        return time.perf_counter() - start, result
+    finally:
+        gc.enable()
+
+
+def main() -> None:
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    statements = parse_statements_into_objects(list(parse(generated_lines(line_count))))
+    print(f'{len(statements)} statements')
+
+    pickle_dump, pickled = _time(lambda: pickle.dumps(statements, pickle.HIGHEST_PROTOCOL))
+    pickle_load, _ = _time(lambda: pickle.loads(pickled))
+    print(f'        pickle: {len(pickled) / 1e6:6.2f} MB, dumps {pickle_dump:.2f} s, loads {pickle_load:.2f} s')
+
+    compile_time, compiled = _time(lambda: bytecode.GrinBytecode.from_program(statements))
+    dump, dumped = _time(lambda: bytecode.dumps(compiled))
+    load, loaded = _time(lambda: bytecode.loads(dumped))
+    rebuild, _ = _time(lambda: loaded.program())
+    print(f'      bytecode: {len(dumped) / 1e6:6.2f} MB, dumps {dump:.2f} s, loads {load:.2f} s')
+    print(f'               (compiling {compile_time:.2f} s, rebuilding statements {rebuild:.2f} s)')
+    print(f'{len(pickled) / len(dumped):.1f}x smaller, loads {pickle_load / load:.1f}x faster')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# bench_closedform.py
+#
+# Compares running Grin counting loops on an InterpreterEngine as they're
+# compiled against running them after close_counting_loops() has put nodes
+# in front of them that compute all but their last iterations at once.  The
+# numeric loop's products are strength-reduced by optimize_loops() first,
+# which leaves it a counting loop.  The closed programs are made of nodes
+# with resolved jump targets, so the programs they're compared against are
+# too.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_closedform [iteration_count]
+
+import sys
+import time
+from benchmarks.loops import summing_loop, numeric_loop, run_quietly
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.linker import link
+from grin.interpreter.program import compile_program
+from grin.ir.closedform import close_counting_loops
+from grin.ir.loops import optimize_loops
+
+
+def main() -> None:
+    iteration_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    programs = {
+        'summing loop': summing_loop(iteration_count),
+        'numeric loop': numeric_loop(iteration_count)
+    }
+
+    for name, lines in programs.items():
+        program = link(compile_program(lines, nodes = True))
+        closed = close_counting_loops(optimize_loops(program))
+
+        times = {}
+        outputs = set()
+        for label, candidate in (('statements', program), ('closed', closed.program)):
+            start = time.perf_counter()
+            outputs.add(run_quietly(lambda: InterpreterEngine(candidate).run()))
+            times[label] = time.perf_counter() - start
+        assert len(outputs) == 1, f'{name} printed different output when closed'
+
+        print(f'{name}: {closed.report!r}')
+        print(f'    statements {times["statements"]:.2f} s, closed {times["closed"] * 1000:.3f} ms '
+              f'({times["statements"] / times["closed"]:,.0f}x)')
+
+
+if __name__ == '__main__':
+    main()
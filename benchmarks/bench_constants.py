@@ -0,0 +1,51 @@
+# bench_constants.py
+#
+# Compares running Grin loops on an InterpreterEngine as they're compiled
+# against running them after propagate_constants() has propagated and
+# folded their constants and removed the statements that do nothing.  The
+# optimized programs are made of nodes with resolved jump targets, so the
+# programs they're compared against are too.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_constants [iteration_count]
+
+import sys
+import time
+from benchmarks.loops import counting_loop, branching_loop, constant_loop, run_quietly
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.linker import link
+from grin.interpreter.program import compile_program
+from grin.ir.constants import propagate_constants
+
+
+def main() -> None:
+    iteration_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    programs = {
+        'constant loop': constant_loop(iteration_count),
+        'counting loop': counting_loop(iteration_count),
+        'branching loop': branching_loop(iteration_count)
+    }
+
+    for name, lines in programs.items():
+        program = link(compile_program(lines, nodes = True))
+        start = time.perf_counter()
+        optimized = propagate_constants(program)
+        optimizing_time = time.perf_counter() - start
+
+        times = {}
+        outputs = set()
+        for label, candidate in (('statements', program), ('optimized', optimized.program)):
+            start = time.perf_counter()
+            outputs.add(run_quietly(lambda: InterpreterEngine(candidate).run()))
+            times[label] = time.perf_counter() - start
+        assert len(outputs) == 1, f'{name} printed different output when optimized'
+
+        print(f'{name}: {len(program)} -> {len(optimized)} statements, {optimized.report!r} '
+              f'in {optimizing_time * 1000:.1f} ms')
+        print(f'    statements {times["statements"]:.2f} s, optimized {times["optimized"]:.2f} s '
+              f'({times["statements"] / times["optimized"]:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# bench_document.py
+#
+# Measures how long it takes to apply small edits to a large
+# grin.interpreter.document.GrinDocument, compared with parsing the whole
+# program again after each edit.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_document [line_count]
+
+import sys
+import time
+from benchmarks.programs import generated_lines
+from grin.interpreter.document import GrinDocument
+from grin.interpreter.parser import parse_statements_into_objects
+from grin.parsing import parse
+
+
+def _latency(edit, count: int) -> float:
+    start = time.perf_counter()
+
+    for i in range(count):
+        edit(i)
+
+    return (time.perf_counter() - start) / count
+
+
+def main() -> None:
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    lines = generated_lines(line_count)
+
+    start = time.perf_counter()
+    document = GrinDocument(lines)
+    print(f'{len(document)} lines, initial parse in {time.perf_counter() - start:.2f} s')
+
+    middle = len(document) // 2
+
+    edits = [
+        ('replace a line', lambda i: document.edit(middle, middle + 1, [f'ADD X {i}'])),
+        ('insert a line', lambda i: document.edit(middle, middle, [f'PRINT {i}'])),
+        ('delete a line', lambda i: document.edit(middle, middle + 1, [])),
+        ('insert a label', lambda i: document.edit(10, 10, [f'NEW{i}: PRINT {i}']))
+    ]
+
+    for name, edit in edits:
+        print(f'{name:>16}: {_latency(edit, 1000) * 1_000_000:.0f} us per edit')
+
+    start = time.perf_counter()
+    parse_statements_into_objects(list(parse(document.lines())))
+    print(f'{"full re-parse":>16}: {(time.perf_counter() - start) * 1_000_000:.0f} us')
+
+
+if __name__ == '__main__':
+    main()
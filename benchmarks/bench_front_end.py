@@ -0,0 +1,41 @@
+# bench_front_end.py
+#
+# Compares building the statement objects of a large Grin program in two
+# passes (grin.parsing.parse, then parse_statements_into_objects) against
+# the single-pass grin.interpreter.parser.parse_lines_into_objects.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_front_end [line_count]
+
+import sys
+import time
+from benchmarks.programs import generated_lines
+from grin.interpreter.parser import parse_lines_into_objects, parse_statements_into_objects
+from grin.parsing import parse
+
+
+def _two_passes(lines: list[str], lazy_locations: bool) -> list:
+    return parse_statements_into_objects(list(parse(lines, lazy_locations = lazy_locations)))
+
+
+def _single_pass(lines: list[str], lazy_locations: bool) -> list:
+    return parse_lines_into_objects(lines, lazy_locations)
+
+
+def main() -> None:
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    lines = generated_lines(line_count)
+    print(f'{len(lines)} lines')
+
+    for lazy_locations in (False, True):
+        for name, front_end in (('two passes', _two_passes), ('single pass', _single_pass)):
+            start = time.perf_counter()
+            front_end(lines, lazy_locations)
+            elapsed = time.perf_counter() - start
+            mode = 'lazy' if lazy_locations else 'eager'
+            print(f'{name:>12}, {mode} locations: {elapsed:.2f} s, {len(lines) / elapsed / 1000:.0f}k lines/s')
+
+
+if __name__ == '__main__':
+    main()
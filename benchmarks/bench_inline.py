@@ -0,0 +1,58 @@
+# bench_inline.py
+#
+# Compares running Grin loops that call subroutines on an InterpreterEngine
+# as they're compiled against running them after inline_subroutines() has
+# replaced the calls with the subroutines' statements, and after the loop
+# optimizations, which can only work on loops without calls, have been run
+# on the inlined programs too.  The optimized programs are made of nodes
+# with resolved jump targets, so the programs they're compared against are
+# too.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_inline [iteration_count]
+
+import sys
+import time
+from benchmarks.loops import calling_loop, nested_loops, run_quietly
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.linker import link
+from grin.interpreter.program import compile_program
+from grin.ir.closedform import close_counting_loops
+from grin.ir.inline import inline_subroutines
+from grin.ir.loops import optimize_loops
+
+
+def main() -> None:
+    iteration_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    programs = {
+        'calling loop': calling_loop(iteration_count),
+        'nested loops': nested_loops(iteration_count // 100, 100)
+    }
+
+    for name, lines in programs.items():
+        program = link(compile_program(lines, nodes = True))
+        inlined = inline_subroutines(program)
+        optimized = close_counting_loops(optimize_loops(inlined))
+
+        times = {}
+        outputs = set()
+        for label, candidate in (('statements', program), ('inlined', inlined.program),
+                                 ('optimized', optimized.program)):
+            # The best of a few runs, so that the first isn't penalized for warming up.
+            times[label] = float('inf')
+            for _ in range(3):
+                start = time.perf_counter()
+                outputs.add(run_quietly(lambda: InterpreterEngine(candidate).run()))
+                times[label] = min(times[label], time.perf_counter() - start)
+        assert len(outputs) == 1, f'{name} printed different output when inlined'
+
+        print(f'{name}: {inlined.report!r}')
+        print(f'    statements {times["statements"]:.2f} s, '
+              f'inlined {times["inlined"]:.2f} s ({times["statements"] / times["inlined"]:.2f}x), '
+              f'inlined and loops optimized {times["optimized"]:.2f} s '
+              f'({times["statements"] / times["optimized"]:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
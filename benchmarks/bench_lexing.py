@@ -0,0 +1,42 @@
+# bench_lexing.py
+#
+# Compares the throughput of grin.lexing.to_tokens, which scans each line with
+# a precompiled pattern, against the original character-at-a-time lexer.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_lexing [statement_count]
+
+import sys
+import time
+from benchmarks.programs import generated_lines
+from grin.lexing import to_tokens, _to_tokens_by_character
+
+
+def _time_lexer(lexer, lines: list[str]) -> tuple[float, int]:
+    start = time.perf_counter()
+    count = 0
+
+    for line_number, line in enumerate(lines, start = 1):
+        for _ in lexer(line, line_number):
+            count += 1
+
+    return time.perf_counter() - start, count
+
+
+def main() -> None:
+    statement_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    lines = generated_lines(statement_count)
+    size = sum(len(line) + 1 for line in lines)
+
+    print(f'{len(lines)} lines, {size / 1_000_000:.1f} MB')
+
+    for name, lexer in (('by character', _to_tokens_by_character), ('pattern', to_tokens)):
+        elapsed, count = min(_time_lexer(lexer, lines) for _ in range(3))
+        print(
+            f'{name:>14}: {elapsed:.3f} s, {count / elapsed / 1_000_000:.2f} M tokens/s, '
+            f'{size / elapsed / 1_000_000:.2f} MB/s')
+
+
+if __name__ == '__main__':
+    main()
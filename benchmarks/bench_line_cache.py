@@ -0,0 +1,35 @@
+# bench_line_cache.py
+#
+# Compares parsing a large, repetitive Grin program with and without a
+# grin.parsing.GrinLineCache.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_line_cache [repetitions]
+
+import sys
+import time
+from benchmarks.programs import generated_lines
+from grin.parsing import GrinLineCache, parse
+
+
+def main() -> None:
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    lines = generated_lines(80) * repetitions
+
+    start = time.perf_counter()
+    list(parse(lines))
+    uncached = time.perf_counter() - start
+
+    cache = GrinLineCache()
+    start = time.perf_counter()
+    list(parse(lines, cache))
+    cached = time.perf_counter() - start
+
+    print(f'{len(lines)} lines, {len(set(lines))} distinct')
+    print(f'  uncached: {uncached:.2f} s')
+    print(f'    cached: {cached:.2f} s ({uncached / cached:.1f}x), {cache.hits()} hits, {cache.misses()} misses')
+
+
+if __name__ == '__main__':
+    main()
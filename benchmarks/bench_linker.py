@@ -0,0 +1,50 @@
+# bench_linker.py
+#
+# Measures what grin.interpreter.linker saves: indexing the labels of a
+# label-heavy program (which InterpreterEngine used to do in quadratic
+# time), and running a jump-heavy loop with and without its literal jump
+# targets resolved to statement indexes.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_linker [label_count] [iteration_count]
+
+import sys
+import time
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.linker import link
+from grin.interpreter.program import compile_program
+
+
+def _time(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    label_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    iteration_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+
+    labeled = list(compile_program([f'L{i}: LET X {i}' for i in range(label_count)]).statements())
+    print(f'indexing {label_count} labels: {_time(lambda: InterpreterEngine(labeled)):.2f} s')
+
+    loop = compile_program([
+        'LET I 0',
+        'LOOP: ADD I 1',
+        'GOSUB "BODY"',
+        'GOTO "LOOP" IF I < ' + str(iteration_count),
+        'GOTO 3',
+        'BODY: ADD J 1',
+        'RETURN',
+        'END'
+    ])
+
+    unlinked = _time(lambda: InterpreterEngine(loop).run())
+    linked_program = link(loop)
+    linked = _time(lambda: InterpreterEngine(linked_program).run())
+    print(f'{iteration_count} loop iterations: unlinked {unlinked:.2f} s, linked {linked:.2f} s ({unlinked / linked:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
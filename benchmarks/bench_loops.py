@@ -0,0 +1,54 @@
+# bench_loops.py
+#
+# Compares running tight numeric Grin loops on an InterpreterEngine as
+# they're compiled against running them after optimize_loops() has hoisted
+# their invariant statements and strength-reduced their products, with and
+# without unrolling.  The optimized programs are made of nodes with resolved
+# jump targets, so the programs they're compared against are too.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_loops [iteration_count]
+
+import sys
+import time
+from benchmarks.loops import counting_loop, numeric_loop, constant_loop, run_quietly
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.linker import link
+from grin.interpreter.program import compile_program
+from grin.ir.loops import optimize_loops
+
+
+def main() -> None:
+    iteration_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    programs = {
+        'numeric loop': numeric_loop(iteration_count),
+        'constant loop': constant_loop(iteration_count),
+        'counting loop': counting_loop(iteration_count)
+    }
+
+    for name, lines in programs.items():
+        program = link(compile_program(lines, nodes = True))
+        optimized = optimize_loops(program)
+        unrolled = optimize_loops(program, unroll = 4)
+
+        times = {}
+        outputs = set()
+        for label, candidate in (('statements', program), ('optimized', optimized.program),
+                                 ('unrolled', unrolled.program)):
+            # The best of a few runs, so that the first isn't penalized for warming up.
+            times[label] = float('inf')
+            for _ in range(3):
+                start = time.perf_counter()
+                outputs.add(run_quietly(lambda: InterpreterEngine(candidate).run()))
+                times[label] = min(times[label], time.perf_counter() - start)
+        assert len(outputs) == 1, f'{name} printed different output when optimized'
+
+        print(f'{name}: {unrolled.report!r}')
+        print(f'    statements {times["statements"]:.2f} s, '
+              f'optimized {times["optimized"]:.2f} s ({times["statements"] / times["optimized"]:.2f}x), '
+              f'unrolled {times["unrolled"]:.2f} s ({times["statements"] / times["unrolled"]:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
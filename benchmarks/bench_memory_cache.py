@@ -0,0 +1,48 @@
+# bench_memory_cache.py
+#
+# Simulates a service that embeds InterpreterEngine and is sent the same
+# few Grin programs over and over, comparing parsing each request's program
+# again against looking it up in a grin.interpreter.cache.GrinProgramMemoryCache
+# shared by a pool of threads.  Only preparing each engine is timed, not
+# running it.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_memory_cache [request_count]
+
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.programs import generated_lines
+from grin.interpreter.cache import GrinProgramMemoryCache
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.parser import parse_statements_into_objects
+from grin.parsing import parse
+
+
+def main() -> None:
+    request_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    programs = [generated_lines(random.Random(seed).randint(50, 400)) for seed in range(40)]
+    requests = [random.Random(request).choice(programs) for request in range(request_count)]
+    print(f'{request_count} requests for {len(programs)} programs')
+
+    start = time.perf_counter()
+    for lines in requests:
+        InterpreterEngine(parse_statements_into_objects(list(parse(lines))))
+    uncached = time.perf_counter() - start
+    print(f'  no cache: {uncached:.2f} s')
+
+    cache = GrinProgramMemoryCache(max_programs=32)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda lines: InterpreterEngine(cache.compile(lines)), requests))
+    cached = time.perf_counter() - start
+
+    print(f'     cache: {cached:.2f} s ({uncached / cached:.1f}x faster), '
+          f'{cache.hits()} hits, {cache.misses()} misses, {cache.evictions()} evictions')
+
+
+if __name__ == '__main__':
+    main()
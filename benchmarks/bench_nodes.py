@@ -0,0 +1,79 @@
+# bench_nodes.py
+#
+# Compares statements that hold tokens against the slotted, token-free
+# nodes in grin.statements.nodes: how much memory each statement of a
+# large program occupies (including its tokens, their locations, texts
+# and values), and how long arithmetic-heavy loops take to run.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_nodes [line_count] [iteration_count]
+
+import sys
+import time
+from benchmarks.loops import counting_loop, nested_loops, run_quietly
+from benchmarks.programs import generated_lines
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.parser import parse_statements_into_objects
+from grin.interpreter.program import compile_program
+from grin.parsing import parse
+from grin.token import GrinTokenKind
+
+
+def _deep_size(obj: object, seen: set[int]) -> int:
+    if obj is None or isinstance(obj, (bool, GrinTokenKind, type)) or callable(obj) or id(obj) in seen:
+        return 0
+
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, (list, tuple)):
+        values = obj
+    elif hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+        values = obj.__dict__.values()
+    else:
+        values = [
+            getattr(obj, slot)
+            for cls in type(obj).__mro__
+            for slot in cls.__dict__.get('__slots__', ())
+            if hasattr(obj, slot)
+        ]
+
+    return size + sum(_deep_size(value, seen) for value in values)
+
+
+def _bytes_per_statement(statements) -> float:
+    seen = set()
+    return sum(_deep_size(statement, seen) for statement in statements) / len(statements)
+
+
+def main() -> None:
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    iteration_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    lines = generated_lines(line_count)
+
+    sizes = {
+        'statements, eager tokens': parse_statements_into_objects(list(parse(lines))),
+        'statements, lazy tokens': compile_program(lines).statements(),
+        'nodes': compile_program(lines, nodes = True).statements()
+    }
+
+    print(f'{len(lines)} lines:')
+    for name, statements in sizes.items():
+        print(f'  {name:>24}: {_bytes_per_statement(statements):.1f} bytes per statement')
+
+    for name, loop in (('counting loop', counting_loop(iteration_count)),
+                       ('nested loops', nested_loops(iteration_count // 100, 100))):
+        times = {}
+        for nodes in (False, True):
+            program = compile_program(loop, nodes = nodes)
+            start = time.perf_counter()
+            run_quietly(lambda: InterpreterEngine(program).run())
+            times[nodes] = time.perf_counter() - start
+
+        print(f'{name:>14}: statements {times[False]:.2f} s, nodes {times[True]:.2f} s ({times[False] / times[True]:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
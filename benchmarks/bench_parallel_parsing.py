@@ -0,0 +1,38 @@
+# bench_parallel_parsing.py
+#
+# Measures how grin.parsing.parse_parallel scales from one worker process to
+# many, compared with parsing in order with grin.parsing.parse.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_parallel_parsing [line_count] [max_workers]
+
+import os
+import sys
+import time
+from benchmarks.programs import generated_lines
+from grin.interpreter.parser import parse_statements_into_objects
+from grin.parsing import parse, parse_parallel
+
+
+def main() -> None:
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    lines = generated_lines(line_count)
+
+    start = time.perf_counter()
+    parse_statements_into_objects(list(parse(lines)))
+    serial = time.perf_counter() - start
+
+    print(f'{len(lines)} lines on {os.cpu_count()} CPUs')
+    print(f'    in order: {serial:.2f} s')
+
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        parse_parallel(lines, workers, transform = parse_statements_into_objects)
+        elapsed = time.perf_counter() - start
+        print(f'{workers:>3} workers: {elapsed:.2f} s ({serial / elapsed:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
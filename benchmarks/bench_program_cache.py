@@ -0,0 +1,51 @@
+# bench_program_cache.py
+#
+# Compares starting a large Grin program without a cache, with a cold
+# grin.interpreter.cache.GrinProgramCache (compiling the program and
+# storing it) and with a warm one (loading the stored program), along with
+# compiling it with compile_program() alone.  Only
+# startup is timed -- reading the source and building the program an
+# InterpreterEngine runs -- not running it.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_program_cache [line_count]
+
+import sys
+import tempfile
+import time
+from benchmarks.programs import generated_lines
+from grin.interpreter.cache import GrinProgramCache
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.program import compile_program
+from grin.interpreter.parser import parse_statements_into_objects
+from grin.parsing import parse
+
+
+def _time(start_up) -> float:
+    start = time.perf_counter()
+    start_up()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    lines = generated_lines(line_count)
+    print(f'{len(lines)} lines')
+
+    uncached = _time(lambda: InterpreterEngine(parse_statements_into_objects(list(parse(lines)))))
+    print(f'  no cache: {uncached:.2f} s')
+    compiled = _time(lambda: InterpreterEngine(compile_program(lines)))
+    print(f'  compiled: {compiled:.2f} s (compile_program, no cache)')
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = GrinProgramCache(directory)
+        cold = _time(lambda: InterpreterEngine(cache.compile(lines)))
+        print(f'cold cache: {cold:.2f} s')
+
+        warm = min(_time(lambda: InterpreterEngine(cache.compile(lines))) for _ in range(3))
+        print(f'warm cache: {warm:.2f} s ({compiled / warm:.1f}x faster than compiling)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# bench_superinstructions.py
+#
+# Compares running Grin loops on an InterpreterEngine as they're compiled
+# against running them after fuse() has fused the statements of each basic
+# block into superinstructions, and counts the dispatches each makes.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_superinstructions [iteration_count]
+
+import sys
+import time
+from benchmarks.loops import counting_loop, nested_loops, branching_loop, run_quietly
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.program import compile_program
+from grin.interpreter.superinstructions import fuse
+
+
+class _CountingEngine(InterpreterEngine):
+    """An engine that counts the statements it dispatches."""
+    def run(self) -> None:
+        self.dispatches = 0
+        while self.current_line < len(self.program) and not self.terminate:
+            statement = self.program[self.current_line]
+            if isinstance(statement, (list, tuple)):
+                statement = statement[1]
+            statement.execute(self)
+            self.current_line += 1
+            self.dispatches += 1
+
+
+def main() -> None:
+    iteration_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    programs = {
+        'counting loop': counting_loop(iteration_count),
+        'nested loops': nested_loops(iteration_count // 100, 100),
+        'branching loop': branching_loop(iteration_count)
+    }
+
+    for name, lines in programs.items():
+        program = compile_program(lines)
+        fused, report = fuse(program)
+
+        times = {}
+        outputs = set()
+        for label, candidate in (('statements', program), ('fused', fused)):
+            start = time.perf_counter()
+            outputs.add(run_quietly(lambda: InterpreterEngine(candidate).run()))
+            times[label] = time.perf_counter() - start
+        assert len(outputs) == 1, f'{name} printed different output when fused'
+
+        counts = {}
+        for label, candidate in (('statements', program), ('fused', fused)):
+            engine = _CountingEngine(candidate)
+            run_quietly(engine.run)
+            counts[label] = engine.dispatches
+
+        print(f'{name}: {report.blocks} blocks, {report.superinstructions} superinstructions '
+              f'({", ".join(f"{pattern} x{count}" for pattern, count in report.patterns.items())})')
+        print(f'    dispatches {counts["statements"]:,} -> {counts["fused"]:,} '
+              f'({counts["statements"] - counts["fused"]:,} eliminated)')
+        print(f'    statements {times["statements"]:.2f} s, fused {times["fused"]:.2f} s '
+              f'({times["statements"] / times["fused"]:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# bench_token_memory.py
+#
+# Measures how much memory the tokens of a large Grin program occupy, and how
+# long it takes to lex and parse it.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_token_memory [token_count]
+
+import sys
+import time
+from benchmarks.programs import generated_lines
+from grin.parsing import parse
+
+
+def _deep_size(obj: object, seen: set[int]) -> int:
+    if obj is None or id(obj) in seen:
+        return 0
+
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+        values = obj.__dict__.values()
+    else:
+        values = [
+            getattr(obj, slot)
+            for cls in type(obj).__mro__
+            for slot in cls.__dict__.get('__slots__', ())
+            if hasattr(obj, slot)
+        ]
+
+    for value in values:
+        if isinstance(value, (str, int, float)) or hasattr(value, 'line'):
+            size += _deep_size(value, seen)
+
+    return size
+
+
+def main() -> None:
+    token_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    lines = generated_lines(token_count * 2 // 7)
+
+    for lazy_locations in (False, True):
+        start = time.perf_counter()
+        parsed = list(parse(lines, lazy_locations = lazy_locations))
+        elapsed = time.perf_counter() - start
+
+        tokens = [token for line_tokens in parsed for token in line_tokens]
+        seen = set()
+        size = sum(_deep_size(token, seen) for token in tokens)
+
+        print(f'{"lazy" if lazy_locations else "eager"} locations:')
+        print(f'  {len(tokens)} tokens on {len(lines)} lines, lexed and parsed in {elapsed:.2f} s')
+        print(f'  {size / len(tokens):.1f} bytes per token, including its location, text and value')
+
+        del parsed, tokens, seen
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# bench_transpiler.py
+#
+# Compares running Grin loops on an InterpreterEngine against a
+# TranspiledEngine, which translates the program into a Python function
+# that keeps variables in locals and dispatches over basic blocks, along
+# with the time it takes to translate and compile the program.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_transpiler [iteration_count]
+
+import sys
+import time
+from benchmarks.loops import counting_loop, nested_loops, branching_loop, run_quietly
+from benchmarks.programs import generated_lines
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.program import compile_program
+from grin.interpreter.transpiler import TranspiledEngine
+
+
+def main() -> None:
+    iteration_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    programs = {
+        'counting loop': counting_loop(iteration_count),
+        'nested loops': nested_loops(iteration_count // 100, 100),
+        'branching loop': branching_loop(iteration_count)
+    }
+
+    for name, lines in programs.items():
+        program = compile_program(lines)
+
+        start = time.perf_counter()
+        expected = run_quietly(lambda: InterpreterEngine(program).run())
+        statements = time.perf_counter() - start
+
+        start = time.perf_counter()
+        output = run_quietly(lambda: TranspiledEngine(program).run())
+        python = time.perf_counter() - start
+
+        assert output == expected, f'{name} printed different output when translated'
+        print(f'{name:>14}: statements {statements:.2f} s, python {python:.2f} s ({statements / python:.2f}x)')
+
+    program = compile_program(generated_lines(10_000))
+    start = time.perf_counter()
+    TranspiledEngine(program)
+    print(f'translating and compiling 10,000 generated lines: {time.perf_counter() - start:.2f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# bench_validation.py
+#
+# Compares checking a large Grin program with grin.validation.validate,
+# which doesn't build tokens for valid lines, against parsing it with
+# grin.parsing.parse, for a valid program and for one with an error on
+# every hundredth line (which parse() can only report the first of).
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_validation [line_count]
+
+import sys
+import time
+from benchmarks.programs import generated_lines
+from grin.parsing import parse
+from grin.validation import validate
+
+
+def _parse(lines: list[str]) -> int:
+    try:
+        for _ in parse(lines):
+            pass
+    except Exception:
+        return 1
+
+    return 0
+
+
+def _validate(lines: list[str]) -> int:
+    return len(validate(lines))
+
+
+def main() -> None:
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    valid = generated_lines(line_count)
+    invalid = [line if index % 100 else 'LET X' for index, line in enumerate(valid, start = 1)]
+    print(f'{len(valid)} lines')
+
+    for program_name, lines in (('valid', valid), ('invalid', invalid)):
+        for name, check in (('parse', _parse), ('validate', _validate)):
+            start = time.perf_counter()
+            error_count = check(lines)
+            elapsed = time.perf_counter() - start
+            print(f'{program_name:>8}, {name:>8}: {elapsed:.2f} s, {len(lines) / elapsed / 1000:.0f}k lines/s, {error_count} errors reported')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+# bench_variable_slots.py
+#
+# Compares running arithmetic-heavy Grin loops with variables kept in a
+# dict, keyed by name, against keeping them in slots of a list, as
+# InterpreterEngine does when created with variable_slots = True.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_variable_slots [iteration_count]
+
+import sys
+import time
+from benchmarks.loops import counting_loop, nested_loops, run_quietly
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.program import compile_program
+
+
+def main() -> None:
+    iteration_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    programs = {
+        'counting loop': counting_loop(iteration_count),
+        'nested loops': nested_loops(iteration_count // 100, 100)
+    }
+
+    for name, lines in programs.items():
+        program = compile_program(lines)
+        times = {}
+
+        for variable_slots in (False, True):
+            start = time.perf_counter()
+            output = run_quietly(lambda: InterpreterEngine(program, variable_slots = variable_slots).run())
+            times[variable_slots] = time.perf_counter() - start
+
+        print(f'{name:>14}: dict {times[False]:.2f} s, slots {times[True]:.2f} s '
+              f'({times[False] / times[True]:.2f}x), printed {output.strip()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# bench_vm.py
+#
+# Compares running Grin loops on an InterpreterEngine, which dispatches
+# each statement through its execute() method, against a BytecodeEngine,
+# which runs the program's bytecode in a dispatch loop over a program
+# counter, and against a ClosureEngine.
+#
+# Run it from the root of the project:
+#
+#     python -m benchmarks.bench_vm [iteration_count]
+
+import sys
+import time
+from benchmarks.loops import counting_loop, nested_loops, branching_loop, run_quietly
+from grin.interpreter.closures import ClosureEngine
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.program import compile_program
+from grin.interpreter.vm import BytecodeEngine
+
+
+def main() -> None:
+    iteration_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    programs = {
+        'counting loop': counting_loop(iteration_count),
+        'nested loops': nested_loops(iteration_count // 100, 100),
+        'branching loop': branching_loop(iteration_count)
+    }
+    engines = {
+        'statements': InterpreterEngine,
+        'bytecode': BytecodeEngine,
+        'closures': ClosureEngine
+    }
+
+    for name, lines in programs.items():
+        program = compile_program(lines)
+        times = {}
+        outputs = set()
+
+        for engine_name, engine in engines.items():
+            start = time.perf_counter()
+            outputs.add(run_quietly(lambda: engine(program).run()))
+            times[engine_name] = time.perf_counter() - start
+
+        assert len(outputs) == 1, f'{name} printed different output on different engines'
+        baseline = times['statements']
+        print(f'{name:>14}: ' + ', '.join(
+            f'{engine_name} {seconds:.2f} s ({baseline / seconds:.2f}x)' for engine_name, seconds in times.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+# loops.py
+#
+# Small, arithmetic-heavy Grin programs that spend their time in loops,
+# which the benchmarks of execution speed in this directory run, along
+# with a helper that runs a program with its output discarded.
+
+import contextlib
+import io
+
+
+def counting_loop(iteration_count: int) -> list[str]:
+    """Returns a loop that updates a few numeric variables on each iteration."""
+    return [
+        'LET I 0',
+        'LET TOTAL 0',
+        'LET SCALE 1.5',
+        'LOOP: ADD I 1',
+        'ADD TOTAL I',
+        'MULT TOTAL 3',
+        'DIV TOTAL 4',
+        'SUB TOTAL SCALE',
+        f'GOTO "LOOP" IF I < {iteration_count}',
+        'PRINT TOTAL'
+    ]
+
+
+def nested_loops(outer_count: int, inner_count: int) -> list[str]:
+    """Returns two nested loops, the inner one in a subroutine."""
+    return [
+        'LET I 0',
+        'OUTER: LET J 0',
+        'GOSUB "INNER"',
+        'ADD I 1',
+        f'GOTO "OUTER" IF I < {outer_count}',
+        'PRINT SUM',
+        'END',
+        'INNER: ADD SUM J',
+        'ADD J 1',
+        f'GOTO -2 IF J < {inner_count}',
+        'RETURN'
+    ]
+
+
+def branching_loop(iteration_count: int) -> list[str]:
+    """Returns a loop whose iterations take one of two branches, building a string on one."""
+    return [
+        'LET I 0',
+        'LET EVENS 0',
+        'LET TEXT ""',
+        'LOOP: ADD I 1',
+        'LET HALF I',
+        'DIV HALF 2',
+        'MULT HALF 2',
+        'GOTO "ODD" IF HALF <> I',
+        'ADD EVENS 1',
+        'GOTO "NEXT"',
+        'ODD: LET TEXT "x"',
+        'NEXT: GOTO "LOOP" IF I < ' + str(iteration_count),
+        'PRINT EVENS',
+        'PRINT TEXT'
+    ]
+
+
+def constant_loop(iteration_count: int) -> list[str]:
+    """Returns a loop that recomputes the same constants on each iteration, with code after it that never runs."""
+    return [
+        'LET I 0',
+        'LOOP: LET RATE 3',
+        'LET SCALE RATE',
+        'MULT SCALE 4',
+        'ADD SCALE 2',
+        'LET TOTAL I',
+        'MULT TOTAL SCALE',
+        'ADD I 1',
+        f'GOTO "LOOP" IF I < {iteration_count}',
+        'GOTO "DONE"',
+        'PRINT "never"',
+        'LET TOTAL 0',
+        'DONE: PRINT TOTAL'
+    ]
+
+def numeric_loop(iteration_count: int) -> list[str]:
+    """Returns a tight loop that recomputes an invariant product and a multiple of its counter on each iteration."""
+    return [
+        'LET I 0',
+        'LET TOTAL 0',
+        'LOOP: ADD I 1',
+        'LET RATE 3',
+        'MULT RATE 7',
+        'LET OFFSET I',
+        'MULT OFFSET 8',
+        'ADD TOTAL OFFSET',
+        'ADD TOTAL RATE',
+        f'GOTO "LOOP" IF I < {iteration_count}',
+        'PRINT TOTAL'
+    ]
+
+def summing_loop(iteration_count: int) -> list[str]:
+    """Returns a loop that only adds to its counter and to a few sums, one of them of the counter."""
+    return [
+        'LET STEP 3',
+        f'LET N {iteration_count}',
+        'LOOP: ADD I 1',
+        'ADD TOTAL STEP',
+        'ADD SQUARES I',
+        'SUB DEBT 2',
+        'GOTO "LOOP" IF I < N',
+        'PRINT TOTAL',
+        'PRINT SQUARES'
+    ]
+
+def calling_loop(iteration_count: int) -> list[str]:
+    """Returns a loop that calls a small helper subroutine on each iteration."""
+    return [
+        'LET I 0',
+        'LOOP: GOSUB "SCALE"',
+        'ADD TOTAL X',
+        'ADD I 1',
+        f'GOTO "LOOP" IF I < {iteration_count}',
+        'PRINT TOTAL',
+        'END',
+        'SCALE: LET X I',
+        'MULT X 3',
+        'ADD X 1',
+        'RETURN'
+    ]
+
+def run_quietly(run) -> str:
+    """Calls run(), returning what it printed."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        run()
+    return output.getvalue()
@@ -0,0 +1,34 @@
+# programs.py
+#
+# Generators for the large, synthetic Grin programs that the benchmarks in
+# this directory run against.  They're shaped like the machine-generated
+# programs that motivated most of the performance work: lots of short
+# arithmetic statements, counting loops and labeled jump targets.
+
+
+def generated_lines(statement_count: int) -> list[str]:
+    """Returns the lines of a generated Grin program with roughly the given
+    number of statements, not including the terminating '.' line."""
+    lines = []
+    block = 0
+
+    while len(lines) < statement_count:
+        lines.extend([
+            f'LET I{block} 0',
+            f'LET S{block} 0.5',
+            f'L{block}: ADD I{block} 1',
+            f'ADD S{block} I{block}',
+            f'MULT S{block} 2',
+            f'LET NAME "block {block}"',
+            f'GOTO "L{block}" IF I{block} < 10',
+            f'PRINT S{block}'
+        ])
+
+        block += 1
+
+    return lines
+
+
+def generated_source(statement_count: int) -> str:
+    """Returns the text of a generated Grin program, including its '.' line."""
+    return '\n'.join(generated_lines(statement_count)) + '\n.\n'
@@ -17,11 +17,23 @@
 from grin.lexing import *
 from grin.location import *
 from grin.parsing import *
+from grin.validation import *
 from grin.token import GrinToken, GrinTokenKind, GrinTokenCategory  # Explicit import
-from grin.interpreter.errors import GrinRuntimeError, GrinParseError  # Explicit import
+from grin.interpreter.errors import GrinRuntimeError, GrinParseError, GrinLinkError  # Explicit import
 from grin.interpreter.engine import InterpreterEngine
-from grin.interpreter.parser import parse_statements_into_objects
+from grin.interpreter.parser import parse_statements_into_objects, parse_lines_into_objects
+from grin.interpreter.document import GrinDocument
+from grin.interpreter.program import GrinProgram, compile_program
+from grin.interpreter.cache import GrinProgramCache, GrinProgramMemoryCache
+from grin.interpreter.bytecode import GrinBytecode, GrinOpcode
+from grin.interpreter.linker import link, link_errors
+from grin.interpreter.slots import GrinVariables, compile_slots
+from grin.interpreter.closures import ClosureEngine, compile_closures
+from grin.interpreter.vm import BytecodeEngine, assemble
+from grin.interpreter.transpiler import TranspiledEngine, transpile
+from grin.interpreter.superinstructions import Superinstruction, FusionReport, basic_blocks, fuse
 from grin.statements import *
+from grin.ir import *
 
 __all__ = [
     "GrinToken",
@@ -29,6 +41,29 @@ __all__ = [
     "GrinTokenCategory",
     "GrinRuntimeError",
     "GrinParseError",
+    "GrinLinkError",
     "InterpreterEngine",
     "parse_statements_into_objects",
+    "parse_lines_into_objects",
+    "GrinDocument",
+    "GrinProgram",
+    "compile_program",
+    "GrinProgramCache",
+    "GrinProgramMemoryCache",
+    "GrinBytecode",
+    "GrinOpcode",
+    "link",
+    "link_errors",
+    "GrinVariables",
+    "compile_slots",
+    "ClosureEngine",
+    "compile_closures",
+    "BytecodeEngine",
+    "assemble",
+    "TranspiledEngine",
+    "transpile",
+    "Superinstruction",
+    "FusionReport",
+    "basic_blocks",
+    "fuse",
 ]
\ No newline at end of file
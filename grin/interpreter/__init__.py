@@ -1,10 +1,43 @@
-from grin.interpreter.errors import GrinRuntimeError, GrinParseError
+from grin.interpreter.errors import GrinRuntimeError, GrinParseError, GrinLinkError
 from grin.interpreter.engine import InterpreterEngine
-from grin.interpreter.parser import parse_statements_into_objects
+from grin.interpreter.parser import parse_statements_into_objects, parse_lines_into_objects
+from grin.interpreter.document import GrinDocument
+from grin.interpreter.program import GrinProgram, compile_program
+from grin.interpreter.cache import GrinProgramCache, GrinProgramMemoryCache
+from grin.interpreter.bytecode import GrinBytecode, GrinOpcode
+from grin.interpreter.linker import link, link_errors
+from grin.interpreter.slots import GrinVariables, compile_slots
+from grin.interpreter.closures import ClosureEngine, compile_closures
+from grin.interpreter.vm import BytecodeEngine, assemble
+from grin.interpreter.transpiler import TranspiledEngine, transpile
+from grin.interpreter.superinstructions import Superinstruction, FusionReport, basic_blocks, fuse
 
 __all__ = [
     "GrinRuntimeError",
     "GrinParseError",
+    "GrinLinkError",
     "InterpreterEngine",
     "parse_statements_into_objects",
+    "parse_lines_into_objects",
+    "GrinDocument",
+    "GrinProgram",
+    "compile_program",
+    "GrinProgramCache",
+    "GrinProgramMemoryCache",
+    "GrinBytecode",
+    "GrinOpcode",
+    "link",
+    "link_errors",
+    "GrinVariables",
+    "compile_slots",
+    "ClosureEngine",
+    "compile_closures",
+    "BytecodeEngine",
+    "assemble",
+    "TranspiledEngine",
+    "transpile",
+    "Superinstruction",
+    "FusionReport",
+    "basic_blocks",
+    "fuse",
 ]
\ No newline at end of file
@@ -0,0 +1,430 @@
+import struct
+import sys
+from array import array
+from enum import IntEnum
+from typing import Iterable
+from grin.token import GrinToken, GrinTokenKind, _LazilyLocatedGrinToken
+from grin.statements.basic_statements import LetStatement, PrintStatement, EndStatement
+from grin.statements.input_statements import InnumStatement, InstrStatement
+from grin.statements.math_statements import AddStatement, SubStatement, MultStatement, DivStatement
+from grin.statements.jump_statements import GotoStatement, GosubStatement, LabelStatement, ReturnStatement
+from grin.interpreter.program import GrinProgram, index_labels
+
+# The version of the binary format written by dumps(); loads() only reads
+# this version.  Bump it whenever the format (or an opcode) changes.
+FORMAT_VERSION = 1
+
+_MAGIC = b'GRINBC'
+_HEADER = struct.Struct('<6sH')
+_COUNT = struct.Struct('<I')
+
+class GrinOpcode(IntEnum):
+    """The operation performed by an instruction.  Each is followed in the
+    code by a fixed number of operand words, given by OPERAND_COUNTS."""
+    LET = 0
+    PRINT = 1
+    INNUM = 2
+    INSTR = 3
+    ADD = 4
+    SUB = 5
+    MULT = 6
+    DIV = 7
+    GOTO = 8
+    GOTO_IF = 9
+    GOSUB = 10
+    GOSUB_IF = 11
+    RETURN = 12
+    END = 13
+
+# The number of operand words that follow each opcode: a conditional jump's
+# are its target, the left side of its condition, its comparison and the
+# right side of its condition.
+OPERAND_COUNTS = (2, 1, 1, 1, 2, 2, 2, 2, 1, 4, 1, 4, 0, 0)
+
+# A comparison operand is the index of its kind in this tuple.
+COMPARISON_KINDS = (
+    GrinTokenKind.EQUAL,
+    GrinTokenKind.NOT_EQUAL,
+    GrinTokenKind.LESS_THAN,
+    GrinTokenKind.LESS_THAN_OR_EQUAL,
+    GrinTokenKind.GREATER_THAN,
+    GrinTokenKind.GREATER_THAN_OR_EQUAL,
+)
+
+# Every other operand is either a variable, encoded as its index in the name
+# table shifted left by one bit, or a constant, encoded as its index in the
+# constant pool shifted left by one bit, with the lowest bit set.
+CONSTANT_BIT = 1
+
+# The kinds of literal a constant can be, in the order of their tags.
+CONSTANT_KINDS = (GrinTokenKind.LITERAL_INTEGER, GrinTokenKind.LITERAL_FLOAT, GrinTokenKind.LITERAL_STRING)
+
+_STATEMENT_OPCODES = {
+    LetStatement: GrinOpcode.LET,
+    PrintStatement: GrinOpcode.PRINT,
+    InnumStatement: GrinOpcode.INNUM,
+    InstrStatement: GrinOpcode.INSTR,
+    AddStatement: GrinOpcode.ADD,
+    SubStatement: GrinOpcode.SUB,
+    MultStatement: GrinOpcode.MULT,
+    DivStatement: GrinOpcode.DIV,
+    GotoStatement: GrinOpcode.GOTO,
+    GosubStatement: GrinOpcode.GOSUB,
+    ReturnStatement: GrinOpcode.RETURN,
+    EndStatement: GrinOpcode.END,
+}
+
+_OPCODE_STATEMENTS = {opcode: statement_class for statement_class, opcode in _STATEMENT_OPCODES.items()}
+_OPCODE_STATEMENTS[GrinOpcode.GOTO_IF] = GotoStatement
+_OPCODE_STATEMENTS[GrinOpcode.GOSUB_IF] = GosubStatement
+
+class GrinBytecode:
+    """A compiled Grin program in a compact, flat form: a code array holding
+    each statement's opcode followed by its operands, a constant pool of the
+    literals it uses, a table of the names of its variables and a table of
+    its labels.  It also keeps, for each instruction, the line it came from,
+    and for each word of code, the column of the token it came from (either
+    being 0 when it isn't known, e.g., for a RETURN or END statement),
+    so that the original statements can be rebuilt with their locations.
+
+    dumps() and loads() write and read it in a versioned binary format."""
+    def __init__(self, code, names, constants, labels, lines, columns):
+        self.code = code
+        self.names = tuple(names)
+        # Each constant is a (kind, text, value) triple.
+        self.constants = tuple(constants)
+        self.labels = dict(labels)
+        self.lines = lines
+        self.columns = columns
+        self.offsets = _instruction_offsets(code, len(self.names), len(self.constants))
+
+        if len(self.lines) != len(self.offsets) or len(self.columns) != len(self.code):
+            raise ValueError('Grin bytecode has mismatched line or column tables')
+        for name, index in self.labels.items():
+            if not 0 <= index < len(self.offsets):
+                raise ValueError(f'Grin bytecode has label {name} at invalid index {index}')
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @classmethod
+    def from_program(cls, program: GrinProgram | Iterable) -> 'GrinBytecode':
+        """Compiles a GrinProgram, or a list of statements in the form that
+        parse_statements_into_objects() returns them, into bytecode."""
+        if isinstance(program, GrinProgram):
+            statements = program.statements()
+            labels = program.labels()
+        else:
+            statements = list(program)
+            labels = index_labels(statements)
+
+        compiler = _Compiler()
+        for statement in statements:
+            compiler.compile(statement[1] if isinstance(statement, (list, tuple)) else statement)
+
+        return cls(
+            compiler.code, compiler.names, compiler.constants,
+            labels, compiler.lines, compiler.columns)
+
+    def program(self) -> GrinProgram:
+        """Rebuilds the statements of the program, with the same kinds, texts,
+        values and locations of tokens they were compiled from."""
+        code = self.code
+        columns = self.columns
+        statements = []
+
+        for index, offset in enumerate(self.offsets):
+            line = self.lines[index]
+            opcode = code[offset]
+            operands = []
+
+            for word in range(offset + 1, offset + 1 + OPERAND_COUNTS[opcode]):
+                if word == offset + 3 and (opcode == GrinOpcode.GOTO_IF or opcode == GrinOpcode.GOSUB_IF):
+                    operands.append(self._comparison_token(code[word], line, columns[word]))
+                else:
+                    operands.append(self._token(code[word], line, columns[word]))
+
+            statements.append(_OPCODE_STATEMENTS[opcode](*operands))
+
+        for label, index in self.labels.items():
+            statements[index] = [LabelStatement(label), statements[index]]
+
+        return GrinProgram(statements, self.labels)
+
+    def _token(self, operand: int, line: int, column: int) -> GrinToken:
+        if operand & CONSTANT_BIT:
+            kind, text, value = self.constants[operand >> 1]
+        else:
+            kind = GrinTokenKind.IDENTIFIER
+            text = value = self.names[operand >> 1]
+        return _make_token(kind, text, line, column, value)
+
+    def _comparison_token(self, operand: int, line: int, column: int) -> GrinToken:
+        kind = COMPARISON_KINDS[operand]
+        return _make_token(kind, _COMPARISON_TEXTS[kind], line, column, None)
+
+_COMPARISON_TEXTS = {
+    GrinTokenKind.EQUAL: '=',
+    GrinTokenKind.NOT_EQUAL: '<>',
+    GrinTokenKind.LESS_THAN: '<',
+    GrinTokenKind.LESS_THAN_OR_EQUAL: '<=',
+    GrinTokenKind.GREATER_THAN: '>',
+    GrinTokenKind.GREATER_THAN_OR_EQUAL: '>=',
+}
+
+def _make_token(kind: GrinTokenKind, text: str, line: int, column: int, value) -> GrinToken:
+    if line > 0 and column > 0:
+        return _LazilyLocatedGrinToken(kind, text, line, column, value)
+    return GrinToken(kind=kind, text=text, location=None, value=value)
+
+class _Compiler:
+    """Builds the tables and code of a GrinBytecode, one statement at a time."""
+    def __init__(self):
+        self.code = []
+        self.lines = []
+        self.columns = []
+        self.names = []
+        self.constants = []
+        self._name_indexes = {}
+        self._constant_indexes = {}
+
+    def compile(self, statement) -> None:
+        opcode = _STATEMENT_OPCODES.get(type(statement))
+        if opcode is None:
+            raise ValueError(f'Cannot compile {type(statement).__name__} to Grin bytecode')
+
+        if opcode == GrinOpcode.LET or opcode >= GrinOpcode.ADD and opcode <= GrinOpcode.DIV:
+            tokens = (statement.var, statement.value)
+        elif opcode == GrinOpcode.PRINT:
+            tokens = (statement.print_value,)
+        elif opcode == GrinOpcode.INNUM or opcode == GrinOpcode.INSTR:
+            tokens = (statement.var,)
+        elif opcode == GrinOpcode.GOTO or opcode == GrinOpcode.GOSUB:
+            tokens = (statement.target,)
+            if statement.condition_left is not None:
+                opcode += 1
+                tokens = (statement.target, statement.condition_left, statement.operator, statement.condition_right)
+        else:
+            tokens = ()
+
+        line = 0
+        self.code.append(opcode)
+        self.columns.append(0)
+
+        for position, token in enumerate(tokens):
+            if not isinstance(token, GrinToken):
+                raise ValueError(f'Cannot compile a {type(token).__name__} operand to Grin bytecode')
+            location = token.location()
+            if location is not None:
+                line = location.line()
+            self.code.append(
+                COMPARISON_KINDS.index(token.kind()) if position == 2 else self._operand(token))
+            self.columns.append(0 if location is None else location.column())
+
+        self.lines.append(line)
+
+    def _operand(self, token: GrinToken) -> int:
+        kind = token.kind()
+        if kind is GrinTokenKind.IDENTIFIER:
+            text = token.text()
+            index = self._name_indexes.get(text)
+            if index is None:
+                index = self._name_indexes[text] = len(self.names)
+                self.names.append(text)
+            return index << 1
+
+        if kind not in CONSTANT_KINDS:
+            raise ValueError(f'Cannot compile a {kind} operand to Grin bytecode')
+
+        key = (kind, token.text())
+        index = self._constant_indexes.get(key)
+        if index is None:
+            index = self._constant_indexes[key] = len(self.constants)
+            self.constants.append((kind, token.text(), token.value()))
+        return index << 1 | CONSTANT_BIT
+
+def _instruction_offsets(code, name_count: int, constant_count: int) -> array:
+    """Returns the offset in the code of each instruction, checking that every
+    opcode and operand in it is valid."""
+    offsets = array('I')
+    offset = 0
+    size = len(code)
+    operand_counts = OPERAND_COUNTS
+    opcode_count = len(operand_counts)
+    comparison_count = len(COMPARISON_KINDS)
+
+    while offset < size:
+        opcode = code[offset]
+        if not 0 <= opcode < opcode_count:
+            raise ValueError(f'Grin bytecode has invalid opcode {opcode} at offset {offset}')
+
+        end = offset + 1 + operand_counts[opcode]
+        if end > size:
+            raise ValueError(f'Grin bytecode ends in the middle of an instruction at offset {offset}')
+
+        for word in range(offset + 1, end):
+            operand = code[word]
+            if word == offset + 3 and (opcode == GrinOpcode.GOTO_IF or opcode == GrinOpcode.GOSUB_IF):
+                limit = comparison_count
+            elif operand & CONSTANT_BIT:
+                operand >>= 1
+                limit = constant_count
+            else:
+                operand >>= 1
+                limit = name_count
+
+            if not 0 <= operand < limit:
+                raise ValueError(f'Grin bytecode has invalid operand at offset {word}')
+
+        offsets.append(offset)
+        offset = end
+
+    return offsets
+
+def dumps(program: GrinBytecode | GrinProgram) -> bytes:
+    """Returns the binary encoding of a program, compiling it to bytecode first
+    if it isn't already."""
+    if not isinstance(program, GrinBytecode):
+        program = GrinBytecode.from_program(program)
+
+    label_names = list(program.labels)
+    constant_tags = [CONSTANT_KINDS.index(kind) for kind, _, _ in program.constants]
+
+    chunks = [_HEADER.pack(_MAGIC, FORMAT_VERSION)]
+    _write_strings(chunks, program.names)
+    _write_array(chunks, constant_tags)
+    _write_strings(chunks, [text for _, text, _ in program.constants])
+    _write_strings(chunks, label_names)
+    _write_array(chunks, [program.labels[name] for name in label_names])
+    _write_array(chunks, program.code)
+    _write_array(chunks, program.lines)
+    _write_array(chunks, program.columns)
+    return b''.join(chunks)
+
+def loads(data: bytes | bytearray | memoryview) -> GrinBytecode:
+    """Reads a program written by dumps(), raising a ValueError if the data
+    isn't a valid program in the current format."""
+    reader = _Reader(memoryview(data).cast('B'))
+    magic, version = reader.unpack(_HEADER)
+    if magic != _MAGIC:
+        raise ValueError('Data is not Grin bytecode')
+    if version != FORMAT_VERSION:
+        raise ValueError(f'Grin bytecode version {version} is not supported (expected {FORMAT_VERSION})')
+
+    names = reader.strings()
+    constant_tags = reader.array()
+    constant_texts = reader.strings()
+    label_names = reader.strings()
+    label_indexes = reader.array()
+    code = reader.array()
+    lines = reader.array()
+    columns = reader.array()
+
+    if reader.remaining():
+        raise ValueError('Grin bytecode has unexpected data at its end')
+    if len(constant_tags) != len(constant_texts) or len(label_names) != len(label_indexes):
+        raise ValueError('Grin bytecode has mismatched tables')
+
+    try:
+        constants = [
+            _constant(CONSTANT_KINDS[tag], text)
+            for tag, text in zip(constant_tags, constant_texts)
+        ]
+    except (IndexError, ValueError):
+        raise ValueError('Grin bytecode has an invalid constant') from None
+
+    return GrinBytecode(code, names, constants, zip(label_names, label_indexes), lines, columns)
+
+def _constant(kind: GrinTokenKind, text: str) -> tuple:
+    if kind is GrinTokenKind.LITERAL_INTEGER:
+        return kind, text, int(text)
+    elif kind is GrinTokenKind.LITERAL_FLOAT:
+        return kind, text, float(text)
+    elif len(text) < 2 or text[0] != '"' or text[-1] != '"':
+        raise ValueError(f'Invalid string literal {text}')
+    return kind, text, text[1:-1]
+
+# Arrays are written with the narrowest of these type codes that holds all
+# of their values, preceded by their item size and the number of values.
+_ARRAY_TYPECODES = (('B', 1), ('H', 2), ('I', 4), ('Q', 8))
+_ARRAY_HEADER = struct.Struct('<BI')
+
+def _write_array(chunks: list, values) -> None:
+    largest = max(values, default=0)
+    for typecode, itemsize in _ARRAY_TYPECODES:
+        if largest < 1 << (8 * itemsize):
+            break
+    else:
+        raise ValueError(f'Cannot write {largest} to Grin bytecode')
+
+    items = array(typecode, values)
+    if sys.byteorder == 'big':
+        items.byteswap()
+    chunks.append(_ARRAY_HEADER.pack(itemsize, len(items)))
+    chunks.append(items.tobytes())
+
+def _write_strings(chunks: list, strings: list[str]) -> None:
+    # Strings are written as one UTF-8 blob, with an array of their lengths in
+    # characters, so that they're decoded in one call and sliced apart.
+    _write_array(chunks, [len(string) for string in strings])
+    blob = ''.join(strings).encode('utf-8', 'surrogatepass')
+    chunks.append(_COUNT.pack(len(blob)))
+    chunks.append(blob)
+
+_TYPECODES_BY_SIZE = {itemsize: typecode for typecode, itemsize in _ARRAY_TYPECODES}
+
+class _Reader:
+    """Reads the parts of a program written by dumps(), checking their sizes."""
+    def __init__(self, data: memoryview):
+        self._data = data
+        self._offset = 0
+
+    def remaining(self) -> int:
+        return len(self._data) - self._offset
+
+    def bytes(self, size: int) -> memoryview:
+        if size > self.remaining():
+            raise ValueError('Grin bytecode is truncated')
+        chunk = self._data[self._offset:self._offset + size]
+        self._offset += size
+        return chunk
+
+    def unpack(self, format: struct.Struct) -> tuple:
+        return format.unpack(self.bytes(format.size))
+
+    def array(self) -> array:
+        itemsize, count = self.unpack(_ARRAY_HEADER)
+        typecode = _TYPECODES_BY_SIZE.get(itemsize)
+        if typecode is None:
+            raise ValueError(f'Grin bytecode has an array of invalid item size {itemsize}')
+
+        items = array(typecode)
+        items.frombytes(self.bytes(itemsize * count))
+        if sys.byteorder == 'big':
+            items.byteswap()
+        return items
+
+    def strings(self) -> list[str]:
+        lengths = self.array()
+        size, = self.unpack(_COUNT)
+        try:
+            text = str(self.bytes(size), 'utf-8', 'surrogatepass')
+        except UnicodeDecodeError:
+            raise ValueError('Grin bytecode has an invalid string table') from None
+
+        if sum(lengths) != len(text):
+            raise ValueError('Grin bytecode has an invalid string table')
+
+        strings = []
+        start = 0
+        for length in lengths:
+            strings.append(text[start:start + length])
+            start += length
+        return strings
+
+__all__ = [
+    GrinOpcode.__name__,
+    GrinBytecode.__name__,
+    dumps.__name__,
+    loads.__name__
+]
@@ -0,0 +1,263 @@
+import gc
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import cache
+from typing import Iterable
+from grin.interpreter.parser import parse_lines_into_objects
+from grin.interpreter.program import GrinProgram, compile_program
+
+# Bump this whenever a change to the interpreter changes what a compiled
+# program looks like (e.g., the attributes of a statement class), so that
+# programs compiled by an earlier version are no longer found in a cache.
+INTERPRETER_VERSION = 3
+
+_MAGIC = b'GRINC\x00'
+_VERSION_TAG = f'{INTERPRETER_VERSION}-{sys.implementation.cache_tag}-{pickle.HIGHEST_PROTOCOL}'.encode()
+
+class GrinProgramCache:
+    """A directory of compiled Grin programs, similar to __pycache__.  Each
+    program is stored in a file named after a hash of its source code and
+    the interpreter version, so an edited program or a new interpreter never
+    finds a stale entry.  Each file also begins with that hash, and a file
+    that doesn't, that can't be loaded at all, or whose statements don't have
+    the attributes this interpreter's do is treated as missing and replaced.
+
+    Entries are pickled, so a cache directory must be trusted as much as
+    the interpreter's own source code."""
+    def __init__(self, directory: str | os.PathLike):
+        self._directory = os.fspath(directory)
+
+    def directory(self) -> str:
+        return self._directory
+
+    def path(self, lines: Iterable[str]) -> str:
+        """Returns the path of the file the program in the given lines is cached in."""
+        return self._path(_digest(_program_lines(lines)))
+
+    def load(self, lines: Iterable[str]) -> GrinProgram | None:
+        """Returns the cached program compiled from the given lines, or None if
+        there isn't one (or it's corrupt)."""
+        return self._load(_digest(_program_lines(lines)))
+
+    def store(self, lines: Iterable[str], program: GrinProgram) -> None:
+        """Caches the given program, compiled from the given lines.  Failing
+        to write the file isn't an error, since the cache is only an optimization."""
+        self._store(_digest(_program_lines(lines)), program)
+
+    def compile(self, lines: Iterable[str]) -> GrinProgram:
+        """Returns the program compiled from the given lines, loading it from
+        the cache if it's there, or compiling and caching it if it isn't."""
+        lines = _program_lines(lines)
+        digest = _digest(lines)
+        program = self._load(digest)
+
+        if program is None:
+            program = compile_program(lines)
+            self._store(digest, program)
+
+        return program
+
+    def _path(self, digest: bytes) -> str:
+        return os.path.join(self._directory, digest.hex() + '.grinc')
+
+    def _load(self, digest: bytes) -> GrinProgram | None:
+        try:
+            with open(self._path(digest), 'rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+
+        header = _MAGIC + digest
+        if not data.startswith(header):
+            return None
+
+        # Unpickling a program creates hundreds of thousands of objects, none
+        # of them garbage, and letting the garbage collector keep scanning
+        # them as they're created would make loading several times slower.
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            program = pickle.loads(memoryview(data)[len(header):])
+        except Exception:
+            return None
+        finally:
+            if collecting:
+                gc.enable()
+
+        return program if isinstance(program, GrinProgram) and _is_current(program) else None
+
+    def _store(self, digest: bytes, program: GrinProgram) -> None:
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            # Write to a temporary file first, so that a reader never sees a
+            # partly written entry, even when several processes store at once.
+            descriptor, temporary_path = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+            try:
+                with os.fdopen(descriptor, 'wb') as file:
+                    file.write(_MAGIC + digest)
+                    pickle.dump(program, file, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temporary_path, self._path(digest))
+            except BaseException:
+                os.unlink(temporary_path)
+                raise
+        except OSError:
+            pass
+
+class GrinProgramMemoryCache:
+    """A bounded, in-process cache of compiled Grin programs, keyed by their
+    source code, for services that are sent the same programs over and over.
+    It holds at most max_programs programs, whose statements number at most
+    max_statements in total; when either would be exceeded, the least
+    recently used programs are evicted.
+
+    A cache can be shared by any number of threads.  The programs it returns
+    can't be changed, so one can be run by any number of engines at once."""
+    def __init__(self, max_programs: int = 256, max_statements: int = 1_000_000):
+        if max_programs < 1:
+            raise ValueError(f'Cache size must be positive, was {max_programs}')
+        if max_statements < 1:
+            raise ValueError(f'Cache statement limit must be positive, was {max_statements}')
+
+        self._max_programs = max_programs
+        self._max_statements = max_statements
+        self._entries: OrderedDict[tuple[str, ...], GrinProgram] = OrderedDict()
+        self._statement_count = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def max_programs(self) -> int:
+        """Returns the largest number of programs the cache will hold"""
+        return self._max_programs
+
+    def max_statements(self) -> int:
+        """Returns the largest total number of statements the cache will hold"""
+        return self._max_statements
+
+    def statement_count(self) -> int:
+        """Returns the total number of statements in the cached programs"""
+        return self._statement_count
+
+    def hits(self) -> int:
+        """Returns how many programs were found in the cache"""
+        return self._hits
+
+    def misses(self) -> int:
+        """Returns how many programs had to be compiled"""
+        return self._misses
+
+    def evictions(self) -> int:
+        """Returns how many programs were evicted to make room for others"""
+        return self._evictions
+
+    def clear(self) -> None:
+        """Empties the cache and resets its counters"""
+        with self._lock:
+            self._entries.clear()
+            self._statement_count = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def compile(self, lines: Iterable[str]) -> GrinProgram:
+        """Returns the program compiled from the given lines, compiling and
+        caching it if it isn't already cached.  A program that fails to
+        compile isn't cached, so the same error is raised every time."""
+        key = tuple(_program_lines(lines))
+
+        with self._lock:
+            program = self._entries.get(key)
+            if program is not None:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return program
+            self._misses += 1
+
+        # Compiling happens outside the lock, so that a large program doesn't
+        # hold up threads that find theirs in the cache.  If two threads
+        # compile the same program at once, the first one cached is kept.
+        program = compile_program(key)
+
+        if len(program) > self._max_statements:
+            return program
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                return cached
+
+            self._entries[key] = program
+            self._statement_count += len(program)
+
+            while len(self._entries) > self._max_programs or self._statement_count > self._max_statements:
+                _, evicted = self._entries.popitem(last=False)
+                self._statement_count -= len(evicted)
+                self._evictions += 1
+
+        return program
+
+def _program_lines(lines: Iterable[str]) -> list[str]:
+    """Returns a program's lines, up to (not including) its '.' line."""
+    program_lines = []
+    for line in lines:
+        if line.strip() == '.':
+            break
+        program_lines.append(line)
+    return program_lines
+
+@cache
+def _statement_attributes() -> dict[type, set[str]]:
+    """Returns the attributes of each kind of statement this interpreter
+    compiles, taken from a program with one of each."""
+    statements = parse_lines_into_objects([
+        'LET A 1', 'PRINT A', 'INNUM A', 'INSTR A', 'ADD A 1', 'SUB A 1', 'MULT A 1', 'DIV A 1',
+        'L: GOTO 1 IF A < 1', 'GOSUB "L"', 'RETURN', 'END'], lazy_locations=True)
+    attributes = {}
+    for statement in statements:
+        for part in statement if isinstance(statement, list) else (statement,):
+            attributes[type(part)] = set(vars(part))
+    return attributes
+
+def _is_current(program: GrinProgram) -> bool:
+    """Returns whether the statements in a loaded program have the attributes
+    this interpreter's statements of their kinds have, which a program
+    pickled by an interpreter whose version wasn't bumped might not.  All of
+    a program's statements of one kind were built by the same interpreter,
+    so only one of each kind is checked."""
+    statements = program.statements()
+    examples = {type(statement): statement for statement in statements}
+    labeled = examples.pop(tuple, None)
+    try:
+        if labeled is not None:
+            examples.update({type(statement[1]): statement[1] for statement in statements if type(statement) is tuple})
+            examples[type(labeled[0])] = labeled[0]
+
+        attributes = _statement_attributes()
+        return all(vars(example).keys() == attributes[kind] for kind, example in examples.items())
+    except (IndexError, KeyError, TypeError):
+        return False
+
+def _digest(lines: list[str]) -> bytes:
+    """Returns the hash of a program's lines and the interpreter version."""
+    digest = hashlib.sha256(_VERSION_TAG)
+    for line in lines:
+        # Each line is preceded by its length, so that no two different
+        # sequences of lines are hashed as the same bytes.
+        encoded = line.encode('utf-8', 'surrogatepass')
+        digest.update(len(encoded).to_bytes(8, 'little'))
+        digest.update(encoded)
+    return digest.digest()
+
+__all__ = [
+    GrinProgramCache.__name__,
+    GrinProgramMemoryCache.__name__
+]
@@ -0,0 +1,284 @@
+import operator as _operator
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.errors import GrinRuntimeError
+from grin.statements.input_statements import read_number
+from grin.statements.jump_statements import compare_values, check_goto_target, resolve_target
+from grin.statements.nodes import (
+    LetNode, PrintNode, InnumNode, InstrNode, MathNode, AddNode, SubNode, MultNode,
+    JumpNode, GotoNode, GosubNode, ReturnNode, EndNode, to_node)
+
+# Returned by a closure that ends the program, so that the run loop stops.
+_STOP = float('inf')
+
+_NUMBERS = frozenset([int, float])
+
+# The operations whose result, when both sides are numbers, is just the
+# operator's; DIV isn't one, since its result depends on the types and it
+# has to check for zero.
+_NUMERIC_OPERATIONS = {
+    AddNode: _operator.add,
+    SubNode: _operator.sub,
+    MultNode: _operator.mul,
+}
+
+class ClosureEngine(InterpreterEngine):
+    """An engine that compiles each statement of its program, once, into a
+    closure with its operands, operator and variable names baked in, so
+    that its run loop does nothing but call them.  Each closure returns the
+    index of the statement to run next.  It prints, fails and leaves its
+    variables exactly as an InterpreterEngine does."""
+    def __init__(self, program):
+        super().__init__(program)
+        self.code = compile_closures(self)
+
+    def run(self) -> None:
+        """Runs the interpreter"""
+        if self.terminate:
+            return
+
+        code = self.code
+        count = len(code)
+        line = self.current_line
+        try:
+            while line < count:
+                line = code[line]()
+        except BaseException:
+            self.current_line = line
+            raise
+
+        # Closures that end the program leave current_line where the engine
+        # would have, and return _STOP rather than an index.
+        if line is not _STOP:
+            self.current_line = line
+
+def compile_closures(engine: InterpreterEngine) -> list:
+    """Returns a closure for each statement of the given engine's program,
+    which runs it against the engine's variables, labels and call stack,
+    and returns the index of the statement to run next."""
+    count = len(engine.program)
+    code = []
+    for index, statement in enumerate(engine.program):
+        if isinstance(statement, (list, tuple)):
+            statement = statement[1]
+        code.append(_compile(to_node(statement), index, count, engine))
+    return code
+
+def _compile(node, index: int, count: int, engine: InterpreterEngine):
+    variables = engine.variables
+    following = index + 1
+
+    if isinstance(node, LetNode):
+        return _let(variables, node.name, node.is_variable, node.operand, following)
+    elif isinstance(node, PrintNode):
+        return _print(variables, node.is_variable, node.operand, following)
+    elif isinstance(node, MathNode):
+        return _math(variables, node, following)
+    elif isinstance(node, InnumNode):
+        return _innum(variables, node.name, following)
+    elif isinstance(node, InstrNode):
+        return _instr(variables, node.name, following)
+    elif isinstance(node, JumpNode):
+        return _jump(node, index, count, engine)
+    elif isinstance(node, ReturnNode):
+        return _return(engine.call_stack)
+    elif isinstance(node, EndNode):
+        return _end(engine, following)
+    return _execute(node, index, engine)
+
+def _let(variables, name, is_variable, operand, following):
+    if is_variable:
+        def let():
+            variables[name] = variables.get(operand, 0)
+            return following
+    else:
+        def let():
+            variables[name] = operand
+            return following
+    return let
+
+def _print(variables, is_variable, operand, following):
+    if is_variable:
+        def print_variable():
+            print(variables.get(operand, 0))
+            return following
+        return print_variable
+    else:
+        def print_literal():
+            print(operand)
+            return following
+        return print_literal
+
+def _math(variables, node, following):
+    name = node.name
+    operand = node.operand
+    operate = node.operate
+    numeric = _NUMERIC_OPERATIONS.get(type(node))
+
+    if node.is_variable and numeric is not None:
+        def math():
+            left = variables.get(name)
+            if left is None:
+                left = variables[name] = 0
+            right = variables.get(operand, 0)
+            if type(left) in _NUMBERS and type(right) in _NUMBERS:
+                variables[name] = numeric(left, right)
+            else:
+                variables[name] = operate(left, right)
+            return following
+    elif node.is_variable:
+        def math():
+            left = variables.get(name)
+            if left is None:
+                left = variables[name] = 0
+            variables[name] = operate(left, variables.get(operand, 0))
+            return following
+    elif numeric is not None and type(operand) in _NUMBERS:
+        def math():
+            left = variables.get(name)
+            if left is None:
+                left = variables[name] = 0
+            if type(left) in _NUMBERS:
+                variables[name] = numeric(left, operand)
+            else:
+                variables[name] = operate(left, operand)
+            return following
+    else:
+        def math():
+            left = variables.get(name)
+            if left is None:
+                left = variables[name] = 0
+            variables[name] = operate(left, operand)
+            return following
+    return math
+
+def _innum(variables, name, following):
+    def innum():
+        variables[name] = read_number(name)
+        return following
+    return innum
+
+def _instr(variables, name, following):
+    def instr():
+        variables[name] = input().strip()
+        return following
+    return instr
+
+def _condition(variables, condition):
+    """Returns a function that evaluates a jump's condition."""
+    left_is_variable, left, comparison, right_is_variable, right = condition
+
+    if left_is_variable and not right_is_variable:
+        right_type = type(right)
+        def test():
+            left_value = variables.get(left, 0)
+            if type(left_value) is right_type:
+                return comparison(left_value, right)
+            return compare_values(left_value, comparison, right)
+    elif left_is_variable and right_is_variable:
+        def test():
+            left_value = variables.get(left, 0)
+            right_value = variables.get(right, 0)
+            if type(left_value) is type(right_value):
+                return comparison(left_value, right_value)
+            return compare_values(left_value, comparison, right_value)
+    else:
+        def test():
+            left_value = variables.get(left, 0) if left_is_variable else left
+            right_value = variables.get(right, 0) if right_is_variable else right
+            return compare_values(left_value, comparison, right_value)
+    return test
+
+def _literal_destination(value, index: int, count: int, labels):
+    """Returns the index a literal target jumps to, and the message of the
+    error taking the jump raises instead, if it does."""
+    try:
+        return resolve_target(value, index, count, labels), None
+    except GrinRuntimeError as e:
+        return None, str(e)
+
+def _jump(node, index: int, count: int, engine: InterpreterEngine):
+    variables = engine.variables
+    labels = engine.labels
+    call_stack = engine.call_stack
+    following = index + 1
+    is_gosub = isinstance(node, GosubNode)
+    test = None if node.condition is None else _condition(variables, node.condition)
+
+    if node.resolved_target is not None or not node.target_is_variable:
+        if node.resolved_target is not None:
+            destination, message = node.resolved_target, None
+        else:
+            if isinstance(node, GotoNode) and isinstance(node.target, int) and node.target == 0:
+                def fail():
+                    check_goto_target(0)
+                return fail
+            destination, message = _literal_destination(node.target, index, count, labels)
+
+        if message is not None:
+            def jump():
+                if test is None or test():
+                    if is_gosub:
+                        call_stack.append(index)
+                    raise GrinRuntimeError(message)
+                return following
+        elif is_gosub:
+            def jump():
+                if test is None or test():
+                    call_stack.append(index)
+                    return destination
+                return following
+        elif test is None:
+            def jump():
+                return destination
+        else:
+            def jump():
+                if test():
+                    return destination
+                return following
+        return jump
+
+    target = node.target
+    checks_zero = isinstance(node, GotoNode)
+
+    def jump():
+        if checks_zero:
+            check_goto_target(variables.get(target, 0))
+        if test is None or test():
+            if is_gosub:
+                call_stack.append(index)
+            # The target is read again, as jump_to() does, though nothing
+            # can have changed it since.
+            return resolve_target(variables.get(target, 0), index, count, labels)
+        return following
+    return jump
+
+def _return(call_stack):
+    def return_():
+        if not call_stack:
+            raise GrinRuntimeError("RETURN statement encountered without a matching GOSUB.")
+        return call_stack.pop() + 1
+    return return_
+
+def _end(engine, following):
+    def end():
+        engine.terminate = True
+        engine.current_line = following
+        return _STOP
+    return end
+
+def _execute(statement, index: int, engine: InterpreterEngine):
+    """Returns a closure that executes a statement that can't be compiled
+    (one built by hand, say) as InterpreterEngine.run() would."""
+    def execute():
+        engine.current_line = index
+        statement.execute(engine)
+        if engine.terminate:
+            engine.current_line += 1
+            return _STOP
+        return engine.current_line + 1
+    return execute
+
+__all__ = [
+    ClosureEngine.__name__,
+    compile_closures.__name__
+]
@@ -0,0 +1,185 @@
+from bisect import bisect_left
+from typing import Iterable
+from grin.lexing import GrinLexError
+# grin.parsing and grin.interpreter.errors each define a GrinParseError; the
+# former is raised while lines are parsed, the latter while statements are
+# created from them.
+from grin.parsing import GrinParseError as GrinLineParseError, _parse_line
+from grin.token import GrinToken, GrinTokenKind
+from grin.interpreter.errors import GrinParseError, GrinRuntimeError
+from grin.interpreter.parser import parse_statements_into_objects
+
+class GrinDocument:
+    """An editable Grin program that keeps the tokens and the statement object
+    of each of its lines, along with an index of its labels.  Editing a range
+    of lines re-lexes and re-parses only the lines that replace it; every
+    other line keeps what was built for it.
+
+    The document holds the statements of a program, without the '.' line
+    that terminates it when it's typed in.  Lines with errors are kept, so
+    a document can be edited back into a valid program."""
+    def __init__(self, lines: Iterable[str] = ()):
+        self._texts = []
+        self._tokens = []
+        self._statements = []
+        self._errors = []
+        self._parsed_at = []
+        self._error_count = 0
+        # The labels in the document, ordered by the index of their lines, so
+        # that the ones after an edit can be shifted in a single slice.
+        self._label_names = []
+        self._label_positions = []
+        self._label_counts = {}
+        self._duplicate_label_count = 0
+        self.edit(0, 0, lines)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def line(self, index: int) -> str:
+        """Returns the text of the line at the given (zero-based) index."""
+        return self._texts[index]
+
+    def lines(self) -> list[str]:
+        """Returns the text of every line."""
+        return list(self._texts)
+
+    def edit(self, start: int, end: int, lines: Iterable[str]) -> None:
+        """Replaces the lines from index start up to (but not including) index
+        end with the given lines, lexing and parsing only those."""
+        if not 0 <= start <= end <= len(self._texts):
+            raise IndexError(f'Invalid range of lines: {start} to {end}')
+
+        texts = list(lines)
+        compiled = [self._compile_line(text, start + offset + 1) for offset, text in enumerate(texts)]
+
+        for index in range(start, end):
+            if self._errors[index] is not None:
+                self._error_count -= 1
+
+        first = bisect_left(self._label_positions, start)
+        last = bisect_left(self._label_positions, end, first)
+
+        for label in self._label_names[first:last]:
+            self._count_label(label, -1)
+
+        del self._label_names[first:last]
+        del self._label_positions[first:last]
+
+        shift = len(texts) - (end - start)
+
+        if shift != 0:
+            self._label_positions[first:] = [position + shift for position in self._label_positions[first:]]
+
+        self._texts[start:end] = texts
+        self._tokens[start:end] = [tokens for tokens, _, _ in compiled]
+        self._statements[start:end] = [statement for _, statement, _ in compiled]
+        self._errors[start:end] = [error for _, _, error in compiled]
+        self._parsed_at[start:end] = range(start + 1, start + len(texts) + 1)
+
+        new_names = []
+        new_positions = []
+
+        for index in range(start, start + len(texts)):
+            if self._errors[index] is not None:
+                self._error_count += 1
+
+            label = self._label_of(index)
+
+            if label is not None:
+                self._count_label(label, 1)
+                new_names.append(label)
+                new_positions.append(index)
+
+        self._label_names[first:first] = new_names
+        self._label_positions[first:first] = new_positions
+
+    def tokens(self, index: int) -> list[GrinToken]:
+        """Returns the tokens on the line at the given index, whose locations
+        reflect where the line is now, even if lines were inserted or removed
+        above it since it was parsed.
+
+        Raises the line's GrinLexError or GrinParseError if it has one."""
+        if self._parsed_at[index] != index + 1:
+            self._relocate(index)
+
+        if self._errors[index] is not None:
+            raise self._errors[index]
+
+        return self._tokens[index]
+
+    def errors(self) -> list[Exception]:
+        """Returns the error on each line that has one, in order of line."""
+        errors = []
+
+        if self._error_count > 0:
+            for index, error in enumerate(self._errors):
+                if error is not None:
+                    if self._parsed_at[index] != index + 1:
+                        self._relocate(index)
+                    errors.append(self._errors[index])
+
+        return errors
+
+    def statements(self) -> list:
+        """Returns the statement objects of the program, in the same form as
+        parse_statements_into_objects() returns them.  The list belongs to
+        the document and changes as it's edited, so it must not be modified.
+
+        Raises the first error in the document, if there are any."""
+        if self._error_count > 0:
+            raise self.errors()[0]
+
+        return self._statements
+
+    def labels(self) -> dict[str, int]:
+        """Returns a dictionary mapping each label to the index of the statement
+        it labels, the way InterpreterEngine indexes them.
+
+        Raises a GrinRuntimeError if a label appears on more than one line."""
+        if self._duplicate_label_count > 0:
+            raise GrinRuntimeError("Cannot create two of the same label")
+
+        return dict(zip(self._label_names, self._label_positions))
+
+    def _compile_line(self, text: str, line_number: int) -> tuple:
+        try:
+            tokens = _parse_line(text, line_number)
+            return tokens, parse_statements_into_objects([tokens])[0], None
+        except (GrinLexError, GrinLineParseError, GrinParseError) as e:
+            return None, None, e
+
+    def _relocate(self, index: int) -> None:
+        tokens, statement, error = self._compile_line(self._texts[index], index + 1)
+        self._tokens[index] = tokens
+        self._errors[index] = error
+        self._parsed_at[index] = index + 1
+
+    def _label_of(self, index: int) -> str | None:
+        tokens = self._tokens[index]
+
+        if tokens is not None and len(tokens) >= 2 and tokens[1].kind() is GrinTokenKind.COLON:
+            return tokens[0].text()
+
+        return None
+
+    def _count_label(self, label: str, change: int) -> None:
+        count = self._label_counts.get(label, 0)
+
+        if count > 1:
+            self._duplicate_label_count -= 1
+
+        count += change
+
+        if count > 1:
+            self._duplicate_label_count += 1
+
+        if count == 0:
+            del self._label_counts[label]
+        else:
+            self._label_counts[label] = count
+
+
+__all__ = [
+    GrinDocument.__name__
+]
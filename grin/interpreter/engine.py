@@ -1,32 +1,39 @@
 from grin.statements.jump_statements import LabelStatement
-from grin.interpreter.errors import GrinRuntimeError
+from grin.interpreter.program import GrinProgram, index_labels
+from grin.interpreter.slots import GrinVariables, compile_slots
 
 class InterpreterEngine:
-    def __init__(self, program):
-        self.program = program
+    def __init__(self, program, variable_slots = False):
         self.current_line = 0
         self.variables = {}
-        self.labels = {}
         self.terminate = False
         self.call_stack = []
-        self._index_labels()
+        if isinstance(program, GrinProgram):
+            # A compiled program's labels were already indexed, and it can't
+            # change, so they can be shared rather than indexed again.
+            self.program = program.statements()
+            self.labels = program.labels()
+        else:
+            self.program = program
+            self.labels = {}
+            self._index_labels()
+
+        if variable_slots:
+            # Each variable gets a slot in a list, which the compiled statements
+            # index directly; variables becomes a dict-like view of the list.
+            self.program, names = compile_slots(self.program)
+            self.slots = [None] * len(names)
+            self.variables = GrinVariables(names, self.slots)
 
     def _index_labels(self) -> None:
         """Scan the program and record labels with their statement index."""
-        for i, statement in enumerate(self.program):
-            if isinstance(statement, list):
-                if isinstance(statement[0], LabelStatement):
-                    key_list = list(self.labels.keys())
-                    if statement[0].label in key_list:
-                        raise GrinRuntimeError("Cannot create two of the same label")
-
-                    self.labels[statement[0].label] = i
+        self.labels = index_labels(self.program)
 
     def run(self) -> None:
         """Runs the interpreter"""
         while self.current_line < len(self.program) and not self.terminate:
             statement = self.program[self.current_line]
-            if isinstance(statement, list):
+            if isinstance(statement, (list, tuple)):
                 if isinstance(statement[0], LabelStatement):
                     statement = statement[1]
 
@@ -10,7 +10,21 @@ class GrinRuntimeError(Exception):
         super().__init__(message)
         self.message = message
 
+class GrinLinkError(GrinRuntimeError):
+    """Raised when a program is linked and one of its jumps has a target that
+    would fail when the jump is taken.  Its message is the one that taking
+    the jump would raise."""
+    def __init__(self, message, index, line = None):
+        super().__init__(message)
+        self.index = index
+        self.line = line
+
+    def __reduce__(self):
+        # Lets the error be pickled, e.g., to report it from another process
+        return type(self), (self.args[0], self.index, self.line)
+
 __all__ = [
     GrinParseError.__name__,
-    GrinRuntimeError.__name__
+    GrinRuntimeError.__name__,
+    GrinLinkError.__name__
 ]
\ No newline at end of file
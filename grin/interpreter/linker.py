@@ -0,0 +1,103 @@
+from typing import Iterable
+from grin.token import GrinToken, GrinTokenKind
+from grin.statements.jump_statements import JumpStatement, GotoStatement, check_goto_target, resolve_target
+from grin.statements.nodes import JumpNode, GotoNode
+from grin.interpreter.errors import GrinLinkError, GrinRuntimeError
+from grin.interpreter.program import GrinProgram, index_labels
+
+def link(program: GrinProgram | Iterable) -> GrinProgram:
+    """Links a GrinProgram (or a list of statements or nodes, in the form that
+    parse_statements_into_objects() returns them): indexes its labels, and
+    resolves each jump whose target is a literal -- a label or a relative
+    number of lines -- to the absolute index of the statement it jumps to,
+    so that taking the jump neither evaluates nor looks up its target.
+
+    Every literal target is checked, whether or not its jump would ever be
+    taken, and the first that would fail when taken raises a GrinLinkError
+    with the message that taking it would have raised.  Jumps whose targets
+    are variables are left to be resolved when they're taken."""
+    if isinstance(program, GrinProgram):
+        statements = program.statements()
+        labels = program.labels()
+    else:
+        statements = list(program)
+        labels = index_labels(statements)
+
+    errors = link_errors(statements, labels)
+    if errors:
+        raise errors[0]
+
+    linked = []
+    for index, statement in enumerate(statements):
+        if isinstance(statement, (list, tuple)):
+            linked.append((statement[0], _resolve(statement[1], index, labels)))
+        else:
+            linked.append(_resolve(statement, index, labels))
+
+    return GrinProgram(linked, labels)
+
+def link_errors(statements: Iterable, labels) -> list[GrinLinkError]:
+    """Returns a GrinLinkError for each jump in the given statements whose
+    literal target would fail when taken, in order of statement."""
+    statements = list(statements)
+    errors = []
+    for index, statement in enumerate(statements):
+        if isinstance(statement, (list, tuple)):
+            statement = statement[1]
+        is_literal, value = _literal_target(statement)
+        if is_literal:
+            message = _target_error(statement, value, index, len(statements), labels)
+            if message is not None:
+                errors.append(GrinLinkError(message, index, _line_of(statement)))
+    return errors
+
+def _literal_target(statement) -> tuple[bool, object]:
+    """Returns whether a statement (or node) is a jump with a literal target,
+    and the target's value if it is."""
+    if isinstance(statement, JumpStatement):
+        target = statement.target
+        if isinstance(target, GrinToken) and target.kind() is not GrinTokenKind.IDENTIFIER:
+            return True, target.value()
+    elif isinstance(statement, JumpNode) and not statement.target_is_variable:
+        return True, statement.target
+    return False, None
+
+def _line_of(statement) -> int | None:
+    """Returns the line of a jump statement's target, if it's known; nodes
+    don't keep locations."""
+    if isinstance(statement, JumpStatement):
+        location = statement.target.location()
+        if location is not None:
+            return location.line()
+    return None
+
+def _target_error(statement, value, index: int, count: int, labels) -> str | None:
+    """Returns the message of the error taking the given jump would raise, or
+    None if it wouldn't raise one; the messages are the ones jump_to raises."""
+    try:
+        if isinstance(statement, (GotoStatement, GotoNode)):
+            check_goto_target(value)
+        resolve_target(value, index, count, labels)
+    except GrinRuntimeError as e:
+        return str(e)
+    return None
+
+def _resolve(statement, index: int, labels):
+    """Returns a copy of a jump statement (or node) with its literal target
+    resolved to an absolute statement index, or any other statement unchanged."""
+    is_literal, value = _literal_target(statement)
+    if not is_literal:
+        return statement
+
+    resolved = labels[value] if isinstance(value, str) else index + value
+
+    if isinstance(statement, JumpNode):
+        return type(statement)(statement.target_is_variable, statement.target, statement.condition, resolved)
+    return type(statement)(
+        statement.target, statement.condition_left, statement.operator,
+        statement.condition_right, resolved_target=resolved)
+
+__all__ = [
+    link.__name__,
+    link_errors.__name__
+]
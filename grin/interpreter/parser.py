@@ -1,3 +1,7 @@
+from typing import Iterable, Iterator, NoReturn
+from grin.lexing import to_tokens
+from grin.location import GrinLocation
+from grin.parsing import GrinParseError as GrinLineParseError, _COLON, _CONDITION_OPERANDS, _STATEMENT_OPERANDS
 from grin.token import GrinTokenKind, GrinToken
 from grin.interpreter.errors import GrinParseError
 from grin.statements.basic_statements import LetStatement, PrintStatement, EndStatement
@@ -5,55 +9,54 @@ from grin.statements.input_statements import InnumStatement, InstrStatement
 from grin.statements.math_statements import AddStatement, SubStatement, MultStatement, DivStatement
 from grin.statements.jump_statements import GotoStatement, GosubStatement, LabelStatement, ReturnStatement
 
+# Dictionary mapping tokens to their corresponding statement classes
+_STATEMENT_CLASSES = {
+    GrinTokenKind.LET: LetStatement,
+    GrinTokenKind.PRINT: PrintStatement,
+    GrinTokenKind.INNUM: InnumStatement,
+    GrinTokenKind.INSTR: InstrStatement,
+    GrinTokenKind.ADD: AddStatement,
+    GrinTokenKind.SUB: SubStatement,
+    GrinTokenKind.MULT: MultStatement,
+    GrinTokenKind.DIV: DivStatement,
+    GrinTokenKind.RETURN: ReturnStatement,
+    GrinTokenKind.END: EndStatement,
+}
+
+_JUMP_CLASSES = {
+    GrinTokenKind.GOTO: GotoStatement,
+    GrinTokenKind.GOSUB: GosubStatement,
+}
+
 def statement_creator(token: list[GrinToken]) -> "Statement":
     """Parses tokens into corresponding statement objects."""
     if not token:
         raise GrinParseError("Empty statement encountered.")
 
+    kind = token[0].kind()
+
     # Handle GOTO and GOSUB separately because they can be conditional
-    if token[0].kind() in {GrinTokenKind.GOTO, GrinTokenKind.GOSUB}:
-        target_token = token[1]
+    if kind in _JUMP_CLASSES:
+        jump_class = _JUMP_CLASSES[kind]
 
         # Check for conditional jump (IF condition is present)
-        if len(token) > 2 and token[2].kind() == GrinTokenKind.IF:
-            return GotoStatement(
-                target=target_token,
-                condition_left=token[3],
-                operator=token[4],
-                condition_right=token[5],
-            ) if token[0].kind() == GrinTokenKind.GOTO else GosubStatement(
-                target=target_token,
+        if len(token) > 2 and token[2].kind() is GrinTokenKind.IF:
+            return jump_class(
+                target=token[1],
                 condition_left=token[3],
                 operator=token[4],
                 condition_right=token[5],
             )
 
         # Unconditional jump
-        return GotoStatement(target=target_token) if token[0].kind() == GrinTokenKind.GOTO else GosubStatement(
-            target=target_token
-        )
-
-    # Dictionary mapping tokens to their corresponding statement classes
-    statement_classes = {
-        GrinTokenKind.LET: LetStatement,
-        GrinTokenKind.PRINT: PrintStatement,
-        GrinTokenKind.INNUM: InnumStatement,
-        GrinTokenKind.INSTR: InstrStatement,
-        GrinTokenKind.ADD: AddStatement,
-        GrinTokenKind.SUB: SubStatement,
-        GrinTokenKind.MULT: MultStatement,
-        GrinTokenKind.DIV: DivStatement,
-        GrinTokenKind.RETURN: ReturnStatement,
-        GrinTokenKind.END: EndStatement,
-    }
+        return jump_class(target=token[1])
 
     # Create an instance of the corresponding statement class
-    kind = token[0].kind()
-    if kind in statement_classes:
-        return statement_classes[kind](*token[1:])
+    if kind in _STATEMENT_CLASSES:
+        return _STATEMENT_CLASSES[kind](*token[1:])
 
     # If the statement is a label (e.g., `LABEL:`), return a LabelStatement
-    if len(token) >= 2 and token[1].kind() == GrinTokenKind.COLON:
+    if len(token) >= 2 and token[1].kind() is GrinTokenKind.COLON:
         return LabelStatement(token[0].text())
 
     raise GrinParseError(f"Unknown statement: {token[0].text()}")
@@ -80,7 +83,102 @@ def parse_statements_into_objects(token_list: list[list[GrinToken]]) -> list:
             statements.append(statement_creator(tokens))
     return statements
 
+def parse_lines_into_objects(lines: Iterable[str], lazy_locations: bool = False) -> list:
+    """Parses lines of Grin code straight into Statement objects, in the same
+    form parse_statements_into_objects() returns them, validating each line
+    and building its statement in a single walk over its tokens, without
+    collecting them into lists first.  Like parse(), it stops at a line
+    containing only a '.', and raises the same GrinLexError or GrinParseError
+    (from grin.parsing) that parse() would for the first invalid line."""
+    statements = []
+    names = {}
+
+    for line_number, line in enumerate(lines, start=1):
+        tokens = to_tokens(line, line_number, names, lazy_locations)
+        statement = _parse_line_into_object(tokens, line_number, len(line) + 1)
+
+        if statement is None:
+            break
+
+        statements.append(statement)
+
+    return statements
+
+def _parse_line_into_object(tokens: Iterator[GrinToken], line_number: int, end_column: int):
+    """Parses the tokens of one line into its statement, or returns None if the
+    line is the '.' that ends a program."""
+    token = next(tokens, None)
+
+    if token is None:
+        _fail(tokens, 'Program lines cannot be empty', line_number, end_column)
+
+    label = None
+    keyword = token.kind()
+
+    if keyword is GrinTokenKind.DOT:
+        extra = next(tokens, None)
+
+        if extra is None:
+            return None
+
+        _fail(tokens, 'Statement keyword expected', line_number, end_column, token)
+    elif keyword is GrinTokenKind.IDENTIFIER:
+        _expect(tokens, _COLON, line_number, end_column)
+        label = token.text()
+        token = next(tokens, None)
+
+        if token is None:
+            _fail(tokens, 'Statement body expected', line_number, end_column)
+
+        keyword = token.kind()
+
+    operand_kinds = _STATEMENT_OPERANDS.get(keyword)
+
+    if operand_kinds is None:
+        _fail(tokens, 'Statement keyword expected', line_number, end_column, token)
+
+    operands = [_expect(tokens, expected, line_number, end_column) for expected in operand_kinds]
+    extra = next(tokens, None)
+
+    if keyword in _JUMP_CLASSES:
+        if extra is not None and extra.kind() is GrinTokenKind.IF:
+            left, operator, right = [
+                _expect(tokens, expected, line_number, end_column) for expected in _CONDITION_OPERANDS]
+            statement = _JUMP_CLASSES[keyword](operands[0], left, operator, right)
+            extra = next(tokens, None)
+        else:
+            statement = _JUMP_CLASSES[keyword](operands[0])
+    else:
+        statement = _STATEMENT_CLASSES[keyword](*operands)
+
+    if extra is not None:
+        _fail(tokens, 'Extra tokens after statement end', line_number, end_column, extra)
+
+    return statement if label is None else [LabelStatement(label), statement]
+
+def _expect(
+        tokens: Iterator[GrinToken], expected: tuple[GrinTokenKind, ...],
+        line_number: int, end_column: int) -> GrinToken:
+    token = next(tokens, None)
+
+    if token is None or token.kind() not in expected:
+        _fail(tokens, ', '.join(str(kind) for kind in expected), line_number, end_column, token)
+
+    return token
+
+def _fail(
+        tokens: Iterator[GrinToken], message: str,
+        line_number: int, end_column: int, token: GrinToken | None = None) -> NoReturn:
+    # Lexing the rest of the line first reports the same error parse() would,
+    # since it lexes a whole line before validating any of it.
+    for _ in tokens:
+        pass
+
+    location = GrinLocation(line_number, end_column) if token is None else token.location()
+    raise GrinLineParseError(message, location)
+
 __all__ = [
     statement_creator.__name__,
-    parse_statements_into_objects.__name__
+    parse_statements_into_objects.__name__,
+    parse_lines_into_objects.__name__
 ]
\ No newline at end of file
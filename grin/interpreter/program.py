@@ -0,0 +1,69 @@
+from types import MappingProxyType
+from typing import Iterable, Mapping
+from grin.statements.jump_statements import LabelStatement
+from grin.interpreter.errors import GrinRuntimeError
+from grin.interpreter.parser import parse_lines_into_objects
+from grin.statements.nodes import to_nodes
+
+class GrinProgram:
+    """A compiled Grin program: its statements, in the form an
+    InterpreterEngine runs them, and the index of each of its labels.  It
+    can't be changed once it's built, so one program can be run by any
+    number of engines, in any number of threads, at the same time."""
+    __slots__ = ('_statements', '_labels')
+
+    def __init__(self, statements: Iterable, labels: Mapping[str, int]):
+        object.__setattr__(self, '_statements', tuple(
+            tuple(statement) if isinstance(statement, list) else statement
+            for statement in statements))
+        object.__setattr__(self, '_labels', MappingProxyType(dict(labels)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} objects cannot be changed')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} objects cannot be changed')
+
+    def __reduce__(self):
+        return GrinProgram, (self._statements, dict(self._labels))
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def statements(self) -> tuple:
+        """Returns the statements, with a labeled one as a (label, statement) pair."""
+        return self._statements
+
+    def labels(self) -> Mapping[str, int]:
+        """Returns a read-only mapping from each label to its statement's index."""
+        return self._labels
+
+def index_labels(statements: Iterable) -> dict[str, int]:
+    """Returns a dictionary mapping each label in the given statements to the
+    index of its statement, raising a GrinRuntimeError if a label is used twice."""
+    labels = {}
+    for i, statement in enumerate(statements):
+        if isinstance(statement, (list, tuple)) and isinstance(statement[0], LabelStatement):
+            if statement[0].label in labels:
+                raise GrinRuntimeError("Cannot create two of the same label")
+
+            labels[statement[0].label] = i
+
+    return labels
+
+def compile_program(lines: Iterable[str], nodes: bool = False) -> GrinProgram:
+    """Parses lines of Grin code (stopping at a line containing only a '.')
+    into a GrinProgram, raising the same errors that parsing them and creating
+    an InterpreterEngine to run them would.  Its tokens build their locations
+    lazily, since a program is usually kept around (or cached) for a while.
+    If nodes is True, the program is made of statement nodes instead, which
+    hold no tokens at all."""
+    statements = parse_lines_into_objects(lines, lazy_locations=True)
+    if nodes:
+        statements = to_nodes(statements)
+    return GrinProgram(statements, index_labels(statements))
+
+__all__ = [
+    GrinProgram.__name__,
+    compile_program.__name__
+]
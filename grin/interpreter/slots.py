@@ -0,0 +1,216 @@
+from collections.abc import MutableMapping
+from typing import Iterable, Iterator
+from grin.statements.input_statements import read_number
+from grin.statements.jump_statements import compare_values, check_goto_target
+from grin.statements.nodes import (
+    LetNode, PrintNode, InnumNode, InstrNode, MathNode, JumpNode, GotoNode, GosubNode, to_node)
+
+class GrinVariables(MutableMapping):
+    """A dict-like view of the variables of an engine running with variable
+    slots, which keeps their values in a list, with each of the program's
+    variables at the index of its slot and None in the slots of variables
+    that haven't been assigned.  It behaves like the dict the engine would
+    otherwise use: only assigned variables are in it, and names that aren't
+    in the program can be assigned too (though only statements in the
+    program can use them)."""
+    def __init__(self, names: Iterable[str], slots: list):
+        self._indexes = {name: index for index, name in enumerate(names)}
+        self._slots = slots
+        self._others = {}
+
+    def __getitem__(self, name):
+        index = self._indexes.get(name)
+        if index is None:
+            return self._others[name]
+        value = self._slots[index]
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name, value):
+        index = self._indexes.get(name)
+        if index is None:
+            self._others[name] = value
+        else:
+            self._slots[index] = value
+
+    def __delitem__(self, name):
+        index = self._indexes.get(name)
+        if index is None:
+            del self._others[name]
+        elif self._slots[index] is None:
+            raise KeyError(name)
+        else:
+            self._slots[index] = None
+
+    def __iter__(self) -> Iterator[str]:
+        slots = self._slots
+        for name, index in self._indexes.items():
+            if slots[index] is not None:
+                yield name
+        yield from self._others
+
+    def __len__(self) -> int:
+        # The list can hold more than the variables' slots, after them.
+        slots = self._slots
+        assigned = sum(1 for index in self._indexes.values() if slots[index] is not None)
+        return assigned + len(self._others)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+def compile_slots(statements: Iterable) -> tuple[list, tuple[str, ...]]:
+    """Assigns each variable in the given statements a slot, in order of first
+    appearance, and returns the statements rewritten to read and write the
+    slots directly, along with the names of the variables in slot order.
+    Statements that don't use variables are returned as their nodes, and
+    ones that aren't built from tokens are returned unchanged."""
+    compiler = _SlotCompiler()
+    compiled = []
+    for statement in statements:
+        if isinstance(statement, (list, tuple)):
+            compiled.append((statement[0], compiler.compile(statement[1])))
+        else:
+            compiled.append(compiler.compile(statement))
+    return compiled, tuple(compiler.names)
+
+class _SlotCompiler:
+    def __init__(self):
+        self.names = []
+        self._slots = {}
+
+    def slot(self, name: str) -> int:
+        slot = self._slots.get(name)
+        if slot is None:
+            slot = self._slots[name] = len(self.names)
+            self.names.append(name)
+        return slot
+
+    def operand(self, is_variable: bool, operand) -> tuple[bool, object]:
+        """Returns whether an operand is a variable, and its slot if it is, or its value if it isn't."""
+        return is_variable, self.slot(operand) if is_variable else operand
+
+    def compile(self, statement):
+        # Statements are compiled by way of their nodes, whose operands are
+        # already classified as variables or literals.
+        node = to_node(statement)
+
+        if isinstance(node, LetNode):
+            return _SlotLet(self.slot(node.name), *self.operand(node.is_variable, node.operand))
+        elif isinstance(node, PrintNode):
+            return _SlotPrint(*self.operand(node.is_variable, node.operand))
+        elif isinstance(node, MathNode):
+            return _SlotMath(self.slot(node.name), *self.operand(node.is_variable, node.operand), node.operate)
+        elif isinstance(node, InnumNode):
+            return _SlotInnum(self.slot(node.name), node.name)
+        elif isinstance(node, InstrNode):
+            return _SlotInstr(self.slot(node.name))
+        elif isinstance(node, JumpNode):
+            if node.target_is_variable:
+                self.slot(node.target)
+            if node.condition is None:
+                return _SlotJump(node, None)
+            left_is_variable, left, comparison, right_is_variable, right = node.condition
+            return _SlotJump(node, (
+                *self.operand(left_is_variable, left), comparison, *self.operand(right_is_variable, right)))
+        return node
+
+class _SlotLet:
+    def __init__(self, slot, is_variable, operand):
+        self.slot = slot
+        self.is_variable = is_variable
+        self.operand = operand
+
+    def execute(self, interpreter_engine):
+        slots = interpreter_engine.slots
+        if self.is_variable:
+            value = slots[self.operand]
+            slots[self.slot] = 0 if value is None else value
+        else:
+            slots[self.slot] = self.operand
+
+class _SlotPrint:
+    def __init__(self, is_variable, operand):
+        self.is_variable = is_variable
+        self.operand = operand
+
+    def execute(self, interpreter_engine):
+        if self.is_variable:
+            value = interpreter_engine.slots[self.operand]
+            print(0 if value is None else value)
+        else:
+            print(self.operand)
+
+class _SlotMath:
+    def __init__(self, slot, is_variable, operand, operate):
+        self.slot = slot
+        self.is_variable = is_variable
+        self.operand = operand
+        self.operate = operate
+
+    def execute(self, interpreter_engine):
+        slots = interpreter_engine.slots
+        left = slots[self.slot]
+        if left is None:
+            # As MathStatement does, the variable is set to 0 before the
+            # operation, so it's left at 0 if the operation fails.
+            left = slots[self.slot] = 0
+        if self.is_variable:
+            right = slots[self.operand]
+            if right is None:
+                right = 0
+        else:
+            right = self.operand
+        slots[self.slot] = self.operate(left, right)
+
+class _SlotInnum:
+    def __init__(self, slot, name):
+        self.slot = slot
+        self.name = name
+
+    def execute(self, interpreter_engine):
+        interpreter_engine.slots[self.slot] = read_number(self.name)
+
+class _SlotInstr:
+    def __init__(self, slot):
+        self.slot = slot
+
+    def execute(self, interpreter_engine):
+        interpreter_engine.slots[self.slot] = input().strip()
+
+class _SlotJump:
+    """A GOTO or GOSUB whose condition reads slots; taking the jump is left to
+    its node, whose target reads variables through the view."""
+    def __init__(self, node, condition):
+        self.node = node
+        self.condition = condition
+        self.checks_zero = isinstance(node, GotoNode) and node.resolved_target is None
+        self.is_gosub = isinstance(node, GosubNode)
+
+    def execute(self, interpreter_engine):
+        node = self.node
+        if self.checks_zero:
+            check_goto_target(node.target_value(interpreter_engine))
+
+        if self.condition is not None:
+            slots = interpreter_engine.slots
+            left_is_variable, left, comparison, right_is_variable, right = self.condition
+            if left_is_variable:
+                left = slots[left]
+                if left is None:
+                    left = 0
+            if right_is_variable:
+                right = slots[right]
+                if right is None:
+                    right = 0
+            if not compare_values(left, comparison, right):
+                return
+
+        if self.is_gosub:
+            interpreter_engine.call_stack.append(interpreter_engine.current_line)
+        node.jump_to(interpreter_engine)
+
+__all__ = [
+    GrinVariables.__name__,
+    compile_slots.__name__
+]
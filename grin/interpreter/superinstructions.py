@@ -0,0 +1,177 @@
+from collections import Counter
+from typing import Iterable
+from grin.interpreter.program import GrinProgram, index_labels
+from grin.statements.basic_statements import Statement, EndStatement
+from grin.statements.jump_statements import JumpStatement, ReturnStatement
+from grin.statements.nodes import JumpNode, ReturnNode, EndNode, to_node
+
+
+class Superinstruction(Statement):
+    """A run of adjacent statements in one basic block, executed as one
+    statement, so that an engine dispatches once to run all of them.  It
+    replaces the first statement of the run; the others are left where they
+    were, so that a jump into the middle of the run still lands on the
+    statement it always did.  Only the last statement of a run can jump,
+    and each one sees the engine's current_line as the index it had."""
+    __slots__ = ('statements', 'pattern')
+
+    def __init__(self, statements):
+        self.statements = tuple(statements)
+        self.pattern = ' '.join(_keyword(statement) for statement in self.statements)
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def execute(self, interpreter_engine):
+        statements = self.statements
+        for statement in statements[:-1]:
+            statement.execute(interpreter_engine)
+            interpreter_engine.current_line += 1
+        statements[-1].execute(interpreter_engine)
+
+class _Pair(Superinstruction):
+    __slots__ = ('first', 'second')
+
+    def __init__(self, statements):
+        super().__init__(statements)
+        self.first, self.second = self.statements
+
+    def execute(self, interpreter_engine):
+        self.first.execute(interpreter_engine)
+        interpreter_engine.current_line += 1
+        self.second.execute(interpreter_engine)
+
+class _Triple(Superinstruction):
+    __slots__ = ('first', 'second', 'third')
+
+    def __init__(self, statements):
+        super().__init__(statements)
+        self.first, self.second, self.third = self.statements
+
+    def execute(self, interpreter_engine):
+        self.first.execute(interpreter_engine)
+        interpreter_engine.current_line += 1
+        self.second.execute(interpreter_engine)
+        interpreter_engine.current_line += 1
+        self.third.execute(interpreter_engine)
+
+# The statements that can move execution somewhere other than the next
+# statement, or stop it, and so end a basic block; a superinstruction is
+# counted among them, as it can end in one (and it's never fused again).
+_TRANSFERS = (
+    JumpStatement, ReturnStatement, EndStatement, JumpNode, ReturnNode, EndNode, Superinstruction)
+
+class FusionReport:
+    """What fuse() did to a program: how many basic blocks it found, how many
+    superinstructions it built, of which patterns of statements, how many
+    statements they hold, and so how many dispatches a pass straight through
+    the program no longer makes."""
+    def __init__(self, blocks: int, superinstructions: list[Superinstruction]):
+        self.blocks = blocks
+        self.superinstructions = len(superinstructions)
+        self.fused_statements = sum(len(superinstruction) for superinstruction in superinstructions)
+        self.patterns = Counter(superinstruction.pattern for superinstruction in superinstructions)
+        # Each superinstruction saves a dispatch for each of its statements
+        # after the first, every time it runs; this counts each run once.
+        self.dispatches_eliminated = self.fused_statements - self.superinstructions
+
+    def __repr__(self) -> str:
+        return (f'FusionReport(blocks={self.blocks}, superinstructions={self.superinstructions}, '
+                f'fused_statements={self.fused_statements}, '
+                f'dispatches_eliminated={self.dispatches_eliminated})')
+
+def basic_blocks(statements: Iterable, labels = None) -> list[range]:
+    """Splits statements, in the form parse_statements_into_objects() returns
+    them, into basic blocks: ranges of indexes whose statements run one
+    after another.  A block starts at the first statement, at each labeled
+    statement and after each statement that can jump, return or end the
+    program, and at each literal relative target of a jump."""
+    statements = list(statements)
+    if labels is None:
+        labels = index_labels(statements)
+
+    count = len(statements)
+    leaders = {0} if count else set()
+    leaders.update(labels.values())
+    for index, statement in enumerate(statements):
+        statement = _unlabeled(statement)
+        if isinstance(statement, _TRANSFERS):
+            leaders.add(index + 1)
+        destination = _literal_destination(statement, index)
+        if destination is not None:
+            leaders.add(destination)
+
+    starts = sorted(leader for leader in leaders if 0 <= leader < count)
+    return [range(start, end) for start, end in zip(starts, starts[1:] + [count])]
+
+def fuse(program: GrinProgram | Iterable, max_length: int = 3) -> tuple[GrinProgram, FusionReport]:
+    """Returns a program in which each basic block's statements are fused, from
+    its start, into superinstructions of up to max_length statements (at
+    least 2), and a report of what was fused.  The statements are fused as
+    their nodes, where they have them."""
+    if max_length < 2:
+        raise ValueError('Superinstructions must fuse at least 2 statements')
+
+    if isinstance(program, GrinProgram):
+        statements, labels = list(program.statements()), program.labels()
+    else:
+        statements = list(program)
+        labels = index_labels(statements)
+
+    blocks = basic_blocks(statements, labels)
+    fused = list(statements)
+    superinstructions = []
+
+    for block in blocks:
+        for start in range(block.start, block.stop, max_length):
+            stop = min(start + max_length, block.stop)
+            if stop - start < 2:
+                continue
+
+            run = [to_node(_unlabeled(statements[index])) for index in range(start, stop)]
+            superinstruction = _superinstruction(run)
+            superinstructions.append(superinstruction)
+
+            if isinstance(fused[start], (list, tuple)):
+                fused[start] = (fused[start][0], superinstruction)
+            else:
+                fused[start] = superinstruction
+
+    return GrinProgram(fused, labels), FusionReport(len(blocks), superinstructions)
+
+def _superinstruction(run: list) -> Superinstruction:
+    if len(run) == 2:
+        return _Pair(run)
+    elif len(run) == 3:
+        return _Triple(run)
+    return Superinstruction(run)
+
+def _unlabeled(statement):
+    return statement[1] if isinstance(statement, (list, tuple)) else statement
+
+def _literal_destination(statement, index: int) -> int | None:
+    """Returns the index a jump's literal relative target goes to, if it has one."""
+    node = to_node(statement)
+    if isinstance(node, JumpNode):
+        if node.resolved_target is not None:
+            return node.resolved_target
+        if not node.target_is_variable and isinstance(node.target, int):
+            return index + node.target
+    elif isinstance(node, JumpStatement) and node.resolved_target is not None:
+        return node.resolved_target
+    return None
+
+def _keyword(statement) -> str:
+    """Returns the keyword of a statement (or node), e.g., ADD or GOTO."""
+    name = type(statement).__name__
+    for suffix in ('Statement', 'Node'):
+        if name.endswith(suffix):
+            return name[:-len(suffix)].upper()
+    return name.upper()
+
+__all__ = [
+    Superinstruction.__name__,
+    FusionReport.__name__,
+    basic_blocks.__name__,
+    fuse.__name__
+]
@@ -0,0 +1,379 @@
+import math
+import operator as _operator
+from typing import Iterable, TextIO
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.errors import GrinRuntimeError
+from grin.interpreter.program import GrinProgram, index_labels
+from grin.statements.input_statements import read_number
+from grin.statements.jump_statements import compare_values, check_goto_target, resolve_target
+from grin.statements.math_statements import add, subtract, multiply, divide
+from grin.statements.nodes import (
+    LetNode, PrintNode, InnumNode, InstrNode, MathNode, AddNode, SubNode, MultNode, DivNode,
+    JumpNode, GotoNode, GosubNode, ReturnNode, EndNode, to_node)
+
+# The name the generated code is compiled under, so that the frames running
+# it can be found in a traceback.
+_FILENAME = '<grin>'
+
+_NUMBERS = frozenset([int, float])
+
+def _literal(value) -> str:
+    """Returns a Python expression for a literal operand.  A float that isn't
+    finite has a repr (inf or nan) that isn't one, so it's built from a string."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return f'float({repr(value)!r})'
+    return repr(value)
+
+# For each comparison: the name the generated code refers to it by, and its
+# Python operator.
+_COMPARISON_SOURCES = {
+    _operator.eq: ('_eq', '=='),
+    _operator.ne: ('_ne', '!='),
+    _operator.lt: ('_lt', '<'),
+    _operator.le: ('_le', '<='),
+    _operator.gt: ('_gt', '>'),
+    _operator.ge: ('_ge', '>='),
+}
+
+# For each math operation: the name of the function that performs it with
+# its checks, and the Python operator that gives the same result when both
+# sides are numbers (DIV has none, since its result depends on the types).
+_MATH_SOURCES = {
+    AddNode: ('_add', '+'),
+    SubNode: ('_subtract', '-'),
+    MultNode: ('_multiply', '*'),
+    DivNode: ('_divide', None),
+}
+
+class TranspiledEngine(InterpreterEngine):
+    """An engine that translates its program into the source of a Python
+    function, compiles it and runs it.  The function keeps each variable
+    in a local, and dispatches over the program's basic blocks, each
+    identified by the index of its first statement, in a loop; jumps set the
+    block to run next.  Operations and comparisons make the same checks and
+    raise the same errors their statements do, and the engine's variables
+    and current_line are updated when it finishes or fails, so it prints,
+    fails and leaves its variables as an InterpreterEngine does.
+
+    The generated source is kept as source, and written to dump if it's
+    given.  Only programs of statements with token operands (or their
+    nodes) can be translated; any other raises a ValueError."""
+    def __init__(self, program: GrinProgram | Iterable, dump: TextIO | None = None):
+        super().__init__(program)
+        self.source, self._lines = _Translator(self.program, self.labels).translate()
+        if dump is not None:
+            dump.write(self.source)
+
+        namespace = {
+            '_add': add,
+            '_subtract': subtract,
+            '_multiply': multiply,
+            '_divide': divide,
+            '_compare_values': compare_values,
+            '_read_number': read_number,
+            '_error': GrinRuntimeError,
+            '_check_goto_target': check_goto_target,
+            '_resolve_target': resolve_target,
+            '_labels': self.labels,
+            '_NUMBERS': _NUMBERS,
+        }
+        for comparison, (name, _) in _COMPARISON_SOURCES.items():
+            namespace[name] = comparison
+
+        exec(compile(self.source, _FILENAME, 'exec'), namespace)
+        self._run = namespace['run']
+
+    def run(self) -> None:
+        """Runs the interpreter"""
+        if self.terminate:
+            return
+
+        try:
+            self._run(self)
+        except BaseException as e:
+            # The statement that failed is the one the innermost line of the
+            # generated code in the traceback came from.
+            traceback = e.__traceback__
+            line = None
+            while traceback is not None:
+                if traceback.tb_frame.f_code.co_filename == _FILENAME:
+                    line = traceback.tb_lineno
+                traceback = traceback.tb_next
+            if line is not None and self._lines[line] is not None:
+                self.current_line = self._lines[line]
+            raise
+
+def transpile(program: GrinProgram | Iterable) -> str:
+    """Returns the Python source a TranspiledEngine runs for the given program:
+    the definition of a function named run, which takes the engine."""
+    if isinstance(program, GrinProgram):
+        statements, labels = program.statements(), program.labels()
+    else:
+        statements = list(program)
+        labels = index_labels(statements)
+    return _Translator(statements, labels).translate()[0]
+
+def _literal_destination(value, index: int, count: int, labels):
+    """Returns the index a literal target jumps to, or the error taking the
+    jump raises instead."""
+    try:
+        return resolve_target(value, index, count, labels), None
+    except GrinRuntimeError as e:
+        return None, str(e)
+
+class _Translator:
+    """Generates the source of a program's function, one line at a time,
+    keeping the index of the statement each line came from."""
+    def __init__(self, statements, labels):
+        self.nodes = []
+        for index, statement in enumerate(statements):
+            node = to_node(statement[1] if isinstance(statement, (list, tuple)) else statement)
+            if not isinstance(node, (LetNode, PrintNode, InnumNode, InstrNode, MathNode, JumpNode, ReturnNode, EndNode)):
+                raise ValueError(f'Cannot translate statement {index + 1} ({type(node).__name__}) to Python')
+            self.nodes.append(node)
+        self.labels = labels
+        self.count = len(self.nodes)
+        self.names = {}
+        # The variables certainly assigned at this point of the current block,
+        # which needn't be checked for None.
+        self.assigned = set()
+        self.source = []
+        # The statement index of each line of source, numbered from 1.
+        self.lines = [None]
+
+    def emit(self, indent: int, text: str, index: int | None = None) -> None:
+        self.source.append('    ' * indent + text)
+        self.lines.append(index)
+
+    def variable(self, name: str) -> str:
+        local = self.names.get(name)
+        if local is None:
+            local = f'v_{name}'
+            # Python normalizes non-ASCII identifiers, which could make two
+            # different names the same local.
+            if not local.isidentifier() or not local.isascii():
+                local = f'_v{len(self.names)}'
+            self.names[name] = local
+        return local
+
+    def read(self, is_variable: bool, operand) -> str:
+        """Returns an expression for an operand's value."""
+        if is_variable:
+            local = self.variable(operand)
+            if operand in self.assigned:
+                return local
+            return f'(0 if {local} is None else {local})'
+        return _literal(operand)
+
+    def translate(self) -> tuple[str, list]:
+        for node in self.nodes:
+            for name in _node_variables(node):
+                self.variable(name)
+
+        leaders = self.leaders()
+        self.emit(0, 'def run(_engine):')
+        self.emit(1, '_variables = _engine.variables')
+        self.emit(1, '_stack = _engine.call_stack')
+        for name, local in self.names.items():
+            self.emit(1, f'{local} = _variables.get({name!r})')
+        self.emit(1, '_block = _engine.current_line')
+        self.emit(1, 'try:')
+        self.emit(2, f'while _block < {self.count}:')
+        if leaders:
+            self.dispatch(leaders, 0, len(leaders), 3)
+        else:
+            self.emit(3, 'break')
+        self.emit(2, f'_engine.current_line = {self.count}')
+        self.emit(1, 'finally:')
+        if self.names:
+            for name, local in self.names.items():
+                self.emit(2, f'if {local} is not None:')
+                self.emit(3, f'_variables[{name!r}] = {local}')
+        else:
+            self.emit(2, 'pass')
+        return '\n'.join(self.source) + '\n', self.lines
+
+    def leaders(self) -> list[int]:
+        """Returns the indexes of the statements that begin basic blocks: the
+        first, every labeled one, every one that follows a jump, RETURN or END
+        and every literal target.  A jump whose target is a variable could
+        land anywhere, so if there is one, every statement begins a block."""
+        leaders = {0} if self.count else set()
+        leaders.update(self.labels.values())
+        for index, node in enumerate(self.nodes):
+            if isinstance(node, JumpNode):
+                if node.target_is_variable and node.resolved_target is None:
+                    return list(range(self.count))
+                destination, _ = self.destination(node, index)
+                if destination is not None:
+                    leaders.add(destination)
+            if isinstance(node, (JumpNode, ReturnNode, EndNode)):
+                leaders.add(index + 1)
+        return sorted(leader for leader in leaders if leader < self.count)
+
+    def destination(self, node: JumpNode, index: int):
+        if node.resolved_target is not None:
+            return node.resolved_target, None
+        return _literal_destination(node.target, index, self.count, self.labels)
+
+    def dispatch(self, leaders: list[int], low: int, high: int, indent: int) -> None:
+        """Emits a binary search of the blocks beginning at leaders[low:high]."""
+        if high - low == 1:
+            end = leaders[high] if high < len(leaders) else self.count
+            self.block(leaders[low], end, indent)
+            return
+
+        middle = (low + high) // 2
+        self.emit(indent, f'if _block < {leaders[middle]}:')
+        self.dispatch(leaders, low, middle, indent + 1)
+        self.emit(indent, 'else:')
+        self.dispatch(leaders, middle, high, indent + 1)
+
+    def block(self, start: int, end: int, indent: int) -> None:
+        self.emit(indent, f'# block {start}: lines {start + 1} to {end}')
+        self.assigned.clear()
+        for index in range(start, end):
+            if not self.statement(self.nodes[index], index, indent):
+                # The statement always transfers control, so nothing after it
+                # runs.
+                return
+        self.emit(indent, f'_block = {end}')
+
+    def statement(self, node, index: int, indent: int) -> bool:
+        """Emits a statement, returning whether control can fall through it."""
+        if isinstance(node, LetNode):
+            local = self.variable(node.name)
+            self.emit(indent, f'{local} = {self.read(node.is_variable, node.operand)}', index)
+            self.assigned.add(node.name)
+        elif isinstance(node, PrintNode):
+            self.emit(indent, f'print({self.read(node.is_variable, node.operand)})', index)
+        elif isinstance(node, MathNode):
+            self.math(node, index, indent)
+        elif isinstance(node, InnumNode):
+            self.emit(indent, f'{self.variable(node.name)} = _read_number({node.name!r})', index)
+            self.assigned.add(node.name)
+        elif isinstance(node, InstrNode):
+            self.emit(indent, f'{self.variable(node.name)} = input().strip()', index)
+            self.assigned.add(node.name)
+        elif isinstance(node, JumpNode):
+            return self.jump(node, index, indent)
+        elif isinstance(node, ReturnNode):
+            self.emit(indent, 'if not _stack:', index)
+            self.emit(indent + 1, 'raise _error("RETURN statement encountered without a matching GOSUB.")', index)
+            self.emit(indent, '_block = _stack.pop() + 1', index)
+            self.emit(indent, 'continue', index)
+            return False
+        elif isinstance(node, EndNode):
+            self.emit(indent, '_engine.terminate = True', index)
+            self.emit(indent, f'_engine.current_line = {index + 1}', index)
+            self.emit(indent, 'return', index)
+            return False
+        return True
+
+    def math(self, node: MathNode, index: int, indent: int) -> None:
+        local = self.variable(node.name)
+        function, symbol = _MATH_SOURCES[type(node)]
+
+        # As MathStatement does, the variable is set to 0 before the
+        # operation, so it's left at 0 if the operation fails.
+        if node.name not in self.assigned:
+            self.emit(indent, f'if {local} is None:', index)
+            self.emit(indent + 1, f'{local} = 0', index)
+            self.assigned.add(node.name)
+
+        if node.is_variable:
+            self.emit(indent, f'_right = {self.read(True, node.operand)}', index)
+            right = '_right'
+            numeric = f'type({local}) in _NUMBERS and type(_right) in _NUMBERS'
+        else:
+            right = _literal(node.operand)
+            numeric = f'type({local}) in _NUMBERS' if type(node.operand) in _NUMBERS else None
+
+        checked = f'{function}({local}, {right})'
+        if symbol is not None and numeric is not None:
+            self.emit(indent, f'{local} = {local} {symbol} {right} if {numeric} else {checked}', index)
+        elif symbol is None and not node.is_variable and type(node.operand) is int and node.operand != 0:
+            # Dividing by a literal integer other than 0 only needs checks when
+            # the variable isn't an integer.
+            self.emit(indent, f'{local} = int({local} / {right}) if type({local}) is int else {checked}', index)
+        else:
+            self.emit(indent, f'{local} = {checked}', index)
+
+    def jump(self, node: JumpNode, index: int, indent: int) -> bool:
+        is_gosub = isinstance(node, GosubNode)
+        if node.resolved_target is not None or not node.target_is_variable:
+            if isinstance(node, GotoNode) and node.resolved_target is None and node.target == 0:
+                self.emit(indent, '_check_goto_target(0)', index)
+                return False
+            destination, message = self.destination(node, index)
+            target = None
+        else:
+            destination = message = None
+            target = self.read(True, node.target)
+            if isinstance(node, GotoNode):
+                self.emit(indent, f'_check_goto_target({target})', index)
+
+        body = indent
+        if node.condition is not None:
+            self.emit(indent, f'if {self.condition(node.condition, index, indent)}:', index)
+            body = indent + 1
+
+        if is_gosub:
+            self.emit(body, f'_stack.append({index})', index)
+        if message is not None:
+            self.emit(body, f'raise _error({message!r})', index)
+        else:
+            if destination is not None:
+                self.emit(body, f'_block = {destination}', index)
+            else:
+                self.emit(body, f'_block = _resolve_target({target}, {index}, {self.count}, _labels)', index)
+            self.emit(body, 'continue', index)
+        return node.condition is not None
+
+    def condition(self, condition: tuple, index: int, indent: int) -> str:
+        """Emits the evaluation of a condition's sides, returning an expression
+        that compares them as compare() does."""
+        left_is_variable, left, comparison, right_is_variable, right = condition
+        name, symbol = _COMPARISON_SOURCES[comparison]
+
+        sides = []
+        for side, is_variable, operand in (('_left', left_is_variable, left), ('_right', right_is_variable, right)):
+            if is_variable:
+                self.emit(indent, f'{side} = {self.read(True, operand)}', index)
+                sides.append((side, None))
+            else:
+                sides.append((_literal(operand), type(operand).__name__))
+        (left, left_type), (right, right_type) = sides
+
+        if left_type is not None and right_type is not None:
+            same_type = 'True' if left_type == right_type else 'False'
+        elif right_type is not None:
+            same_type = f'type({left}) is {right_type}'
+        elif left_type is not None:
+            same_type = f'type({right}) is {left_type}'
+        else:
+            same_type = f'type({left}) is type({right})'
+        return f'({left} {symbol} {right} if {same_type} else _compare_values({left}, {name}, {right}))'
+
+def _node_variables(node) -> list[str]:
+    """Returns the names of the variables a node uses, in order."""
+    names = []
+    if isinstance(node, (LetNode, MathNode, InnumNode, InstrNode)):
+        names.append(node.name)
+    if isinstance(node, (LetNode, PrintNode, MathNode)) and node.is_variable:
+        names.append(node.operand)
+    if isinstance(node, JumpNode):
+        if node.target_is_variable:
+            names.append(node.target)
+        if node.condition is not None:
+            left_is_variable, left, _, right_is_variable, right = node.condition
+            if left_is_variable:
+                names.append(left)
+            if right_is_variable:
+                names.append(right)
+    return names
+
+__all__ = [
+    TranspiledEngine.__name__,
+    transpile.__name__
+]
@@ -0,0 +1,267 @@
+from bisect import bisect_right
+from typing import Iterable
+from grin.interpreter.bytecode import GrinBytecode, GrinOpcode, OPERAND_COUNTS, COMPARISON_KINDS, CONSTANT_BIT
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.errors import GrinRuntimeError
+from grin.interpreter.program import GrinProgram
+from grin.interpreter.slots import GrinVariables
+from grin.statements.input_statements import read_number
+from grin.statements.jump_statements import compare_values, check_goto_target, resolve_target, _COMPARISONS
+from grin.statements.math_statements import add, subtract, multiply, divide
+
+# The machine code a BytecodeEngine runs is its bytecode's code, rewritten
+# so that every operand is an index into one register file: the program's
+# variables, each None until it's assigned, followed by its constants.  A
+# jump's target becomes the program counter of the statement it jumps to,
+# when it's a literal that can be taken, or else the bitwise complement of
+# the register holding it, whose value is then resolved as jump_to() would.
+# Each jump is also followed by the index of its statement, which GOSUB
+# pushes onto the call stack and a relative jump is taken from.
+
+_COMPARISON_FUNCTIONS = tuple(_COMPARISONS[kind] for kind in COMPARISON_KINDS)
+
+_NUMBERS = frozenset([int, float])
+
+_LET = int(GrinOpcode.LET)
+_PRINT = int(GrinOpcode.PRINT)
+_INNUM = int(GrinOpcode.INNUM)
+_INSTR = int(GrinOpcode.INSTR)
+_ADD = int(GrinOpcode.ADD)
+_SUB = int(GrinOpcode.SUB)
+_MULT = int(GrinOpcode.MULT)
+_DIV = int(GrinOpcode.DIV)
+_GOTO = int(GrinOpcode.GOTO)
+_GOTO_IF = int(GrinOpcode.GOTO_IF)
+_GOSUB = int(GrinOpcode.GOSUB)
+_GOSUB_IF = int(GrinOpcode.GOSUB_IF)
+_RETURN = int(GrinOpcode.RETURN)
+_END = int(GrinOpcode.END)
+
+_JUMPS = frozenset([_GOTO, _GOTO_IF, _GOSUB, _GOSUB_IF])
+
+class BytecodeEngine(InterpreterEngine):
+    """An engine that compiles its program to bytecode and runs it on a
+    virtual machine: a loop that dispatches on each instruction's opcode and
+    moves a program counter through a flat list of machine code, so that
+    GOTO, GOSUB and RETURN are updates of that counter.  The program can
+    also be given as GrinBytecode, e.g., as read by loads(), in which case
+    its statements are never rebuilt.  It prints, fails and leaves its
+    variables as an InterpreterEngine does, but only runs programs of the
+    statements that parse_statements_into_objects() builds, raising a
+    ValueError for any other."""
+    def __init__(self, program: GrinBytecode | GrinProgram | Iterable):
+        if isinstance(program, GrinBytecode):
+            super().__init__([])
+            bytecode = program
+            self.labels = bytecode.labels
+            # The bytecode stands in for the statements; it has their length.
+            self.program = bytecode
+        else:
+            super().__init__(program)
+            bytecode = GrinBytecode.from_program(
+                program if isinstance(program, GrinProgram) else GrinProgram(self.program, self.labels))
+
+        self.code, self.starts, self.names, constants = assemble(bytecode)
+        self.registers = [None] * len(self.names) + list(constants)
+        self.variables = GrinVariables(self.names, self.registers)
+
+    def _line_at(self, counter: int) -> int:
+        """Returns the index of the statement at the given program counter."""
+        return bisect_right(self.starts, counter) - 1
+
+    def run(self) -> None:
+        """Runs the interpreter"""
+        if self.terminate:
+            return
+
+        code = self.code
+        starts = self.starts
+        registers = self.registers
+        names = self.names
+        call_stack = self.call_stack
+        count = len(starts) - 1
+        end = starts[count]
+        counter = starts[min(self.current_line, count)]
+
+        LET, PRINT, INNUM, INSTR = _LET, _PRINT, _INNUM, _INSTR
+        ADD, SUB, MULT, DIV = _ADD, _SUB, _MULT, _DIV
+        GOTO, GOTO_IF, GOSUB, GOSUB_IF = _GOTO, _GOTO_IF, _GOSUB, _GOSUB_IF
+        RETURN = _RETURN
+        NUMBERS = _NUMBERS
+        COMPARISONS = _COMPARISON_FUNCTIONS
+
+        try:
+            while counter < end:
+                opcode = code[counter]
+
+                if opcode == ADD or opcode == SUB or opcode == MULT or opcode == DIV:
+                    target = code[counter + 1]
+                    left = registers[target]
+                    if left is None:
+                        # As MathStatement does, the variable is set to 0 before
+                        # the operation, so it's left at 0 if the operation fails.
+                        left = registers[target] = 0
+                    right = registers[code[counter + 2]]
+                    if right is None:
+                        right = 0
+
+                    if opcode == ADD:
+                        if type(left) in NUMBERS and type(right) in NUMBERS:
+                            registers[target] = left + right
+                        else:
+                            registers[target] = add(left, right)
+                    elif opcode == SUB:
+                        if type(left) in NUMBERS and type(right) in NUMBERS:
+                            registers[target] = left - right
+                        else:
+                            registers[target] = subtract(left, right)
+                    elif opcode == MULT:
+                        if type(left) in NUMBERS and type(right) in NUMBERS:
+                            registers[target] = left * right
+                        else:
+                            registers[target] = multiply(left, right)
+                    else:
+                        registers[target] = divide(left, right)
+                    counter += 3
+
+                elif opcode == GOTO_IF or opcode == GOSUB_IF:
+                    left = registers[code[counter + 3]]
+                    if left is None:
+                        left = 0
+                    right = registers[code[counter + 5]]
+                    if right is None:
+                        right = 0
+                    destination = code[counter + 1]
+
+                    # GOTO checks its target before its condition.
+                    if opcode == GOTO_IF and destination < 0:
+                        check_goto_target(self._target(~destination))
+
+                    comparison = COMPARISONS[code[counter + 4]]
+                    if type(left) is type(right):
+                        taken = comparison(left, right)
+                    else:
+                        taken = compare_values(left, comparison, right)
+
+                    if taken:
+                        if opcode == GOSUB_IF:
+                            call_stack.append(code[counter + 2])
+                        if destination >= 0:
+                            counter = destination
+                        else:
+                            value = self._target(~destination)
+                            counter = starts[resolve_target(value, code[counter + 2], count, self.labels)]
+                    else:
+                        counter += 6
+
+                elif opcode == LET:
+                    value = registers[code[counter + 2]]
+                    registers[code[counter + 1]] = 0 if value is None else value
+                    counter += 3
+
+                elif opcode == GOTO or opcode == GOSUB:
+                    destination = code[counter + 1]
+                    if opcode == GOSUB:
+                        call_stack.append(code[counter + 2])
+                    if destination >= 0:
+                        counter = destination
+                    else:
+                        value = self._target(~destination)
+                        if opcode == GOTO:
+                            check_goto_target(value)
+                        counter = starts[resolve_target(value, code[counter + 2], count, self.labels)]
+
+                elif opcode == PRINT:
+                    value = registers[code[counter + 1]]
+                    print(0 if value is None else value)
+                    counter += 2
+
+                elif opcode == RETURN:
+                    if not call_stack:
+                        raise GrinRuntimeError("RETURN statement encountered without a matching GOSUB.")
+                    counter = starts[call_stack.pop() + 1]
+
+                elif opcode == INNUM:
+                    target = code[counter + 1]
+                    registers[target] = read_number(names[target])
+                    counter += 2
+
+                elif opcode == INSTR:
+                    registers[code[counter + 1]] = input().strip()
+                    counter += 2
+
+                else:
+                    # END
+                    self.terminate = True
+                    self.current_line = self._line_at(counter) + 1
+                    return
+
+        except BaseException:
+            self.current_line = self._line_at(counter)
+            raise
+
+        self.current_line = count
+
+    def _target(self, register: int):
+        value = self.registers[register]
+        return 0 if value is None else value
+
+def assemble(bytecode: GrinBytecode) -> tuple[list, list, tuple, tuple]:
+    """Rewrites bytecode into the machine code a BytecodeEngine runs, returning
+    the code, the program counter at which each statement starts (followed
+    by the length of the code), the names of the variables and the values
+    of the constants, which follow the variables in the register file."""
+    source = bytecode.code
+    names = bytecode.names
+    constants = tuple(value for _, _, value in bytecode.constants)
+    name_count = len(names)
+    count = len(bytecode)
+
+    def register(operand: int) -> int:
+        if operand & CONSTANT_BIT:
+            return name_count + (operand >> 1)
+        return operand >> 1
+
+    # Instructions keep their sizes, but jumps gain the index of their
+    # statement, so each statement's start is known before any is rewritten.
+    starts = []
+    counter = 0
+    for offset in bytecode.offsets:
+        starts.append(counter)
+        opcode = source[offset]
+        counter += 1 + OPERAND_COUNTS[opcode] + (1 if opcode in _JUMPS else 0)
+    starts.append(counter)
+
+    code = []
+    for index, offset in enumerate(bytecode.offsets):
+        opcode = source[offset]
+        operands = source[offset + 1:offset + 1 + OPERAND_COUNTS[opcode]]
+        code.append(opcode)
+
+        if opcode in _JUMPS:
+            code.append(_jump_destination(operands[0], index, count, starts, bytecode, register))
+            code.append(index)
+            if opcode == _GOTO_IF or opcode == _GOSUB_IF:
+                code.extend((register(operands[1]), operands[2], register(operands[3])))
+        else:
+            code.extend(register(operand) for operand in operands)
+
+    return code, starts, names, constants
+
+def _jump_destination(operand: int, index: int, count: int, starts: list, bytecode: GrinBytecode, register) -> int:
+    """Returns the program counter a jump's target goes to, if it's a literal
+    that can be taken, or else the complement of its register."""
+    if operand & CONSTANT_BIT:
+        _, _, value = bytecode.constants[operand >> 1]
+        # A jump 0 lines is left to GOTO to reject when it's taken.
+        if not (isinstance(value, int) and value == 0):
+            try:
+                return starts[resolve_target(value, index, count, bytecode.labels)]
+            except GrinRuntimeError:
+                pass
+    return ~register(operand)
+
+__all__ = [
+    BytecodeEngine.__name__,
+    assemble.__name__
+]
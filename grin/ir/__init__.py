@@ -0,0 +1,45 @@
+# __init__.py
+#
+# The intermediate representation of Grin programs: control-flow graphs of
+# their basic blocks, where their variables are defined and used, and a
+# readable listing of both, on which optimizations can reason about a
+# program's control flow rather than its list of statements, and the
+# optimization passes built on them.
+
+from grin.ir.cfg import *
+from grin.ir.defuse import *
+from grin.ir.printer import *
+from grin.ir.nodes import *
+from grin.ir.types import *
+from grin.ir.rewrite import *
+from grin.ir.constants import *
+from grin.ir.loops import *
+from grin.ir.closedform import *
+from grin.ir.inline import *
+
+__all__ = [
+    "EdgeKind",
+    "Edge",
+    "BasicBlock",
+    "ControlFlowGraph",
+    "build_cfg",
+    "literal_destination",
+    "definitions",
+    "uses",
+    "DefUse",
+    "format_operand",
+    "format_node",
+    "format_cfg",
+    "ClosedFormLoopNode",
+    "ValueTypes",
+    "OptimizationReport",
+    "OptimizedProgram",
+    "propagate_constants",
+    "Loop",
+    "dominators",
+    "dominates",
+    "find_loops",
+    "optimize_loops",
+    "close_counting_loops",
+    "inline_subroutines"
+]
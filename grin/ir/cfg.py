@@ -0,0 +1,239 @@
+from bisect import bisect_right
+from enum import Enum
+from typing import Iterable
+from grin.interpreter.program import GrinProgram, index_labels
+from grin.statements.nodes import (
+    LetNode, PrintNode, InnumNode, InstrNode, MathNode, JumpNode, GotoNode, GosubNode,
+    ReturnNode, EndNode, to_node)
+from grin.ir.nodes import ClosedFormLoopNode
+
+class EdgeKind(Enum):
+    """How control moves along an edge of a control-flow graph."""
+    FALLTHROUGH = 'fallthrough'
+    JUMP = 'jump'
+    CALL = 'call'
+    RETURN = 'return'
+    EXIT = 'exit'
+    ERROR = 'error'
+
+class Edge:
+    """An edge from one block of a control-flow graph to another."""
+    __slots__ = ('source', 'target', 'kind')
+
+    def __init__(self, source: int, target: int, kind: EdgeKind):
+        self.source = source
+        self.target = target
+        self.kind = kind
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Edge) and \
+            (self.source, self.target, self.kind) == (other.source, other.target, other.kind)
+
+    def __hash__(self) -> int:
+        return hash((self.source, self.target, self.kind))
+
+    def __repr__(self) -> str:
+        return f'Edge({self.source}, {self.target}, {self.kind.name})'
+
+class BasicBlock:
+    """A run of statements that always execute one after another: the
+    statements at indexes start up to (but not including) stop, as nodes.
+    A block whose last statement jumps to a target held in a variable has
+    an unknown target, which no edge accounts for."""
+    __slots__ = ('id', 'start', 'stop', 'nodes', 'successors', 'predecessors', 'unknown_target')
+
+    def __init__(self, id: int, start: int, stop: int, nodes: list):
+        self.id = id
+        self.start = start
+        self.stop = stop
+        self.nodes = nodes
+        self.successors = []
+        self.predecessors = []
+        self.unknown_target = False
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def indexes(self) -> range:
+        """Returns the indexes of the block's statements."""
+        return range(self.start, self.stop)
+
+    def last(self):
+        """Returns the block's last statement, or None if it's the exit."""
+        return self.nodes[-1] if self.nodes else None
+
+    def __repr__(self) -> str:
+        return f'BasicBlock({self.id}, {self.start}, {self.stop})'
+
+class ControlFlowGraph:
+    """The control-flow graph of a Grin program: its statements as nodes,
+    split into basic blocks, with an edge for each way control can move from
+    one block to another.  Blocks are numbered in order of their statements;
+    after them comes an empty exit block, which END, falling off the end of
+    the program, jumping just past its end and errors raised by literal
+    jump targets lead to.
+
+    Edges come from falling through to the next block, from jumps to
+    literal targets, from GOSUB to its target (a call edge), from RETURN
+    to the statement after every GOSUB (as any could be the one it returns
+    from), and from END.  Jumps to targets held in variables mark their
+    blocks' targets as unknown.  Errors are only edges where they're certain:
+    a jump to a literal target that can't be taken, and a RETURN in a
+    program without a GOSUB; any other statement might raise one too."""
+    def __init__(self, nodes: list, labels, blocks: list[BasicBlock]):
+        self.nodes = nodes
+        self.labels = labels
+        self.blocks = blocks
+        self.entry = blocks[0]
+        self.exit = blocks[-1]
+        self._starts = [block.start for block in blocks[:-1]]
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def __iter__(self):
+        return iter(self.blocks)
+
+    def block_at(self, index: int) -> BasicBlock:
+        """Returns the block holding the statement at the given index, or the
+        exit block if it's past the last statement."""
+        if index >= len(self.nodes):
+            return self.exit
+        return self.blocks[bisect_right(self._starts, index) - 1]
+
+    def edges(self) -> list[Edge]:
+        return [edge for block in self.blocks for edge in block.successors]
+
+    def has_unknown_targets(self) -> bool:
+        """Returns whether any jump's target is held in a variable."""
+        return any(block.unknown_target for block in self.blocks)
+
+    def reachable(self) -> set[int]:
+        """Returns the ids of the blocks that can run, starting from the entry.
+        A jump to an unknown target could go anywhere, so if one can run,
+        every block can."""
+        seen = {self.entry.id}
+        pending = [self.entry]
+        while pending:
+            block = pending.pop()
+            if block.unknown_target:
+                return {block.id for block in self.blocks}
+            for edge in block.successors:
+                if edge.target not in seen:
+                    seen.add(edge.target)
+                    pending.append(self.blocks[edge.target])
+        return seen
+
+def build_cfg(program: GrinProgram | Iterable) -> ControlFlowGraph:
+    """Builds the control-flow graph of a GrinProgram, or of a list of
+    statements in the form that parse_statements_into_objects() returns
+    them.  Only programs whose statements have nodes can be analyzed; any
+    other statement raises a ValueError."""
+    if isinstance(program, GrinProgram):
+        statements, labels = program.statements(), program.labels()
+    else:
+        statements = list(program)
+        labels = index_labels(statements)
+
+    nodes = []
+    for index, statement in enumerate(statements):
+        node = to_node(statement[1] if isinstance(statement, (list, tuple)) else statement)
+        if not isinstance(node, _ANALYZED_NODES):
+            raise ValueError(f'Cannot analyze statement {index + 1} ({type(node).__name__})')
+        nodes.append(node)
+
+    count = len(nodes)
+    leaders = {0} if count else set()
+    leaders.update(labels.values())
+    return_sites = set()
+    for index, node in enumerate(nodes):
+        if isinstance(node, (JumpNode, ReturnNode, EndNode)):
+            leaders.add(index + 1)
+        if isinstance(node, GosubNode):
+            return_sites.add(index + 1)
+        destination = literal_destination(node, index, count, labels)
+        if destination is not None:
+            leaders.add(destination)
+
+    starts = sorted(leader for leader in leaders if leader < count)
+    blocks = [
+        BasicBlock(id, start, stop, nodes[start:stop])
+        for id, (start, stop) in enumerate(zip(starts, starts[1:] + [count]))]
+    blocks.append(BasicBlock(len(blocks), count, count, []))
+    graph = ControlFlowGraph(nodes, labels, blocks)
+
+    for block in blocks[:-1]:
+        for target, kind in _successors(graph, block, return_sites):
+            edge = Edge(block.id, target.id, kind)
+            if edge not in block.successors:
+                block.successors.append(edge)
+                target.predecessors.append(edge)
+
+    return graph
+
+_ANALYZED_NODES = (
+    LetNode, PrintNode, InnumNode, InstrNode, MathNode, JumpNode, ReturnNode, EndNode, ClosedFormLoopNode)
+
+def literal_destination(node, index: int, count: int, labels) -> int | None:
+    """Returns the index of the statement a jump to a literal target goes to,
+    or None if its target is held in a variable or taking it would raise an
+    error; a destination equal to count is just past the last statement."""
+    if not isinstance(node, JumpNode):
+        return None
+    if node.resolved_target is not None:
+        return node.resolved_target
+    if node.target_is_variable:
+        return None
+
+    target = node.target
+    if isinstance(target, int):
+        if isinstance(node, GotoNode) and target == 0:
+            return None
+        destination = index + target
+        return destination if 0 <= destination <= count else None
+    elif isinstance(target, str):
+        return labels.get(target)
+    return None
+
+def _successors(graph: ControlFlowGraph, block: BasicBlock, return_sites: set[int]):
+    node = block.last()
+    index = block.stop - 1
+    count = len(graph.nodes)
+    fallthrough = (graph.block_at(block.stop), EdgeKind.FALLTHROUGH)
+
+    if isinstance(node, EndNode):
+        return [(graph.exit, EdgeKind.EXIT)]
+    elif isinstance(node, ReturnNode):
+        if not return_sites:
+            # A RETURN without a matching GOSUB raises an error.
+            return [(graph.exit, EdgeKind.ERROR)]
+        return [(graph.block_at(site), EdgeKind.RETURN) for site in sorted(return_sites)]
+    elif not isinstance(node, JumpNode):
+        return [fallthrough]
+
+    successors = []
+    if node.target_is_variable and node.resolved_target is None:
+        block.unknown_target = True
+    else:
+        destination = literal_destination(node, index, count, graph.labels)
+        if destination is None:
+            successors.append((graph.exit, EdgeKind.ERROR))
+            if isinstance(node, GotoNode) and node.target == 0:
+                # GOTO 0 raises before its condition is checked.
+                return successors
+        else:
+            kind = EdgeKind.CALL if isinstance(node, GosubNode) else EdgeKind.JUMP
+            successors.append((graph.block_at(destination), kind))
+
+    if node.condition is not None:
+        successors.append(fallthrough)
+    return successors
+
+__all__ = [
+    EdgeKind.__name__,
+    Edge.__name__,
+    BasicBlock.__name__,
+    ControlFlowGraph.__name__,
+    build_cfg.__name__,
+    literal_destination.__name__
+]
@@ -0,0 +1,99 @@
+from typing import Iterable
+from grin.interpreter.program import GrinProgram
+from grin.ir.cfg import ControlFlowGraph, build_cfg, literal_destination
+from grin.ir.loops import Loop, find_loops, _TRIP_COMPARISONS
+from grin.ir.nodes import ClosedFormLoopNode
+from grin.ir.printer import format_node
+from grin.ir.rewrite import (
+    OptimizationReport, OptimizedProgram, unpack, unlabeled, has_failing_relative_jump, rebuild)
+from grin.statements.nodes import AddNode, SubNode, GotoNode
+
+# A counting loop is a loop of one block made only of ADDs and SUBs, ending
+# by jumping back to its start while an induction variable compares to a
+# bound.  A ClosedFormLoopNode is put in front of it, which jumps into the
+# loop from outside land on and its back edge skips, so that it runs once
+# each time the loop is entered.  Whether the loop's variables hold
+# integers (and so how many times it runs) is only known then, so the node
+# checks, and leaves the loop to run as it would have if they don't.
+
+def close_counting_loops(program: GrinProgram | OptimizedProgram | Iterable) -> OptimizedProgram:
+    """Returns a program in which every counting loop (one that adds integer
+    literals or variables it doesn't change to its induction variables, and
+    those or its induction variables to its other variables, such as
+    ADD I 1, ADD S K, GOTO "LOOP" IF I < N) computes its variables' values
+    in constant time rather than running every iteration, along with a
+    report of the loops it changed.  Loops that print, read input or change
+    their variables in any other way are left alone, and a loop whose
+    variables don't all hold integers when it starts runs as it always did.
+
+    The program prints, fails and leaves its variables as the original
+    program does.  A program with a jump to a target held in a variable or a
+    literal relative target out of bounds is left unchanged."""
+    statements, labels, origins, length = unpack(program)
+    report = OptimizationReport()
+    cfg = build_cfg(GrinProgram(statements, labels))
+    if cfg.has_unknown_targets() or has_failing_relative_jump(cfg.nodes):
+        return OptimizedProgram(GrinProgram(statements, labels), origins, length, report)
+
+    replacements = [unlabeled(statement) for statement in statements]
+    back_edges = {}
+    for loop in find_loops(cfg):
+        node = _closed_form(cfg, loop)
+        if node is None:
+            continue
+
+        header = cfg.blocks[loop.header]
+        replacements[header.start] = [(header.start, node), (header.start, replacements[header.start])]
+        back_edges[header.start] = header.stop - 1
+        line = origins[header.start] + 1
+        report.record('closed', line, f'computed the loop at line {line} in closed form: {format_node(node)}')
+
+    if back_edges:
+        def landing(source: int, destination: int) -> int:
+            return 1 if back_edges.get(destination) == source else 0
+
+        statements, labels, sources = rebuild(statements, labels, replacements, landing)
+        origins = [origins[source] for source in sources]
+
+    return OptimizedProgram(GrinProgram(statements, labels), origins, length, report)
+
+def _closed_form(cfg: ControlFlowGraph, loop: Loop) -> ClosedFormLoopNode | None:
+    """Returns the node that computes a loop in closed form, or None if it
+    isn't a counting loop."""
+    header = cfg.blocks[loop.header]
+    last = header.last()
+    if loop.blocks != {header.id} or len(header) < 2 or type(last) is not GotoNode or last.condition is None or \
+            literal_destination(last, header.stop - 1, len(cfg.nodes), cfg.labels) != header.start:
+        return None
+
+    updates = []
+    for node in header.nodes[:-1]:
+        if type(node) not in (AddNode, SubNode) or (not node.is_variable and type(node.operand) is not int):
+            return None
+        updates.append((node.name, 1 if type(node) is AddNode else -1, node.is_variable, node.operand))
+
+    assigned = {name for name, _, _, _ in updates}
+    bases = [
+        name for name in dict.fromkeys(name for name, _, _, _ in updates)
+        if all(not is_variable or operand not in assigned
+               for assigned_name, _, is_variable, operand in updates if assigned_name == name)]
+    for name, _, is_variable, operand in updates:
+        if name not in bases and is_variable and operand in assigned and operand not in bases:
+            return None
+
+    left_is_variable, left, comparison, right_is_variable, right = last.condition
+    if left_is_variable and left in bases:
+        induction, bound_is_variable, bound = left, right_is_variable, right
+    elif right_is_variable and right in bases:
+        induction, bound_is_variable, bound = right, left_is_variable, left
+        comparison = _TRIP_COMPARISONS[comparison]
+    else:
+        return None
+    if (bound_is_variable and bound in assigned) or (not bound_is_variable and type(bound) is not int):
+        return None
+
+    return ClosedFormLoopNode(updates, bases, induction, comparison, bound_is_variable, bound)
+
+__all__ = [
+    close_counting_loops.__name__
+]
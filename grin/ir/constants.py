@@ -0,0 +1,268 @@
+import math
+from typing import Iterable
+from grin.interpreter.errors import GrinRuntimeError
+from grin.interpreter.program import GrinProgram
+from grin.ir.cfg import EdgeKind, ControlFlowGraph, build_cfg
+from grin.ir.defuse import DefUse, definitions, uses
+from grin.ir.printer import format_node
+from grin.ir.types import ValueTypes
+from grin.ir.rewrite import (
+    OptimizationReport, OptimizedProgram, unpack, unlabeled, label_of, has_failing_relative_jump, rebuild)
+from grin.statements.jump_statements import compare_values
+from grin.statements.nodes import (
+    LetNode, PrintNode, InnumNode, InstrNode, MathNode, JumpNode, GotoNode)
+
+# Constants are propagated through a program's control-flow graph as a map
+# from each variable to the value it's known to hold, or to _VARYING if it
+# can hold more than one.  Only the edges that can be taken are followed: a
+# jump whose condition is known is taken (or not) every time, so only one of
+# its edges is, and a block reached by no edge that can be taken never runs.
+# Every variable starts out unset, which reads as 0.
+
+_VARYING = object()
+
+# A folded result too large to be worth writing into the program is left
+# to be computed when it runs.
+_MAX_FOLDED_SIZE = 10_000
+
+def propagate_constants(program: GrinProgram | OptimizedProgram | Iterable) -> OptimizedProgram:
+    """Returns a program in which the value of every variable known to be a
+    constant is written in place of the variable, every math statement and
+    comparison whose operands are constants is folded into its result, and
+    statements that can't run or whose results are never used are removed,
+    along with a report of what changed.  It prints, fails and leaves its
+    variables as the original program does; a statement that would raise an
+    error is never folded, so the error is raised when it runs.
+
+    A program with a jump to a target held in a variable could go to any of
+    its statements, so it's left unchanged."""
+    statements, labels, origins, length = unpack(program)
+    report = OptimizationReport()
+    cfg = build_cfg(GrinProgram(statements, labels))
+
+    if not cfg.has_unknown_targets():
+        in_place = has_failing_relative_jump(cfg.nodes)
+        replacements = _fold(cfg, statements, origins, report, in_place)
+        if not in_place:
+            statements, labels, kept = rebuild(statements, labels, replacements)
+            origins = [origins[index] for index in kept]
+            while True:
+                replacements = _remove_dead_statements(build_cfg(GrinProgram(statements, labels)),
+                                                       statements, origins, report)
+                if all(replacement is not None for replacement in replacements):
+                    break
+                statements, labels, kept = rebuild(statements, labels, replacements)
+                origins = [origins[index] for index in kept]
+        else:
+            statements = [
+                (label_of(statement), replacement) if label_of(statement) is not None else replacement
+                for statement, replacement in zip(statements, replacements)]
+
+    return OptimizedProgram(GrinProgram(statements, labels), origins, length, report)
+
+def _same(left, right) -> bool:
+    """Returns whether two values are the same constant: of the same type and
+    equal, and for floats, of the same sign (as 0.0 and -0.0 print differently)."""
+    if left is _VARYING or right is _VARYING or type(left) is not type(right) or left != right:
+        return False
+    return type(left) is not float or math.copysign(1.0, left) == math.copysign(1.0, right)
+
+def _join(into: dict, facts: dict) -> bool:
+    """Merges the facts known along one edge into those known at the start of
+    a block, returning whether they changed."""
+    changed = False
+    for name, value in facts.items():
+        if into[name] is not _VARYING and not _same(into[name], value):
+            into[name] = _VARYING
+            changed = True
+    return changed
+
+def _foldable(value) -> bool:
+    """Returns whether a value can be written into a program as a literal: a
+    float that isn't finite has no literal, and a large value isn't worth it."""
+    if isinstance(value, str):
+        return len(value) <= _MAX_FOLDED_SIZE
+    elif isinstance(value, int):
+        return value.bit_length() <= _MAX_FOLDED_SIZE
+    return math.isfinite(value)
+
+def _value(facts: dict, is_variable: bool, operand):
+    return facts[operand] if is_variable else operand
+
+def _operand(facts: dict, is_variable: bool, operand) -> tuple[bool, object]:
+    """Returns an operand with a variable known to be a constant replaced by its value."""
+    if is_variable and facts[operand] is not _VARYING and _foldable(facts[operand]):
+        return False, facts[operand]
+    return is_variable, operand
+
+def _evaluate(node, facts: dict):
+    """Updates the facts known before a statement to those known after it,
+    returning the statement it can be replaced with (None if it does nothing)
+    and, for a jump, whether it's known to be taken (None if it isn't known)."""
+    if isinstance(node, LetNode):
+        is_variable, operand = _operand(facts, node.is_variable, node.operand)
+        facts[node.name] = _value(facts, node.is_variable, node.operand)
+        if is_variable == node.is_variable:
+            return node, None
+        return LetNode(node.name, is_variable, operand), None
+
+    elif isinstance(node, PrintNode):
+        is_variable, operand = _operand(facts, node.is_variable, node.operand)
+        if is_variable == node.is_variable:
+            return node, None
+        return PrintNode(is_variable, operand), None
+
+    elif isinstance(node, (InnumNode, InstrNode)):
+        facts[node.name] = _VARYING
+        return node, None
+
+    elif isinstance(node, MathNode):
+        left = facts[node.name]
+        right = _value(facts, node.is_variable, node.operand)
+        is_variable, operand = _operand(facts, node.is_variable, node.operand)
+        facts[node.name] = _VARYING
+        if left is not _VARYING and right is not _VARYING:
+            try:
+                result = node.operate(left, right)
+            except GrinRuntimeError:
+                result = _VARYING
+            if result is not _VARYING and _foldable(result):
+                facts[node.name] = result
+                return LetNode(node.name, False, result), None
+        if is_variable == node.is_variable:
+            return node, None
+        return type(node)(node.name, is_variable, operand), None
+
+    elif isinstance(node, JumpNode) and node.condition is not None:
+        left_is_variable, left, comparison, right_is_variable, right = node.condition
+        left_value = _value(facts, left_is_variable, left)
+        right_value = _value(facts, right_is_variable, right)
+        if left_value is not _VARYING and right_value is not _VARYING and \
+                not (isinstance(node, GotoNode) and node.target == 0):
+            try:
+                taken = compare_values(left_value, comparison, right_value)
+            except GrinRuntimeError:
+                taken = None
+            if taken:
+                return type(node)(node.target_is_variable, node.target, None, node.resolved_target), True
+            elif taken is not None:
+                return None, False
+
+        condition = (*_operand(facts, left_is_variable, left), comparison, *_operand(facts, right_is_variable, right))
+        if condition == node.condition:
+            return node, None
+        return type(node)(node.target_is_variable, node.target, condition, node.resolved_target), None
+
+    for name in definitions(node):
+        facts[name] = _VARYING
+    return node, None
+
+def _propagate(cfg: ControlFlowGraph) -> list:
+    """Returns what's known about each variable's value at the start of each
+    block of a program's graph (None for a block that can't run)."""
+    names = DefUse(cfg).variables()
+    known = [None] * len(cfg.blocks)
+    known[cfg.entry.id] = {name: 0 for name in names}
+    pending = [cfg.entry.id]
+
+    while pending:
+        block = cfg.blocks[pending.pop()]
+        facts = dict(known[block.id])
+        taken = None
+        for node in block.nodes:
+            _, taken = _evaluate(node, facts)
+
+        for edge in block.successors:
+            if edge.kind is EdgeKind.ERROR or \
+                    (taken is True and edge.kind is EdgeKind.FALLTHROUGH) or \
+                    (taken is False and edge.kind is not EdgeKind.FALLTHROUGH):
+                continue
+            if known[edge.target] is None:
+                known[edge.target] = dict(facts)
+                pending.append(edge.target)
+            elif _join(known[edge.target], facts):
+                pending.append(edge.target)
+
+    return known
+
+def _fold(cfg: ControlFlowGraph, statements: list, origins: list[int], report: OptimizationReport,
+          in_place: bool) -> list:
+    """Propagates constants through a program's graph, returning the statement
+    each one is replaced with (None for those that are removed)."""
+    known = _propagate(cfg)
+    replacements = []
+    for block in cfg.blocks[:-1]:
+        if known[block.id] is None:
+            for index, node in zip(block.indexes(), block.nodes):
+                if in_place:
+                    replacements.append(node)
+                else:
+                    replacements.append(None)
+                    report.record('unreachable', origins[index] + 1, f'removed unreachable {format_node(node)}')
+            continue
+
+        facts = dict(known[block.id])
+        for index, node in zip(block.indexes(), block.nodes):
+            replacement, _ = _evaluate(node, facts)
+            line = origins[index] + 1
+            if replacement is None and (in_place or label_of(statements[index]) is not None):
+                replacement = node
+            elif replacement is None:
+                report.record('removed', line, f'removed {format_node(node)}, which never jumps')
+            elif replacement is not node:
+                kind = 'folded' if type(replacement) is not type(node) or \
+                    (isinstance(node, JumpNode) and replacement.condition is None) else 'propagated'
+                report.record(kind, line, f'{kind} {format_node(node)} into {format_node(replacement)}')
+            replacements.append(replacement)
+
+    return replacements
+
+def _remove_dead_statements(cfg: ControlFlowGraph, statements: list, origins: list[int],
+                            report: OptimizationReport) -> list:
+    """Returns the statements of a program with those that do nothing removed
+    (as None): LETs whose values are never read before they're assigned
+    again, and jumps to the statement after them.  Every variable is live
+    when the program ends, as its value is part of what the program leaves
+    behind, and so is every variable at a statement that could raise an
+    error."""
+    everything = frozenset(DefUse(cfg).variables())
+    raises = ValueTypes(cfg).raises
+    live_in = [frozenset() for _ in cfg.blocks]
+    live_in[cfg.exit.id] = everything
+
+    def transfer(index: int, node, live: frozenset) -> frozenset:
+        if raises[index]:
+            return everything
+        return (live - frozenset(definitions(node))) | frozenset(uses(node))
+
+    changed = True
+    while changed:
+        changed = False
+        for block in reversed(cfg.blocks[:-1]):
+            live = frozenset().union(*(live_in[edge.target] for edge in block.successors))
+            for index, node in zip(reversed(block.indexes()), reversed(block.nodes)):
+                live = transfer(index, node, live)
+            if live != live_in[block.id]:
+                live_in[block.id] = live
+                changed = True
+
+    replacements = [unlabeled(statement) for statement in statements]
+    for block in cfg.blocks[:-1]:
+        live = frozenset().union(*(live_in[edge.target] for edge in block.successors))
+        for index, node in reversed(list(zip(block.indexes(), block.nodes))):
+            if label_of(statements[index]) is None:
+                if isinstance(node, LetNode) and node.name not in live:
+                    replacements[index] = None
+                    report.record('dead', origins[index] + 1, f'removed {format_node(node)}, whose value is never used')
+                    continue
+                if isinstance(node, GotoNode) and node.condition is None and node.resolved_target == index + 1:
+                    replacements[index] = None
+                    report.record('removed', origins[index] + 1, f'removed {format_node(node)}, which goes to the next statement')
+                    continue
+            live = transfer(index, node, live)
+
+    return replacements
+
+__all__ = [
+    propagate_constants.__name__
+]
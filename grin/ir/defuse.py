@@ -0,0 +1,73 @@
+from grin.ir.cfg import ControlFlowGraph
+from grin.ir.nodes import ClosedFormLoopNode
+from grin.statements.nodes import LetNode, PrintNode, InnumNode, InstrNode, MathNode, JumpNode
+
+def definitions(node) -> tuple[str, ...]:
+    """Returns the names of the variables a statement (as a node) assigns."""
+    if isinstance(node, (LetNode, MathNode, InnumNode, InstrNode)):
+        return (node.name,)
+    elif isinstance(node, ClosedFormLoopNode):
+        return tuple(dict.fromkeys(name for name, _, _, _ in node.updates))
+    return ()
+
+def uses(node) -> tuple[str, ...]:
+    """Returns the names of the variables a statement (as a node) reads, in
+    the order it reads them.  A math statement reads the variable it assigns."""
+    if isinstance(node, ClosedFormLoopNode):
+        return node.names
+    names = []
+    if isinstance(node, MathNode):
+        names.append(node.name)
+    if isinstance(node, (LetNode, PrintNode, MathNode)) and node.is_variable:
+        names.append(node.operand)
+    elif isinstance(node, JumpNode):
+        if node.target_is_variable and node.resolved_target is None:
+            names.append(node.target)
+        if node.condition is not None:
+            left_is_variable, left, _, right_is_variable, right = node.condition
+            if left_is_variable:
+                names.append(left)
+            if right_is_variable:
+                names.append(right)
+    return tuple(names)
+
+class DefUse:
+    """Where each variable of a program is defined (assigned) and used (read):
+    the indexes of those statements, in order, for each variable, and for
+    each block, the variables it defines and the ones it uses before
+    defining them (those whose values come from before the block)."""
+    def __init__(self, cfg: ControlFlowGraph):
+        self.definitions = {}
+        self.uses = {}
+        self.block_definitions = []
+        self.block_uses = []
+
+        for block in cfg.blocks:
+            defined = set()
+            used = set()
+            for index, node in zip(block.indexes(), block.nodes):
+                for name in uses(node):
+                    self.uses.setdefault(name, []).append(index)
+                    if name not in defined:
+                        used.add(name)
+                for name in definitions(node):
+                    self.definitions.setdefault(name, []).append(index)
+                    defined.add(name)
+            self.block_definitions.append(frozenset(defined))
+            self.block_uses.append(frozenset(used))
+
+    def variables(self) -> list[str]:
+        """Returns the names of all of the program's variables, sorted."""
+        return sorted(self.definitions.keys() | self.uses.keys())
+
+    def is_defined(self, name: str) -> bool:
+        return name in self.definitions
+
+    def is_used(self, name: str) -> bool:
+        return name in self.uses
+
+__all__ = [
+    definitions.__name__,
+    uses.__name__,
+    DefUse.__name__
+]
@@ -0,0 +1,110 @@
+from typing import Iterable
+from grin.interpreter.program import GrinProgram
+from grin.ir.cfg import build_cfg, literal_destination
+from grin.ir.rewrite import (
+    OptimizationReport, OptimizedProgram, unpack, unlabeled, has_failing_relative_jump, rebuild)
+from grin.statements.nodes import JumpNode, GotoNode, GosubNode, ReturnNode, EndNode
+
+# A subroutine is inlined by putting a copy of its statements, up to the
+# RETURN that ends it, in place of a GOSUB to it, with each copied jump
+# going to the copy of the statement it went to, and a jump to the RETURN
+# going to the statement after the GOSUB.  Only subroutines that call no
+# others are inlined, so a recursive one never is, but inlining is repeated
+# until nothing more can be, so one whose calls have all been inlined can
+# be inlined in turn.  The copies keep the original lines of the statements
+# they were copied from.
+
+def inline_subroutines(program: GrinProgram | OptimizedProgram | Iterable, max_size: int = 8,
+                       max_growth: int | None = None) -> OptimizedProgram:
+    """Returns a program in which each GOSUB without a condition to a literal
+    target is replaced by the statements of the subroutine it calls, along
+    with a report of what changed.  A subroutine is inlined if it has at most
+    max_size statements before the RETURN that ends it, none of which is a
+    GOSUB, an END or a jump out of it, and if no jump goes into it other
+    than to its first statement.  With max_growth, inlining stops before the
+    program grows by more than that many statements.
+
+    The program prints, fails (at the same original lines) and leaves its
+    variables as the original program does, though an error raised in an
+    inlined subroutine leaves the call stack without its call.  A program
+    with a jump to a target held in a variable or a literal relative target
+    out of bounds is left unchanged."""
+    if max_size < 0 or (max_growth is not None and max_growth < 0):
+        raise ValueError('Inlining limits cannot be negative')
+
+    statements, labels, origins, length = unpack(program)
+    report = OptimizationReport()
+    cfg = build_cfg(GrinProgram(statements, labels))
+    if cfg.has_unknown_targets() or has_failing_relative_jump(cfg.nodes):
+        return OptimizedProgram(GrinProgram(statements, labels), origins, length, report)
+
+    growth = 0
+    while True:
+        nodes = [unlabeled(statement) for statement in statements]
+        count = len(nodes)
+        subroutines = {}
+        replacements = list(nodes)
+        changed = False
+
+        for index, node in enumerate(nodes):
+            if type(node) is not GosubNode or node.condition is not None or node.target_is_variable:
+                continue
+            entry = literal_destination(node, index, count, labels)
+            if entry is None or entry == count:
+                continue
+            if entry not in subroutines:
+                subroutines[entry] = _subroutine(nodes, labels, entry, max_size)
+            body = subroutines[entry]
+            if body is None or (max_growth is not None and growth + len(body) - 1 > max_growth):
+                continue
+
+            replacements[index] = [(source, *copy) for source, copy in zip(range(entry, entry + len(body)), body)]
+            growth += len(body) - 1
+            changed = True
+            report.record('inlined', origins[index] + 1,
+                          f'inlined the subroutine at line {origins[entry] + 1} ({len(body)} statements)')
+
+        if not changed:
+            break
+        statements, labels, sources = rebuild(statements, labels, replacements)
+        origins = [origins[source] for source in sources]
+
+    return OptimizedProgram(GrinProgram(statements, labels), origins, length, report)
+
+def _subroutine(nodes: list, labels, entry: int, max_size: int) -> list[tuple] | None:
+    """Returns the statements of the subroutine starting at an index, up to
+    the RETURN that ends it, as the nodes to put in place of a call to it
+    (with each jump's position among them as a (node, position) pair), or
+    None if it can't be inlined."""
+    count = len(nodes)
+    end = entry
+    while end < count and not isinstance(nodes[end], ReturnNode):
+        if end - entry >= max_size or isinstance(nodes[end], (GosubNode, EndNode)):
+            return None
+        end += 1
+    if end == count:
+        return None
+
+    body = []
+    for index in range(entry, end):
+        node = nodes[index]
+        if isinstance(node, GotoNode):
+            destination = literal_destination(node, index, count, labels)
+            if node.target_is_variable or destination is None or not entry <= destination <= end:
+                return None
+            body.append((node, destination - entry))
+        else:
+            body.append((node,))
+
+    # A jump from outside into the middle of the subroutine would be a
+    # second way into it, which a copy can't have.
+    for index, node in enumerate(nodes):
+        if isinstance(node, JumpNode) and not entry <= index < end:
+            destination = literal_destination(node, index, count, labels)
+            if destination is not None and entry < destination <= end:
+                return None
+    return body
+
+__all__ = [
+    inline_subroutines.__name__
+]
@@ -0,0 +1,392 @@
+import operator
+from collections import Counter
+from typing import Iterable
+from grin.interpreter.program import GrinProgram
+from grin.ir.cfg import ControlFlowGraph, EdgeKind, build_cfg, literal_destination
+from grin.ir.constants import _VARYING, _evaluate, _join, _propagate
+from grin.ir.defuse import definitions, uses
+from grin.ir.nodes import _iterations
+from grin.ir.printer import format_node
+from grin.ir.rewrite import (
+    OptimizationReport, OptimizedProgram, unpack, unlabeled, has_failing_relative_jump, rebuild)
+from grin.ir.types import ValueTypes
+from grin.statements.nodes import (
+    LetNode, MathNode, AddNode, SubNode, MultNode, GotoNode, GosubNode, ReturnNode)
+
+# A loop is optimized in place of its header block, the block every one of
+# its iterations starts with, which always runs to its end once it starts:
+# statements moved out of the loop go in a preheader put just before the
+# header, which jumps into the loop from outside land on and its back edges
+# skip.  Only innermost loops without subroutine calls are optimized, and
+# only statements in their header blocks are moved or rewritten, as those
+# are the ones known to run exactly once on every iteration.
+
+def dominators(cfg: ControlFlowGraph) -> list[int | None]:
+    """Returns the id of the immediate dominator of each block of a graph:
+    the closest block that every path from the entry to it goes through.
+    The entry is its own, and a block that can't be reached has None."""
+    order = []
+    seen = {cfg.entry.id}
+    stack = [(cfg.entry.id, iter(cfg.entry.successors))]
+    while stack:
+        block_id, successors = stack[-1]
+        for edge in successors:
+            if edge.target not in seen:
+                seen.add(edge.target)
+                stack.append((edge.target, iter(cfg.blocks[edge.target].successors)))
+                break
+        else:
+            stack.pop()
+            order.append(block_id)
+    order.reverse()
+
+    number = {block_id: position for position, block_id in enumerate(order)}
+    idom = [None] * len(cfg.blocks)
+    idom[cfg.entry.id] = cfg.entry.id
+
+    def intersect(left: int, right: int) -> int:
+        while left != right:
+            while number[left] > number[right]:
+                left = idom[left]
+            while number[right] > number[left]:
+                right = idom[right]
+        return left
+
+    changed = True
+    while changed:
+        changed = False
+        for block_id in order[1:]:
+            new_idom = None
+            for edge in cfg.blocks[block_id].predecessors:
+                if idom[edge.source] is not None:
+                    new_idom = edge.source if new_idom is None else intersect(edge.source, new_idom)
+            if idom[block_id] != new_idom:
+                idom[block_id] = new_idom
+                changed = True
+
+    return idom
+
+def dominates(idom: list[int | None], dominator: int, block_id: int) -> bool:
+    """Returns whether every path from the entry to a block goes through another."""
+    while True:
+        if block_id == dominator:
+            return True
+        if idom[block_id] is None or idom[block_id] == block_id:
+            return False
+        block_id = idom[block_id]
+
+class Loop:
+    """A natural loop of a control-flow graph: the blocks that can reach one
+    of its back edges (edges to a block that dominates their source) without
+    going through the block they go to, its header."""
+    def __init__(self, header: int, latches: list[int], blocks: frozenset[int]):
+        self.header = header
+        self.latches = latches
+        self.blocks = blocks
+
+    def __contains__(self, block_id: int) -> bool:
+        return block_id in self.blocks
+
+    def __repr__(self) -> str:
+        return f'Loop(header={self.header}, latches={self.latches}, blocks={sorted(self.blocks)})'
+
+def find_loops(cfg: ControlFlowGraph) -> list[Loop]:
+    """Returns the natural loops of a graph, one for each header (with the
+    back edges that go to it merged), ordered by their headers."""
+    idom = dominators(cfg)
+    latches = {}
+    for block in cfg.blocks:
+        if idom[block.id] is None:
+            continue
+        for edge in block.successors:
+            if edge.kind is not EdgeKind.ERROR and dominates(idom, edge.target, block.id):
+                latches.setdefault(edge.target, []).append(block.id)
+
+    loops = []
+    for header in sorted(latches):
+        blocks = {header}
+        pending = [latch for latch in latches[header] if latch != header]
+        blocks.update(pending)
+        while pending:
+            for edge in cfg.blocks[pending.pop()].predecessors:
+                if edge.source not in blocks and idom[edge.source] is not None:
+                    blocks.add(edge.source)
+                    pending.append(edge.source)
+        loops.append(Loop(header, sorted(latches[header]), frozenset(blocks)))
+    return loops
+
+def optimize_loops(program: GrinProgram | OptimizedProgram | Iterable, unroll: int = 1) -> OptimizedProgram:
+    """Returns a program whose innermost loops are optimized, along with a
+    report of what changed.  Statements whose values are the same on every
+    iteration (LETs of literals or of variables the loop doesn't change, and
+    math on them) are hoisted out of the loop, and a variable set to an
+    integer induction variable (one the loop adds the same integer literal
+    to on every iteration) times an integer literal is updated by adding to
+    it instead.  With unroll greater than 1, a loop of one block whose
+    number of iterations is known is unrolled that many times, so that its
+    condition is checked once for every unroll iterations.
+
+    The program prints, fails (at the same original lines) and leaves its
+    variables as the original program does.  A program with a jump to a
+    target held in a variable or a literal relative target out of bounds is
+    left unchanged."""
+    if unroll < 1:
+        raise ValueError('Loops must be unrolled at least once')
+
+    statements, labels, origins, length = unpack(program)
+    report = OptimizationReport()
+    cfg = build_cfg(GrinProgram(statements, labels))
+    if cfg.has_unknown_targets() or has_failing_relative_jump(cfg.nodes):
+        return OptimizedProgram(GrinProgram(statements, labels), origins, length, report)
+
+    loops = find_loops(cfg)
+    headers = {loop.header for loop in loops}
+    types = ValueTypes(cfg)
+    known = _propagate(cfg)
+    replacements = [unlabeled(statement) for statement in statements]
+    landings = {}
+
+    for loop in loops:
+        if any(header in loop for header in headers - {loop.header}):
+            continue
+        optimized = _optimize_loop(cfg, loop, types, known, unroll, origins, report)
+        if optimized is None:
+            continue
+
+        sequence, offset = optimized
+        header = cfg.blocks[loop.header]
+        replacements[header.start] = sequence
+        for index in range(header.start + 1, header.stop):
+            replacements[index] = None
+        sources = {index for block_id in loop.blocks for index in cfg.blocks[block_id].indexes()}
+        landings[header.start] = (sources, offset)
+
+    if landings:
+        def landing(source: int, destination: int) -> int:
+            sources, offset = landings.get(destination, ((), 0))
+            return offset if source in sources else 0
+
+        statements, labels, sources = rebuild(statements, labels, replacements, landing)
+        origins = [origins[source] for source in sources]
+
+    return OptimizedProgram(GrinProgram(statements, labels), origins, length, report)
+
+def _optimize_loop(cfg: ControlFlowGraph, loop: Loop, types: ValueTypes, known: list, unroll: int,
+                   origins: list[int], report: OptimizationReport) -> tuple[list, int] | None:
+    """Returns the statements (as (source, node) pairs) that take the place of
+    a loop's header block, and the position among them that the loop's back
+    edges go to, or None if the loop isn't changed."""
+    header = cfg.blocks[loop.header]
+    for edge in header.predecessors:
+        # A preheader can't be put in the way of a fall-through from inside
+        # the loop, nor of a RETURN to the statement after a GOSUB.
+        if edge.kind is EdgeKind.RETURN or (edge.kind is EdgeKind.FALLTHROUGH and edge.source in loop):
+            return None
+    for block_id in loop.blocks:
+        if any(isinstance(node, (GosubNode, ReturnNode)) for node in cfg.blocks[block_id].nodes):
+            return None
+
+    body_definitions = Counter(
+        name for block_id in loop.blocks for node in cfg.blocks[block_id].nodes for name in definitions(node))
+    loop_line = origins[header.start] + 1
+
+    hoisted = _hoist(header, body_definitions, types.raises)
+    for index in hoisted:
+        report.record('hoisted', origins[index] + 1,
+                      f'hoisted {format_node(cfg.nodes[index])} out of the loop at line {loop_line}')
+
+    inductions = _induction_variables(header, body_definitions, types)
+    reduced, initialization = _strength_reduce(header, hoisted, inductions, body_definitions, types.raises)
+    for index, replacement in reduced.items():
+        if replacement is not None:
+            report.record('reduced', origins[index] + 1,
+                          f'reduced {format_node(cfg.nodes[index])} {format_node(cfg.nodes[index + 1])} '
+                          f'into {format_node(replacement)}')
+
+    preheader = [(index, cfg.nodes[index]) for index in hoisted] + initialization
+    body = [
+        (index, reduced.get(index, node)) for index, node in zip(header.indexes(), header.nodes)
+        if index not in hoisted and reduced.get(index, node) is not None]
+
+    copies = 1
+    prologue = []
+    if unroll > 1:
+        trip_count = _trip_count(cfg, loop, inductions, body_definitions, known)
+        if trip_count is not None and trip_count >= unroll:
+            copies = unroll
+            prologue = body[:-1] * (trip_count % unroll)
+            body = body[:-1] * unroll + body[-1:]
+            report.record('unrolled', loop_line,
+                          f'unrolled the loop at line {loop_line} {unroll} times ({trip_count} iterations)')
+
+    if not preheader and not reduced and copies == 1:
+        return None
+    return preheader + prologue + body, len(preheader) + len(prologue)
+
+def _hoist(header, body_definitions: Counter, raises: list[bool]) -> list[int]:
+    """Returns the indexes of the statements of a loop's header block that can
+    be hoisted out of it.  A statement is hoisted if it's a LET or math
+    statement whose operands are the same on every iteration, if every
+    statement assigning its variable in the loop is hoisted with it, and if
+    nothing left in the loop before it reads that variable.  As it then runs
+    before the statements left before it, those can't raise errors, and if
+    it can, all of them must be hoisted too."""
+    banned = set()
+    while True:
+        hoisted = []
+        hoisted_definitions = Counter()
+        read = set()
+        all_hoisted = True
+        raised = False
+
+        def invariant(name: str) -> bool:
+            return body_definitions[name] == hoisted_definitions[name] and name not in banned
+
+        for index, node in zip(header.indexes(), header.nodes):
+            hoistable = isinstance(node, (LetNode, MathNode)) and node.name not in banned \
+                and node.name not in read and (all_hoisted if raises[index] else not raised)
+            if hoistable and isinstance(node, MathNode):
+                hoistable = hoisted_definitions[node.name] > 0
+            if hoistable and node.is_variable:
+                if node.operand == node.name:
+                    hoistable = hoisted_definitions[node.name] > 0
+                else:
+                    hoistable = invariant(node.operand)
+
+            if hoistable:
+                hoisted.append(index)
+                hoisted_definitions[node.name] += 1
+            else:
+                all_hoisted = False
+                raised = raised or raises[index]
+                read.update(uses(node))
+
+        partial = {name for name, count in hoisted_definitions.items() if count != body_definitions[name]}
+        if not partial:
+            return hoisted
+        banned |= partial
+
+def _induction_variables(header, body_definitions: Counter, types: ValueTypes) -> dict[str, tuple[int, int]]:
+    """Returns the integer induction variables of a loop, each with the index
+    of the statement in its header block that updates it and the integer
+    that statement adds to it."""
+    entry_types = types.block_types[header.id]
+    inductions = {}
+    for index, node in zip(header.indexes(), header.nodes):
+        if isinstance(node, (AddNode, SubNode)) and not node.is_variable and type(node.operand) is int \
+                and body_definitions[node.name] == 1 and entry_types[node.name] == frozenset([int]):
+            inductions[node.name] = (index, node.operand if isinstance(node, AddNode) else -node.operand)
+    return inductions
+
+def _strength_reduce(header, hoisted: list[int], inductions: dict, body_definitions: Counter,
+                     raises: list[bool]) -> tuple[dict, list]:
+    """Finds pairs of statements in a loop's header block that set a variable
+    to an induction variable times an integer literal, as LET T I followed
+    by MULT T K (or LET T K followed by MULT T I), and returns the
+    replacement for each statement of those pairs (an ADD for the first,
+    None for the second) along with the statements that set each variable
+    to its first value before the loop."""
+    reduced = {}
+    initialization = []
+    read = set()
+    raised = False
+    indexes = list(header.indexes())
+    nodes = header.nodes
+
+    for position, (index, node) in enumerate(zip(indexes, nodes)):
+        if index in hoisted:
+            continue
+        pair = _product(node, nodes[position + 1] if position + 1 < len(nodes) else None, inductions)
+        if pair is not None and index + 1 not in hoisted:
+            name, induction, factor = pair
+            if body_definitions[name] == 2 and name not in read and not raised:
+                update, step = inductions[induction]
+                reduced[index] = AddNode(name, False, step * factor)
+                reduced[index + 1] = None
+                initialization.append((index, LetNode(name, True, induction)))
+                if update > index:
+                    initialization.append((index, SubNode(name, False, step)))
+                initialization.append((index + 1, MultNode(name, False, factor)))
+                continue
+
+        if index - 1 in reduced:
+            continue
+        raised = raised or raises[index]
+        read.update(uses(node))
+
+    return reduced, initialization
+
+def _product(first, second, inductions: dict) -> tuple[str, str, int] | None:
+    """Returns the variable, induction variable and factor of a pair of
+    statements that multiply an induction variable by an integer literal."""
+    if not isinstance(first, LetNode) or type(second) is not MultNode or second.name != first.name:
+        return None
+    if first.is_variable and first.operand in inductions and not second.is_variable \
+            and type(second.operand) is int:
+        induction, factor = first.operand, second.operand
+    elif not first.is_variable and type(first.operand) is int and second.is_variable \
+            and second.operand in inductions:
+        induction, factor = second.operand, first.operand
+    else:
+        return None
+    return (first.name, induction, factor) if first.name != induction else None
+
+_TRIP_COMPARISONS = {
+    operator.lt: operator.gt,
+    operator.le: operator.ge,
+    operator.gt: operator.lt,
+    operator.ge: operator.le,
+    operator.eq: operator.eq,
+    operator.ne: operator.ne,
+}
+
+def _trip_count(cfg: ControlFlowGraph, loop: Loop, inductions: dict, body_definitions: Counter,
+                known: list) -> int | None:
+    """Returns how many times a loop of one block runs, if that's known: if it
+    ends by jumping back to its start when an induction variable compares to
+    an integer as a condition says, and both of their values are known
+    whenever the loop starts."""
+    header = cfg.blocks[loop.header]
+    node = header.last()
+    if loop.blocks != {header.id} or type(node) is not GotoNode or node.condition is None or \
+            literal_destination(node, header.stop - 1, len(cfg.nodes), cfg.labels) != header.start:
+        return None
+
+    left_is_variable, left, comparison, right_is_variable, right = node.condition
+    if left_is_variable and left in inductions:
+        induction, bound_is_variable, bound = left, right_is_variable, right
+    elif right_is_variable and right in inductions:
+        induction, bound_is_variable, bound = right, left_is_variable, left
+        comparison = _TRIP_COMPARISONS[comparison]
+    else:
+        return None
+    if bound_is_variable and body_definitions[bound] != 0:
+        return None
+
+    facts = None
+    for edge in header.predecessors:
+        if edge.source in loop or known[edge.source] is None:
+            continue
+        out = dict(known[edge.source])
+        for predecessor in cfg.blocks[edge.source].nodes:
+            _evaluate(predecessor, out)
+        if facts is None:
+            facts = out
+        else:
+            _join(facts, out)
+    if facts is None:
+        return None
+
+    start = facts[induction]
+    limit = facts[bound] if bound_is_variable else bound
+    if start is _VARYING or limit is _VARYING or type(start) is not int or type(limit) is not int:
+        return None
+    return _iterations(start, inductions[induction][1], comparison, limit)
+
+__all__ = [
+    Loop.__name__,
+    dominators.__name__,
+    dominates.__name__,
+    find_loops.__name__,
+    optimize_loops.__name__
+]
@@ -0,0 +1,103 @@
+import operator
+from grin.statements.nodes import Node
+
+# Nodes that optimization passes put into programs, which no Grin statement
+# is built into.  Like the nodes of statements, they run on an
+# InterpreterEngine, and the passes and analyses in this package know what
+# they read and assign.
+
+def _iterations(start: int, step: int, comparison, limit: int) -> int | None:
+    """Returns the number of iterations after which start + iterations * step
+    first fails the comparison with limit, or None if it never does."""
+    if not comparison(start + step, limit):
+        return 1
+    elif comparison is operator.lt and step > 0:
+        count = -(-(limit - start) // step)
+    elif comparison is operator.le and step > 0:
+        count = (limit - start) // step + 1
+    elif comparison is operator.gt and step < 0:
+        count = -(-(start - limit) // -step)
+    elif comparison is operator.ge and step < 0:
+        count = (start - limit) // -step + 1
+    elif comparison is operator.eq and step != 0:
+        count = 2
+    elif comparison is operator.ne and step != 0 and (limit - start) % step == 0 and (limit - start) // step > 0:
+        count = (limit - start) // step
+    else:
+        return None
+    return max(count, 1)
+
+class ClosedFormLoopNode(Node):
+    """Node put in front of a loop of one block that only adds integers to
+    its variables and ends by jumping back to its start while an induction
+    variable compares to a bound the loop doesn't change.  Each update is a
+    tuple of the variable it assigns, 1 for an ADD or -1 for a SUB, and
+    whether its operand is a variable and the operand; bases are the
+    variables whose updates only add literals and variables the loop doesn't
+    assign, and every other variable the loop assigns only adds those and
+    its bases.
+
+    When every variable the loop reads holds an integer, the number of
+    iterations it's about to run is known, and the node assigns each
+    variable the value it would have at the start of the last one, whose
+    statements then run as they would have.  Otherwise, it does nothing and
+    the loop runs as it would have."""
+    __slots__ = ('updates', 'bases', 'induction', 'comparison', 'bound_is_variable', 'bound', 'names')
+
+    def __init__(self, updates, bases, induction, comparison, bound_is_variable, bound):
+        self.updates = tuple(updates)
+        self.bases = tuple(bases)
+        self.induction = induction
+        self.comparison = comparison
+        self.bound_is_variable = bound_is_variable
+        self.bound = bound
+        names = []
+        for name, _, is_variable, operand in self.updates:
+            names.append(name)
+            if is_variable:
+                names.append(operand)
+        if bound_is_variable:
+            names.append(bound)
+        self.names = tuple(dict.fromkeys(names))
+
+    def execute(self, interpreter_engine):
+        variables = interpreter_engine.variables
+        values = {}
+        for name in self.names:
+            value = variables.get(name, 0)
+            if type(value) is not int:
+                return
+            values[name] = value
+
+        # How much each base has been added to by each point of an iteration,
+        # and for every other variable, the sum of the constants and of the
+        # bases (as each one's value at the start of the iteration plus how
+        # much it's been added to by then) added to it on each iteration.
+        steps = dict.fromkeys(self.bases, 0)
+        constants = {}
+        terms = {}
+        for name, sign, is_variable, operand in self.updates:
+            if name in steps:
+                steps[name] += sign * (values[operand] if is_variable else operand)
+            elif is_variable and operand in steps:
+                terms.setdefault(name, []).append((sign, operand, steps[operand]))
+            else:
+                constants[name] = constants.get(name, 0) + sign * (values[operand] if is_variable else operand)
+
+        limit = values[self.bound] if self.bound_is_variable else self.bound
+        count = _iterations(values[self.induction], steps[self.induction], self.comparison, limit)
+        if count is None or count == 1:
+            return
+
+        skipped = count - 1
+        for name, step in steps.items():
+            variables[name] = values[name] + skipped * step
+        for name in constants.keys() | terms.keys():
+            value = values[name] + skipped * constants.get(name, 0)
+            for sign, base, offset in terms.get(name, ()):
+                value += sign * (skipped * (values[base] + offset) + steps[base] * (skipped * (skipped - 1) // 2))
+            variables[name] = value
+
+__all__ = [
+    ClosedFormLoopNode.__name__
+]
@@ -0,0 +1,108 @@
+import operator as _operator
+from grin.ir.cfg import ControlFlowGraph
+from grin.ir.defuse import DefUse
+from grin.ir.nodes import ClosedFormLoopNode
+from grin.statements.nodes import (
+    LetNode, PrintNode, InnumNode, InstrNode, MathNode, AddNode, SubNode, MultNode, DivNode,
+    GosubNode, JumpNode, ReturnNode, EndNode)
+
+_COMPARISON_TEXTS = {
+    _operator.eq: '=',
+    _operator.ne: '<>',
+    _operator.lt: '<',
+    _operator.le: '<=',
+    _operator.gt: '>',
+    _operator.ge: '>=',
+}
+
+_MATH_KEYWORDS = {
+    AddNode: 'ADD',
+    SubNode: 'SUB',
+    MultNode: 'MULT',
+    DivNode: 'DIV',
+}
+
+def format_operand(is_variable: bool, operand) -> str:
+    """Returns the Grin source of an operand: a variable's name, or a literal."""
+    if is_variable:
+        return operand
+    elif isinstance(operand, str):
+        return f'"{operand}"'
+    return repr(operand)
+
+def format_node(node) -> str:
+    """Returns the Grin source of a statement (as a node), without its label.
+    A jump whose target has been resolved shows it as @ and the index of the
+    statement it goes to, and a closed-form loop, which isn't built from a
+    statement, shows the updates it makes and the condition it ends on."""
+    if isinstance(node, LetNode):
+        return f'LET {node.name} {format_operand(node.is_variable, node.operand)}'
+    elif isinstance(node, PrintNode):
+        return f'PRINT {format_operand(node.is_variable, node.operand)}'
+    elif isinstance(node, InnumNode):
+        return f'INNUM {node.name}'
+    elif isinstance(node, InstrNode):
+        return f'INSTR {node.name}'
+    elif isinstance(node, MathNode):
+        return f'{_MATH_KEYWORDS[type(node)]} {node.name} {format_operand(node.is_variable, node.operand)}'
+    elif isinstance(node, JumpNode):
+        keyword = 'GOSUB' if isinstance(node, GosubNode) else 'GOTO'
+        if node.resolved_target is not None:
+            text = f'{keyword} @{node.resolved_target}'
+        else:
+            text = f'{keyword} {format_operand(node.target_is_variable, node.target)}'
+        if node.condition is not None:
+            left_is_variable, left, comparison, right_is_variable, right = node.condition
+            text += (f' IF {format_operand(left_is_variable, left)} {_COMPARISON_TEXTS[comparison]} '
+                     f'{format_operand(right_is_variable, right)}')
+        return text
+    elif isinstance(node, ReturnNode):
+        return 'RETURN'
+    elif isinstance(node, EndNode):
+        return 'END'
+    elif isinstance(node, ClosedFormLoopNode):
+        updates = ', '.join(f'{"ADD" if sign > 0 else "SUB"} {name} {format_operand(is_variable, operand)}'
+                            for name, sign, is_variable, operand in node.updates)
+        return (f'CLOSED FORM ({updates}) WHILE {node.induction} {_COMPARISON_TEXTS[node.comparison]} '
+                f'{format_operand(node.bound_is_variable, node.bound)}')
+    return repr(node)
+
+def format_cfg(cfg: ControlFlowGraph, def_use: DefUse | None = None) -> str:
+    """Returns a readable listing of a control-flow graph: each block's
+    statements, numbered by line, the variables it uses from before it and
+    defines, and its edges."""
+    if def_use is None:
+        def_use = DefUse(cfg)
+
+    labels_at = {}
+    for label, index in cfg.labels.items():
+        labels_at.setdefault(index, []).append(label)
+    width = len(str(len(cfg.nodes)))
+
+    lines = []
+    for block in cfg.blocks:
+        if block is cfg.exit:
+            lines.append(f'block {block.id} (exit)')
+            continue
+
+        lines.append(f'block {block.id} (lines {block.start + 1}-{block.stop}):')
+        for index, node in zip(block.indexes(), block.nodes):
+            label = ''.join(f'{name}: ' for name in labels_at.get(index, []))
+            lines.append(f'    {index + 1:>{width}}  {label}{format_node(node)}')
+
+        if def_use.block_uses[block.id]:
+            lines.append(f'    uses: {" ".join(sorted(def_use.block_uses[block.id]))}')
+        if def_use.block_definitions[block.id]:
+            lines.append(f'    defines: {" ".join(sorted(def_use.block_definitions[block.id]))}')
+        for edge in block.successors:
+            lines.append(f'    -> block {edge.target} ({edge.kind.value})')
+        if block.unknown_target:
+            lines.append('    -> ? (unknown target)')
+
+    return '\n'.join(lines) + '\n'
+
+__all__ = [
+    format_operand.__name__,
+    format_node.__name__,
+    format_cfg.__name__
+]
@@ -0,0 +1,154 @@
+from collections import Counter
+from typing import Iterable
+from grin.interpreter.program import GrinProgram, index_labels
+from grin.ir.cfg import literal_destination
+from grin.statements.jump_statements import LabelStatement
+from grin.statements.nodes import JumpNode, to_node
+
+class OptimizationReport:
+    """What an optimization pass changed in a program: a description of each
+    change, with the source line of the statement it was made to, and how
+    many changes of each kind it made."""
+    def __init__(self):
+        self.changes = []
+        self.counts = Counter()
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def record(self, kind: str, line: int, description: str) -> None:
+        self.changes.append((line, description))
+        self.counts[kind] += 1
+
+    def __str__(self) -> str:
+        return ''.join(f'line {line}: {description}\n' for line, description in self.changes)
+
+    def __repr__(self) -> str:
+        counts = ', '.join(f'{kind}={count}' for kind, count in sorted(self.counts.items()))
+        return f'OptimizationReport({counts})'
+
+class OptimizedProgram:
+    """A program rewritten by an optimization pass, made of nodes: the
+    GrinProgram an engine runs, the index in the original program of each
+    of its statements (so that an error raised by one can be reported at
+    the line it came from) and a report of what the pass changed.  It can
+    be given to another pass, which keeps track of the same original lines."""
+    def __init__(self, program: GrinProgram, origins: Iterable[int], original_length: int,
+                 report: OptimizationReport):
+        self.program = program
+        self.origins = tuple(origins)
+        self.original_length = original_length
+        self.report = report
+
+    def __len__(self) -> int:
+        return len(self.program)
+
+    def original_index(self, index: int) -> int:
+        """Returns the index in the original program of the statement at the
+        given index, or the original program's length if it's past the end."""
+        return self.origins[index] if index < len(self.origins) else self.original_length
+
+    def source_line(self, index: int) -> int:
+        """Returns the (1-based) source line of the statement at the given index."""
+        return self.original_index(index) + 1
+
+def unpack(program) -> tuple[list, dict, list[int], int]:
+    """Returns the statements of a GrinProgram, an OptimizedProgram or a list
+    of statements (in the form parse_statements_into_objects() returns them),
+    as nodes with a labeled one as a (label, node) pair, along with its
+    labels, the original index of each statement and the original length."""
+    if isinstance(program, OptimizedProgram):
+        origins, length = list(program.origins), program.original_length
+        program = program.program
+    else:
+        origins = length = None
+
+    if isinstance(program, GrinProgram):
+        statements, labels = list(program.statements()), dict(program.labels())
+    else:
+        statements = list(program)
+        labels = index_labels(statements)
+
+    statements = [
+        (statement[0], to_node(statement[1])) if isinstance(statement, (list, tuple)) else to_node(statement)
+        for statement in statements]
+    if origins is None:
+        origins, length = list(range(len(statements))), len(statements)
+    return statements, labels, origins, length
+
+def unlabeled(statement):
+    return statement[1] if isinstance(statement, (list, tuple)) else statement
+
+def label_of(statement) -> LabelStatement | None:
+    return statement[0] if isinstance(statement, (list, tuple)) else None
+
+def has_failing_relative_jump(nodes: list) -> bool:
+    """Returns whether any jump has a literal relative target that takes it
+    out of bounds.  Removing statements could bring such a target back in
+    bounds, so a program with one can only be rewritten in place."""
+    count = len(nodes)
+    for index, node in enumerate(nodes):
+        if isinstance(node, JumpNode) and node.resolved_target is None and not node.target_is_variable \
+                and isinstance(node.target, int) and node.target != 0 \
+                and not 0 <= index + node.target <= count:
+            return True
+    return False
+
+def rebuild(statements: list, labels, replacements: list, landing = None) -> tuple[list, dict, list[int]]:
+    """Rebuilds a program's statements, as unpack() returns them, with each
+    one replaced by what's at its index in replacements: a node, None to
+    remove it, or a list of (source, node) pairs to put in its place, where
+    source is the index of the statement each node came from.
+
+    Jumps to literal targets are resolved to the index their destinations
+    end up at: the first node put in a statement's place, or the one at
+    landing(source, destination) within them, if landing is given.  A jump
+    given as a (source, node, position) triple instead goes to the node at
+    that position in its own statement's place (or just past them).  A
+    removed statement's index becomes that of the next statement that's
+    kept, so removing a statement must never change what happens after a
+    jump to it.  A label stays with the first node in its statement's place,
+    and labels of removed statements are dropped.  Returns the new
+    statements and labels, and the index of the statement each new one came
+    from."""
+    count = len(statements)
+    sequences = [
+        [(index, replacement)] if replacement is not None and not isinstance(replacement, list) else replacement
+        for index, replacement in enumerate(replacements)]
+
+    starts = [0] * (count + 1)
+    next_index = sum(len(sequence) for sequence in sequences if sequence is not None)
+    starts[count] = next_index
+    for index in range(count - 1, -1, -1):
+        if sequences[index]:
+            next_index -= len(sequences[index])
+        starts[index] = next_index
+
+    new_statements = []
+    new_labels = {}
+    sources = []
+    for index, sequence in enumerate(sequences):
+        for position, (source, node, *local) in enumerate(sequence or ()):
+            destination = literal_destination(node, source, count, labels)
+            if local:
+                node = type(node)(node.target_is_variable, node.target, node.condition, starts[index] + local[0])
+            elif destination is not None:
+                new_destination = starts[destination]
+                if landing is not None and destination < count and sequences[destination]:
+                    new_destination += landing(source, destination)
+                node = type(node)(node.target_is_variable, node.target, node.condition, new_destination)
+
+            label = label_of(statements[index]) if position == 0 else None
+            if label is not None:
+                new_labels[label.label] = len(new_statements)
+                new_statements.append((label, node))
+            else:
+                new_statements.append(node)
+            sources.append(source)
+
+    return new_statements, new_labels, sources
+
+__all__ = [
+    OptimizationReport.__name__,
+    OptimizedProgram.__name__
+]
@@ -0,0 +1,141 @@
+from grin.ir.cfg import ControlFlowGraph, EdgeKind, literal_destination
+from grin.ir.defuse import DefUse
+from grin.ir.nodes import ClosedFormLoopNode
+from grin.statements.nodes import (
+    LetNode, PrintNode, InnumNode, InstrNode, MathNode, AddNode, MultNode, DivNode, JumpNode, EndNode)
+
+# The types of the values each variable can hold are propagated through a
+# program's control-flow graph, so that it's known which statements can't
+# raise an error: those whose operands can only have types they accept.
+# Every variable starts out unset, which reads as the integer 0.  Python's
+# own errors count too, so mixing an int with a float (which overflows for
+# a large enough int) is taken to be able to fail.
+
+_NUMBERS = (int, float)
+
+_ALL_TYPES = frozenset([int, float, str])
+
+def _math_result(node_type, left: type, right: type) -> tuple[type | None, bool]:
+    """Returns the type a math operation on values of the given types gives
+    (None if it always fails), and whether it can fail."""
+    if node_type is DivNode:
+        if left in _NUMBERS and right in _NUMBERS:
+            return (int if left is int and right is int else float), True
+        return None, True
+    elif left in _NUMBERS and right in _NUMBERS:
+        return (int if left is int and right is int else float), left is not right
+    elif node_type is AddNode and left is str and right is str:
+        return str, False
+    elif node_type is MultNode and {left, right} == {str, int}:
+        # A negative count fails.
+        return str, True
+    return None, True
+
+def _math_types(node, env: dict) -> tuple[frozenset, bool]:
+    left_types = env[node.name]
+    right_types = env[node.operand] if node.is_variable else frozenset([type(node.operand)])
+    results = set()
+    raises = False
+    for left in left_types:
+        for right in right_types:
+            result, can_fail = _math_result(type(node), left, right)
+            if result is not None:
+                results.add(result)
+            raises = raises or can_fail
+    return frozenset(results), raises
+
+def _comparison_raises(node, env: dict) -> bool:
+    left_is_variable, left, _, right_is_variable, right = node.condition
+    left_types = env[left] if left_is_variable else frozenset([type(left)])
+    right_types = env[right] if right_is_variable else frozenset([type(right)])
+    return len(left_types | right_types) > 1
+
+def _transfer(node, env: dict, index: int, count: int, labels) -> bool:
+    """Updates the types each variable can have before a statement (as a
+    node) at the given index to those after it, returning whether it can
+    raise an error."""
+    if isinstance(node, (LetNode, PrintNode, EndNode)):
+        if isinstance(node, LetNode):
+            env[node.name] = env[node.operand] if node.is_variable else frozenset([type(node.operand)])
+        return False
+    elif isinstance(node, InnumNode):
+        env[node.name] = frozenset([int, float])
+        return True
+    elif isinstance(node, InstrNode):
+        env[node.name] = frozenset([str])
+        return True
+    elif isinstance(node, MathNode):
+        results, raises = _math_types(node, env)
+        env[node.name] = results
+        return raises
+    elif isinstance(node, ClosedFormLoopNode):
+        # It only assigns integers to variables that already hold them.
+        return False
+    elif isinstance(node, JumpNode):
+        if node.resolved_target is None:
+            if node.target_is_variable or literal_destination(node, index, count, labels) is None:
+                return True
+        return node.condition is not None and _comparison_raises(node, env)
+    return True
+
+class ValueTypes:
+    """The types of the values each variable of a program can hold before
+    each block of its control-flow graph, and whether each statement can
+    raise an error.  If a jump's target is held in a variable, any block
+    could follow it, so any variable could hold any type anywhere."""
+    def __init__(self, cfg: ControlFlowGraph):
+        self.cfg = cfg
+        names = DefUse(cfg).variables()
+        count = len(cfg.nodes)
+        unknown = cfg.has_unknown_targets()
+        if unknown:
+            self.block_types = [{name: _ALL_TYPES for name in names} for _ in cfg.blocks]
+        else:
+            self.block_types = [None] * len(cfg.blocks)
+            self.block_types[cfg.entry.id] = {name: frozenset([int]) for name in names}
+        pending = [] if unknown else [cfg.entry.id]
+
+        while pending:
+            block = cfg.blocks[pending.pop()]
+            env = dict(self.block_types[block.id])
+            for index, node in zip(block.indexes(), block.nodes):
+                _transfer(node, env, index, count, cfg.labels)
+
+            for edge in block.successors:
+                if edge.kind is EdgeKind.ERROR:
+                    continue
+                known = self.block_types[edge.target]
+                if known is None:
+                    self.block_types[edge.target] = env if len(block.successors) == 1 else dict(env)
+                    pending.append(edge.target)
+                elif any(not env[name] <= known[name] for name in names):
+                    self.block_types[edge.target] = {name: known[name] | env[name] for name in names}
+                    pending.append(edge.target)
+
+        self.raises = [True] * count
+        for block in cfg.blocks[:-1]:
+            if self.block_types[block.id] is None:
+                continue
+            env = dict(self.block_types[block.id])
+            for index, node in zip(block.indexes(), block.nodes):
+                self.raises[index] = _transfer(node, env, index, count, cfg.labels)
+
+    def types_before(self, index: int) -> dict | None:
+        """Returns the types each variable can have before the statement at the
+        given index, or None if it can't run."""
+        block = self.cfg.block_at(index)
+        if self.block_types[block.id] is None:
+            return None
+        env = dict(self.block_types[block.id])
+        count = len(self.cfg.nodes)
+        for at, node in zip(range(block.start, index), block.nodes):
+            _transfer(node, env, at, count, self.cfg.labels)
+        return env
+
+    def may_raise(self, index: int) -> bool:
+        """Returns whether the statement at the given index could raise an error."""
+        return self.raises[index]
+
+__all__ = [
+    ValueTypes.__name__
+]
@@ -9,10 +9,11 @@
 # WHAT YOU'LL NEED TO DO: Nothing.  This module is provided in its entirety,
 # and it should not be necessary to change it.
 
-from collections import defaultdict
+import re
 from grin.location import GrinLocation
-from grin.token import GrinTokenCategory, GrinTokenKind, GrinToken
-from typing import Iterable, NoReturn
+from grin.token import GrinTokenCategory, GrinTokenKind, GrinToken, _LazilyLocatedGrinToken
+from typing import Iterable, NoReturn, Union
+import mmap
 
 
 
@@ -32,38 +33,300 @@ class GrinLexError(Exception):
         return self._location
 
 
+    def __reduce__(self):
+        # Lets the error be pickled, e.g., to report it from another process
+        return type(self), (self._message, self._location)
 
-_TOKEN_KIND_MAP = defaultdict(
-    lambda: GrinTokenKind.IDENTIFIER,
-    [(kind.name, kind)
-     for kind in GrinTokenKind.__members__.values()
-     if kind.category() == GrinTokenCategory.KEYWORD])
 
 
-KEYWORDS = frozenset(_TOKEN_KIND_MAP.keys())
+# Maps the text of each keyword to its kind; any other word is an identifier.
+# This is only ever read, so lexing never grows it, no matter how many
+# distinct identifiers a long-lived process sees.
+_KEYWORD_KIND_MAP = {
+    kind.name: kind
+    for kind in GrinTokenKind.__members__.values()
+    if kind.category() == GrinTokenCategory.KEYWORD
+}
 
 
+KEYWORDS = frozenset(_KEYWORD_KIND_MAP.keys())
 
-def to_tokens(line: str, line_number: int) -> Iterable[GrinToken]:
+
+
+# An ASCII line can be lexed in a single pass with one precompiled pattern.
+# Every match is one lexeme, and which group matched (found.lastindex) says
+# what kind of lexeme it is; whitespace is skipped by finditer(), since no
+# alternative matches it.  The last three groups exist only so that errors
+# are detected at the same columns the character-at-a-time lexer reports them.
+_TOKEN_PATTERN = re.compile(r'''
+      ( [A-Za-z][A-Za-z0-9]* )
+    | ( "[^"]*" )
+    | ( -?[0-9]+\.[0-9]* )
+    | ( -?[0-9]+ )
+    | ( <> | <= | >= | [:.=<>] )
+    | ( " )
+    | ( - )
+    | ( \S )
+    ''', re.VERBOSE)
+
+
+_WORD = 1
+_STRING = 2
+_FLOAT = 3
+_INTEGER = 4
+_OPERATOR = 5
+_UNTERMINATED_STRING = 6
+_NEGATION = 7
+
+
+_OPERATOR_KIND_MAP = {
+    ':': GrinTokenKind.COLON,
+    '.': GrinTokenKind.DOT,
+    '=': GrinTokenKind.EQUAL,
+    '<>': GrinTokenKind.NOT_EQUAL,
+    '<': GrinTokenKind.LESS_THAN,
+    '<=': GrinTokenKind.LESS_THAN_OR_EQUAL,
+    '>': GrinTokenKind.GREATER_THAN,
+    '>=': GrinTokenKind.GREATER_THAN_OR_EQUAL
+}
+
+
+
+def _located_token(
+        kind: GrinTokenKind, text: str, line: int, column: int, value: object = None) -> GrinToken:
+    return GrinToken(kind = kind, text = text, location = GrinLocation(line, column), value = value)
+
+
+def _token_factory(lazy_locations: bool):
+    return _LazilyLocatedGrinToken if lazy_locations else _located_token
+
+
+
+def to_tokens(
+        line: str, line_number: int,
+        names: dict[str, str] | None = None,
+        lazy_locations: bool = False) -> Iterable[GrinToken]:
     """Given a line of Grin code and its line number, generates a sequence of
     GrinTokens corresponding to each of the lexemes found on the line.
 
+    If names is given, it's used as an intern table: the text of every word
+    and the value of every string literal are looked up in it, so that each
+    distinct name is represented by one string object, no matter how many
+    lines it appears on.  Sharing one dictionary across all of the lines of
+    a program interns the names within that program.
+
+    If lazy_locations is True, the tokens hold only the line and column of
+    their locations, building GrinLocations from them when asked.  They're
+    otherwise indistinguishable, but save an allocation per token.
+
     Raises a GrinLexError when there is a lexical error on the line."""
 
+    if not line.isascii():
+        yield from _to_tokens_by_character(line, line_number, names, lazy_locations)
+        return
+
+    make_token = _token_factory(lazy_locations)
+
+    for found in _TOKEN_PATTERN.finditer(line):
+        group = found.lastindex
+        start, end = found.span()
+        text = line[start:end]
+
+        if group == _WORD:
+            if names is not None:
+                text = names.setdefault(text, text)
+
+            yield make_token(
+                _KEYWORD_KIND_MAP.get(text, GrinTokenKind.IDENTIFIER), text, line_number, start + 1, text)
+        elif group == _INTEGER:
+            yield make_token(GrinTokenKind.LITERAL_INTEGER, text, line_number, start + 1, int(text))
+        elif group == _OPERATOR:
+            yield make_token(_OPERATOR_KIND_MAP[text], text, line_number, start + 1)
+        elif group == _STRING:
+            value = text[1:-1]
+
+            if names is not None:
+                value = names.setdefault(value, value)
+
+            yield make_token(GrinTokenKind.LITERAL_STRING, text, line_number, start + 1, value)
+        elif group == _FLOAT:
+            yield make_token(GrinTokenKind.LITERAL_FLOAT, text, line_number, start + 1, float(text))
+        elif group == _UNTERMINATED_STRING:
+            raise GrinLexError(
+                'Newline in string literal', GrinLocation(line_number, len(line) + 1))
+        elif group == _NEGATION:
+            raise GrinLexError(
+                'Negation must be followed by at least one digit',
+                GrinLocation(line_number, start + 2))
+        else:
+            raise GrinLexError('Invalid character', GrinLocation(line_number, start + 1))
+
+
+# A whole source file, held as bytes, is lexed by a similar pattern, which
+# also matches line breaks (the same ones bytes.splitlines() recognizes).  Any
+# byte that can't begin a token -- an invalid character, the beginning of an
+# unterminated string literal, a negation without digits, or a non-ASCII byte
+# -- lands in the last group, and the line containing it is then decoded and
+# lexed by to_tokens(), so that what's reported is exactly what to_tokens()
+# would have reported.
+_BUFFER_TOKEN_PATTERN = re.compile(rb'''
+      ( [A-Za-z][A-Za-z0-9]* )
+    | ( "[^"\r\n\x80-\xff]*" )
+    | ( -?[0-9]+\.[0-9]* )
+    | ( -?[0-9]+ )
+    | ( <> | <= | >= | [:.=<>] )
+    | ( \r\n? | \n )
+    | ( [^ \t\x0b\x0c\x1c-\x1f] )
+    ''', re.VERBOSE)
+
+
+_BUFFER_LINE_BREAK = 6
+
+_LINE_BREAK_PATTERN = re.compile(rb'\r\n?|\n')
+
+
+_OPERATOR_BYTES_MAP = {
+    text.encode('ascii'): (text, kind)
+    for text, kind in _OPERATOR_KIND_MAP.items()
+}
+
+
+_KEYWORD_BYTES_MAP = {
+    text.encode('ascii'): (text, kind)
+    for text, kind in _KEYWORD_KIND_MAP.items()
+}
+
+
+GrinSourceBuffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+
+def to_tokens_from_buffer(
+        source: GrinSourceBuffer,
+        names: dict[str, str] | None = None,
+        lazy_locations: bool = False) -> Iterable[tuple[int, list[GrinToken], int]]:
+    """Given the UTF-8 encoded text of a Grin program, such as the contents of
+    a file or a memory-mapped file, generates a tuple for each of its lines,
+    containing the line's number, a list of the GrinTokens on it, and the
+    column just past its end.  Lines are split the way bytes.splitlines()
+    splits them, and each line's tokens are the ones to_tokens() would
+    generate from it; only the text of the tokens is ever decoded.
+
+    The names dictionary and lazy_locations are used just as they are by
+    to_tokens().
+
+    Raises a GrinLexError when there is a lexical error on a line, though
+    not until every line before it has been generated."""
+
+    make_token = _token_factory(lazy_locations)
+    words = dict(_KEYWORD_BYTES_MAP)
+    line_number = 1
+    line_start = 0
+    position = 0
+    tokens = []
+
+    while True:
+        for found in _BUFFER_TOKEN_PATTERN.finditer(source, position):
+            group = found.lastindex
+            start, end = found.span()
+
+            if group == _WORD:
+                word = found.group()
+                entry = words.get(word)
+
+                if entry is None:
+                    text = word.decode('ascii')
+
+                    if names is not None:
+                        text = names.setdefault(text, text)
+
+                    entry = words[word] = (text, GrinTokenKind.IDENTIFIER)
+
+                text, kind = entry
+                tokens.append(make_token(
+                    kind, text, line_number, start - line_start + 1, text))
+            elif group == _INTEGER:
+                text = found.group().decode('ascii')
+                tokens.append(make_token(
+                    GrinTokenKind.LITERAL_INTEGER, text, line_number, start - line_start + 1, int(text)))
+            elif group == _OPERATOR:
+                text, kind = _OPERATOR_BYTES_MAP[found.group()]
+                tokens.append(make_token(
+                    kind, text, line_number, start - line_start + 1))
+            elif group == _STRING:
+                text = found.group().decode('ascii')
+                value = text[1:-1]
+
+                if names is not None:
+                    value = names.setdefault(value, value)
+
+                tokens.append(make_token(
+                    GrinTokenKind.LITERAL_STRING, text, line_number, start - line_start + 1, value))
+            elif group == _FLOAT:
+                text = found.group().decode('ascii')
+                tokens.append(make_token(
+                    GrinTokenKind.LITERAL_FLOAT, text, line_number, start - line_start + 1, float(text)))
+            elif group == _BUFFER_LINE_BREAK:
+                yield line_number, tokens, start - line_start + 1
+                line_number += 1
+                line_start = end
+                tokens = []
+            else:
+                line_break = _LINE_BREAK_PATTERN.search(source, start)
+                line_end, position = line_break.span() if line_break else (len(source), len(source))
+                yield _decode_and_lex_line(source[line_start:line_end], line_number, names, lazy_locations)
+                line_number += 1
+                line_start = position
+                tokens = []
+                break
+        else:
+            break
+
+    if line_start < len(source):
+        yield line_number, tokens, len(source) - line_start + 1
+
+
+def _decode_and_lex_line(
+        line_bytes: bytes | memoryview, line_number: int,
+        names: dict[str, str] | None, lazy_locations: bool) -> tuple[int, list[GrinToken], int]:
+    line_bytes = bytes(line_bytes)
+
+    try:
+        line = line_bytes.decode('utf-8')
+    except UnicodeDecodeError as e:
+        column = len(line_bytes[:e.start].decode('utf-8')) + 1
+        raise GrinLexError('Invalid UTF-8', GrinLocation(line_number, column))
+
+    return line_number, list(to_tokens(line, line_number, names, lazy_locations)), len(line) + 1
+
+
+
+def _to_tokens_by_character(
+        line: str, line_number: int,
+        names: dict[str, str] | None = None,
+        lazy_locations: bool = False) -> Iterable[GrinToken]:
+    """The original character-at-a-time lexer.  It handles every line that
+    to_tokens() can't scan with its precompiled pattern (i.e., lines that
+    contain non-ASCII characters), and it serves as the reference that the
+    faster scanner is tested and benchmarked against."""
+
     index = 0
     start = 0
+    make_token = _token_factory(lazy_locations)
 
 
     def _make_token(kind: GrinTokenKind, value: object = None) -> GrinToken:
-        return GrinToken(
-            kind = kind, text = line[start:index],
-            location = GrinLocation(line_number, start + 1), value = value)
+        return make_token(kind, line[start:index], line_number, start + 1, value)
 
 
     def _raise_error(message: str) -> NoReturn:
         raise GrinLexError(message, GrinLocation(line_number, index + 1))
 
 
+    def _intern(name: str) -> str:
+        return name if names is None else names.setdefault(name, name)
+
+
     while True:
         while index < len(line) and line[index].isspace():
             index += 1
@@ -79,7 +342,10 @@ def to_tokens(line: str, line_number: int) -> Iterable[GrinToken]:
             while index < len(line) and line[index].isalnum():
                 index += 1
 
-            yield _make_token(_TOKEN_KIND_MAP[line[start:index]], line[start:index])
+            word = _intern(line[start:index])
+
+            yield make_token(
+                _KEYWORD_KIND_MAP.get(word, GrinTokenKind.IDENTIFIER), word, line_number, start + 1, word)
         elif line[index] == '"':
             index += 1
 
@@ -90,7 +356,7 @@ def to_tokens(line: str, line_number: int) -> Iterable[GrinToken]:
                 _raise_error('Newline in string literal')
             else:
                 index += 1
-                yield _make_token(GrinTokenKind.LITERAL_STRING, line[(start + 1):(index - 1)])
+                yield _make_token(GrinTokenKind.LITERAL_STRING, _intern(line[(start + 1):(index - 1)]))
         elif line[index] == '-' or line[index].isdigit():
             is_negated = line[index] == '-'
             index += 1
@@ -147,5 +413,6 @@ def to_tokens(line: str, line_number: int) -> Iterable[GrinToken]:
 __all__ = [
     'KEYWORDS',
     to_tokens.__name__,
+    to_tokens_from_buffer.__name__,
     GrinLexError.__name__
 ]
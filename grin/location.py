@@ -14,12 +14,14 @@
 class GrinLocation:
     """Describes a location within the text of a Grin program"""
 
-    def __init__(self, line, column):
-        if int(line) < 1:
-            raise ValueError(f'Line in location cannot be non-positive, was {line}')
+    __slots__ = ('_line', '_column')
+
 
-        if int(column) < 1:
-            raise ValueError(f'Column in location cannot be non-positive, was {column}')
+    def __init__(self, line, column):
+        # The lexer creates one location per token, always from positive
+        # ints, so only anything else pays for the full validation.
+        if type(line) is not int or type(column) is not int or line < 1 or column < 1:
+            _validate(line, column)
 
         self._line = line
         self._column = column
@@ -47,5 +49,18 @@ class GrinLocation:
                 and self._column == other._column
 
 
+    def __reduce__(self):
+        return GrinLocation, (self._line, self._column)
+
+
+
+def _validate(line, column) -> None:
+    if int(line) < 1:
+        raise ValueError(f'Line in location cannot be non-positive, was {line}')
+
+    if int(column) < 1:
+        raise ValueError(f'Column in location cannot be non-positive, was {column}')
+
+
 
 __all__ = [GrinLocation.__name__]
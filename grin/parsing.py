@@ -13,8 +13,12 @@
 # WHAT YOU'LL NEED TO DO: Nothing.  This module is provided in its entirety,
 # and it should not be necessary to change it.
 
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import mmap
+import os
 from typing import Callable, Iterable, NoReturn
-from grin.lexing import to_tokens
+from grin.lexing import GrinLexError, GrinSourceBuffer, to_tokens, to_tokens_from_buffer, _token_factory
 from grin.location import GrinLocation
 from grin.token import GrinTokenKind, GrinToken
 
@@ -27,6 +31,7 @@ class GrinParseError(Exception):
     def __init__(self, message: str, location: GrinLocation):
         formatted = f'Error during parsing: {str(location)}: {message}'
         super().__init__(formatted)
+        self._message = message
         self._location = location
 
 
@@ -35,168 +40,363 @@ class GrinParseError(Exception):
         return self._location
 
 
+    def __reduce__(self):
+        # Lets the error be pickled, e.g., to report it from another process
+        return type(self), (self._message, self._location)
 
-def parse(lines: Iterable[str]) -> Iterable[list[GrinToken]]:
+
+
+class GrinLineCache:
+    """A bounded cache of the tokens found on lines of Grin code that parsed
+    successfully, keyed by the text of the line, which can be shared by any
+    number of calls to parse().  When a line is found in the cache, its
+    tokens are rebuilt from the cached kinds, texts and values, with only the
+    line number of their locations changed, rather than being lexed and
+    validated again.  When the cache is full, the least recently used line
+    is evicted."""
+
+    def __init__(self, max_size: int = 4096):
+        if max_size < 1:
+            raise ValueError(f'Cache size must be positive, was {max_size}')
+
+        self._max_size = max_size
+        self._entries: OrderedDict[str, tuple[tuple[GrinTokenKind, str, int, object], ...]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+
+    def max_size(self) -> int:
+        """Returns the largest number of lines the cache will hold"""
+        return self._max_size
+
+
+    def hits(self) -> int:
+        """Returns how many lines were found in the cache"""
+        return self._hits
+
+
+    def misses(self) -> int:
+        """Returns how many lines had to be lexed and validated"""
+        return self._misses
+
+
+    def evictions(self) -> int:
+        """Returns how many lines were evicted to make room for others"""
+        return self._evictions
+
+
+    def clear(self) -> None:
+        """Empties the cache and resets its counters"""
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+    def _parse_line(
+            self, line: str, line_number: int,
+            names: dict[str, str], lazy_locations: bool) -> list[GrinToken]:
+        entry = self._entries.get(line)
+
+        if entry is not None:
+            self._hits += 1
+            self._entries.move_to_end(line)
+            make_token = _token_factory(lazy_locations)
+
+            return [
+                make_token(kind, text, line_number, column, value)
+                for kind, text, column, value in entry
+            ]
+
+        self._misses += 1
+        tokens = _parse_line(line, line_number, names, lazy_locations)
+
+        self._entries[line] = tuple(
+            (token.kind(), token.text(), token.location().column(), token.value())
+            for token in tokens)
+
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last = False)
+            self._evictions += 1
+
+        return tokens
+
+
+
+def parse(
+        lines: Iterable[str], cache: GrinLineCache | None = None,
+        lazy_locations: bool = False) -> Iterable[list[GrinToken]]:
     """Given a sequence of strings containing lines of Grin code, generates a
     corresponding sequence of lists of GrinTokens, each being the tokens
     found on the corresponding line of input code.
 
     Raises a GrinParseError when there is a parse error on a line, so that
-    you'll only ever receive valid lists of GrinTokens from this function."""
+    you'll only ever receive valid lists of GrinTokens from this function.
+
+    Identifiers and string literals are interned per call, so every token
+    naming the same variable or label shares one string object.  If a
+    GrinLineCache is given, lines are looked up in it (and added to it)
+    instead of always being lexed and validated.  If lazy_locations is True,
+    the tokens build their locations only when asked for them, as described
+    in grin.lexing.to_tokens()."""
+
+    names = {}
+    parse_line = _parse_line if cache is None else cache._parse_line
 
     for line_number, line in enumerate(lines, start = 1):
-        tokens = _parse_line(line, line_number)
+        tokens = parse_line(line, line_number, names, lazy_locations)
 
-        if len(tokens) == 1 and tokens[0].kind() == GrinTokenKind.DOT:
+        if len(tokens) == 1 and tokens[0].kind() is GrinTokenKind.DOT:
             return
 
         yield tokens
 
 
-def _parse_line(line: str, line_number: int) -> list[GrinToken]:
-    tokens = list(to_tokens(line, line_number))
-    index = 0
+def parse_buffer(
+        source: GrinSourceBuffer, lazy_locations: bool = False) -> Iterable[list[GrinToken]]:
+    """Given the UTF-8 encoded text of a Grin program as bytes, or any other
+    object supporting the buffer protocol (such as a memory-mapped file),
+    generates the same sequence of lists of GrinTokens that parse() would
+    generate from its lines, without decoding or splitting it first.  Lines
+    are split the way bytes.splitlines() splits them.  lazy_locations is
+    used just as it is by parse().
 
+    Raises a GrinParseError when there is a parse error on a line."""
 
-    def _raise_error_on_token(message: str, token: GrinToken) -> NoReturn:
-        raise GrinParseError(message, token.location())
+    names = {}
 
+    for line_number, tokens, end_column in to_tokens_from_buffer(source, names, lazy_locations):
+        _parse_tokens(tokens, line_number, end_column)
 
-    def _raise_error_at_end_of_line(message: str) -> NoReturn:
-        raise GrinParseError(message, GrinLocation(line_number, len(line) + 1))
+        if len(tokens) == 1 and tokens[0].kind() is GrinTokenKind.DOT:
+            return
 
+        yield tokens
 
-    def _token_is(*kinds: GrinTokenKind) -> bool:
-        return index < len(tokens) and tokens[index].kind() in kinds
 
+def parse_file(
+        path: str | os.PathLike, lazy_locations: bool = False) -> Iterable[list[GrinToken]]:
+    """Given the path to a file containing a Grin program, generates the same
+    sequence of lists of GrinTokens that parse_buffer() would generate from
+    its contents, memory-mapping the file rather than reading it."""
 
-    def _expect(*kinds: GrinTokenKind) -> None:
-        if not _token_is(*kinds):
-            message = ', '.join(str(kind) for kind in kinds)
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
 
-            if index >= len(tokens):
-                _raise_error_at_end_of_line(message)
-            else:
-                _raise_error_on_token(message, tokens[index])
+        with mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) as source:
+            yield from parse_buffer(source, lazy_locations)
 
 
-    def _parse_label() -> None:
-        nonlocal index
+def parse_parallel(
+        lines: Iterable[str], workers: int | None = None, *,
+        chunk_size: int | None = None,
+        transform: Callable[[list[list[GrinToken]]], list] | None = None,
+        lazy_locations: bool = False) -> list:
+    """Given a sequence of strings containing lines of Grin code, returns a list
+    of the lists of GrinTokens that parse() would generate from them, lexing
+    and parsing chunks of consecutive lines in a pool of worker processes.
+    workers is the number of processes, defaulting to the number of CPUs;
+    with one worker, the lines are parsed in this process.
 
-        if _token_is(GrinTokenKind.IDENTIFIER):
-            index += 1
-            _expect(GrinTokenKind.COLON)
-            index += 1
+    If transform is given, it's called in the worker processes with each
+    chunk's lists of tokens, and the lists it returns are concatenated
+    instead.  For example, a transform of parse_statements_into_objects
+    returns the statement objects of the program.  It must be a function
+    that can be pickled, i.e., one defined at the top level of a module.
 
+    Errors are reported exactly as they would be by parsing the lines in
+    order: the error on the earliest line is raised, any error after the
+    terminating '.' line is ignored, and any error raised by transform is
+    raised only if no line has a parse error."""
 
-    def _parse_variable_update() -> None:
-        nonlocal index
-        _expect(GrinTokenKind.IDENTIFIER)
-        index += 1
-        _parse_value()
+    lines = list(lines)
+    workers = workers or os.cpu_count() or 1
 
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(lines) // (workers * 4)))
 
-    def _parse_print() -> None:
-        nonlocal index
-        _parse_value()
+    chunks = [
+        (lines[start:start + chunk_size], start + 1, transform, lazy_locations)
+        for start in range(0, len(lines), chunk_size)
+    ]
 
+    if workers == 1:
+        return _combine_chunk_results(map(_parse_chunk, chunks))
 
-    def _parse_input() -> None:
-        nonlocal index
-        _expect(GrinTokenKind.IDENTIFIER)
-        index += 1
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        futures = [executor.submit(_parse_chunk, chunk) for chunk in chunks]
 
+        try:
+            return _combine_chunk_results(future.result() for future in futures)
+        finally:
+            for future in futures:
+                future.cancel()
 
-    def _parse_jump() -> None:
-        nonlocal index
-        _parse_jump_target()
 
-        if _token_is(GrinTokenKind.IF):
-            index += 1
-            _parse_value()
-            _parse_comparison_operator()
-            _parse_value()
+def _parse_chunk(chunk: tuple) -> tuple[list, bool, Exception | None, Exception | None]:
+    lines, first_line_number, transform, lazy_locations = chunk
+    names = {}
+    parsed = []
+    ended = False
 
+    try:
+        for line_number, line in enumerate(lines, start = first_line_number):
+            tokens = _parse_line(line, line_number, names, lazy_locations)
 
-    def _parse_empty() -> None:
-        pass
+            if len(tokens) == 1 and tokens[0].kind() is GrinTokenKind.DOT:
+                ended = True
+                break
 
+            parsed.append(tokens)
+    except (GrinLexError, GrinParseError) as e:
+        return [], False, e, None
 
-    _BODY_PARSERS: dict[GrinTokenKind, Callable[[], None]] = {
-        GrinTokenKind.LET: _parse_variable_update,
-        GrinTokenKind.PRINT: _parse_print,
-        GrinTokenKind.INNUM: _parse_input,
-        GrinTokenKind.INSTR: _parse_input,
-        GrinTokenKind.ADD: _parse_variable_update,
-        GrinTokenKind.SUB: _parse_variable_update,
-        GrinTokenKind.MULT: _parse_variable_update,
-        GrinTokenKind.DIV: _parse_variable_update,
-        GrinTokenKind.GOTO: _parse_jump,
-        GrinTokenKind.GOSUB: _parse_jump,
-        GrinTokenKind.RETURN: _parse_empty,
-        GrinTokenKind.END: _parse_empty
-    }
+    if transform is not None:
+        try:
+            parsed = transform(parsed)
+        except Exception as e:
+            return [], ended, None, e
 
+    return parsed, ended, None, None
 
-    def _parse_body() -> None:
-        nonlocal index
 
-        if tokens[index].kind() in _BODY_PARSERS:
-            kind = tokens[index].kind()
-            index += 1
-            _BODY_PARSERS[kind]()
-        else:
-            _raise_error_on_token('Statement keyword expected', tokens[index])
+def _combine_chunk_results(results: Iterable[tuple]) -> list:
+    combined = []
+    transform_error = None
+
+    for parsed, ended, parse_error, error in results:
+        if parse_error is not None:
+            raise parse_error
+
+        if transform_error is None:
+            transform_error = error
+            combined.extend(parsed)
+
+        if ended:
+            break
+
+    if transform_error is not None:
+        raise transform_error
+
+    return combined
+
+
+_IDENTIFIER = (GrinTokenKind.IDENTIFIER,)
+
+_COLON = (GrinTokenKind.COLON,)
 
+_JUMP_TARGET = (
+    GrinTokenKind.LITERAL_INTEGER, GrinTokenKind.LITERAL_STRING,
+    GrinTokenKind.IDENTIFIER)
 
-    def _parse_jump_target() -> None:
-        nonlocal index
+_VALUE = (
+    GrinTokenKind.LITERAL_INTEGER, GrinTokenKind.LITERAL_FLOAT,
+    GrinTokenKind.LITERAL_STRING, GrinTokenKind.IDENTIFIER)
 
-        _expect(
-            GrinTokenKind.LITERAL_INTEGER, GrinTokenKind.LITERAL_STRING,
-            GrinTokenKind.IDENTIFIER)
+_COMPARISON_OPERATOR = (
+    GrinTokenKind.EQUAL, GrinTokenKind.NOT_EQUAL,
+    GrinTokenKind.LESS_THAN, GrinTokenKind.LESS_THAN_OR_EQUAL,
+    GrinTokenKind.GREATER_THAN, GrinTokenKind.GREATER_THAN_OR_EQUAL)
 
-        index += 1
 
+# For each statement keyword, the kinds of tokens allowed for each of the
+# operands that follow it.
+_STATEMENT_OPERANDS: dict[GrinTokenKind, tuple[tuple[GrinTokenKind, ...], ...]] = {
+    GrinTokenKind.LET: (_IDENTIFIER, _VALUE),
+    GrinTokenKind.PRINT: (_VALUE,),
+    GrinTokenKind.INNUM: (_IDENTIFIER,),
+    GrinTokenKind.INSTR: (_IDENTIFIER,),
+    GrinTokenKind.ADD: (_IDENTIFIER, _VALUE),
+    GrinTokenKind.SUB: (_IDENTIFIER, _VALUE),
+    GrinTokenKind.MULT: (_IDENTIFIER, _VALUE),
+    GrinTokenKind.DIV: (_IDENTIFIER, _VALUE),
+    GrinTokenKind.GOTO: (_JUMP_TARGET,),
+    GrinTokenKind.GOSUB: (_JUMP_TARGET,),
+    GrinTokenKind.RETURN: (),
+    GrinTokenKind.END: ()
+}
 
-    def _parse_value() -> None:
-        nonlocal index
 
-        _expect(
-            GrinTokenKind.LITERAL_INTEGER, GrinTokenKind.LITERAL_FLOAT,
-            GrinTokenKind.LITERAL_STRING, GrinTokenKind.IDENTIFIER)
+_JUMP_KEYWORDS = frozenset([GrinTokenKind.GOTO, GrinTokenKind.GOSUB])
 
-        index += 1
+_CONDITION_OPERANDS = (_VALUE, _COMPARISON_OPERATOR, _VALUE)
 
 
-    def _parse_comparison_operator() -> None:
-        nonlocal index
 
-        _expect(
-            GrinTokenKind.EQUAL, GrinTokenKind.NOT_EQUAL,
-            GrinTokenKind.LESS_THAN, GrinTokenKind.LESS_THAN_OR_EQUAL,
-            GrinTokenKind.GREATER_THAN, GrinTokenKind.GREATER_THAN_OR_EQUAL)
+def _parse_line(
+        line: str, line_number: int,
+        names: dict[str, str] | None = None,
+        lazy_locations: bool = False) -> list[GrinToken]:
+    tokens = list(to_tokens(line, line_number, names, lazy_locations))
+    return _parse_tokens(tokens, line_number, len(line) + 1)
 
-        index += 1
 
+def _parse_tokens(tokens: list[GrinToken], line_number: int, end_column: int) -> list[GrinToken]:
+    kinds = [token.kind() for token in tokens]
+    count = len(kinds)
 
-    if len(tokens) == 0:
+
+    def _raise_error_at_end_of_line(message: str) -> NoReturn:
+        raise GrinParseError(message, GrinLocation(line_number, end_column))
+
+
+    def _expect(index: int, operands: tuple[tuple[GrinTokenKind, ...], ...]) -> int:
+        for expected in operands:
+            if index >= count or kinds[index] not in expected:
+                message = ', '.join(str(kind) for kind in expected)
+
+                if index >= count:
+                    _raise_error_at_end_of_line(message)
+                else:
+                    raise GrinParseError(message, tokens[index].location())
+
+            index += 1
+
+        return index
+
+
+    if count == 0:
         _raise_error_at_end_of_line('Program lines cannot be empty')
-    elif len(tokens) == 1 and tokens[0].kind() == GrinTokenKind.DOT:
+    elif count == 1 and kinds[0] is GrinTokenKind.DOT:
         return tokens
 
-    _parse_label()
+    index = 0
+
+    if kinds[0] is GrinTokenKind.IDENTIFIER:
+        index = _expect(1, (_COLON,))
 
-    if index >= len(tokens):
+    if index >= count:
         _raise_error_at_end_of_line('Statement body expected')
 
-    _parse_body()
+    keyword = kinds[index]
+    operands = _STATEMENT_OPERANDS.get(keyword)
+
+    if operands is None:
+        raise GrinParseError('Statement keyword expected', tokens[index].location())
+
+    index = _expect(index + 1, operands)
+
+    if keyword in _JUMP_KEYWORDS and index < count and kinds[index] is GrinTokenKind.IF:
+        index = _expect(index + 1, _CONDITION_OPERANDS)
 
-    if index < len(tokens):
-        _raise_error_on_token('Extra tokens after statement end', tokens[index])
+    if index < count:
+        raise GrinParseError('Extra tokens after statement end', tokens[index].location())
 
     return tokens
 
 
 
-__all__ = [parse.__name__, GrinParseError.__name__]
+__all__ = [
+    GrinLineCache.__name__,
+    parse.__name__,
+    parse_buffer.__name__,
+    parse_file.__name__,
+    parse_parallel.__name__,
+    GrinParseError.__name__
+]
@@ -2,6 +2,7 @@ from grin.statements.basic_statements import *
 from grin.statements.math_statements import *
 from grin.statements.jump_statements import *
 from grin.statements.input_statements import *
+from grin.statements.nodes import *
 
 __all__ = [
     "Statement",
@@ -17,5 +18,22 @@ __all__ = [
     "ReturnStatement",
     "LabelStatement",
     "InnumStatement",
-    "InstrStatement"
+    "InstrStatement",
+    "Node",
+    "LetNode",
+    "PrintNode",
+    "InnumNode",
+    "InstrNode",
+    "MathNode",
+    "AddNode",
+    "SubNode",
+    "MultNode",
+    "DivNode",
+    "JumpNode",
+    "GotoNode",
+    "GosubNode",
+    "ReturnNode",
+    "EndNode",
+    "to_node",
+    "to_nodes"
 ]
@@ -1,18 +1,18 @@
 from grin.token import GrinTokenKind, GrinToken
 from grin.interpreter.errors import GrinRuntimeError
 
+_LITERAL_KINDS = frozenset([
+    GrinTokenKind.LITERAL_FLOAT, GrinTokenKind.LITERAL_INTEGER, GrinTokenKind.LITERAL_STRING])
+
 def evaluate_expression(value, engine):
     """Evaluates whether a value is a literal, variable, or label reference."""
     if isinstance(value, GrinToken):
-        if value.kind() in (
-        GrinTokenKind.LITERAL_FLOAT, GrinTokenKind.LITERAL_INTEGER, GrinTokenKind.LITERAL_STRING):
+        kind = value.kind()
+        if kind in _LITERAL_KINDS:
             return value.value()
-        elif value.kind() == GrinTokenKind.IDENTIFIER:
+        elif kind is GrinTokenKind.IDENTIFIER:
             return engine.variables.get(value.text(), 0)
-    elif isinstance(value, str):
-        print(f'it happened {value}')
-        return value
-    elif isinstance(value, int):
+    elif isinstance(value, (str, int)):
         return value
     raise GrinRuntimeError(f"Invalid value: {value}")
 
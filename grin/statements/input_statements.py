@@ -9,23 +9,26 @@ class InputStatement(Statement):
     def execute(self, interpreter_engine):
         raise NotImplementedError
 
+def read_number(name):
+    """Reads a line of input as an int or float, for the variable with the given name."""
+    try:
+        input_value = input().strip()
+        if "." in input_value:
+            first, second = input_value.split('.')
+            if first:
+                return float(input_value)
+            else:
+                raise GrinRuntimeError(f'{input_value} needs to have an integer literal before the decimal place')
+        else:
+            return int(input_value)
+
+    except ValueError:
+        raise GrinRuntimeError(f'Invalid numeric input for {name}')
+
 class InnumStatement(InputStatement):
     """Innum statement class for Grin Innum statements"""
     def execute(self, interpreter_engine):
-        try:
-            input_value = input().strip()
-            if "." in input_value:
-                first, second = input_value.split('.')
-                if first:
-                    interpreter_engine.variables[self.var.text()] = float(
-                input_value)
-                else:
-                    raise GrinRuntimeError(f'{input_value} needs to have an integer literal before the decimal place')
-            else:
-                interpreter_engine.variables[self.var.text()] = int(input_value)
-
-        except ValueError:
-            raise GrinRuntimeError(f'Invalid numeric input for {self.var.text()}')
+        interpreter_engine.variables[self.var.text()] = read_number(self.var.text())
 
 class InstrStatement(InputStatement):
     """Instr statement class for Grin Instr statements"""
@@ -33,6 +36,7 @@ class InstrStatement(InputStatement):
         interpreter_engine.variables[self.var.text()] = input().strip()
 
 __all__ = [
+    read_number.__name__,
     InputStatement.__name__,
     InnumStatement.__name__,
     InstrStatement.__name__,
@@ -2,13 +2,28 @@ from grin.statements.basic_statements import Statement
 from grin.interpreter.errors import GrinRuntimeError
 from grin.token import GrinTokenKind
 from grin.statements.basic_statements import evaluate_expression
+import operator as _operator
 
+_COMPARISONS = {
+    GrinTokenKind.EQUAL: _operator.eq,
+    GrinTokenKind.NOT_EQUAL: _operator.ne,
+    GrinTokenKind.LESS_THAN: _operator.lt,
+    GrinTokenKind.LESS_THAN_OR_EQUAL: _operator.le,
+    GrinTokenKind.GREATER_THAN: _operator.gt,
+    GrinTokenKind.GREATER_THAN_OR_EQUAL: _operator.ge,
+}
 
 def compare(left, operator, right):
     """Evaluates a comparison between left and right values using the given operator."""
     left_value = left if isinstance(left, (int, float, str)) else left.value()
     right_value = right if isinstance(right, (int, float, str)) else right.value()
 
+    comparison = _COMPARISONS.get(operator.kind())
+    return compare_values(left_value, comparison, right_value, operator.text())
+
+def compare_values(left_value, comparison, right_value, operator_text = None):
+    """Compares two values with one of the functions in the operator module,
+    raising the errors compare() does."""
     if isinstance(left_value, int) and isinstance(right_value, float):
         left_value = float(left_value)
     elif isinstance(left_value, float) and isinstance(right_value, int):
@@ -16,48 +31,60 @@ def compare(left, operator, right):
     elif type(left_value) != type(right_value):
         raise GrinRuntimeError(f"Cannot compare different types: {type(left_value).__name__} and {type(right_value).__name__}")
 
-    if operator.kind() == GrinTokenKind.EQUAL:
-        return left_value == right_value
-    elif operator.kind() == GrinTokenKind.NOT_EQUAL:
-        return left_value != right_value
-    elif operator.kind() == GrinTokenKind.LESS_THAN:
-        return left_value < right_value
-    elif operator.kind() == GrinTokenKind.LESS_THAN_OR_EQUAL:
-        return left_value <= right_value
-    elif operator.kind() == GrinTokenKind.GREATER_THAN:
-        return left_value > right_value
-    elif operator.kind() == GrinTokenKind.GREATER_THAN_OR_EQUAL:
-        return left_value >= right_value
-    else:
-        raise GrinRuntimeError(f"Invalid comparison operator: {operator.text()}")
+    if comparison is None:
+        raise GrinRuntimeError(f"Invalid comparison operator: {operator_text}")
+    return comparison(left_value, right_value)
+
+def check_goto_target(target_value):
+    """Raises the error a GOTO raises, before its condition is evaluated, when
+    its evaluated target is 0."""
+    if isinstance(target_value, int) and target_value == 0:
+        raise GrinRuntimeError('Cannot jump 0 lines')
+
+def resolve_target(target_value, index, count, labels):
+    """Returns the index of the statement that a jump from the statement at
+    the given index, in a program of count statements with the given labels,
+    to its evaluated target goes to, raising the error taking it raises if
+    it can't be taken.  A jump just past the last statement ends the program."""
+    if isinstance(target_value, int):  # Relative jump by line number
+        destination = index + target_value
+        if destination < 0 or destination > count:
+            raise GrinRuntimeError(f"GOTO {target_value} jumps out of bounds.")
+        return destination
+
+    elif isinstance(target_value, str):  # Label jump
+        if target_value in labels:
+            return labels[target_value]
+        raise GrinRuntimeError(f'Label "{target_value}" not found.')
+
+    raise GrinRuntimeError(f'Invalid target type for GOTO: {type(target_value).__name__}')
+
+def jump_to_target(interpreter_engine, target_value):
+    """Moves execution to the statement a jump's evaluated target refers to."""
+    destination = resolve_target(
+        target_value, interpreter_engine.current_line, len(interpreter_engine.program), interpreter_engine.labels)
+    interpreter_engine.current_line = destination - 1  # Adjust for next increment
 
 
 class JumpStatement(Statement):
     """Base class for all Grin Jump statements"""
-    def __init__(self, target, condition_left = None, operator = None, condition_right = None):
+    def __init__(self, target, condition_left = None, operator = None, condition_right = None, resolved_target = None):
         self.target = target
         self.condition_left = condition_left
         self.operator = operator
         self.condition_right = condition_right
+        # The absolute statement index of a literal target, once the program
+        # has been linked, so that jumping needn't evaluate or look it up.
+        self.resolved_target = resolved_target
 
     def jump_to(self, interpreter_engine):
         """Moves execution to a new statement index, ensuring correct jumps."""
-        target_value = evaluate_expression(self.target, interpreter_engine)
+        if self.resolved_target is not None:
+            interpreter_engine.current_line = self.resolved_target - 1
+            return
 
-        if isinstance(target_value, int):  # Relative jump by line number
-            new_line = interpreter_engine.current_line + target_value
-            if new_line < 0 or new_line > len(interpreter_engine.program):
-                raise GrinRuntimeError(f"GOTO {target_value} jumps out of bounds.")
-            interpreter_engine.current_line = new_line - 1  # Adjust for next increment
-
-        elif isinstance(target_value, str):  # Label jump
-            if target_value in interpreter_engine.labels:
-                new_line = interpreter_engine.labels[target_value]
-                interpreter_engine.current_line = new_line - 1  # Jump to the label's line
-            else:
-                raise GrinRuntimeError(f'Label "{target_value}" not found.')
-        else:
-            raise GrinRuntimeError(f'Invalid target type for GOTO: {type(target_value).__name__}')
+        target_value = evaluate_expression(self.target, interpreter_engine)
+        jump_to_target(interpreter_engine, target_value)
 
     def should_jump(self, interpreter_engine):
         """Evaluates the conditional expression, if present."""
@@ -71,10 +98,8 @@ class JumpStatement(Statement):
 class GotoStatement(JumpStatement):
     """Goto statement class for Grin Goto statements"""
     def execute(self, interpreter_engine):
-        value = evaluate_expression(self.target, interpreter_engine)
-        if isinstance(value, int):
-            if value == 0:
-                raise GrinRuntimeError('Cannot jump 0 lines')
+        if self.resolved_target is None:
+            check_goto_target(evaluate_expression(self.target, interpreter_engine))
 
         if self.should_jump(interpreter_engine):
             self.jump_to(interpreter_engine)
@@ -104,6 +129,8 @@ class LabelStatement(Statement):
 
 __all__ = [
     compare.__name__,
+    compare_values.__name__,
+    jump_to_target.__name__,
     JumpStatement.__name__,
     GotoStatement.__name__,
     GosubStatement.__name__,
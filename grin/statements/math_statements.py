@@ -19,53 +19,73 @@ class MathStatement(Statement):
         right = evaluate_expression(self.value, interpreter_engine)
         interpreter_engine.variables[self.var.text()] = self.operate(left, right)
 
+def add(left, right):
+    """Adds two values, as ADD does."""
+    if isinstance(left, str) and isinstance(right, str):
+        return left + right
+    elif isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        return left + right
+    raise GrinRuntimeError(f'Cannot add {type(right).__name__} to {type(left).__name__}')
+
+def subtract(left, right):
+    """Subtracts right from left, as SUB does."""
+    if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        return left - right
+    raise GrinRuntimeError(f'Cannot subtract {type(right).__name__} from {type(left).__name__}')
+
+def multiply(left, right):
+    """Multiplies two values, as MULT does."""
+    if isinstance(left, str) and isinstance(right, int):
+        if right >= 0:
+            return left * right
+        else:
+            raise GrinRuntimeError(f'Cannot multiply a string with a negative integer')
+
+    elif isinstance(left, int) and isinstance(right, str):
+        if left >= 0:
+            return right * left
+        else:
+            raise GrinRuntimeError(f'Cannot multiply a string with a negative integer')
+    elif isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        return left * right
+    raise GrinRuntimeError(f'Cannot multiply {type(left).__name__} with {type(right).__name__}')
+
+def divide(left, right):
+    """Divides left by right, as DIV does."""
+    if right == 0:
+        raise GrinRuntimeError('Cannot divide by 0')
+    if isinstance(left, int) and isinstance(right, int):
+        return int(left / right)
+    elif isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        return left / right
+    raise GrinRuntimeError(f'Cannot divide {type(left).__name__} by {type(right).__name__}')
+
 class AddStatement(MathStatement):
     """Add statement class for Grin Add statements"""
     def operate(self, left, right):
-        if isinstance(left, str) and isinstance(right, str):
-            return left + right
-        elif isinstance(left, (int, float)) and isinstance(right, (int, float)):
-            return left + right
-        raise GrinRuntimeError(f'Cannot add {type(right).__name__} to {type(left).__name__}')
+        return add(left, right)
 
 class SubStatement(MathStatement):
     """Sub statement class for Grin Sub statements"""
     def operate(self, left, right):
-        if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-            return left - right
-        raise GrinRuntimeError(f'Cannot subtract {type(right).__name__} from {type(left).__name__}')
+        return subtract(left, right)
 
 class MultStatement(MathStatement):
     """Mult statement class for Grin Mult statements"""
     def operate(self, left, right):
-        if isinstance(left, str) and isinstance(right, int):
-            if right >= 0:
-                return left * right
-            else:
-                raise GrinRuntimeError(f'Cannot multiply a string with a negative integer')
-
-        elif isinstance(left, int) and isinstance(right, str):
-            if left >= 0:
-                return right * left
-            else:
-                raise GrinRuntimeError(f'Cannot multiply a string with a negative integer')
-        elif isinstance(left, (int, float)) and isinstance(right, (int, float)):
-            return left * right
-        raise GrinRuntimeError(f'Cannot multiply {type(left).__name__} with {type(right).__name__}')
+        return multiply(left, right)
 
 class DivStatement(MathStatement):
     """Div statement class for Grin Div statements"""
     def operate(self, left, right):
-        if right == 0:
-            raise GrinRuntimeError('Cannot divide by 0')
-        if isinstance(left, int) and isinstance(right, int):
-            return int(left / right)
-        elif isinstance(left, (int, float)) and isinstance(right, (int, float)):
-            return left / right
-        raise GrinRuntimeError(f'Cannot divide {type(left).__name__} by {type(right).__name__}')
+        return divide(left, right)
 
 
 __all__ = [
+    add.__name__,
+    subtract.__name__,
+    multiply.__name__,
+    divide.__name__,
     MathStatement.__name__,
     AddStatement.__name__,
     SubStatement.__name__,
@@ -0,0 +1,261 @@
+from grin.token import GrinToken, GrinTokenKind
+from grin.interpreter.errors import GrinRuntimeError
+from grin.statements.basic_statements import LetStatement, PrintStatement, EndStatement
+from grin.statements.input_statements import InnumStatement, InstrStatement, read_number
+from grin.statements.math_statements import (
+    AddStatement, SubStatement, MultStatement, DivStatement, add, subtract, multiply, divide)
+from grin.statements.jump_statements import (
+    GotoStatement, GosubStatement, ReturnStatement, compare_values, check_goto_target, jump_to_target, _COMPARISONS)
+
+# Nodes are statements that hold no tokens.  Each operand is classified once,
+# when the node is built, as either a variable (held as its name) or a
+# literal (held as its value), so executing a node never inspects a token's
+# kind, and the tokens and their locations can be dropped once a program's
+# nodes are built.  Nodes run on an InterpreterEngine exactly as the
+# statements they're built from do.
+
+class Node:
+    """Base class for all Grin statement nodes"""
+    __slots__ = ()
+
+    def execute(self, interpreter_engine):
+        raise NotImplementedError("Subclasses must implement execute()")
+
+class LetNode(Node):
+    """Node for Grin Let statements"""
+    __slots__ = ('name', 'is_variable', 'operand')
+
+    def __init__(self, name, is_variable, operand):
+        self.name = name
+        self.is_variable = is_variable
+        self.operand = operand
+
+    def execute(self, interpreter_engine):
+        variables = interpreter_engine.variables
+        variables[self.name] = variables.get(self.operand, 0) if self.is_variable else self.operand
+
+class PrintNode(Node):
+    """Node for Grin Print statements"""
+    __slots__ = ('is_variable', 'operand')
+
+    def __init__(self, is_variable, operand):
+        self.is_variable = is_variable
+        self.operand = operand
+
+    def execute(self, interpreter_engine):
+        print(interpreter_engine.variables.get(self.operand, 0) if self.is_variable else self.operand)
+
+class InnumNode(Node):
+    """Node for Grin Innum statements"""
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def execute(self, interpreter_engine):
+        interpreter_engine.variables[self.name] = read_number(self.name)
+
+class InstrNode(Node):
+    """Node for Grin Instr statements"""
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def execute(self, interpreter_engine):
+        interpreter_engine.variables[self.name] = input().strip()
+
+class MathNode(Node):
+    """Base class for nodes of math operations like ADD, SUB, MULT, DIV"""
+    __slots__ = ('name', 'is_variable', 'operand')
+
+    def __init__(self, name, is_variable, operand):
+        self.name = name
+        self.is_variable = is_variable
+        self.operand = operand
+
+    @staticmethod
+    def operate(left, right):
+        raise NotImplementedError
+
+    def execute(self, interpreter_engine):
+        variables = interpreter_engine.variables
+        left = variables.get(self.name)
+        if left is None:
+            left = variables[self.name] = 0
+        right = variables.get(self.operand, 0) if self.is_variable else self.operand
+        variables[self.name] = self.operate(left, right)
+
+class AddNode(MathNode):
+    """Node for Grin Add statements"""
+    __slots__ = ()
+    operate = staticmethod(add)
+
+class SubNode(MathNode):
+    """Node for Grin Sub statements"""
+    __slots__ = ()
+    operate = staticmethod(subtract)
+
+class MultNode(MathNode):
+    """Node for Grin Mult statements"""
+    __slots__ = ()
+    operate = staticmethod(multiply)
+
+class DivNode(MathNode):
+    """Node for Grin Div statements"""
+    __slots__ = ()
+    operate = staticmethod(divide)
+
+class JumpNode(Node):
+    """Base class for nodes of Grin jump statements.  A conditional jump's
+    condition is a tuple of whether its left side is a variable, its left
+    side, the function in the operator module that compares the sides,
+    whether its right side is a variable and its right side."""
+    __slots__ = ('target_is_variable', 'target', 'condition', 'resolved_target')
+
+    def __init__(self, target_is_variable, target, condition = None, resolved_target = None):
+        self.target_is_variable = target_is_variable
+        self.target = target
+        self.condition = condition
+        self.resolved_target = resolved_target
+
+    def target_value(self, interpreter_engine):
+        return interpreter_engine.variables.get(self.target, 0) if self.target_is_variable else self.target
+
+    def should_jump(self, interpreter_engine):
+        if self.condition is None:
+            return True
+
+        left_is_variable, left, comparison, right_is_variable, right = self.condition
+        variables = interpreter_engine.variables
+        if left_is_variable:
+            left = variables.get(left, 0)
+        if right_is_variable:
+            right = variables.get(right, 0)
+        return compare_values(left, comparison, right)
+
+    def jump_to(self, interpreter_engine):
+        if self.resolved_target is not None:
+            interpreter_engine.current_line = self.resolved_target - 1
+        else:
+            jump_to_target(interpreter_engine, self.target_value(interpreter_engine))
+
+class GotoNode(JumpNode):
+    """Node for Grin Goto statements"""
+    __slots__ = ()
+
+    def execute(self, interpreter_engine):
+        if self.resolved_target is None:
+            check_goto_target(self.target_value(interpreter_engine))
+
+        if self.should_jump(interpreter_engine):
+            self.jump_to(interpreter_engine)
+
+class GosubNode(JumpNode):
+    """Node for Grin Gosub statements"""
+    __slots__ = ()
+
+    def execute(self, interpreter_engine):
+        if self.should_jump(interpreter_engine):
+            interpreter_engine.call_stack.append(interpreter_engine.current_line)
+            self.jump_to(interpreter_engine)
+
+class ReturnNode(Node):
+    """Node for Grin Return statements"""
+    __slots__ = ()
+
+    def execute(self, interpreter_engine):
+        if not interpreter_engine.call_stack:
+            raise GrinRuntimeError("RETURN statement encountered without a matching GOSUB.")
+        interpreter_engine.current_line = interpreter_engine.call_stack.pop()
+
+class EndNode(Node):
+    """Node for Grin End statements"""
+    __slots__ = ()
+
+    def execute(self, interpreter_engine):
+        interpreter_engine.terminate = True
+
+_MATH_NODES = {
+    AddStatement: AddNode,
+    SubStatement: SubNode,
+    MultStatement: MultNode,
+    DivStatement: DivNode,
+}
+
+_OPERAND_KINDS = frozenset([
+    GrinTokenKind.IDENTIFIER, GrinTokenKind.LITERAL_INTEGER,
+    GrinTokenKind.LITERAL_FLOAT, GrinTokenKind.LITERAL_STRING])
+
+def _is_operand(value) -> bool:
+    return isinstance(value, GrinToken) and value.kind() in _OPERAND_KINDS
+
+def _operand(token: GrinToken):
+    """Returns whether an operand is a variable, and its name if it is, or its value if it isn't."""
+    if token.kind() is GrinTokenKind.IDENTIFIER:
+        return True, token.text()
+    return False, token.value()
+
+def to_node(statement):
+    """Returns the node for a statement, or the statement itself if it's
+    already a node, isn't one whose node is known, or holds operands that
+    aren't tokens (so that it's evaluated the way it always was)."""
+    statement_type = type(statement)
+
+    if statement_type is LetStatement and _is_operand(statement.value):
+        return LetNode(statement.var.text(), *_operand(statement.value))
+    elif statement_type is PrintStatement and _is_operand(statement.print_value):
+        return PrintNode(*_operand(statement.print_value))
+    elif statement_type in _MATH_NODES and _is_operand(statement.value):
+        return _MATH_NODES[statement_type](statement.var.text(), *_operand(statement.value))
+    elif statement_type is InnumStatement:
+        return InnumNode(statement.var.text())
+    elif statement_type is InstrStatement:
+        return InstrNode(statement.var.text())
+    elif (statement_type is GotoStatement or statement_type is GosubStatement) and _is_operand(statement.target):
+        condition = None
+        if statement.condition_left is not None:
+            if not _is_operand(statement.condition_left) or not _is_operand(statement.condition_right) \
+                    or statement.operator.kind() not in _COMPARISONS:
+                return statement
+            condition = (
+                *_operand(statement.condition_left),
+                _COMPARISONS[statement.operator.kind()],
+                *_operand(statement.condition_right))
+
+        node_type = GotoNode if statement_type is GotoStatement else GosubNode
+        return node_type(*_operand(statement.target), condition, statement.resolved_target)
+    elif statement_type is ReturnStatement:
+        return ReturnNode()
+    elif statement_type is EndStatement:
+        return EndNode()
+    return statement
+
+def to_nodes(statements):
+    """Returns a list of the nodes for the given statements, in the form that
+    parse_statements_into_objects() returns them (with a labeled statement's
+    label kept alongside its node)."""
+    return [
+        (statement[0], to_node(statement[1])) if isinstance(statement, (list, tuple)) else to_node(statement)
+        for statement in statements
+    ]
+
+__all__ = [
+    Node.__name__,
+    LetNode.__name__,
+    PrintNode.__name__,
+    InnumNode.__name__,
+    InstrNode.__name__,
+    MathNode.__name__,
+    AddNode.__name__,
+    SubNode.__name__,
+    MultNode.__name__,
+    DivNode.__name__,
+    JumpNode.__name__,
+    GotoNode.__name__,
+    GosubNode.__name__,
+    ReturnNode.__name__,
+    EndNode.__name__,
+    to_node.__name__,
+    to_nodes.__name__
+]
@@ -64,6 +64,12 @@ class GrinTokenKind(Enum):
         self._category = category
 
 
+    # Kinds are singletons compared by identity, so they can be hashed by
+    # identity, too.  That keeps every "kind in {...}" and dictionary lookup
+    # keyed by a kind in C, rather than calling Enum's hash of the name.
+    __hash__ = object.__hash__
+
+
     def index(self) -> int:
         """An index associated with this kind of token, mainly to differentiate
         it from all the others."""
@@ -78,6 +84,10 @@ class GrinTokenKind(Enum):
 
 class GrinToken:
     """A single token in a Grin program"""
+
+    __slots__ = ('_kind', '_text', '_location', '_value')
+
+
     def __init__(
             self, *,
             kind: GrinTokenKind,
@@ -110,10 +120,55 @@ class GrinToken:
         return isinstance(other, GrinToken) \
                 and self._kind == other._kind \
                 and self._text == other._text \
-                and self._location == other._location \
+                and self.location() == other.location() \
                 and self._value == other._value
 
 
+    def __reduce__(self):
+        # Pickling tokens by their constructor arguments, rather than by the
+        # default copy of their slots, makes pickled programs about half the
+        # size and much faster to load.
+        return _restore_token, (self._kind, self._text, self._location, self._value)
+
+
+
+def _restore_token(kind: GrinTokenKind, text: str, location: GrinLocation, value: Any) -> GrinToken:
+    return GrinToken(kind = kind, text = text, location = location, value = value)
+
+
+
+class _LazilyLocatedGrinToken(GrinToken):
+    """A GrinToken that holds the line and column of its location, building a
+    GrinLocation only when its location is asked for, which is usually only
+    when an error is being reported.  The line is the same int object for
+    every token on a line, and columns are mostly small, cached ints, so
+    these tokens don't require any allocation besides their own.  The line
+    is kept in the _location slot until the GrinLocation replaces it."""
+
+    __slots__ = ('_column',)
+
+
+    def __init__(self, kind: GrinTokenKind, text: str, line: int, column: int, value: Any = None):
+        self._kind = kind
+        self._text = text
+        self._location = line
+        self._column = column
+        self._value = value
+
+
+    def location(self) -> GrinLocation:
+        location = self._location
+        if type(location) is int:
+            location = self._location = GrinLocation(location, self._column)
+        return location
+
+
+    def __reduce__(self):
+        location = self._location
+        line = location if type(location) is int else location.line()
+        return _LazilyLocatedGrinToken, (self._kind, self._text, line, self._column, self._value)
+
+
 
 __all__ = [
     GrinToken.__name__,
@@ -0,0 +1,204 @@
+# validation.py
+#
+# Checks Grin programs for every lex, parse and duplicate label error they
+# contain, rather than stopping at the first, without building tokens for
+# the lines that are valid.  It's meant for checking large numbers of
+# programs quickly, e.g., before accepting them from users.
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+import re
+import time
+from typing import Iterable
+from grin.lexing import GrinLexError, KEYWORDS
+from grin.location import GrinLocation
+from grin.parsing import (
+    GrinParseError, _COMPARISON_OPERATOR, _CONDITION_OPERANDS, _JUMP_KEYWORDS,
+    _STATEMENT_OPERANDS, _parse_line)
+from grin.token import GrinTokenKind
+
+
+
+# The lines of a valid program form a regular language, so an ASCII line can
+# be validated by matching it against one pattern generated from the same
+# operand table that grin.parsing validates lines with.  Each kind of token
+# is matched only where the lexer would end it (e.g., an identifier can't be
+# followed by another letter or digit, and < can't be followed by > or =),
+# so that a line matches only if lexing it would produce those tokens.
+_KEYWORD = r'(?:{})(?![A-Za-z0-9])'.format('|'.join(sorted(KEYWORDS)))
+
+_KIND_PATTERNS = {
+    GrinTokenKind.IDENTIFIER: rf'(?!{_KEYWORD})[A-Za-z][A-Za-z0-9]*(?![A-Za-z0-9])',
+    GrinTokenKind.LITERAL_INTEGER: r'-?[0-9]+(?![0-9.])',
+    GrinTokenKind.LITERAL_FLOAT: r'-?[0-9]+\.[0-9]*(?![0-9])',
+    GrinTokenKind.LITERAL_STRING: r'"[^"]*"',
+    GrinTokenKind.EQUAL: r'=',
+    GrinTokenKind.NOT_EQUAL: r'<>',
+    GrinTokenKind.LESS_THAN: r'<(?![>=])',
+    GrinTokenKind.LESS_THAN_OR_EQUAL: r'<=',
+    GrinTokenKind.GREATER_THAN: r'>(?!=)',
+    GrinTokenKind.GREATER_THAN_OR_EQUAL: r'>='
+}
+
+
+def _operand_pattern(kinds: tuple[GrinTokenKind, ...]) -> str:
+    return r'\s*(?:{})'.format('|'.join(_KIND_PATTERNS[kind] for kind in kinds))
+
+
+def _statement_pattern(keyword: GrinTokenKind, operands: tuple) -> str:
+    pattern = rf'{keyword.name}(?![A-Za-z0-9])' + ''.join(_operand_pattern(kinds) for kinds in operands)
+
+    if keyword in _JUMP_KEYWORDS:
+        condition = ''.join(_operand_pattern(kinds) for kinds in _CONDITION_OPERANDS)
+        pattern += rf'(?:\s*IF(?![A-Za-z0-9]){condition})?'
+
+    return pattern
+
+
+_VALID_LINE_PATTERN = re.compile(r'\s*(?:(?P<label>{})\s*:\s*)?(?:{})\s*'.format(
+    _KIND_PATTERNS[GrinTokenKind.IDENTIFIER],
+    '|'.join(_statement_pattern(keyword, operands) for keyword, operands in _STATEMENT_OPERANDS.items())))
+
+
+assert set(_COMPARISON_OPERATOR) <= _KIND_PATTERNS.keys()
+
+
+
+class GrinValidationReport:
+    """The result of validating one Grin source file"""
+
+    def __init__(self, path: str, errors: list[Exception], line_count: int, elapsed: float):
+        self._path = path
+        self._errors = errors
+        self._line_count = line_count
+        self._elapsed = elapsed
+
+
+    def path(self) -> str:
+        return self._path
+
+
+    def errors(self) -> list[Exception]:
+        """Returns every error found in the file, in order of line"""
+        return self._errors
+
+
+    def is_valid(self) -> bool:
+        return len(self._errors) == 0
+
+
+    def line_count(self) -> int:
+        """Returns the number of lines that were validated"""
+        return self._line_count
+
+
+    def elapsed(self) -> float:
+        """Returns how long the file took to read and validate, in seconds"""
+        return self._elapsed
+
+
+    def __repr__(self) -> str:
+        return f'GrinValidationReport({self._path!r}, {len(self._errors)} errors)'
+
+
+
+def validate(lines: Iterable[str]) -> list[Exception]:
+    """Given a sequence of strings containing lines of Grin code, returns a list
+    of every error in them, in order of line: the GrinLexError or
+    GrinParseError that parse() would raise for each invalid line, and a
+    GrinParseError for each label that was already used on an earlier line.
+    Like parse(), it stops at a line containing only a '.'.
+
+    Valid lines are checked without building any tokens; only invalid lines
+    are lexed and parsed, to find out exactly what's wrong with them."""
+
+    errors = []
+    labels = {}
+    match = _VALID_LINE_PATTERN.fullmatch
+
+    for line_number, line in enumerate(lines, start = 1):
+        found = match(line) if line.isascii() else None
+
+        if found is not None:
+            label = found.group('label')
+
+            if label is None:
+                continue
+
+            column = found.start('label') + 1
+        else:
+            try:
+                tokens = _parse_line(line, line_number)
+            except (GrinLexError, GrinParseError) as e:
+                errors.append(e)
+                continue
+
+            if len(tokens) == 1 and tokens[0].kind() is GrinTokenKind.DOT:
+                break
+            elif tokens[0].kind() is not GrinTokenKind.IDENTIFIER:
+                continue
+
+            label = tokens[0].text()
+            column = tokens[0].location().column()
+
+        if label in labels:
+            errors.append(GrinParseError(
+                f'Label {label} was already used on line {labels[label]}',
+                GrinLocation(line_number, column)))
+        else:
+            labels[label] = line_number
+
+    return errors
+
+
+def validate_file(path: str | os.PathLike) -> GrinValidationReport:
+    """Validates the Grin program in the file with the given path, which is
+    expected to be encoded in UTF-8.  A file that can't be decoded is
+    reported with the UnicodeDecodeError as its only error."""
+
+    start = time.perf_counter()
+
+    with open(path, 'rb') as file:
+        source = file.read()
+
+    try:
+        lines = source.decode('utf-8').splitlines()
+        errors = validate(lines)
+    except UnicodeDecodeError as e:
+        lines = []
+        errors = [e]
+
+    return GrinValidationReport(os.fspath(path), errors, len(lines), time.perf_counter() - start)
+
+
+def validate_directory(
+        path: str | os.PathLike, workers: int | None = None,
+        suffix: str = '.grin') -> list[GrinValidationReport]:
+    """Validates every file whose name ends with the given suffix in the given
+    directory and its subdirectories, in a pool of worker processes, and
+    returns a report for each, sorted by path.  workers is the number of
+    processes, defaulting to the number of CPUs; with one worker, the files
+    are validated in this process."""
+
+    paths = sorted(
+        os.path.join(directory, name)
+        for directory, _, names in os.walk(path)
+        for name in names
+        if name.endswith(suffix))
+
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(paths) < 2:
+        return [validate_file(file_path) for file_path in paths]
+
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        return list(executor.map(validate_file, paths, chunksize = max(1, len(paths) // (workers * 8))))
+
+
+
+__all__ = [
+    GrinValidationReport.__name__,
+    validate.__name__,
+    validate_file.__name__,
+    validate_directory.__name__
+]
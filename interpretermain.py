@@ -1,4 +1,6 @@
+import os
 from grin.parsing import parse
+from grin.interpreter.cache import GrinProgramCache
 from grin.interpreter.engine import InterpreterEngine
 from grin.interpreter.parser import parse_statements_into_objects
 
@@ -11,9 +13,16 @@ def main() -> None:
             if statement.strip() == ".":
                 break
             statement_list.append(statement)
-        parsed_statements = list(parse(statement_list))
-        parsed_objects = parse_statements_into_objects(parsed_statements)
-        engine = InterpreterEngine(parsed_objects)
+
+        # When GRIN_CACHE_DIR is set, compiled programs are cached there, so
+        # running the same program again skips lexing and parsing it.
+        cache_directory = os.environ.get("GRIN_CACHE_DIR")
+        if cache_directory:
+            engine = InterpreterEngine(GrinProgramCache(cache_directory).compile(statement_list))
+        else:
+            parsed_statements = list(parse(statement_list))
+            parsed_objects = parse_statements_into_objects(parsed_statements)
+            engine = InterpreterEngine(parsed_objects)
         engine.run()
 
     except Exception as e:
@@ -22,4 +31,4 @@ def main() -> None:
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,145 @@
+import io
+import contextlib
+import random
+from unittest import mock
+from typing import Iterator
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.errors import GrinRuntimeError
+from grin.interpreter.program import compile_program
+
+# Programs that every engine is tested against InterpreterEngine with, and
+# the helpers that run them.  An engine's tests mix EngineTestCase into a
+# unittest.TestCase, setting engine_type to the engine they test, and run
+# the tests every engine shares along with their own.
+
+
+PROGRAMS = [
+    ['LET X 3', 'LOOP: SUB X 1', 'PRINT X', 'GOTO "LOOP" IF X > 0', 'PRINT Y'],
+    ['ADD A 2.5', 'MULT A 2', 'DIV A 2', 'LET S "ab"', 'MULT S 3', 'ADD S "!"', 'PRINT A', 'PRINT S'],
+    ['LET N 7', 'DIV N 2', 'PRINT N', 'LET M -7', 'DIV M 2', 'PRINT M', 'LET F 1.0', 'DIV F 4', 'PRINT F'],
+    ['LET T "F"', 'GOSUB T', 'GOSUB T IF T = "F"', 'END', 'F: ADD C 1', 'PRINT C', 'RETURN'],
+    ['LET X 1', 'ADD X "a"'],
+    ['LET X 1', 'ADD X Y', 'LET S "a"', 'ADD S X'],
+    ['MULT S -1', 'LET S "s"', 'MULT S -1'],
+    ['LET S "ab"', 'LET N 2', 'MULT N S', 'PRINT N', 'SUB S 1'],
+    ['DIV Z 0'],
+    ['LET Z 0.0', 'DIV X Z'],
+    ['LET D 0', 'GOTO D'],
+    ['GOTO 0 IF X > 1'],
+    ['LET X 2', 'GOTO 2 IF X < "s"', 'PRINT X'],
+    ['LET X 2', 'LET Y "s"', 'GOTO 2 IF X < Y', 'PRINT X'],
+    ['LET J 2', 'GOTO J', 'PRINT "skipped"', 'PRINT J', 'GOTO 5'],
+    ['LET J 1.5', 'GOSUB J'],
+    ['LET J -9', 'GOTO J IF J < 0'],
+    ['RETURN'],
+    ['LET X 1', 'GOTO "NOWHERE" IF X > 1', 'PRINT "fine"', 'GOTO "NOWHERE"'],
+    ['LET X 1', 'GOSUB "NOWHERE" IF X > 0'],
+    ['LET A 1', 'LET B 1.0', 'GOTO 2 IF A = B', 'PRINT "no"', 'PRINT "yes"', 'GOTO 1 IF A <> B', 'GOTO -7 IF A >= B'],
+    ['LET A "x"', 'GOTO 2 IF "x" = A', 'PRINT "no"', 'GOTO 2 IF 1 <= 1.5', 'PRINT "no"', 'PRINT A'],
+    ['PRINT "a"', 'GOTO 2', 'PRINT "b"', 'PRINT "c"', 'END', 'PRINT "d"'],
+]
+
+
+def random_program(generator: random.Random, length: int) -> list[str]:
+    """Returns a random program, which may loop forever, print or fail."""
+    names = ['A', 'B', 'C']
+    values = ['0', '1', '-2', '2.5', '"s"', 'A', 'B', 'C']
+    targets = ['1', '2', '-1', '-3', '"L0"', '"L1"', '"L9"', 'A']
+    lines = []
+    for index in range(length):
+        kind = generator.choice(['LET', 'PRINT', 'ADD', 'SUB', 'MULT', 'DIV', 'GOTO', 'GOSUB', 'RETURN', 'END'])
+        if kind in ('LET', 'ADD', 'SUB', 'MULT', 'DIV'):
+            line = f'{kind} {generator.choice(names)} {generator.choice(values)}'
+        elif kind == 'PRINT':
+            line = f'PRINT {generator.choice(values)}'
+        elif kind in ('GOTO', 'GOSUB'):
+            line = f'{kind} {generator.choice(targets)}'
+            if generator.random() < 0.7:
+                operator = generator.choice(['<', '<=', '>', '>=', '=', '<>'])
+                line += f' IF {generator.choice(values)} {operator} {generator.choice(values)}'
+        else:
+            line = kind
+        if index % 4 == 0:
+            line = f'L{index // 4}: {line}'
+        lines.append(line)
+    return lines
+
+
+def random_programs() -> Iterator[tuple[list[str], list]]:
+    """Yields 300 random programs, as their lines and the program compiled
+    from them, that finish (or fail) within a budget of statements, skipping
+    those that loop forever."""
+    generator = random.Random(33)
+    tested = 0
+    while tested < 300:
+        lines = random_program(generator, generator.randint(1, 12))
+        try:
+            program = compile_program(lines)
+        except GrinRuntimeError:
+            continue
+
+        engine = InterpreterEngine(program)
+        steps = 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                while engine.current_line < len(engine.program) and not engine.terminate and steps < 500:
+                    statement = engine.program[engine.current_line]
+                    if isinstance(statement, (list, tuple)):
+                        statement = statement[1]
+                    statement.execute(engine)
+                    engine.current_line += 1
+                    steps += 1
+            except GrinRuntimeError:
+                pass
+        if steps == 500:
+            continue
+
+        yield lines, program
+        tested += 1
+
+
+def run_program(engine_type, program):
+    """Runs a program on an engine of the given type, returning what it
+    printed and the state it left the engine in, or only what it printed if
+    the engine couldn't be created."""
+    output = io.StringIO()
+    engine = None
+    with contextlib.redirect_stdout(output):
+        try:
+            engine = engine_type(program)
+            engine.run()
+        except GrinRuntimeError as e:
+            print(f'error: {e}')
+    if engine is None:
+        return output.getvalue(), None
+    return output.getvalue(), dict(engine.variables), engine.current_line, engine.terminate, engine.call_stack
+
+
+class EngineTestCase:
+    engine_type = InterpreterEngine
+
+    def assertRunsTheSame(self, program):
+        self.assertEqual(run_program(self.engine_type, program), run_program(InterpreterEngine, program))
+
+    def test_random_programs_run_the_same(self):
+        """Test random programs that don't loop forever against InterpreterEngine"""
+        for lines, program in random_programs():
+            with self.subTest(lines = lines):
+                self.assertRunsTheSame(program)
+
+    def test_input_statements(self):
+        """Test that INNUM and INSTR read their input as statements do"""
+        program = compile_program(['INNUM X', 'INSTR S', 'INNUM Y', 'PRINT X', 'PRINT S', 'PRINT Y'])
+        with mock.patch('builtins.input', side_effect = ['4.5', ' hi ', '12']):
+            self.assertEqual(run_program(self.engine_type, program)[:2], ('4.5\nhi\n12\n', {'X': 4.5, 'S': 'hi', 'Y': 12}))
+        with mock.patch('builtins.input', side_effect = ['4', 's', 'x']):
+            self.assertEqual(run_program(self.engine_type, program)[0], 'error: Invalid numeric input for Y\n')
+
+    def test_errors_leave_current_line_at_the_failing_statement(self):
+        """Test that an error leaves the engine at the statement that raised it"""
+        engine = self.engine_type(compile_program(['LET X 1', 'PRINT X', 'DIV X 0', 'PRINT X']))
+        with contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises(GrinRuntimeError):
+                engine.run()
+        self.assertEqual(engine.current_line, 2)
+        self.assertEqual(dict(engine.variables), {'X': 1})
@@ -0,0 +1,108 @@
+import unittest
+import io
+import contextlib
+import struct
+from grin.interpreter.bytecode import FORMAT_VERSION, GrinBytecode, GrinOpcode, dumps, loads
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.errors import GrinRuntimeError
+from grin.interpreter.parser import parse_statements_into_objects
+from grin.interpreter.program import compile_program
+from grin.parsing import parse
+from grin.statements.basic_statements import PrintStatement, Statement
+from grin.token import GrinToken, GrinTokenKind
+
+
+class TestGrinBytecode(unittest.TestCase):
+    def setUp(self):
+        self.lines = [
+            'LET X 3',
+            'LET NAME "grin é"',
+            'LOOP: SUB X 0.5',
+            'PRINT X',
+            'GOSUB "SHOUT" IF X >= 1',
+            'GOTO -3 IF X > 0',
+            'END',
+            'SHOUT: MULT NAME 2',
+            'PRINT NAME',
+            'RETURN'
+        ]
+        self.program = compile_program(self.lines)
+
+    def run_program(self, program) -> str:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            InterpreterEngine(program).run()
+        return output.getvalue()
+
+    def test_round_trip_runs_the_same(self):
+        """Test that a program read back from its encoding runs the same way"""
+        loaded = loads(dumps(self.program)).program()
+        self.assertEqual(self.run_program(loaded), self.run_program(self.program))
+        self.assertEqual(dict(loaded.labels()), {'LOOP': 2, 'SHOUT': 7})
+
+    def test_round_trip_keeps_tokens(self):
+        """Test that rebuilt statements have the same tokens, including locations"""
+        statements = parse_statements_into_objects(list(parse(self.lines)))
+        loaded = loads(dumps(GrinBytecode.from_program(statements))).program().statements()
+
+        for original, rebuilt in zip(statements, loaded):
+            if isinstance(original, list):
+                self.assertEqual(original[0].label, rebuilt[0].label)
+                original, rebuilt = original[1], rebuilt[1]
+            self.assertIs(type(original), type(rebuilt))
+            self.assertEqual(vars(original), vars(rebuilt))
+
+    def test_tables(self):
+        """Test that names and constants are interned into tables"""
+        compiled = GrinBytecode.from_program(compile_program(['LET X 1', 'ADD X 1', 'ADD Y X', 'GOTO "A"', 'A: END']))
+        self.assertEqual(compiled.names, ('X', 'Y'))
+        self.assertEqual([value for _, _, value in compiled.constants], [1, 'A'])
+        self.assertEqual(compiled.labels, {'A': 4})
+        self.assertEqual(list(compiled.lines), [1, 2, 3, 4, 0])
+        self.assertEqual(compiled.code[compiled.offsets[3]], GrinOpcode.GOTO)
+        self.assertEqual(len(compiled), 5)
+
+    def test_large_integers_and_tokens_without_locations(self):
+        """Test that huge integers and tokens without locations survive encoding"""
+        value = GrinToken(kind=GrinTokenKind.LITERAL_INTEGER, text='123456789012345678901234567890', location=None, value=123456789012345678901234567890)
+        statement = loads(dumps(GrinBytecode.from_program([PrintStatement(value)]))).program().statements()[0]
+        self.assertEqual(statement.print_value, value)
+
+    def test_encoding_is_compact(self):
+        """Test that a small program's arrays are written a byte per item"""
+        self.assertLess(len(dumps(self.program)), 200)
+
+    def test_unknown_statements_cannot_be_compiled(self):
+        """Test that a statement the format doesn't know about is rejected"""
+        with self.assertRaises(ValueError):
+            GrinBytecode.from_program([Statement()])
+
+    def test_duplicate_labels_are_rejected(self):
+        """Test that statements with the same label twice raise the error InterpreterEngine does"""
+        statements = parse_statements_into_objects(list(parse(['A: PRINT 1', 'A: PRINT 2'])))
+        with self.assertRaises(GrinRuntimeError) as compiled:
+            GrinBytecode.from_program(statements)
+        with self.assertRaises(GrinRuntimeError) as interpreted:
+            InterpreterEngine(statements)
+        self.assertEqual(str(compiled.exception), str(interpreted.exception))
+
+    def test_invalid_data_is_rejected(self):
+        """Test that data that isn't a valid program raises a ValueError"""
+        data = dumps(self.program)
+        wrong_version = data[:6] + struct.pack('<H', FORMAT_VERSION + 1) + data[8:]
+
+        for invalid in [b'', b'not bytecode at all', wrong_version, data[:-1], data + b'\x00', data[:len(data) // 2]]:
+            with self.subTest(invalid = invalid[:20]):
+                with self.assertRaises(ValueError):
+                    loads(invalid)
+
+    def test_invalid_code_is_rejected(self):
+        """Test that code with an invalid opcode or operand raises a ValueError"""
+        for code in [[99], [GrinOpcode.PRINT], [GrinOpcode.PRINT, 2], [GrinOpcode.GOTO_IF, 1, 1, 6, 1]]:
+            with self.subTest(code = code):
+                with self.assertRaises(ValueError):
+                    GrinBytecode(code, [], [(GrinTokenKind.LITERAL_INTEGER, '1', 1)], {}, [1], [0] * len(code))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import unittest
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from grin.interpreter import cache
+from grin.interpreter.cache import GrinProgramCache, GrinProgramMemoryCache
+from grin.interpreter.engine import InterpreterEngine
+from grin.parsing import GrinParseError
+from grin.interpreter.program import GrinProgram
+
+
+class TestGrinProgramCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = GrinProgramCache(os.path.join(directory.name, 'cache'))
+        self.lines = ['LET X 1', 'LOOP: ADD X 1', 'GOTO "LOOP" IF X < 5', 'PRINT X']
+
+    def test_compile_stores_and_loads(self):
+        """Test that a compiled program is loaded from the cache the second time"""
+        self.assertIsNone(self.cache.load(self.lines))
+        program = self.cache.compile(self.lines)
+        self.assertTrue(os.path.exists(self.cache.path(self.lines)))
+
+        with mock.patch.object(cache, 'compile_program') as compile_program:
+            loaded = self.cache.compile(self.lines)
+            compile_program.assert_not_called()
+
+        self.assertIsInstance(loaded, GrinProgram)
+        self.assertEqual(len(loaded), len(program))
+        self.assertEqual(dict(loaded.labels()), {'LOOP': 1})
+
+    def test_dot_line_ends_the_source(self):
+        """Test that lines after the '.' don't change where a program is cached"""
+        self.assertEqual(self.cache.path(self.lines), self.cache.path(self.lines + ['.', 'PRINT 3']))
+
+    def test_different_source_is_a_different_entry(self):
+        """Test that editing a program changes where it's cached"""
+        self.assertNotEqual(self.cache.path(self.lines), self.cache.path(self.lines[:-1] + ['PRINT  X']))
+        self.assertNotEqual(self.cache.path(['A', 'B']), self.cache.path(['A\nB']))
+
+    def test_different_version_is_a_different_entry(self):
+        """Test that a new interpreter version doesn't find an older version's entries"""
+        path = self.cache.path(self.lines)
+        with mock.patch.object(cache, '_VERSION_TAG', b'another version'):
+            self.assertNotEqual(self.cache.path(self.lines), path)
+
+    def test_corrupt_entries_are_rejected(self):
+        """Test that truncated, garbled or mismatched entries are treated as missing"""
+        self.cache.compile(self.lines)
+        path = self.cache.path(self.lines)
+        with open(path, 'rb') as file:
+            data = file.read()
+
+        self.cache.compile(["PRINT 1"])
+        with open(self.cache.path(['PRINT 1']), 'rb') as file:
+            other_data = file.read()
+
+        for corrupt in [b'', data[:20], data[:-10], data[:len(data) // 2] + b'\xff' * 10, other_data]:
+            with self.subTest(corrupt = corrupt[:40]):
+                with open(path, 'wb') as file:
+                    file.write(corrupt)
+
+                self.assertIsNone(self.cache.load(self.lines))
+                self.assertEqual(dict(self.cache.compile(self.lines).labels()), {'LOOP': 1})
+                self.assertIsNotNone(self.cache.load(self.lines))
+
+    def test_stale_entries_are_rejected(self):
+        """Test that an entry whose statements lack attributes this version's have is treated as missing"""
+        program = cache.compile_program(self.lines)
+        del program.statements()[2].resolved_target
+        self.cache.store(self.lines, program)
+        self.assertIsNone(self.cache.load(self.lines))
+
+        self.cache.store(self.lines, GrinProgram([object()], {}))
+        self.assertIsNone(self.cache.load(self.lines))
+        self.cache.compile(self.lines)
+        self.assertIsNotNone(self.cache.load(self.lines))
+
+    def test_unwritable_directory_is_ignored(self):
+        """Test that failing to write an entry doesn't fail compiling"""
+        with mock.patch('tempfile.mkstemp', side_effect = PermissionError):
+            program = self.cache.compile(self.lines)
+        self.assertEqual(len(program), 4)
+        self.assertIsNone(self.cache.load(self.lines))
+
+
+class TestGrinProgramMemoryCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = GrinProgramMemoryCache(max_programs=3, max_statements=10)
+
+    def test_hits_and_misses(self):
+        """Test that the same program is compiled once and then found"""
+        program = self.cache.compile(['LET X 1', 'PRINT X'])
+        self.assertIs(self.cache.compile(['LET X 1', 'PRINT X', '.', 'PRINT 2']), program)
+        self.assertEqual((self.cache.hits(), self.cache.misses(), self.cache.evictions()), (1, 1, 0))
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.statement_count(), 2)
+
+    def test_least_recently_used_program_is_evicted(self):
+        """Test that the least recently used program is evicted when too many are cached"""
+        first = self.cache.compile(['PRINT 1'])
+        self.cache.compile(['PRINT 2'])
+        self.cache.compile(['PRINT 3'])
+        self.cache.compile(['PRINT 1'])
+        self.cache.compile(['PRINT 4'])
+
+        self.assertEqual(self.cache.evictions(), 1)
+        self.assertIs(self.cache.compile(['PRINT 1']), first)
+        self.cache.compile(['PRINT 2'])
+        self.assertEqual(self.cache.misses(), 5)
+
+    def test_programs_are_evicted_to_stay_under_statement_limit(self):
+        """Test that programs are evicted when their statements exceed the limit"""
+        self.cache.compile(['PRINT 1'] * 4)
+        self.cache.compile(['PRINT 2'] * 4)
+        self.cache.compile(['PRINT 3'] * 4)
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.statement_count(), 8)
+        self.assertEqual(self.cache.evictions(), 1)
+
+    def test_program_larger_than_the_limit_is_not_cached(self):
+        """Test that a program with too many statements is compiled but not cached"""
+        program = self.cache.compile(['PRINT 1'] * 11)
+        self.assertEqual(len(program), 11)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_errors_are_not_cached(self):
+        """Test that a program that fails to compile raises its error every time"""
+        for _ in range(2):
+            with self.assertRaises(GrinParseError):
+                self.cache.compile(['LET X'])
+        self.assertEqual((len(self.cache), self.cache.misses()), (0, 2))
+
+    def test_clear(self):
+        """Test that clearing the cache empties it and resets its counters"""
+        self.cache.compile(['PRINT 1'])
+        self.cache.compile(['PRINT 1'])
+        self.cache.clear()
+        self.assertEqual((len(self.cache), self.cache.statement_count(), self.cache.hits(), self.cache.misses()), (0, 0, 0, 0))
+
+    def test_invalid_limits(self):
+        """Test that a cache can't be created with non-positive limits"""
+        with self.assertRaises(ValueError):
+            GrinProgramMemoryCache(max_programs=0)
+        with self.assertRaises(ValueError):
+            GrinProgramMemoryCache(max_statements=0)
+
+    def test_shared_between_threads(self):
+        """Test that threads share one compiled program and can run it at once"""
+        lines = ['LET X 0', 'LOOP: ADD X 1', 'GOTO "LOOP" IF X < 500']
+
+        def run(_):
+            engine = InterpreterEngine(self.cache.compile(lines))
+            engine.run()
+            return engine.variables['X']
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            self.assertEqual(list(executor.map(run, range(32))), [500] * 32)
+
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.hits() + self.cache.misses(), 32)
+
+
+if __name__ == '__main__':
+    unittest.main()
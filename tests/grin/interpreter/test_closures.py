@@ -0,0 +1,39 @@
+import unittest
+from grin.interpreter.closures import ClosureEngine, compile_closures
+from grin.interpreter.linker import link
+from grin.interpreter.program import compile_program
+from grin.statements.basic_statements import PrintStatement, EndStatement
+from engine_cases import PROGRAMS, EngineTestCase, run_program
+
+
+class TestClosureEngine(EngineTestCase, unittest.TestCase):
+    engine_type = ClosureEngine
+
+    def test_closures_run_the_same_as_statements(self):
+        """Test that programs print, fail and leave the engine the same way when compiled to closures"""
+        for lines in PROGRAMS:
+            with self.subTest(lines = lines):
+                self.assertRunsTheSame(compile_program(lines))
+
+    def test_closures_of_linked_programs_and_nodes(self):
+        """Test that linked programs and programs of nodes run the same"""
+        for lines in (PROGRAMS[0], PROGRAMS[3], PROGRAMS[21], PROGRAMS[22]):
+            with self.subTest(lines = lines):
+                self.assertRunsTheSame(link(compile_program(lines)))
+                self.assertRunsTheSame(compile_program(lines, nodes = True))
+
+    def test_statements_without_tokens_are_executed(self):
+        """Test that hand-built statements run through their execute() methods"""
+        program = [PrintStatement(5), EndStatement(), PrintStatement(6)]
+        self.assertRunsTheSame(program)
+        self.assertEqual(run_program(ClosureEngine, program)[0], '5\n')
+
+    def test_one_closure_per_statement(self):
+        """Test that each statement, labeled or not, is compiled to one closure"""
+        engine = ClosureEngine(compile_program(PROGRAMS[3]))
+        self.assertEqual(len(compile_closures(engine)), len(PROGRAMS[3]))
+        self.assertTrue(all(callable(closure) for closure in engine.code))
+
+
+if __name__ == '__main__':
+    unittest.main()
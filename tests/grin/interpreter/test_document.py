@@ -0,0 +1,111 @@
+import unittest
+import io
+import contextlib
+from grin.interpreter.document import GrinDocument
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.errors import GrinRuntimeError
+from grin.lexing import GrinLexError
+from grin.location import GrinLocation
+from grin.parsing import GrinParseError
+from grin.statements.basic_statements import LetStatement, PrintStatement
+from grin.statements.jump_statements import LabelStatement
+
+
+class TestGrinDocument(unittest.TestCase):
+    def setUp(self):
+        self.document = GrinDocument([
+            'LET X 1',
+            'LOOP: ADD X 1',
+            'GOTO "LOOP" IF X < 5',
+            'DONE: PRINT X'
+        ])
+
+    def run_document(self) -> str:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            InterpreterEngine(self.document.statements()).run()
+        return output.getvalue()
+
+    def test_builds_statements_and_labels(self):
+        """Test that a new document holds the statements and labels of its lines"""
+        statements = self.document.statements()
+        self.assertIsInstance(statements[0], LetStatement)
+        self.assertIsInstance(statements[1][0], LabelStatement)
+        self.assertEqual(self.document.labels(), {"LOOP": 1, "DONE": 3})
+        self.assertEqual(self.run_document(), "5\n")
+
+    def test_edit_replaces_lines(self):
+        """Test that editing a line changes only that line's statement"""
+        before = self.document.statements()[2]
+        self.document.edit(0, 1, ['LET X 3'])
+
+        self.assertIs(self.document.statements()[2], before)
+        self.assertEqual(self.document.line(0), 'LET X 3')
+        self.assertEqual(self.run_document(), "5\n")
+
+    def test_inserting_and_deleting_lines_shifts_labels(self):
+        """Test that labels after an insertion or deletion move with their lines"""
+        self.document.edit(1, 1, ['PRINT "A"', 'PRINT "B"'])
+        self.assertEqual(self.document.labels(), {"LOOP": 3, "DONE": 5})
+
+        self.document.edit(0, 2, [])
+        self.assertEqual(self.document.labels(), {"LOOP": 1, "DONE": 3})
+        self.assertEqual(len(self.document), 4)
+
+    def test_shifted_lines_report_current_locations(self):
+        """Test that tokens of lines moved by an edit are located where the lines are now"""
+        self.document.edit(0, 0, ['PRINT 0'])
+        self.assertEqual(self.document.tokens(3)[0].location(), GrinLocation(4, 1))
+
+    def test_errors_are_kept_per_line(self):
+        """Test that lines with errors are kept and reported, and can be fixed"""
+        self.document.edit(1, 2, ['LOOP: ADD X'])
+        self.document.edit(0, 0, ['PRINT !'])
+
+        errors = self.document.errors()
+        self.assertEqual(len(errors), 2)
+        self.assertIsInstance(errors[0], GrinLexError)
+        self.assertIsInstance(errors[1], GrinParseError)
+        self.assertEqual(errors[1].location(), GrinLocation(3, 12))
+
+        with self.assertRaises(GrinLexError):
+            self.document.statements()
+
+        self.document.edit(0, 1, [])
+        self.document.edit(1, 2, ['LOOP: ADD X 2'])
+        self.assertEqual(self.document.errors(), [])
+        self.assertEqual(self.run_document(), "5\n")
+
+    def test_removing_labels_updates_index(self):
+        """Test that replacing a labeled line removes its label"""
+        self.document.edit(3, 4, ['PRINT X'])
+        self.assertEqual(self.document.labels(), {"LOOP": 1})
+
+    def test_duplicate_labels(self):
+        """Test that duplicate labels are reported when labels are requested"""
+        self.document.edit(4, 4, ['LOOP: END'])
+
+        with self.assertRaises(GrinRuntimeError):
+            self.document.labels()
+
+        self.document.edit(4, 5, [])
+        self.assertEqual(self.document.labels(), {"LOOP": 1, "DONE": 3})
+
+    def test_invalid_ranges(self):
+        """Test that edits outside the document are rejected"""
+        with self.assertRaises(IndexError):
+            self.document.edit(3, 9, [])
+
+    def test_statement_errors_are_reported(self):
+        """Test that a terminating dot is reported as an error"""
+        self.document.edit(4, 4, ['.'])
+        self.assertIn("Unknown statement", str(self.document.errors()[0]))
+
+    def test_print_statements_are_built(self):
+        """Test that the statement built for an edited line is the right kind"""
+        self.document.edit(0, 1, ['PRINT 1'])
+        self.assertIsInstance(self.document.statements()[0], PrintStatement)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import io
+import contextlib
+import pickle
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.errors import GrinLinkError, GrinRuntimeError
+from grin.interpreter.linker import link, link_errors
+from grin.interpreter.parser import parse_statements_into_objects
+from grin.interpreter.program import compile_program
+from grin.parsing import parse
+
+
+class TestLinker(unittest.TestCase):
+    def run_program(self, program) -> str:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            try:
+                InterpreterEngine(program).run()
+            except GrinRuntimeError as e:
+                print(str(e))
+        return output.getvalue()
+
+    def test_linked_programs_run_the_same(self):
+        """Test that linking doesn't change what programs do"""
+        programs = [
+            ['LET X 0', 'LOOP: ADD X 1', 'PRINT X', 'GOTO "LOOP" IF X < 3', 'PRINT "done"'],
+            ['LET X 5', 'PRINT X', 'SUB X 1', 'GOTO -2 IF X > 0', 'GOTO 2', 'PRINT "skipped"', 'PRINT "end"'],
+            ['GOSUB "F"', 'GOSUB "F"', 'END', 'F: PRINT "in F"', 'RETURN'],
+            ['LET T "B"', 'GOTO T', 'A: PRINT "A"', 'B: PRINT "B"', 'GOTO 1'],
+            ['LET N 2', 'GOSUB 3 IF N > 1', 'PRINT N', 'END', 'SUB N 1', 'RETURN'],
+        ]
+
+        for lines in programs:
+            with self.subTest(lines = lines):
+                program = compile_program(lines)
+                self.assertEqual(self.run_program(link(program)), self.run_program(program))
+
+    def test_literal_targets_are_resolved(self):
+        """Test that label and relative targets become absolute indexes"""
+        linked = link(compile_program(['A: LET X 1', 'GOTO "A"', 'GOSUB -1 IF X < 2', 'LET T "A"', 'GOTO T']))
+        statements = linked.statements()
+        self.assertEqual(statements[1].resolved_target, 0)
+        self.assertEqual(statements[2].resolved_target, 1)
+        self.assertIsNone(statements[4].resolved_target)
+        self.assertEqual(dict(linked.labels()), {'A': 0})
+
+    def test_statement_lists_can_be_linked(self):
+        """Test that the statements parse_statements_into_objects builds can be linked"""
+        statements = parse_statements_into_objects(list(parse(['GOTO "B"', 'PRINT 1', 'B: PRINT 2'])))
+        self.assertEqual(self.run_program(link(statements)), '2\n')
+
+    def test_bad_targets_are_reported_before_running(self):
+        """Test that every kind of bad literal target is reported when linking"""
+        programs = {
+            'Label "MISSING" not found.': ['PRINT 1', 'GOTO "MISSING" IF 1 > 2'],
+            'GOTO 5 jumps out of bounds.': ['GOSUB 5'],
+            'GOTO -2 jumps out of bounds.': ['PRINT 1', 'GOTO -2'],
+            'Cannot jump 0 lines': ['GOTO 0 IF 1 > 2'],
+        }
+
+        for message, lines in programs.items():
+            with self.subTest(message = message):
+                with self.assertRaises(GrinLinkError) as context:
+                    link(compile_program(lines))
+                self.assertEqual(str(context.exception), message)
+                self.assertEqual(context.exception.index, len(lines) - 1)
+                self.assertEqual(context.exception.line, len(lines))
+
+    def test_jumps_to_the_end_are_allowed(self):
+        """Test that a jump just past the last statement is not an error"""
+        self.assertEqual(self.run_program(link(compile_program(['GOTO 2', 'PRINT 1']))), '')
+
+    def test_all_errors_are_listed(self):
+        """Test that link_errors reports every bad target"""
+        program = compile_program(['GOTO "A"', 'GOTO "B"', 'GOTO 1'])
+        errors = link_errors(program.statements(), program.labels())
+        self.assertEqual([error.index for error in errors], [0, 1])
+
+    def test_errors_can_be_pickled(self):
+        """Test that a link error keeps its message, index and line when pickled"""
+        program = compile_program(['PRINT 1', 'GOTO "MISSING"'])
+        error = link_errors(program.statements(), program.labels())[0]
+        copy = pickle.loads(pickle.dumps(error))
+        self.assertIs(type(copy), GrinLinkError)
+        self.assertEqual((str(copy), copy.index, copy.line), (str(error), error.index, error.line))
+        self.assertEqual(copy.line, 2)
+
+    def test_engine_indexes_many_labels(self):
+        """Test that the engine indexes label-heavy programs and still rejects duplicates"""
+        program = compile_program([f'L{i}: PRINT {i}' for i in range(20000)])
+        self.assertEqual(len(InterpreterEngine(list(program.statements())).labels), 20000)
+
+        with self.assertRaises(GrinRuntimeError):
+            InterpreterEngine([list(statement) for statement in compile_program(['A: END', 'B: END']).statements()] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
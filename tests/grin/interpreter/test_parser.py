@@ -1,9 +1,12 @@
 import unittest
-from grin.interpreter.parser import statement_creator, parse_statements_into_objects
+from grin.interpreter.parser import statement_creator, parse_statements_into_objects, parse_lines_into_objects
+from grin.parsing import parse
 from grin.token import GrinToken, GrinTokenKind
 from grin.statements.basic_statements import LetStatement, PrintStatement, EndStatement
 from grin.statements.jump_statements import LabelStatement, GosubStatement, GotoStatement
 from grin.interpreter.errors import GrinParseError
+from grin.lexing import GrinLexError
+from grin.parsing import GrinParseError as GrinLineParseError
 
 
 class TestParser(unittest.TestCase):
@@ -164,6 +167,45 @@ class TestParser(unittest.TestCase):
         self.assertEqual(statement.label, "start")
 
 
+    def describe(self, statement):
+        """Describes a statement (or labeled statement) as comparable values"""
+        if isinstance(statement, list):
+            return [self.describe(part) for part in statement]
+        return type(statement).__name__, vars(statement)
+
+    def test_parse_lines_into_objects_matches_two_passes(self):
+        """Test that the single-pass parser builds the same statements as parse() followed by parse_statements_into_objects()"""
+        lines = [
+            'LET X 1', 'START: PRINT "Boo"', 'INNUM Y', 'INSTR Z', 'ADD X 1.5', 'SUB X Y',
+            'MULT X 2', 'DIV X 3', 'GOTO 2', 'GOSUB "START" IF X >= 3', 'LOOP: GOTO LOOP IF X <> Y',
+            'RETURN', 'END', '.', 'PRINT !'
+        ]
+
+        expected = parse_statements_into_objects(list(parse(lines)))
+        actual = parse_lines_into_objects(lines)
+
+        self.assertEqual(len(actual), 13)
+        self.assertEqual([self.describe(s) for s in actual], [self.describe(s) for s in expected])
+
+    def test_parse_lines_into_objects_reports_same_errors(self):
+        """Test that the single-pass parser raises the same errors as parse()"""
+        lines = [
+            '', 'LET', 'LET X', 'LET 3 4', 'LET X 3 4', 'PRINT END', 'LABEL', 'LABEL:', 'LABEL: 3',
+            'GOTO', 'GOTO 3 IF', 'GOTO 3 IF X', 'GOTO 3 IF X <', 'GOTO 3 IF X < 4 5', 'GOTO 3 4',
+            'RETURN X', '. X', '3 < 4', 'PRINT X Y !', 'LET X "Boo'
+        ]
+
+        for line in lines:
+            with self.subTest(line=line):
+                with self.assertRaises((GrinLexError, GrinLineParseError)) as expected:
+                    list(parse([line]))
+
+                with self.assertRaises(type(expected.exception)) as actual:
+                    parse_lines_into_objects([line])
+
+                self.assertEqual(str(actual.exception), str(expected.exception))
+
+
     def test_statement_creator_empty(self):
         """Test statement_creator with an empty token list"""
         tokens = []
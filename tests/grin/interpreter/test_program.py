@@ -0,0 +1,69 @@
+import unittest
+import io
+import contextlib
+import pickle
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.errors import GrinRuntimeError
+from grin.interpreter.program import GrinProgram, compile_program
+from grin.parsing import GrinParseError
+from grin.statements.jump_statements import LabelStatement
+
+
+class TestGrinProgram(unittest.TestCase):
+    def setUp(self):
+        self.program = compile_program([
+            'LET X 1',
+            'LOOP: ADD X 1',
+            'GOTO "LOOP" IF X < 5',
+            'DONE: PRINT X',
+            '.',
+            'PRINT "ignored"'
+        ])
+
+    def run_program(self, program) -> str:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            InterpreterEngine(program).run()
+        return output.getvalue()
+
+    def test_statements_and_labels(self):
+        """Test that a compiled program has its statements and labels"""
+        self.assertEqual(len(self.program), 4)
+        self.assertIsInstance(self.program.statements()[1][0], LabelStatement)
+        self.assertEqual(dict(self.program.labels()), {'LOOP': 1, 'DONE': 3})
+
+    def test_program_runs_more_than_once(self):
+        """Test that engines running the same program don't affect each other"""
+        self.assertEqual(self.run_program(self.program), '5\n')
+        self.assertEqual(self.run_program(self.program), '5\n')
+
+    def test_program_cannot_be_changed(self):
+        """Test that a program's statements and labels are read-only"""
+        with self.assertRaises(AttributeError):
+            self.program._statements = ()
+        with self.assertRaises(TypeError):
+            self.program.labels()['LOOP'] = 0
+        self.assertIsInstance(self.program.statements(), tuple)
+        self.assertIsInstance(self.program.statements()[1], tuple)
+
+    def test_duplicate_labels(self):
+        """Test that compiling a program with a duplicate label raises the engine's error"""
+        with self.assertRaises(GrinRuntimeError) as context:
+            compile_program(['A: PRINT 1', 'A: PRINT 2'])
+        self.assertEqual(str(context.exception), 'Cannot create two of the same label')
+
+    def test_parse_errors(self):
+        """Test that compiling an invalid program raises the parse error"""
+        with self.assertRaises(GrinParseError):
+            compile_program(['LET X'])
+
+    def test_pickling(self):
+        """Test that a program survives pickling"""
+        copy = pickle.loads(pickle.dumps(self.program))
+        self.assertIsInstance(copy, GrinProgram)
+        self.assertEqual(dict(copy.labels()), dict(self.program.labels()))
+        self.assertEqual(self.run_program(copy), '5\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
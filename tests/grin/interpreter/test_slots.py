@@ -0,0 +1,95 @@
+import unittest
+import io
+import contextlib
+from unittest import mock
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.errors import GrinRuntimeError
+from grin.interpreter.linker import link
+from grin.interpreter.program import compile_program
+from grin.interpreter.slots import GrinVariables, compile_slots
+from grin.statements.basic_statements import PrintStatement
+
+
+PROGRAMS = [
+    ['LET X 3', 'LOOP: SUB X 1', 'PRINT X', 'GOTO "LOOP" IF X > 0', 'PRINT Y'],
+    ['ADD A 2.5', 'MULT A 2', 'DIV A 2', 'LET S "ab"', 'MULT S 3', 'ADD S "!"', 'PRINT A', 'PRINT S'],
+    ['LET N 7', 'DIV N 2', 'PRINT N', 'LET M -7', 'DIV M 2', 'PRINT M'],
+    ['LET T "F"', 'GOSUB T', 'GOSUB T IF T = "F"', 'END', 'F: ADD C 1', 'PRINT C', 'RETURN'],
+    ['LET X 1', 'ADD X "a"'],
+    ['DIV Z 0'],
+    ['LET D 0', 'GOTO D'],
+    ['LET X 2', 'GOTO 2 IF X < "s"', 'PRINT X'],
+    ['LET J 2', 'GOTO J', 'PRINT "skipped"', 'PRINT J'],
+    ['RETURN'],
+    ['LET X 1', 'GOTO "NOWHERE" IF X > 1', 'PRINT "fine"', 'GOTO "NOWHERE"'],
+]
+
+
+class TestVariableSlots(unittest.TestCase):
+    def run_program(self, program, **options):
+        output = io.StringIO()
+        engine = None
+        with contextlib.redirect_stdout(output):
+            try:
+                engine = InterpreterEngine(program, **options)
+                engine.run()
+            except GrinRuntimeError as e:
+                print(f'error: {e}')
+        return output.getvalue(), None if engine is None else dict(engine.variables)
+
+    def test_slots_run_the_same_as_a_dictionary(self):
+        """Test that programs print, fail and leave variables the same way with slots"""
+        for lines in PROGRAMS:
+            with self.subTest(lines = lines):
+                program = compile_program(lines)
+                self.assertEqual(self.run_program(program, variable_slots = True), self.run_program(program))
+
+    def test_slots_work_with_linked_programs(self):
+        """Test that a linked program runs the same with slots"""
+        program = link(compile_program(PROGRAMS[0]))
+        self.assertEqual(self.run_program(program, variable_slots = True), self.run_program(program))
+
+    def test_input_statements(self):
+        """Test that INNUM and INSTR store their input in slots"""
+        program = compile_program(['INNUM X', 'INSTR S', 'INNUM Y', 'PRINT X', 'PRINT S', 'PRINT Y'])
+        with mock.patch('builtins.input', side_effect = ['4.5', ' hi ', '12']):
+            self.assertEqual(self.run_program(program, variable_slots = True), ('4.5\nhi\n12\n', {'X': 4.5, 'S': 'hi', 'Y': 12}))
+        with mock.patch('builtins.input', side_effect = ['.5']):
+            self.assertEqual(self.run_program(program, variable_slots = True)[0], 'error: .5 needs to have an integer literal before the decimal place\n')
+
+    def test_slots_are_assigned_in_order_of_appearance(self):
+        """Test that each variable gets one slot, in order of first appearance"""
+        _, names = compile_slots(compile_program(['LET B 1', 'ADD A B', 'GOTO C IF D < B']).statements())
+        self.assertEqual(names, ('B', 'A', 'C', 'D'))
+
+    def test_statements_without_tokens_are_kept(self):
+        """Test that hand-built statements still run, through the variables view"""
+        statement = PrintStatement(5)
+        compiled, names = compile_slots([statement])
+        self.assertIs(compiled[0], statement)
+        self.assertEqual(self.run_program([statement], variable_slots = True)[0], '5\n')
+
+    def test_variables_view(self):
+        """Test that the variables view behaves like a dictionary"""
+        slots = [None, None]
+        variables = GrinVariables(['X', 'Y'], slots)
+        self.assertEqual(len(variables), 0)
+        self.assertNotIn('X', variables)
+        self.assertEqual(variables.get('X', 0), 0)
+
+        variables['Y'] = 3
+        variables['OTHER'] = 'o'
+        self.assertEqual(slots, [None, 3])
+        self.assertEqual(dict(variables), {'Y': 3, 'OTHER': 'o'})
+        self.assertEqual(len(variables), 2)
+
+        del variables['Y']
+        self.assertEqual(slots, [None, None])
+        with self.assertRaises(KeyError):
+            variables['Y']
+        with self.assertRaises(KeyError):
+            del variables['X']
+
+
+if __name__ == '__main__':
+    unittest.main()
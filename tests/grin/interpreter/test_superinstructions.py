@@ -0,0 +1,82 @@
+import unittest
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.linker import link
+from grin.interpreter.program import compile_program
+from grin.interpreter.superinstructions import Superinstruction, basic_blocks, fuse
+from grin.statements.basic_statements import PrintStatement
+from engine_cases import PROGRAMS, random_programs, run_program
+
+
+class TestSuperinstructions(unittest.TestCase):
+    def assertRunsTheSame(self, program, **options):
+        fused, _ = fuse(program, **options)
+        self.assertEqual(run_program(InterpreterEngine, fused), run_program(InterpreterEngine, program))
+
+    def test_fused_programs_run_the_same(self):
+        """Test that fused programs print, fail and leave the engine the same way"""
+        for lines in PROGRAMS:
+            with self.subTest(lines = lines):
+                self.assertRunsTheSame(compile_program(lines))
+                self.assertRunsTheSame(compile_program(lines), max_length = 2)
+                self.assertRunsTheSame(link(compile_program(lines)) if lines in (PROGRAMS[0], PROGRAMS[3]) else compile_program(lines, nodes = True))
+
+    def test_random_programs_run_the_same(self):
+        """Test random programs that don't loop forever against InterpreterEngine"""
+        for lines, program in random_programs():
+            with self.subTest(lines = lines):
+                self.assertRunsTheSame(program)
+                self.assertRunsTheSame(program, max_length = 2)
+
+    def test_basic_blocks(self):
+        """Test that blocks start at labels, after jumps and at literal targets"""
+        program = compile_program([
+            'LET X 1', 'LOOP: ADD X 1', 'PRINT X', 'GOTO "LOOP" IF X < 3', 'LET Y 2', 'GOTO 2', 'PRINT Y', 'PRINT X', 'END'])
+        self.assertEqual(basic_blocks(program.statements()), [range(0, 1), range(1, 4), range(4, 6), range(6, 7), range(7, 9)])
+        self.assertEqual(basic_blocks([]), [])
+
+    def test_report(self):
+        """Test that the report counts blocks, superinstructions and the dispatches they save"""
+        program = compile_program(['LET X 1', 'LOOP: ADD X 1', 'PRINT X', 'GOTO "LOOP" IF X < 3', 'PRINT "done"', 'END'])
+        fused, report = fuse(program)
+        self.assertEqual(report.blocks, 3)
+        self.assertEqual(report.superinstructions, 2)
+        self.assertEqual(report.fused_statements, 5)
+        self.assertEqual(report.dispatches_eliminated, 3)
+        self.assertEqual(dict(report.patterns), {'ADD PRINT GOTO': 1, 'PRINT END': 1})
+        self.assertEqual(dict(fused.labels()), {'LOOP': 1})
+        self.assertIsInstance(fused.statements()[1][1], Superinstruction)
+
+    def test_jumps_into_the_middle_of_a_superinstruction(self):
+        """Test that a jump into the middle of a fused run lands on its original statement"""
+        program = compile_program(['LET T 3', 'GOTO T', 'PRINT "a"', 'PRINT "b"', 'PRINT "c"', 'PRINT "d"'])
+        fused, report = fuse(program)
+        self.assertIsInstance(fused.statements()[2], Superinstruction)
+        self.assertEqual(run_program(InterpreterEngine, fused)[0], 'c\nd\n')
+        self.assertRunsTheSame(program)
+
+    def test_fusing_twice(self):
+        """Test that superinstructions aren't fused into others"""
+        program = compile_program(PROGRAMS[0])
+        fused, _ = fuse(program)
+        twice, _ = fuse(fused)
+        self.assertEqual(run_program(InterpreterEngine, twice), run_program(InterpreterEngine, program))
+        self.assertIs(twice.statements()[1][1], fused.statements()[1][1])
+        for statement in twice.statements():
+            if isinstance(statement, Superinstruction):
+                self.assertFalse(any(isinstance(inner, Superinstruction) for inner in statement.statements))
+
+    def test_hand_built_statements(self):
+        """Test that statements without tokens are fused as they are"""
+        program = [PrintStatement(1), PrintStatement(2)]
+        fused, report = fuse(program)
+        self.assertEqual(report.superinstructions, 1)
+        self.assertEqual(run_program(InterpreterEngine, fused), run_program(InterpreterEngine, program))
+
+    def test_max_length(self):
+        """Test that superinstructions must fuse at least two statements"""
+        with self.assertRaises(ValueError):
+            fuse([], max_length = 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
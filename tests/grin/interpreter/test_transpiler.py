@@ -0,0 +1,63 @@
+import unittest
+import io
+import operator
+from grin.interpreter.linker import link
+from grin.interpreter.program import compile_program
+from grin.interpreter.transpiler import TranspiledEngine, transpile
+from grin.statements.basic_statements import PrintStatement
+from grin.statements.nodes import LetNode, PrintNode, AddNode, GotoNode
+from engine_cases import PROGRAMS, EngineTestCase, run_program
+
+
+class TestTranspiledEngine(EngineTestCase, unittest.TestCase):
+    engine_type = TranspiledEngine
+
+    def test_python_runs_the_same_as_statements(self):
+        """Test that programs print, fail and leave the engine the same way when translated to Python"""
+        for lines in PROGRAMS:
+            with self.subTest(lines = lines):
+                self.assertRunsTheSame(compile_program(lines))
+
+    def test_linked_programs_and_nodes_run_the_same(self):
+        """Test that linked programs and programs of nodes run the same"""
+        for lines in (PROGRAMS[0], PROGRAMS[3], PROGRAMS[21], PROGRAMS[22]):
+            with self.subTest(lines = lines):
+                self.assertRunsTheSame(link(compile_program(lines)))
+                self.assertRunsTheSame(compile_program(lines, nodes = True))
+
+    def test_constants_without_literals(self):
+        """Test that nodes holding floats that aren't finite, which have no literals, can be translated"""
+        infinity = float('inf')
+        program = [
+            LetNode('X', False, infinity), AddNode('Y', False, -infinity), PrintNode(False, float('nan')),
+            GotoNode(False, 2, (False, infinity, operator.gt, True, 'Y')), PrintNode(False, 'skipped'),
+            PrintNode(True, 'X'), PrintNode(True, 'Y')]
+        self.assertRunsTheSame(program)
+        self.assertEqual(run_program(TranspiledEngine, program)[0], 'nan\ninf\n-inf\n')
+
+    def test_statements_without_tokens_cannot_be_translated(self):
+        """Test that a program of hand-built statements raises a ValueError"""
+        with self.assertRaises(ValueError):
+            TranspiledEngine([PrintStatement(5)])
+
+    def test_dump(self):
+        """Test that the generated source is written to dump, and is what transpile() returns"""
+        program = compile_program(PROGRAMS[0])
+        dump = io.StringIO()
+        engine = TranspiledEngine(program, dump = dump)
+        self.assertEqual(dump.getvalue(), engine.source)
+        self.assertEqual(transpile(program), engine.source)
+        self.assertTrue(engine.source.startswith('def run(_engine):\n'))
+        self.assertIn('# block 1: lines 2 to 4', engine.source)
+        compile(engine.source, '<test>', 'exec')
+
+    def test_blocks_are_split_only_where_needed(self):
+        """Test that a program without variable targets has one block per leader"""
+        source = transpile(compile_program(['LET X 1', 'ADD X 1', 'L: PRINT X', 'GOTO "L" IF X < 3', 'PRINT "done"']))
+        self.assertEqual(source.count('# block'), 3)
+        source = transpile(compile_program(['LET X 1', 'ADD X 1', 'GOTO X']))
+        self.assertEqual(source.count('# block'), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from grin.interpreter.bytecode import GrinBytecode, dumps, loads
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.linker import link
+from grin.interpreter.program import compile_program
+from grin.interpreter.vm import BytecodeEngine, assemble
+from grin.statements.basic_statements import PrintStatement
+from engine_cases import PROGRAMS, EngineTestCase, run_program
+
+
+class TestBytecodeEngine(EngineTestCase, unittest.TestCase):
+    engine_type = BytecodeEngine
+
+    def test_bytecode_runs_the_same_as_statements(self):
+        """Test that programs print, fail and leave the engine the same way on the virtual machine"""
+        for lines in PROGRAMS:
+            with self.subTest(lines = lines):
+                self.assertRunsTheSame(compile_program(lines))
+
+    def test_linked_programs_and_bytecode_run_the_same(self):
+        """Test that linked programs, and bytecode given directly, run the same"""
+        for lines in (PROGRAMS[0], PROGRAMS[3], PROGRAMS[21], PROGRAMS[22]):
+            with self.subTest(lines = lines):
+                program = compile_program(lines)
+                self.assertRunsTheSame(link(program))
+                self.assertEqual(
+                    run_program(BytecodeEngine, loads(dumps(program)))[:4],
+                    run_program(InterpreterEngine, program)[:4])
+
+    def test_statements_without_tokens_cannot_be_run(self):
+        """Test that a program of hand-built statements raises a ValueError"""
+        with self.assertRaises(ValueError):
+            BytecodeEngine([PrintStatement(5)])
+
+    def test_literal_jumps_are_assembled_to_program_counters(self):
+        """Test that jumps with literal targets hold the program counter they jump to"""
+        code, starts, names, constants = assemble(GrinBytecode.from_program(compile_program(
+            ['LET X 1', 'L: ADD X 1', 'GOTO "L" IF X < 5', 'GOSUB -1', 'GOTO X'])))
+        self.assertEqual(names, ('X',))
+        self.assertEqual(constants, (1, 'L', 5, -1))
+        self.assertEqual(starts, [0, 3, 6, 12, 15, 18])
+        self.assertEqual(code[7:9], [starts[1], 2])
+        self.assertEqual(code[13:15], [starts[2], 3])
+        self.assertEqual(code[16:18], [~0, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import io
+import contextlib
+from unittest import mock
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.errors import GrinRuntimeError
+from grin.ir.printer import format_node
+
+# Helpers that test an optimization pass by running programs before and
+# after it on InterpreterEngine.  A pass's tests subclass OptimizerTestCase,
+# setting the input their programs read.
+
+
+def finishes(program, budget: int = 500) -> bool:
+    """Returns whether a program finishes (or fails) within a budget of
+    statements, without its numbers or strings growing too large."""
+    engine = InterpreterEngine(program)
+    steps = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            while engine.current_line < len(engine.program) and not engine.terminate and steps < budget:
+                statement = engine.program[engine.current_line]
+                if isinstance(statement, (list, tuple)):
+                    statement = statement[1]
+                statement.execute(engine)
+                engine.current_line += 1
+                steps += 1
+                if any((isinstance(value, int) and value.bit_length() > 100) or
+                       (isinstance(value, str) and len(value) > 1000) for value in engine.variables.values()):
+                    return False
+        except GrinRuntimeError:
+            pass
+    return steps < budget
+
+
+class OptimizerTestCase(unittest.TestCase):
+    inputs = ()
+    call_stack_on_failure = True
+
+    def run_program(self, program, optimized = None):
+        """Runs a program, returning what it printed and the state it left its
+        engine in, with the lines of an optimized program mapped back to the
+        original program's.  The call stack is left out when it fails if
+        call_stack_on_failure is false, as for a pass that removes calls."""
+        output = io.StringIO()
+        engine = InterpreterEngine(program if optimized is None else optimized.program)
+        failed = False
+        with contextlib.redirect_stdout(output), mock.patch('builtins.input', side_effect = list(self.inputs)):
+            try:
+                engine.run()
+            except GrinRuntimeError as e:
+                print(f'error: {e}')
+                failed = True
+
+        line, call_stack = engine.current_line, engine.call_stack
+        if optimized is not None:
+            if engine.terminate and not failed:
+                line = optimized.original_index(line - 1) + 1
+            else:
+                line = optimized.original_index(line)
+            call_stack = [optimized.original_index(index) for index in call_stack]
+        if failed and not self.call_stack_on_failure:
+            call_stack = None
+        return output.getvalue(), dict(engine.variables), line, engine.terminate, call_stack
+
+    def assertOptimizesTheSame(self, program, optimize, **options):
+        optimized = optimize(program, **options)
+        self.assertEqual(self.run_program(program, optimized), self.run_program(program))
+        return optimized
+
+    def nodes(self, optimized) -> list[str]:
+        return [format_node(statement[1] if isinstance(statement, tuple) else statement)
+                for statement in optimized.program.statements()]
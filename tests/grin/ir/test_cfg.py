@@ -0,0 +1,99 @@
+import unittest
+from grin.interpreter.linker import link
+from grin.interpreter.program import compile_program
+from grin.ir.cfg import EdgeKind, build_cfg, literal_destination
+from grin.statements.basic_statements import PrintStatement
+
+
+def edges(cfg) -> set:
+    return {(edge.source, edge.target, edge.kind) for edge in cfg.edges()}
+
+
+class TestControlFlowGraph(unittest.TestCase):
+    def test_straight_line_program(self):
+        """Test that a program without jumps is one block that falls through to the exit"""
+        cfg = build_cfg(compile_program(['LET X 1', 'PRINT X']))
+        self.assertEqual([(block.start, block.stop) for block in cfg], [(0, 2), (2, 2)])
+        self.assertIs(cfg.entry, cfg.blocks[0])
+        self.assertIs(cfg.exit, cfg.blocks[1])
+        self.assertEqual(edges(cfg), {(0, 1, EdgeKind.FALLTHROUGH)})
+
+    def test_empty_program(self):
+        """Test that an empty program's graph is just its exit"""
+        cfg = build_cfg(compile_program([]))
+        self.assertEqual(len(cfg), 1)
+        self.assertIs(cfg.entry, cfg.exit)
+        self.assertEqual(cfg.reachable(), {0})
+
+    def test_loop(self):
+        """Test that a conditional jump has a jump edge and a fall-through edge"""
+        cfg = build_cfg(compile_program(['LET I 0', 'LOOP: ADD I 1', 'GOTO "LOOP" IF I < 3', 'PRINT I']))
+        self.assertEqual([(block.start, block.stop) for block in cfg], [(0, 1), (1, 3), (3, 4), (4, 4)])
+        self.assertEqual(edges(cfg), {
+            (0, 1, EdgeKind.FALLTHROUGH),
+            (1, 1, EdgeKind.JUMP),
+            (1, 2, EdgeKind.FALLTHROUGH),
+            (2, 3, EdgeKind.FALLTHROUGH)})
+        self.assertEqual([edge.source for edge in cfg.blocks[1].predecessors], [0, 1])
+
+    def test_subroutines(self):
+        """Test that GOSUB has a call edge, and RETURN edges go to the statement after every GOSUB"""
+        cfg = build_cfg(compile_program([
+            'GOSUB "F"', 'GOSUB "F" IF X > 0', 'END', 'F: ADD X 1', 'RETURN']))
+        self.assertEqual([(block.start, block.stop) for block in cfg], [(0, 1), (1, 2), (2, 3), (3, 5), (5, 5)])
+        self.assertEqual(edges(cfg), {
+            (0, 3, EdgeKind.CALL),
+            (1, 3, EdgeKind.CALL),
+            (1, 2, EdgeKind.FALLTHROUGH),
+            (2, 4, EdgeKind.EXIT),
+            (3, 1, EdgeKind.RETURN),
+            (3, 2, EdgeKind.RETURN)})
+
+    def test_relative_and_failing_targets(self):
+        """Test relative targets, jumps just past the end, and targets that can't be taken"""
+        cfg = build_cfg(compile_program([
+            'GOTO 2 IF X < 1', 'GOTO "NOWHERE" IF X < 2', 'GOTO 2', 'GOTO 0 IF X > 3', 'GOTO -9', 'RETURN']))
+        self.assertEqual(edges(cfg), {
+            (0, 2, EdgeKind.JUMP),
+            (0, 1, EdgeKind.FALLTHROUGH),
+            (1, 6, EdgeKind.ERROR),
+            (1, 2, EdgeKind.FALLTHROUGH),
+            (2, 4, EdgeKind.JUMP),
+            (3, 6, EdgeKind.ERROR),
+            (4, 6, EdgeKind.ERROR),
+            (5, 6, EdgeKind.ERROR)})
+        self.assertEqual(cfg.reachable(), {0, 1, 2, 4, 6})
+
+    def test_unknown_targets(self):
+        """Test that jumps to targets in variables are marked unknown, and make every block reachable"""
+        cfg = build_cfg(compile_program(['LET T "B"', 'GOTO T', 'END', 'B: PRINT 1']))
+        self.assertTrue(cfg.blocks[0].unknown_target)
+        self.assertTrue(cfg.has_unknown_targets())
+        self.assertEqual(cfg.blocks[0].successors, [])
+        self.assertEqual(cfg.reachable(), {0, 1, 2, 3})
+
+    def test_linked_programs(self):
+        """Test that resolved targets are used as literal ones"""
+        lines = ['LET I 0', 'LOOP: ADD I 1', 'GOTO "LOOP" IF I < 3', 'PRINT I']
+        self.assertEqual(edges(build_cfg(link(compile_program(lines)))), edges(build_cfg(compile_program(lines))))
+
+    def test_block_at(self):
+        """Test finding the block that holds a statement"""
+        cfg = build_cfg(compile_program(['LET I 0', 'LOOP: ADD I 1', 'GOTO "LOOP" IF I < 3', 'PRINT I']))
+        self.assertEqual([cfg.block_at(index).id for index in range(5)], [0, 1, 1, 2, 3])
+
+    def test_literal_destination(self):
+        """Test the destinations of literal targets"""
+        program = compile_program(['GOTO 1', 'GOTO "L"', 'L: GOSUB 0', 'GOTO 0', 'GOTO X', 'GOTO 9'])
+        cfg = build_cfg(program)
+        destinations = [literal_destination(node, index, len(cfg.nodes), cfg.labels) for index, node in enumerate(cfg.nodes)]
+        self.assertEqual(destinations, [1, 2, 2, None, None, None])
+
+    def test_statements_that_cannot_be_analyzed(self):
+        """Test that hand-built statements raise a ValueError"""
+        with self.assertRaises(ValueError):
+            build_cfg([PrintStatement(5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+import unittest
+import io
+import contextlib
+import random
+import operator
+from unittest import mock
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.errors import GrinRuntimeError
+from grin.interpreter.program import compile_program
+from grin.ir.cfg import build_cfg
+from grin.ir.closedform import close_counting_loops
+from grin.ir.constants import propagate_constants
+from grin.ir.defuse import definitions, uses
+from grin.ir.loops import optimize_loops
+from grin.ir.nodes import ClosedFormLoopNode, _iterations
+from grin.ir.printer import format_node
+from grin.ir.types import ValueTypes
+from optimizer_cases import OptimizerTestCase, finishes
+
+
+PROGRAMS = [
+    ['LET N 10', 'LOOP: ADD I 1', 'ADD S 3', 'GOTO "LOOP" IF I < N', 'PRINT S'],
+    ['LET K 4', 'LOOP: ADD I 2', 'ADD S K', 'ADD T I', 'SUB U I', 'ADD I 1', 'GOTO "LOOP" IF I <= 30'],
+    ['LET I 20', 'LOOP: SUB I 3', 'ADD S I', 'GOTO "LOOP" IF 0 < I', 'PRINT S'],
+    ['LOOP: ADD I 1', 'ADD J 2', 'ADD S J', 'GOTO "LOOP" IF I <> 7'],
+    ['LOOP: ADD I 1', 'ADD S K', 'GOTO "LOOP" IF I = 1'],
+    ['LET S 0.5', 'LOOP: ADD I 1', 'ADD S 2', 'GOTO "LOOP" IF I < 5', 'PRINT S'],
+    ['LET K "s"', 'LOOP: ADD I 1', 'ADD S K', 'GOTO "LOOP" IF I < 5'],
+    ['LET N "x"', 'LOOP: ADD I 1', 'GOTO "LOOP" IF I < N'],
+    ['INNUM N', 'LOOP: ADD I 1', 'ADD S I', 'GOTO "LOOP" IF I < N', 'PRINT S'],
+    ['LET I 0', 'LOOP: ADD I 1', 'PRINT I', 'GOTO "LOOP" IF I < 3'],
+    ['LOOP: ADD I 1', 'ADD S S', 'GOTO "LOOP" IF I < 5', 'PRINT S'],
+    ['LOOP: ADD I 1', 'MULT S 2', 'GOTO "LOOP" IF I < 5', 'PRINT S'],
+    ['LET A 0', 'OUTER: LET I 0', 'INNER: ADD I 1', 'ADD S I', 'GOTO "INNER" IF I < 4', 'ADD A 1',
+     'GOTO "OUTER" IF A < 3', 'PRINT S'],
+    ['GOSUB "LOOP"', 'END', 'LOOP: ADD I 1', 'ADD S 2', 'GOTO "LOOP" IF I < 6', 'RETURN'],
+    ['LOOP: ADD I 1', 'ADD S 1', 'GOTO "LOOP" IF S < 3', 'GOTO "LOOP" IF I < 5'],
+]
+
+
+def random_counting_loop(generator: random.Random) -> list[str]:
+    """Returns a random loop of ADDs and SUBs, which may loop forever or fail,
+    after a few LETs that may give its variables values that aren't integers."""
+    values = ['0', '1', '-3', '5', '1.5', '"s"', 'K', 'N']
+    lines = [f'LET {generator.choice(["I", "J", "S", "K", "N"])} {generator.choice(values)}'
+             for _ in range(generator.randint(0, 4))]
+    body = [f'{generator.choice(["ADD", "SUB"])} {generator.choice(["I", "J", "S"])} '
+            f'{generator.choice(["1", "2", "-1", "0", "K", "N", "I", "J", "S", "1.5"])}'
+            for _ in range(generator.randint(1, 5))]
+    body[0] = f'LOOP: {body[0]}'
+    operator = generator.choice(['<', '<=', '>', '>=', '<>', '='])
+    bound = generator.choice(['5', '-4', '20', 'K', 'N'])
+    condition = f'I {operator} {bound}' if generator.random() < 0.7 else f'{bound} {operator} I'
+    return lines + body + [f'GOTO "LOOP" IF {condition}', 'PRINT S', 'PRINT I']
+
+
+class TestCloseCountingLoops(OptimizerTestCase):
+    inputs = ['25']
+
+    def count_statements(self, program) -> int:
+        """Returns how many statements running a program executes, counting one that fails."""
+        engine = InterpreterEngine(program)
+        steps = 0
+        with contextlib.redirect_stdout(io.StringIO()), mock.patch('builtins.input', side_effect = self.inputs):
+            try:
+                while engine.current_line < len(engine.program) and not engine.terminate:
+                    steps += 1
+                    statement = engine.program[engine.current_line]
+                    (statement[1] if isinstance(statement, tuple) else statement).execute(engine)
+                    engine.current_line += 1
+            except GrinRuntimeError:
+                pass
+        return steps
+
+    def test_closed_programs_run_the_same(self):
+        """Test that programs with loops computed in closed form print, fail and leave the engine the same way"""
+        for lines in PROGRAMS:
+            with self.subTest(lines = lines):
+                self.assertOptimizesTheSame(compile_program(lines), close_counting_loops)
+
+    def test_random_loops_run_the_same(self):
+        """Test random loops of ADDs and SUBs that finish against InterpreterEngine"""
+        generator = random.Random(24)
+        tested = 0
+        while tested < 300:
+            lines = random_counting_loop(generator)
+            program = compile_program(lines)
+            if not finishes(program, 2000):
+                continue
+
+            with self.subTest(lines = lines):
+                self.assertOptimizesTheSame(program, close_counting_loops)
+            tested += 1
+
+    def test_counting_loops(self):
+        """Test that a counting loop runs its last iteration after a node that computes the ones before it"""
+        program = compile_program(PROGRAMS[0])
+        optimized = self.assertOptimizesTheSame(program, close_counting_loops)
+        self.assertEqual(self.nodes(optimized), [
+            'LET N 10', 'CLOSED FORM (ADD I 1, ADD S 3) WHILE I < N', 'ADD I 1', 'ADD S 3', 'GOTO @2 IF I < N',
+            'PRINT S'])
+        self.assertEqual(dict(optimized.program.labels()), {'LOOP': 1})
+        self.assertEqual(optimized.origins, (0, 1, 1, 2, 3, 4))
+        self.assertEqual(self.count_statements(program), 32)
+        self.assertEqual(self.count_statements(optimized.program), 6)
+
+    def test_sums_of_induction_variables(self):
+        """Test that variables that add induction variables, wherever they're updated, are computed too"""
+        for lines in (PROGRAMS[1], PROGRAMS[2], PROGRAMS[3], PROGRAMS[8]):
+            with self.subTest(lines = lines):
+                optimized = self.assertOptimizesTheSame(compile_program(lines), close_counting_loops)
+                self.assertEqual(optimized.report.counts['closed'], 1)
+
+    def test_large_loops(self):
+        """Test that a loop of millions of iterations runs in constant time"""
+        program = compile_program(['LET N 5000000', 'LOOP: ADD I 1', 'ADD S I', 'SUB T 2', 'GOTO "LOOP" IF I < N'])
+        engine = InterpreterEngine(close_counting_loops(program).program)
+        engine.run()
+        self.assertEqual(engine.variables, {'N': 5000000, 'I': 5000000, 'S': 12500002500000, 'T': -10000000})
+
+    def test_loops_that_are_not_integers(self):
+        """Test that a loop whose variables don't hold integers when it starts runs every iteration"""
+        for lines in (PROGRAMS[5], PROGRAMS[6], PROGRAMS[7]):
+            with self.subTest(lines = lines):
+                program = compile_program(lines)
+                optimized = self.assertOptimizesTheSame(program, close_counting_loops)
+                self.assertEqual(optimized.report.counts['closed'], 1)
+                self.assertEqual(self.count_statements(optimized.program), self.count_statements(program) + 1)
+
+    def test_loops_that_are_left_alone(self):
+        """Test that loops that print or don't only add integers, and programs with unknown targets, are left alone"""
+        for lines in (PROGRAMS[9], PROGRAMS[10], PROGRAMS[11], PROGRAMS[14], ['LET T 1', 'LOOP: ADD I 1', 'GOTO T']):
+            with self.subTest(lines = lines):
+                optimized = self.assertOptimizesTheSame(compile_program(lines), close_counting_loops)
+                self.assertEqual(len(optimized.report), 0)
+
+    def test_loops_that_are_entered_again(self):
+        """Test that an inner loop or one in a subroutine is computed each time it starts"""
+        for lines in (PROGRAMS[12], PROGRAMS[13]):
+            with self.subTest(lines = lines):
+                optimized = self.assertOptimizesTheSame(compile_program(lines), close_counting_loops)
+                self.assertEqual(optimized.report.counts['closed'], 1)
+
+    def test_after_optimizing_loops(self):
+        """Test that a loop whose products were strength-reduced can then be computed in closed form"""
+        program = compile_program(['LOOP: ADD I 1', 'LET T I', 'MULT T 8', 'ADD S T', 'GOTO "LOOP" IF I < 100'])
+        optimized = close_counting_loops(optimize_loops(program))
+        self.assertEqual(sum(isinstance(node, ClosedFormLoopNode) for node in optimized.program.statements()), 1)
+        self.assertEqual(self.run_program(program, optimized), self.run_program(program))
+
+
+
+class TestClosedFormLoopNode(unittest.TestCase):
+    def test_iterations(self):
+        """Test the number of iterations of a loop against counting them"""
+        comparisons = [operator.lt, operator.le, operator.gt, operator.ge, operator.eq, operator.ne]
+        for start in range(-6, 7):
+            for step in range(-3, 4):
+                for limit in range(-6, 7):
+                    for comparison in comparisons:
+                        count, value = 1, start + step
+                        while comparison(value, limit) and count < 100:
+                            count, value = count + 1, value + step
+                        with self.subTest(start = start, step = step, comparison = comparison, limit = limit):
+                            self.assertEqual(_iterations(start, step, comparison, limit), count if count < 100 else None)
+
+    def test_execute(self):
+        """Test that the node leaves the variables as they are at the start of the loop's last iteration"""
+        node = ClosedFormLoopNode(
+            [('I', 1, False, 2), ('S', 1, True, 'K'), ('T', -1, True, 'I')], ['I'], 'I', operator.lt, True, 'N')
+        engine = InterpreterEngine([])
+        engine.variables.update({'K': 3, 'N': 9})
+        node.execute(engine)
+        self.assertEqual(engine.variables, {'K': 3, 'N': 9, 'I': 8, 'S': 12, 'T': -20})
+
+        engine.variables['K'] = 3.0
+        node.execute(engine)
+        self.assertEqual(engine.variables['I'], 8)
+
+    def test_analyses(self):
+        """Test that the node's variables are known to the analyses, so that a closed program can be optimized again"""
+        program = compile_program(['LET K 3', 'LOOP: ADD I 1', 'ADD S K', 'GOTO "LOOP" IF I < 5', 'PRINT S'])
+        closed = close_counting_loops(program)
+        cfg = build_cfg(closed.program)
+        node = cfg.nodes[1]
+        self.assertEqual(definitions(node), ('I', 'S'))
+        self.assertEqual(uses(node), ('I', 'S', 'K'))
+        self.assertFalse(ValueTypes(cfg).may_raise(1))
+        self.assertEqual(format_node(node), 'CLOSED FORM (ADD I 1, ADD S K) WHILE I < 5')
+
+        optimized = propagate_constants(closed)
+        engine = InterpreterEngine(optimized.program)
+        engine.run()
+        self.assertEqual(engine.variables, {'K': 3, 'I': 5, 'S': 15})
+
+
+if __name__ == '__main__':
+    unittest.main()
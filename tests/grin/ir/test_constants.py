@@ -0,0 +1,182 @@
+import unittest
+import io
+import contextlib
+import random
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.errors import GrinRuntimeError
+from grin.interpreter.program import compile_program
+from grin.interpreter.transpiler import TranspiledEngine
+from grin.ir.constants import propagate_constants
+from grin.statements.nodes import LetNode
+from optimizer_cases import OptimizerTestCase, finishes
+
+
+PROGRAMS = [
+    ['LET X 3', 'LOOP: SUB X 1', 'PRINT X', 'GOTO "LOOP" IF X > 0', 'PRINT Y'],
+    ['ADD A 2.5', 'MULT A 2', 'DIV A 2', 'LET S "ab"', 'MULT S 3', 'ADD S "!"', 'PRINT A', 'PRINT S'],
+    ['LET N 7', 'DIV N 2', 'PRINT N', 'LET M -7', 'DIV M 2', 'PRINT M', 'LET F 1.0', 'DIV F 4', 'PRINT F'],
+    ['LET T "F"', 'GOSUB T', 'GOSUB T IF T = "F"', 'END', 'F: ADD C 1', 'PRINT C', 'RETURN'],
+    ['GOSUB "F"', 'GOSUB "F" IF C = 1', 'END', 'F: ADD C 1', 'PRINT C', 'RETURN'],
+    ['LET X 1', 'ADD X "a"'],
+    ['LET X 1', 'ADD X Y', 'LET S "a"', 'ADD S X'],
+    ['MULT S -1', 'LET S "s"', 'MULT S -1'],
+    ['LET S "ab"', 'LET N 2', 'MULT N S', 'PRINT N', 'SUB S 1'],
+    ['DIV Z 0'],
+    ['LET Z 0.0', 'LET X 1', 'DIV X Z'],
+    ['LET Z -0.0', 'LET W 0.0', 'GOTO 2 IF X < 1', 'LET W Z', 'PRINT W'],
+    ['GOTO 0 IF X > 1'],
+    ['LET X 2', 'GOTO 2 IF X < "s"', 'PRINT X'],
+    ['LET X 2', 'LET Y "s"', 'GOTO 2 IF X < Y', 'PRINT X'],
+    ['LET J 2', 'GOTO J', 'PRINT "skipped"', 'PRINT J', 'GOTO 5'],
+    ['LET X 1', 'GOTO 9 IF X > 1', 'LET Y 1', 'LET Y 2', 'PRINT Y', 'GOTO 9'],
+    ['RETURN'],
+    ['LET X 1', 'GOTO "NOWHERE" IF X > 1', 'PRINT "fine"', 'GOTO "NOWHERE"'],
+    ['LET X 1', 'GOSUB "NOWHERE" IF X > 0'],
+    ['LET A 1', 'LET B 1.0', 'GOTO 2 IF A = B', 'PRINT "no"', 'PRINT "yes"', 'GOTO 1 IF A <> B', 'GOTO -7 IF A >= B'],
+    ['LET A "x"', 'GOTO 2 IF "x" = A', 'PRINT "no"', 'GOTO 2 IF 1 <= 1.5', 'PRINT "no"', 'PRINT A'],
+    ['PRINT "a"', 'GOTO 2', 'PRINT "b"', 'PRINT "c"', 'END', 'PRINT "d"'],
+    ['LET X 1', 'LET X 2', 'ADD Y Z', 'LET X 3', 'LET X 4', 'PRINT "x"', 'LET X 5'],
+    ['INNUM N', 'LET I 0', 'LOOP: ADD I 1', 'LET K 2', 'MULT K 3', 'GOTO "LOOP" IF I < N', 'PRINT K', 'INSTR S', 'PRINT S'],
+]
+
+
+def random_program(generator: random.Random, length: int) -> list[str]:
+    """Returns a random program with literal jump targets, which may loop forever, print or fail."""
+    names = ['A', 'B', 'C']
+    values = ['0', '1', '-2', '2.5', '"s"', 'A', 'B', 'C']
+    targets = ['1', '2', '-1', '-3', '"L0"', '"L1"', '"L9"']
+    lines = []
+    for index in range(length):
+        kind = generator.choice(['LET', 'LET', 'PRINT', 'ADD', 'SUB', 'MULT', 'DIV', 'GOTO', 'GOSUB', 'RETURN', 'END'])
+        if kind in ('LET', 'ADD', 'SUB', 'MULT', 'DIV'):
+            line = f'{kind} {generator.choice(names)} {generator.choice(values)}'
+        elif kind == 'PRINT':
+            line = f'PRINT {generator.choice(values)}'
+        elif kind in ('GOTO', 'GOSUB'):
+            line = f'{kind} {generator.choice(targets)}'
+            if generator.random() < 0.7:
+                operator = generator.choice(['<', '<=', '>', '>=', '=', '<>'])
+                line += f' IF {generator.choice(values)} {operator} {generator.choice(values)}'
+        else:
+            line = kind
+        if index % 4 == 0:
+            line = f'L{index // 4}: {line}'
+        lines.append(line)
+    return lines
+
+
+class TestPropagateConstants(OptimizerTestCase):
+    inputs = ['3', ' text ']
+
+    def test_optimized_programs_run_the_same(self):
+        """Test that optimized programs print, fail and leave the engine the same way"""
+        for lines in PROGRAMS:
+            with self.subTest(lines = lines):
+                self.assertOptimizesTheSame(compile_program(lines), propagate_constants)
+
+    def test_random_programs_run_the_same(self):
+        """Test random programs that don't loop forever against InterpreterEngine"""
+        generator = random.Random(22)
+        tested = 0
+        while tested < 300:
+            lines = random_program(generator, generator.randint(1, 12))
+            try:
+                program = compile_program(lines)
+            except GrinRuntimeError:
+                continue
+            if not finishes(program):
+                continue
+
+            with self.subTest(lines = lines):
+                self.assertOptimizesTheSame(program, propagate_constants)
+            tested += 1
+
+    def test_folding(self):
+        """Test that constants are propagated and folded into the statements that use them"""
+        optimized = self.assertOptimizesTheSame(compile_program([
+            'LET A 3', 'LET B A', 'MULT B 2', 'ADD B A', 'PRINT B', 'LET S "ab"', 'MULT S B', 'PRINT S']),
+            propagate_constants)
+        self.assertEqual(self.nodes(optimized), [
+            'LET A 3', 'LET B 9', 'PRINT 9', 'LET S "ababababababababab"', 'PRINT "ababababababababab"'])
+        self.assertEqual(optimized.report.counts['folded'], 3)
+
+    def test_errors_are_raised_when_they_run(self):
+        """Test that operations that would raise errors aren't folded, and fail at their original lines"""
+        optimized = self.assertOptimizesTheSame(
+            compile_program(['LET A 3', 'LET Z 0', 'PRINT "x"', 'DIV A Z', 'PRINT A']), propagate_constants)
+        self.assertEqual(self.nodes(optimized), ['LET A 3', 'LET Z 0', 'PRINT "x"', 'DIV A 0', 'PRINT A'])
+
+        optimized = propagate_constants(compile_program(['LET X 1', 'LET X 2', 'LET S "s"', 'ADD S X', 'END']))
+        self.assertEqual(self.nodes(optimized), ['LET X 2', 'LET S "s"', 'ADD S 2', 'END'])
+        engine = InterpreterEngine(optimized.program)
+        with self.assertRaises(GrinRuntimeError):
+            engine.run()
+        self.assertEqual(optimized.source_line(engine.current_line), 4)
+
+    def test_values_without_literals(self):
+        """Test that floats that aren't finite are computed when the program runs, as they have no literal"""
+        program = compile_program(['LET X 10.0'] + ['MULT X X'] * 10 + ['PRINT X', 'LET Y X', 'MULT Y -1', 'PRINT Y'])
+        optimized = self.assertOptimizesTheSame(program, propagate_constants)
+        self.assertNotIn('inf', ' '.join(self.nodes(optimized)))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            TranspiledEngine(optimized.program).run()
+        self.assertEqual(output.getvalue(), 'inf\n-inf\n')
+
+    def test_known_conditions(self):
+        """Test that jumps whose conditions are known are taken or removed, along with what can't run"""
+        optimized = self.assertOptimizesTheSame(compile_program([
+            'LET N 5', 'GOTO "BIG" IF N > 3', 'PRINT "small"', 'END', 'BIG: PRINT "big"', 'GOTO 2 IF N = 1', 'PRINT N']),
+            propagate_constants)
+        self.assertEqual(self.nodes(optimized), ['LET N 5', 'PRINT "big"', 'PRINT 5'])
+        self.assertEqual(optimized.origins, (0, 4, 6))
+        self.assertEqual(optimized.report.counts['unreachable'], 2)
+
+    def test_loops(self):
+        """Test that variables assigned in a loop aren't constants, but those assigned the same value are"""
+        optimized = self.assertOptimizesTheSame(compile_program([
+            'LET I 0', 'LOOP: LET K 2', 'ADD I K', 'GOTO "LOOP" IF I < 10', 'PRINT I', 'PRINT K']), propagate_constants)
+        self.assertEqual(self.nodes(optimized), ['LET I 0', 'LET K 2', 'ADD I 2', 'GOTO @1 IF I < 10', 'PRINT I', 'PRINT 2'])
+        self.assertEqual(dict(optimized.program.labels()), {'LOOP': 1})
+
+    def test_dead_statements(self):
+        """Test that values that are never used are removed, but every variable's final value is kept"""
+        optimized = self.assertOptimizesTheSame(compile_program([
+            'LET X 1', 'LET X 2', 'PRINT "a"', 'LET X 3', 'LET Y X', 'LET X 4']), propagate_constants)
+        self.assertEqual(self.nodes(optimized), ['PRINT "a"', 'LET Y 3', 'LET X 4'])
+        self.assertEqual(optimized.report.counts['dead'], 3)
+
+    def test_values_before_errors_are_kept(self):
+        """Test that a value is kept when a statement that could fail reads it or comes before it's replaced"""
+        optimized = self.assertOptimizesTheSame(
+            compile_program(['INNUM N', 'LET X 1', 'ADD N "a"', 'LET X 2']), propagate_constants)
+        self.assertTrue(all(isinstance(node, LetNode) for node in optimized.program.statements()[1::2]))
+        self.assertEqual(len(optimized), 4)
+
+    def test_report(self):
+        """Test that the report describes each change at its source line"""
+        optimized = propagate_constants(compile_program(['LET A 3', 'ADD A 1', 'END', 'PRINT A']))
+        self.assertEqual(str(optimized.report), (
+            'line 2: folded ADD A 1 into LET A 4\n'
+            'line 4: removed unreachable PRINT A\n'
+            'line 1: removed LET A 3, whose value is never used\n'))
+        self.assertEqual(len(optimized.report), 3)
+
+    def test_unknown_targets(self):
+        """Test that programs with jumps to targets held in variables are left unchanged"""
+        optimized = propagate_constants(compile_program(['LET T 2', 'LET X 1', 'GOTO T', 'END']))
+        self.assertEqual(len(optimized.report), 0)
+        self.assertEqual(self.nodes(optimized), ['LET T 2', 'LET X 1', 'GOTO T', 'END'])
+
+    def test_optimizing_twice(self):
+        """Test that an optimized program can be optimized again, keeping its original lines"""
+        program = compile_program(['LET A 1', 'PRINT "x"', 'LET A 2', 'END', 'PRINT A', 'DIV A 0'])
+        once = propagate_constants(program)
+        twice = propagate_constants(once)
+        self.assertEqual(twice.origins, once.origins)
+        self.assertEqual(len(twice.report), 0)
+        self.assertEqual(self.run_program(program, twice), self.run_program(program))
+
+
+if __name__ == '__main__':
+    unittest.main()
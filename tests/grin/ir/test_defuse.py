@@ -0,0 +1,46 @@
+import unittest
+from grin.interpreter.program import compile_program
+from grin.ir.cfg import build_cfg
+from grin.ir.defuse import DefUse, definitions, uses
+
+
+class TestDefUse(unittest.TestCase):
+    def setUp(self):
+        self.cfg = build_cfg(compile_program([
+            'LET I 0',
+            'INNUM N',
+            'LOOP: ADD TOTAL I',
+            'ADD I 1',
+            'GOTO "LOOP" IF I < N',
+            'LET OUT TOTAL',
+            'PRINT OUT',
+            'GOTO T IF "a" = S']))
+        self.def_use = DefUse(self.cfg)
+
+    def test_statement_definitions_and_uses(self):
+        """Test the variables each statement assigns and reads"""
+        nodes = self.cfg.nodes
+        self.assertEqual([definitions(node) for node in nodes],
+                         [('I',), ('N',), ('TOTAL',), ('I',), (), ('OUT',), (), ()])
+        self.assertEqual([uses(node) for node in nodes],
+                         [(), (), ('TOTAL', 'I'), ('I',), ('I', 'N'), ('TOTAL',), ('OUT',), ('T', 'S')])
+
+    def test_variable_definitions_and_uses(self):
+        """Test the statements that define and use each variable"""
+        self.assertEqual(self.def_use.definitions, {'I': [0, 3], 'N': [1], 'TOTAL': [2], 'OUT': [5]})
+        self.assertEqual(self.def_use.uses, {'TOTAL': [2, 5], 'I': [2, 3, 4], 'N': [4], 'OUT': [6], 'T': [7], 'S': [7]})
+        self.assertEqual(self.def_use.variables(), ['I', 'N', 'OUT', 'S', 'T', 'TOTAL'])
+        self.assertFalse(self.def_use.is_defined('S'))
+        self.assertTrue(self.def_use.is_used('S'))
+
+    def test_block_definitions_and_uses(self):
+        """Test that a block's uses are the variables it reads before assigning them"""
+        self.assertEqual(self.def_use.block_uses[1], {'TOTAL', 'I', 'N'})
+        self.assertEqual(self.def_use.block_definitions[1], {'TOTAL', 'I'})
+        self.assertEqual(self.def_use.block_uses[2], {'TOTAL', 'T', 'S'})
+        self.assertEqual(self.def_use.block_definitions[2], {'OUT'})
+        self.assertEqual(self.def_use.block_uses[-1], set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+import io
+import contextlib
+import random
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.errors import GrinRuntimeError
+from grin.interpreter.linker import link
+from grin.interpreter.program import compile_program
+from grin.ir.inline import inline_subroutines
+from optimizer_cases import OptimizerTestCase, finishes
+
+
+PROGRAMS = [
+    ['LET I 0', 'LOOP: GOSUB "SCALE"', 'ADD TOTAL X', 'ADD I 1', 'GOTO "LOOP" IF I < 5', 'PRINT TOTAL', 'END',
+     'SCALE: LET X I', 'MULT X 3', 'RETURN'],
+    ['GOSUB "ABS"', 'LET N -4', 'GOSUB "ABS"', 'PRINT N', 'END', 'ABS: GOTO 2 IF N >= 0', 'MULT N -1', 'RETURN'],
+    ['GOSUB "F"', 'PRINT X', 'END', 'F: GOSUB "G"', 'ADD X 1', 'RETURN', 'G: LET X 10', 'RETURN'],
+    ['GOSUB "F"', 'END', 'F: ADD X 1', 'GOSUB "F" IF X < 3', 'RETURN'],
+    ['LET S "s"', 'GOSUB "F"', 'PRINT "never"', 'END', 'F: PRINT "in"', 'ADD S 1', 'RETURN'],
+    ['GOSUB "F"', 'PRINT "back"', 'F: PRINT "in"', 'RETURN'],
+    ['GOSUB "F"', 'END', 'F: PRINT "a"', 'END', 'RETURN'],
+    ['GOSUB "F"', 'GOTO "MIDDLE"', 'END', 'F: PRINT "a"', 'MIDDLE: PRINT "b"', 'RETURN'],
+    ['GOSUB "F"', 'END', 'F: GOTO "OUT" IF X = 0', 'RETURN', 'OUT: PRINT "out"'],
+    ['GOSUB "F" IF X = 0', 'GOSUB 2', 'END', 'F: ADD X 2', 'RETURN'],
+    ['GOSUB "F"', 'PRINT X', 'END', 'F: RETURN'],
+    ['INNUM N', 'LOOP: GOSUB "STEP"', 'GOTO "LOOP" IF I < N', 'PRINT I', 'END', 'STEP: ADD I 1', 'RETURN'],
+]
+
+
+def random_program(generator: random.Random) -> list[str]:
+    """Returns a random loop that calls random subroutines, which may call
+    each other (or themselves), jump around, end the program or fail."""
+    subroutines = generator.randint(1, 3)
+
+    def statement() -> str:
+        kind = generator.choice(['LET', 'ADD', 'SUB', 'MULT', 'PRINT'])
+        value = generator.choice(['0', '1', '2', '-1', '2.5', '"s"', 'A', 'B', 'I'])
+        return f'PRINT {value}' if kind == 'PRINT' else f'{kind} {generator.choice(["A", "B"])} {value}'
+
+    lines = [
+        f'GOSUB "S{generator.randrange(subroutines)}"' if generator.random() < 0.5 else statement()
+        for _ in range(generator.randint(1, 5))]
+    lines[0] = f'MAIN: {lines[0]}'
+    lines += ['ADD I 1', 'GOTO "MAIN" IF I < 3', 'END']
+    for subroutine in range(subroutines):
+        body = [statement() for _ in range(generator.randint(0, 4))]
+        if body and generator.random() < 0.5:
+            body.insert(generator.randint(0, len(body)), generator.choice([
+                'GOTO 2 IF A > 1', 'GOTO -1 IF A < 0', f'GOTO "S{subroutine}" IF B < 0', 'END', 'RETURN',
+                f'GOSUB "S{generator.randrange(subroutines)}"', 'GOTO "MAIN"']))
+        body.append('RETURN')
+        body[0] = f'S{subroutine}: {body[0]}'
+        lines += body
+    return lines
+
+
+class TestInlineSubroutines(OptimizerTestCase):
+    inputs = ['7']
+    # An inlined subroutine that fails wasn't called, so it isn't on the call stack.
+    call_stack_on_failure = False
+
+    def test_inlined_programs_run_the_same(self):
+        """Test that programs with inlined subroutines print, fail and leave the engine the same way"""
+        for lines in PROGRAMS:
+            with self.subTest(lines = lines):
+                self.assertOptimizesTheSame(compile_program(lines), inline_subroutines)
+                self.assertOptimizesTheSame(link(compile_program(lines, nodes = True)), inline_subroutines, max_size = 2)
+
+    def test_random_programs_run_the_same(self):
+        """Test random programs with subroutines that finish against InterpreterEngine"""
+        generator = random.Random(25)
+        tested = 0
+        while tested < 200:
+            lines = random_program(generator)
+            program = compile_program(lines)
+            if not finishes(program, 600):
+                continue
+
+            with self.subTest(lines = lines):
+                self.assertOptimizesTheSame(program, inline_subroutines)
+                self.assertOptimizesTheSame(program, inline_subroutines, max_size = 1, max_growth = 2)
+            tested += 1
+
+    def test_inlining(self):
+        """Test that a call is replaced by its subroutine's statements, with their original lines"""
+        optimized = self.assertOptimizesTheSame(compile_program(PROGRAMS[0]), inline_subroutines)
+        self.assertEqual(self.nodes(optimized), [
+            'LET I 0', 'LET X I', 'MULT X 3', 'ADD TOTAL X', 'ADD I 1', 'GOTO @1 IF I < 5', 'PRINT TOTAL', 'END',
+            'LET X I', 'MULT X 3', 'RETURN'])
+        self.assertEqual(dict(optimized.program.labels()), {'LOOP': 1, 'SCALE': 8})
+        self.assertEqual(optimized.origins, (0, 7, 8, 2, 3, 4, 5, 6, 7, 8, 9))
+        self.assertEqual(str(optimized.report), 'line 2: inlined the subroutine at line 8 (2 statements)\n')
+
+    def test_jumps_in_subroutines(self):
+        """Test that jumps in an inlined subroutine go to the statements copied with it, or past them for its RETURN"""
+        optimized = self.assertOptimizesTheSame(compile_program(PROGRAMS[1]), inline_subroutines)
+        self.assertEqual(self.nodes(optimized)[:7], [
+            'GOTO @2 IF N >= 0', 'MULT N -1', 'LET N -4', 'GOTO @5 IF N >= 0', 'MULT N -1', 'PRINT N', 'END'])
+
+    def test_calls_in_subroutines(self):
+        """Test that a subroutine is inlined once the ones it calls are, but a recursive one never is"""
+        optimized = self.assertOptimizesTheSame(compile_program(PROGRAMS[2]), inline_subroutines)
+        self.assertEqual(self.nodes(optimized)[:4], ['LET X 10', 'ADD X 1', 'PRINT X', 'END'])
+        self.assertEqual(optimized.report.counts['inlined'], 2)
+        self.assertEqual(len(self.assertOptimizesTheSame(compile_program(PROGRAMS[3]), inline_subroutines).report), 0)
+
+    def test_errors_in_subroutines(self):
+        """Test that an error in an inlined subroutine is raised at its original line"""
+        optimized = self.assertOptimizesTheSame(compile_program(PROGRAMS[4]), inline_subroutines)
+        engine = InterpreterEngine(optimized.program)
+        with self.assertRaises(GrinRuntimeError), contextlib.redirect_stdout(io.StringIO()):
+            engine.run()
+        self.assertEqual(optimized.source_line(engine.current_line), 6)
+
+    def test_subroutines_that_are_not_inlined(self):
+        """Test that subroutines that end the program, or are jumped into or out of aren't inlined, nor conditional calls"""
+        for lines in (PROGRAMS[6], PROGRAMS[7], PROGRAMS[8]):
+            with self.subTest(lines = lines):
+                self.assertEqual(len(self.assertOptimizesTheSame(compile_program(lines), inline_subroutines).report), 0)
+        optimized = self.assertOptimizesTheSame(compile_program(PROGRAMS[9]), inline_subroutines)
+        self.assertEqual(self.nodes(optimized)[:3], ['GOSUB @3 IF X = 0', 'ADD X 2', 'END'])
+
+    def test_size_limits(self):
+        """Test that subroutines larger than max_size aren't inlined, nor any past max_growth"""
+        optimized = self.assertOptimizesTheSame(compile_program(PROGRAMS[0]), inline_subroutines, max_size = 1)
+        self.assertEqual(len(optimized.report), 0)
+        optimized = self.assertOptimizesTheSame(compile_program(PROGRAMS[1]), inline_subroutines, max_growth = 1)
+        self.assertEqual(optimized.report.counts['inlined'], 1)
+        optimized = self.assertOptimizesTheSame(compile_program(PROGRAMS[10]), inline_subroutines, max_size = 0)
+        self.assertEqual(self.nodes(optimized)[:2], ['PRINT X', 'END'])
+        with self.assertRaises(ValueError):
+            inline_subroutines([], max_size = -1)
+
+    def test_unknown_targets(self):
+        """Test that programs with jumps to targets held in variables are left unchanged"""
+        optimized = inline_subroutines(compile_program(['LET T "F"', 'GOSUB "F"', 'GOTO T', 'F: RETURN']))
+        self.assertEqual(len(optimized.report), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import unittest
+import random
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.errors import GrinRuntimeError
+from grin.interpreter.program import compile_program
+from grin.ir.cfg import build_cfg
+from grin.ir.loops import dominators, find_loops, optimize_loops
+from optimizer_cases import OptimizerTestCase, finishes
+
+
+PROGRAMS = [
+    ['LET I 0', 'LOOP: ADD I 1', 'LET K 2', 'MULT K 3', 'ADD S K', 'GOTO "LOOP" IF I < 10', 'PRINT S'],
+    ['LET I 0', 'LOOP: ADD I 1', 'LET T I', 'MULT T 4', 'ADD S T', 'GOTO "LOOP" IF I < 10', 'PRINT S', 'PRINT T'],
+    ['LET I 10', 'LOOP: LET T 3', 'MULT T I', 'SUB I 2', 'ADD S T', 'GOTO "LOOP" IF I > 0', 'PRINT S'],
+    ['LOOP: ADD I 1', 'PRINT K', 'LET K 5', 'GOTO "LOOP" IF I < 3'],
+    ['LET K 1', 'LOOP: ADD I 1', 'LET K 2', 'PRINT K', 'ADD K 1', 'GOTO "LOOP" IF I < 3'],
+    ['LET X "s"', 'LOOP: ADD X 1', 'LET K 2', 'ADD I 1', 'GOTO "LOOP" IF I < 3'],
+    ['LET X "s"', 'LOOP: LET K 2', 'ADD K X', 'ADD I 1', 'GOTO "LOOP" IF I < 3'],
+    ['LET Z 0', 'LOOP: LET K 2', 'DIV K Z', 'ADD I 1', 'GOTO "LOOP" IF I < 3'],
+    ['INNUM N', 'LOOP: ADD I 1', 'LET T I', 'MULT T 2', 'GOTO "LOOP" IF I < N', 'PRINT T'],
+    ['LET I 0', 'LOOP: ADD I 1', 'LET K 2', 'GOTO "DONE" IF I = 4', 'ADD S K', 'GOTO "LOOP"', 'DONE: PRINT S'],
+    ['LET I 0', 'OUTER: LET J 0', 'INNER: ADD J 1', 'LET K 3', 'ADD S K', 'GOTO "INNER" IF J < 3',
+     'ADD I 1', 'GOTO "OUTER" IF I < 3', 'PRINT S'],
+    ['GOTO "LOOP" IF X > 0', 'LET I 5', 'LOOP: ADD I 1', 'LET K 2', 'GOTO "LOOP" IF I < 8', 'PRINT I'],
+    ['LET I 0', 'LOOP: ADD I 1', 'GOSUB "F"', 'GOTO "LOOP" IF I < 3', 'END', 'F: LET K 2', 'RETURN'],
+    ['LET I 0.5', 'LOOP: ADD I 1', 'LET T I', 'MULT T 2', 'GOTO "LOOP" IF I < 3', 'PRINT T'],
+    ['LET I 0', 'GOTO 2', 'LOOP: LET K 1', 'ADD I 1', 'GOTO "LOOP" IF I < 3', 'PRINT I'],
+]
+
+
+def random_loop(generator: random.Random) -> list[str]:
+    """Returns a random loop around random statements, which may loop forever, print or fail."""
+    names = ['I', 'K', 'T', 'S']
+    values = ['0', '1', '2', '-1', '2.5', '"s"', 'I', 'K', 'T', 'S']
+    lines = [f'LET {generator.choice(names)} {generator.choice(["0", "1", "-3", "1.5"])}'
+             for _ in range(generator.randint(0, 2))]
+    body = []
+    for _ in range(generator.randint(1, 6)):
+        kind = generator.choice(['INDUCTION', 'PRODUCT', 'LET', 'ADD', 'SUB', 'MULT', 'DIV', 'PRINT', 'GOTO'])
+        if kind == 'INDUCTION':
+            body.append(f'ADD I {generator.choice(["1", "2", "-1"])}')
+        elif kind == 'PRODUCT':
+            body += [f'LET {generator.choice(names)} I', f'MULT {generator.choice(names)} {generator.choice(["2", "-3"])}']
+        elif kind == 'MULT':
+            body.append(f'MULT {generator.choice(names)} {generator.choice(["2", "-1", "1.5", "I"])}')
+        elif kind == 'PRINT':
+            body.append(f'PRINT {generator.choice(values)}')
+        elif kind == 'GOTO':
+            body.append(f'GOTO 2 IF {generator.choice(values)} < {generator.choice(values)}')
+        else:
+            body.append(f'{kind} {generator.choice(names)} {generator.choice(values)}')
+    body[0] = f'LOOP: {body[0]}'
+    operator = generator.choice(['<', '<=', '>', '>=', '<>'])
+    return lines + body + [f'GOTO "LOOP" IF I {operator} {generator.choice(["5", "-4", "K"])}', 'PRINT S']
+
+
+class TestLoops(OptimizerTestCase):
+    inputs = ['3']
+
+    def test_optimized_programs_run_the_same(self):
+        """Test that programs with optimized loops print, fail and leave the engine the same way"""
+        for lines in PROGRAMS:
+            with self.subTest(lines = lines):
+                self.assertOptimizesTheSame(compile_program(lines), optimize_loops)
+                self.assertOptimizesTheSame(compile_program(lines), optimize_loops, unroll = 3)
+
+    def test_random_loops_run_the_same(self):
+        """Test random loops that finish against InterpreterEngine"""
+        generator = random.Random(23)
+        tested = 0
+        while tested < 200:
+            lines = random_loop(generator)
+            program = compile_program(lines)
+            if not finishes(program, 400):
+                continue
+
+            with self.subTest(lines = lines):
+                self.assertOptimizesTheSame(program, optimize_loops)
+                self.assertOptimizesTheSame(program, optimize_loops, unroll = 4)
+            tested += 1
+
+    def test_dominators_and_loops(self):
+        """Test that natural loops are found from the blocks that dominate their back edges"""
+        cfg = build_cfg(compile_program(PROGRAMS[10]))
+        self.assertEqual(dominators(cfg), [0, 0, 1, 2, 3, 4])
+        loops = find_loops(cfg)
+        self.assertEqual([(loop.header, loop.latches, sorted(loop.blocks)) for loop in loops],
+                         [(1, [3], [1, 2, 3]), (2, [2], [2])])
+
+    def test_hoisting(self):
+        """Test that statements whose values don't change are hoisted in front of the loop"""
+        optimized = self.assertOptimizesTheSame(compile_program(PROGRAMS[0]), optimize_loops)
+        self.assertEqual(self.nodes(optimized), [
+            'LET I 0', 'LET K 2', 'MULT K 3', 'ADD I 1', 'ADD S K', 'GOTO @3 IF I < 10', 'PRINT S'])
+        self.assertEqual(dict(optimized.program.labels()), {'LOOP': 1})
+        self.assertEqual(optimized.report.counts['hoisted'], 2)
+
+    def test_statements_that_are_not_hoisted(self):
+        """Test that statements read before they're assigned, assigned twice or after one that could fail stay in the loop"""
+        for lines in (PROGRAMS[3], PROGRAMS[4], PROGRAMS[5]):
+            with self.subTest(lines = lines):
+                optimized = self.assertOptimizesTheSame(compile_program(lines), optimize_loops)
+                self.assertEqual(optimized.report.counts['hoisted'], 0)
+
+    def test_errors_in_hoisted_statements(self):
+        """Test that a hoisted statement that fails reports its original line"""
+        optimized = self.assertOptimizesTheSame(compile_program(PROGRAMS[7]), optimize_loops)
+        self.assertEqual(self.nodes(optimized)[:3], ['LET Z 0', 'LET K 2', 'DIV K Z'])
+        engine = InterpreterEngine(optimized.program)
+        with self.assertRaises(GrinRuntimeError):
+            engine.run()
+        self.assertEqual(optimized.source_line(engine.current_line), 3)
+
+    def test_strength_reduction(self):
+        """Test that a product of an induction variable is updated by adding to it"""
+        optimized = self.assertOptimizesTheSame(compile_program(PROGRAMS[1]), optimize_loops)
+        self.assertEqual(self.nodes(optimized), [
+            'LET I 0', 'LET T I', 'MULT T 4', 'ADD I 1', 'ADD T 4', 'ADD S T', 'GOTO @3 IF I < 10', 'PRINT S', 'PRINT T'])
+
+        optimized = self.assertOptimizesTheSame(compile_program(PROGRAMS[2]), optimize_loops)
+        self.assertEqual(self.nodes(optimized), [
+            'LET I 10', 'LET T I', 'SUB T -2', 'MULT T 3', 'ADD T -6', 'SUB I 2', 'ADD S T', 'GOTO @4 IF I > 0', 'PRINT S'])
+
+    def test_floats_are_not_reduced(self):
+        """Test that products of induction variables that aren't integers are left alone"""
+        optimized = self.assertOptimizesTheSame(compile_program(PROGRAMS[13]), optimize_loops)
+        self.assertEqual(optimized.report.counts['reduced'], 0)
+
+    def test_unrolling(self):
+        """Test that a loop with a known number of iterations is unrolled, with any remainder in front of it"""
+        optimized = self.assertOptimizesTheSame(compile_program(PROGRAMS[0]), optimize_loops, unroll = 4)
+        self.assertEqual(self.nodes(optimized), [
+            'LET I 0', 'LET K 2', 'MULT K 3'] + ['ADD I 1', 'ADD S K'] * 6 + ['GOTO @7 IF I < 10', 'PRINT S'])
+        self.assertIn('(10 iterations)', str(optimized.report))
+
+        for lines in (PROGRAMS[8], PROGRAMS[11]):
+            with self.subTest(lines = lines):
+                optimized = self.assertOptimizesTheSame(compile_program(lines), optimize_loops, unroll = 4)
+                self.assertEqual(optimized.report.counts['unrolled'], 0)
+
+        with self.assertRaises(ValueError):
+            optimize_loops([], unroll = 0)
+
+    def test_loops_that_are_left_alone(self):
+        """Test that outer loops, loops with calls and programs with unknown targets are left alone"""
+        optimized = self.assertOptimizesTheSame(compile_program(PROGRAMS[10]), optimize_loops)
+        self.assertEqual(self.nodes(optimized)[2:4], ['LET K 3', 'ADD J 1'])
+        self.assertEqual(len(self.assertOptimizesTheSame(compile_program(PROGRAMS[12]), optimize_loops).report), 0)
+        self.assertEqual(len(optimize_loops(compile_program(['LET T 1', 'LOOP: LET K 2', 'GOTO T'])).report), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from grin.interpreter.linker import link
+from grin.interpreter.program import compile_program
+from grin.ir.cfg import build_cfg
+from grin.ir.printer import format_cfg, format_node
+
+
+class TestPrinter(unittest.TestCase):
+    def test_format_node(self):
+        """Test that nodes are printed as the Grin statements they came from"""
+        lines = [
+            'LET X 1', 'LET S "a b"', 'LET F 2.5', 'LET Y X', 'PRINT "hi"', 'INNUM N', 'INSTR T',
+            'ADD X 1', 'SUB X Y', 'MULT S 2', 'DIV F 0.5', 'GOTO 2', 'GOSUB "L" IF X <> 3',
+            'GOTO X IF S <= "b"', 'L: RETURN', 'END']
+        cfg = build_cfg(compile_program(lines))
+        self.assertEqual([format_node(node) for node in cfg.nodes], [line.removeprefix('L: ') for line in lines])
+
+    def test_resolved_targets(self):
+        """Test that resolved targets are printed as statement indexes"""
+        cfg = build_cfg(link(compile_program(['L: ADD X 1', 'GOTO "L" IF X < 3'])))
+        self.assertEqual(format_node(cfg.nodes[1]), 'GOTO @0 IF X < 3')
+
+    def test_format_cfg(self):
+        """Test the listing of a control-flow graph"""
+        cfg = build_cfg(compile_program(['LET I 0', 'LOOP: ADD I 1', 'GOTO "LOOP" IF I < N', 'GOTO T']))
+        self.assertEqual(format_cfg(cfg), '\n'.join([
+            'block 0 (lines 1-1):',
+            '    1  LET I 0',
+            '    defines: I',
+            '    -> block 1 (fallthrough)',
+            'block 1 (lines 2-3):',
+            '    2  LOOP: ADD I 1',
+            '    3  GOTO "LOOP" IF I < N',
+            '    uses: I N',
+            '    defines: I',
+            '    -> block 1 (jump)',
+            '    -> block 2 (fallthrough)',
+            'block 2 (lines 4-4):',
+            '    4  GOTO T',
+            '    uses: T',
+            '    -> ? (unknown target)',
+            'block 3 (exit)',
+        ]) + '\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
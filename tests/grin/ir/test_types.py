@@ -0,0 +1,33 @@
+import unittest
+from grin.interpreter.program import compile_program
+from grin.ir.cfg import build_cfg
+from grin.ir.types import ValueTypes
+
+
+class TestValueTypes(unittest.TestCase):
+    def test_types_before_statements(self):
+        """Test that the types a variable can have are propagated along the graph's edges"""
+        types = ValueTypes(build_cfg(compile_program([
+            'LET S "a"', 'GOTO 2 IF X > 0', 'LET S 1.5', 'ADD X 1', 'INSTR T', 'PRINT S'])))
+        self.assertEqual(types.types_before(0)['S'], {int})
+        self.assertEqual(types.types_before(3)['S'], {str, float})
+        self.assertEqual(types.types_before(5)['T'], {str})
+
+    def test_statements_that_may_raise(self):
+        """Test which statements could raise an error, given the types of their operands"""
+        types = ValueTypes(build_cfg(compile_program([
+            'LET I 0', 'ADD I 1', 'MULT I 2.5', 'LET S "a"', 'ADD S "b"', 'MULT S 2', 'DIV I 2',
+            'GOTO 2 IF I < 3', 'GOTO 1 IF S = "ab"', 'GOTO "NOWHERE" IF S = "c"', 'INNUM N', 'PRINT N', 'RETURN'])))
+        self.assertEqual(types.raises, [
+            False, False, True, False, False, True, True, True, False, True, True, False, True])
+        self.assertEqual(types.types_before(7)['I'], {float})
+
+    def test_unknown_targets(self):
+        """Test that any variable can hold any type when a jump's target is held in a variable"""
+        types = ValueTypes(build_cfg(compile_program(['ADD I 1', 'LET T 1', 'GOTO T'])))
+        self.assertEqual(types.types_before(0)['I'], {int, float, str})
+        self.assertTrue(types.may_raise(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
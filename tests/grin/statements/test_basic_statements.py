@@ -40,7 +40,10 @@ class TestEvaluateExpression(unittest.TestCase):
         self.assertEqual(evaluate_expression(token, self.engine), 0)
 
     def test_evaluate_raw_string(self):
-        self.assertEqual(evaluate_expression("test", self.engine), "test")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(evaluate_expression("test", self.engine), "test")
+        self.assertEqual(output.getvalue(), "")
 
     def test_evaluate_raw_integer(self):
         self.assertEqual(evaluate_expression(99, self.engine), 99)
@@ -0,0 +1,106 @@
+import unittest
+import io
+import contextlib
+from unittest import mock
+from grin.interpreter.engine import InterpreterEngine
+from grin.interpreter.errors import GrinRuntimeError
+from grin.interpreter.linker import link
+from grin.interpreter.program import compile_program
+from grin.statements.basic_statements import PrintStatement
+from grin.statements.jump_statements import GotoStatement, LabelStatement
+from grin.statements.nodes import (
+    AddNode, EndNode, GotoNode, GosubNode, LetNode, PrintNode, ReturnNode, to_node, to_nodes)
+from grin.token import GrinToken, GrinTokenKind
+
+
+PROGRAMS = [
+    ['LET X 3', 'LOOP: SUB X 1', 'PRINT X', 'GOTO "LOOP" IF X > 0', 'PRINT Y'],
+    ['ADD A 2.5', 'MULT A 2', 'DIV A 2', 'LET S "ab"', 'MULT S 3', 'ADD S "!"', 'PRINT A', 'PRINT S'],
+    ['LET N 7', 'DIV N 2', 'PRINT N', 'LET M -7', 'DIV M 2', 'PRINT M', 'LET F 1.0', 'DIV F 4', 'PRINT F'],
+    ['LET T "F"', 'GOSUB T', 'GOSUB T IF T = "F"', 'END', 'F: ADD C 1', 'PRINT C', 'RETURN'],
+    ['LET X 1', 'ADD X "a"'],
+    ['MULT S -1', 'LET S "s"', 'MULT S -1'],
+    ['DIV Z 0'],
+    ['LET D 0', 'GOTO D'],
+    ['LET X 2', 'GOTO 2 IF X < "s"', 'PRINT X'],
+    ['LET J 2', 'GOTO J', 'PRINT "skipped"', 'PRINT J', 'GOTO 5'],
+    ['RETURN'],
+    ['LET X 1', 'GOTO "NOWHERE" IF X > 1', 'PRINT "fine"', 'GOTO "NOWHERE"'],
+    ['LET A 1', 'LET B 1.0', 'GOTO 2 IF A = B', 'PRINT "no"', 'PRINT "yes"', 'GOTO 1 IF A <> B', 'GOTO -7 IF A >= B'],
+]
+
+
+class TestNodes(unittest.TestCase):
+    def run_program(self, program, **options):
+        output = io.StringIO()
+        engine = None
+        with contextlib.redirect_stdout(output):
+            try:
+                engine = InterpreterEngine(program, **options)
+                engine.run()
+            except GrinRuntimeError as e:
+                print(f'error: {e}')
+        return output.getvalue(), None if engine is None else dict(engine.variables)
+
+    def test_nodes_run_the_same_as_statements(self):
+        """Test that programs of nodes print, fail and leave variables the same way as statements"""
+        for lines in PROGRAMS:
+            with self.subTest(lines = lines):
+                expected = self.run_program(compile_program(lines))
+                self.assertEqual(self.run_program(compile_program(lines, nodes = True)), expected)
+                self.assertEqual(self.run_program(compile_program(lines, nodes = True), variable_slots = True), expected)
+
+    def test_linked_nodes_run_the_same(self):
+        """Test that nodes can be linked"""
+        for lines in (PROGRAMS[0], PROGRAMS[3], PROGRAMS[8]):
+            with self.subTest(lines = lines):
+                linked = link(compile_program(lines, nodes = True))
+                self.assertEqual(self.run_program(linked), self.run_program(compile_program(lines)))
+
+    def test_operands_are_classified(self):
+        """Test that each operand is held as a variable name or a literal value"""
+        statements = compile_program(['LET X Y', 'A: ADD X 2', 'GOSUB "A" IF X < 1.5', 'PRINT "s"', 'RETURN', 'END'], nodes = True).statements()
+        let, (label, add), gosub, print_node, return_node, end = statements
+
+        self.assertIsInstance(let, LetNode)
+        self.assertEqual((let.name, let.is_variable, let.operand), ('X', True, 'Y'))
+        self.assertIsInstance(label, LabelStatement)
+        self.assertIsInstance(add, AddNode)
+        self.assertEqual((add.name, add.is_variable, add.operand), ('X', False, 2))
+        self.assertIsInstance(gosub, GosubNode)
+        self.assertEqual((gosub.target_is_variable, gosub.target), (False, 'A'))
+        self.assertEqual((gosub.condition[0], gosub.condition[1], gosub.condition[3], gosub.condition[4]), (True, 'X', False, 1.5))
+        self.assertEqual((print_node.is_variable, print_node.operand), (False, 's'))
+        self.assertIsInstance(return_node, ReturnNode)
+        self.assertIsInstance(end, EndNode)
+
+    def test_nodes_hold_no_tokens(self):
+        """Test that nodes have no dict, and none of their attributes are tokens"""
+        for node in compile_program(['LET X 1', 'GOTO "L" IF X < 2', 'L: PRINT X'], nodes = True).statements():
+            if isinstance(node, tuple):
+                node = node[1]
+            self.assertFalse(hasattr(node, '__dict__'))
+            for name in type(node).__slots__ + getattr(type(node).__mro__[1], '__slots__', ()):
+                self.assertNotIsInstance(getattr(node, name), GrinToken)
+
+    def test_statements_without_tokens_are_kept(self):
+        """Test that statements whose operands aren't tokens aren't turned into nodes"""
+        statement = PrintStatement(5)
+        self.assertIs(to_node(statement), statement)
+        token = GrinToken(kind = GrinTokenKind.LITERAL_INTEGER, text = '1', location = None, value = 1)
+        self.assertIsInstance(to_node(GotoStatement(token)), GotoNode)
+        self.assertEqual(to_nodes([[LabelStatement('L'), statement]])[0][1], statement)
+
+    def test_input_nodes(self):
+        """Test that INNUM and INSTR nodes read input the way their statements do"""
+        lines = ['INNUM X', 'INSTR S', 'PRINT X', 'PRINT S', 'INNUM Y']
+        for inputs in (['4.5', ' hi ', 'x'], ['-3', 'b', '1.2.3'], ['.5']):
+            with self.subTest(inputs = inputs):
+                with mock.patch('builtins.input', side_effect = inputs):
+                    expected = self.run_program(compile_program(lines))
+                with mock.patch('builtins.input', side_effect = inputs):
+                    self.assertEqual(self.run_program(compile_program(lines, nodes = True)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,7 @@
 # WHAT YOU NEED TO DO: Nothing, unless you make changes to grin.lexing
 # (which shouldn't be necessary).
 
-from grin.lexing import to_tokens, GrinLexError, KEYWORDS
+from grin.lexing import to_tokens, GrinLexError, KEYWORDS, _to_tokens_by_character, _KEYWORD_KIND_MAP
 from grin.location import GrinLocation
 from grin.token import GrinTokenKind, GrinToken
 import unittest
@@ -149,6 +149,56 @@ class TestGrinLexing(unittest.TestCase):
                 location = GrinLocation(1, 19)))
 
 
+    def test_pattern_scanner_agrees_with_character_lexer(self):
+        lines = [
+            'START:   LET NAME "Boo"',
+            'GOTO "L1" IF I<=-11.5',
+            'ADD X1 5.5.5-3',
+            'PRINT A<>B>=C=D.',
+            '5ABC -7. "x"y',
+            '\tLET\x0bX\x1c3 ',
+            'PRINT "caf\u00e9" \u00e9T\u00e9'
+        ]
+
+        for line in lines:
+            with self.subTest(line = line):
+                self.assertEqual(
+                    list(to_tokens(line, 7)), list(_to_tokens_by_character(line, 7)))
+
+
+    def test_pattern_scanner_reports_errors_at_same_columns(self):
+        for line in ('LET X "abc', 'ADD X -', 'ADD X -Y', 'LET X 3 !', 'PRINT \u00e9 !'):
+            with self.subTest(line = line):
+                with self.assertRaises(GrinLexError) as expected:
+                    list(_to_tokens_by_character(line, 3))
+
+                with self.assertRaises(GrinLexError) as actual:
+                    list(to_tokens(line, 3))
+
+                self.assertEqual(str(actual.exception), str(expected.exception))
+                self.assertEqual(actual.exception.location(), expected.exception.location())
+
+
+    def test_lexing_identifiers_does_not_grow_keyword_map(self):
+        size = len(_KEYWORD_KIND_MAP)
+        list(to_tokens('LET NEVERSEENBEFORE1 NEVERSEENBEFORE2', 1))
+        list(_to_tokens_by_character('LET NEVERSEENBEFORE3 4', 1))
+        self.assertEqual(len(_KEYWORD_KIND_MAP), size)
+
+
+    def test_names_are_interned_in_the_given_table(self):
+        for lexer in (to_tokens, _to_tokens_by_character):
+            with self.subTest(lexer = lexer.__name__):
+                names = {}
+                first = list(lexer(''.join(['CO', 'UNT: ADD CO', 'UNT 1']), 1, names))
+                second = list(lexer(''.join(['GOTO "CO', 'UNT" IF CO', 'UNT < 10']), 2, names))
+
+                self.assertIs(first[0].text(), first[3].text())
+                self.assertIs(first[0].text(), second[1].value())
+                self.assertIs(first[0].text(), second[3].value())
+                self.assertIn('COUNT', names)
+
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -9,6 +9,7 @@
 # (which shouldn't be necessary).
 
 from grin import GrinLocation
+import pickle
 import unittest
 
 
@@ -36,6 +37,17 @@ class TestGrinLocation(unittest.TestCase):
                 self.assertEqual(location.column(), column)
 
 
+    def test_validates_lines_and_columns_that_are_not_ints(self):
+        for line, column in (('0', 1), (1, '-3'), (0.5, 1)):
+            with self.subTest(line = line, column = column):
+                with self.assertRaises(ValueError):
+                    GrinLocation(line, column)
+
+
+    def test_locations_do_not_carry_a_dict(self):
+        self.assertFalse(hasattr(GrinLocation(1, 1), '__dict__'))
+
+
     def test_can_format_with_str(self):
         location = GrinLocation(11, 7)
         self.assertEqual(str(location), 'Line 11 Column 7')
@@ -46,6 +58,11 @@ class TestGrinLocation(unittest.TestCase):
         self.assertEqual(repr(location), 'GrinLocation(11, 7)')
 
 
+    def test_can_be_pickled(self):
+        location = GrinLocation(11, 7)
+        self.assertEqual(pickle.loads(pickle.dumps(location)), location)
+
+
 
 if __name__ == '__main__':
     unittest.main()
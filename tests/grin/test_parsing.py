@@ -10,7 +10,12 @@
 
 from grin.lexing import to_tokens
 from grin.location import GrinLocation
-from grin.parsing import parse, GrinParseError
+from grin.lexing import GrinLexError
+from grin.parsing import parse, parse_buffer, parse_file, parse_parallel, GrinLineCache, GrinParseError
+from grin.interpreter.parser import parse_statements_into_objects
+import pickle
+import os
+import tempfile
 import unittest
 
 
@@ -230,6 +235,177 @@ class TestGrinParsing(unittest.TestCase):
         self.assertParseError(invalid, len(invalid) + 1)
 
 
+    def test_names_are_shared_across_lines_of_a_program(self):
+        parsed = list(parse(['LET ' + 'COUNT' * 2 + ' 1', 'ADD ' + 'COUNT' * 2 + ' 1']))
+        self.assertIs(parsed[0][1].text(), parsed[1][1].text())
+
+
+    def assertBufferParsesLikeLines(self, source: str) -> None:
+        expected_error = None
+
+        try:
+            expected = list(parse(source.splitlines()))
+        except (GrinLexError, GrinParseError) as e:
+            expected_error = e
+
+        for buffer in (source.encode('utf-8'), memoryview(bytearray(source.encode('utf-8')))):
+            if expected_error is None:
+                self.assertEqual(list(parse_buffer(buffer)), expected)
+            else:
+                with self.assertRaises(type(expected_error)) as context:
+                    list(parse_buffer(buffer))
+
+                self.assertEqual(str(context.exception), str(expected_error))
+
+
+    def test_can_parse_buffers_like_lines(self):
+        sources = [
+            '',
+            'LET X 3\nPRINT X\n',
+            'START: LET NAME "Boo"\r\nGOTO "START" IF X <= -1.5\r\n.\r\nNOT PARSED',
+            'LET X 3\rADD X 4.\n\n',
+            'PRINT "caf\u00e9"\nLET \u00e9T\u00e9 3\nPRINT \u00e9T\u00e9',
+            'LET X 3\n   \nPRINT X',
+            'LET X "unterminated\nPRINT X',
+            'LET X -\n',
+            'LET X 3 !\n',
+            'LET X 3\nPRINT "\u00e9\n',
+            'LET X 3\nGOTO IF\n',
+            'LET X 3\nPRINT X Y'
+        ]
+
+        for source in sources:
+            with self.subTest(source = source):
+                self.assertBufferParsesLikeLines(source)
+
+
+    def test_invalid_utf8_is_a_lex_error(self):
+        with self.assertRaises(GrinLexError) as context:
+            list(parse_buffer(b'PRINT 1\nPRINT "\xc3\xa9\xff"'))
+
+        self.assertEqual(context.exception.location(), GrinLocation(2, 9))
+
+
+    def test_can_parse_memory_mapped_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'program.grin')
+
+            with open(path, 'wb') as file:
+                file.write(b'LET X 3\nPRINT X\n.\n')
+
+            self.assertEqual(list(parse_file(path)), list(parse(['LET X 3', 'PRINT X'])))
+
+            with open(path, 'wb'):
+                pass
+
+            self.assertEqual(list(parse_file(path)), [])
+
+
+    def test_cached_lines_parse_like_uncached_lines(self):
+        lines = ['LOOP: ADD I 1', 'PRINT "Boo"', 'ADD I 1', 'GOTO "LOOP" IF I < 5.5', 'ADD I 1']
+        cache = GrinLineCache()
+
+        self.assertEqual(list(parse(lines, cache)), list(parse(lines)))
+        self.assertEqual(list(parse(lines, cache)), list(parse(lines)))
+        self.assertEqual(cache.misses(), 4)
+        self.assertEqual(cache.hits(), 6)
+
+
+    def test_cached_lines_are_relocated_to_their_line(self):
+        cache = GrinLineCache()
+        parsed = list(parse(['ADD I 1', 'PRINT I', 'ADD I 1'], cache))
+        self.assertEqual(parsed[2][1].location(), GrinLocation(3, 5))
+
+
+    def test_line_cache_evicts_least_recently_used_lines(self):
+        cache = GrinLineCache(2)
+        list(parse(['PRINT 1', 'PRINT 2', 'PRINT 1', 'PRINT 3', 'PRINT 1', 'PRINT 2'], cache))
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.hits(), 2)
+        self.assertEqual(cache.misses(), 4)
+        self.assertEqual(cache.evictions(), 2)
+
+
+    def test_lines_with_errors_are_not_cached(self):
+        cache = GrinLineCache()
+
+        for _ in range(2):
+            with self.assertRaises(GrinParseError):
+                list(parse(['PRINT 1', 'PRINT'], cache))
+
+        self.assertEqual(len(cache), 1)
+
+
+    def test_lazily_located_tokens_parse_like_located_tokens(self):
+        lines = ['START: LET NAME "Boo"', 'GOTO "START" IF X <= -1.5', 'PRINT \u00e9T\u00e9']
+        cache = GrinLineCache()
+
+        for parsed in (
+                list(parse(lines, lazy_locations = True)),
+                list(parse(lines, cache, lazy_locations = True)),
+                list(parse(lines, cache, lazy_locations = True)),
+                list(parse_buffer('\n'.join(lines).encode('utf-8'), lazy_locations = True))):
+            self.assertEqual(parsed, list(parse(lines)))
+            self.assertEqual(parsed[1][4].location(), GrinLocation(2, 19))
+
+
+    def test_lazily_located_tokens_report_the_same_errors(self):
+        for line in ('PRINT X Y', 'LET X', 'PRINT !', 'GOTO "A" IF X'):
+            with self.subTest(line = line):
+                with self.assertRaises(Exception) as expected:
+                    list(parse([line]))
+
+                with self.assertRaises(type(expected.exception)) as actual:
+                    list(parse([line], lazy_locations = True))
+
+                self.assertEqual(str(actual.exception), str(expected.exception))
+
+
+    def test_parse_errors_can_be_pickled(self):
+        for error in (GrinParseError('Boo', GrinLocation(3, 4)), GrinLexError('Boo', GrinLocation(3, 4))):
+            with self.subTest(error = error):
+                copy = pickle.loads(pickle.dumps(error))
+                self.assertEqual(str(copy), str(error))
+                self.assertEqual(copy.location(), error.location())
+
+
+    def test_can_parse_in_parallel_like_in_order(self):
+        lines = ['LET X 1', 'LOOP: ADD X 1', 'GOTO "LOOP" IF X < 5', 'PRINT X'] * 5
+
+        for workers in (1, 2):
+            with self.subTest(workers = workers):
+                self.assertEqual(parse_parallel(lines, workers, chunk_size = 3), list(parse(lines)))
+
+
+    def test_parallel_parsing_reports_earliest_error(self):
+        lines = ['LET X 1', 'PRINT X Y', 'LET X 2', 'PRINT !', 'PRINT X']
+
+        for workers in (1, 2):
+            with self.subTest(workers = workers):
+                with self.assertRaises(GrinParseError) as context:
+                    parse_parallel(lines, workers, chunk_size = 1)
+
+                self.assertEqual(context.exception.location(), GrinLocation(2, 9))
+
+
+    def test_parallel_parsing_stops_at_dot(self):
+        lines = ['LET X 1', 'PRINT X', '.', 'PRINT !', 'PRINT X']
+
+        for workers in (1, 2):
+            with self.subTest(workers = workers):
+                self.assertEqual(parse_parallel(lines, workers, chunk_size = 2), list(parse(lines)))
+
+
+    def test_parallel_parsing_can_build_statements(self):
+        lines = ['LET X 1', 'LOOP: ADD X 1', 'GOTO "LOOP" IF X < 5', 'PRINT X', '.']
+        statements = parse_parallel(lines, 2, chunk_size = 2, transform = parse_statements_into_objects)
+
+        self.assertEqual(len(statements), 4)
+        self.assertEqual(statements[1][0].label, 'LOOP')
+        self.assertEqual(statements[2].target.value(), 'LOOP')
+
+
 
 if __name__ == '__main__':
     unittest.main()
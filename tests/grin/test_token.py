@@ -8,7 +8,9 @@
 # WHAT YOU NEED TO DO: Nothing, unless you make changes to grin.token
 # (which shouldn't be necessary).
 
-from grin.token import GrinTokenKind, GrinToken
+from grin.location import GrinLocation
+from grin.token import GrinTokenKind, GrinToken, _LazilyLocatedGrinToken
+import pickle
 import unittest
 
 
@@ -19,6 +21,52 @@ class GrinTokenKindTest(unittest.TestCase):
         self.assertEqual(len(indexes), len(GrinTokenKind.__members__))
 
 
+    def test_kinds_can_be_used_as_keys(self):
+        kinds = {kind: kind.index() for kind in GrinTokenKind.__members__.values()}
+
+        for kind in GrinTokenKind.__members__.values():
+            with self.subTest(kind = kind):
+                self.assertEqual(kinds[GrinTokenKind[kind.name]], kind.index())
+
+
+
+class GrinTokenTest(unittest.TestCase):
+    def test_tokens_do_not_carry_a_dict(self):
+        token = GrinToken(kind = GrinTokenKind.IDENTIFIER, text = 'X', location = None, value = 'X')
+        self.assertFalse(hasattr(token, '__dict__'))
+
+
+    def test_can_access_token_parts(self):
+        location = GrinLocation(3, 5)
+        token = GrinToken(kind = GrinTokenKind.LITERAL_INTEGER, text = '13', location = location, value = 13)
+        self.assertEqual(token.kind(), GrinTokenKind.LITERAL_INTEGER)
+        self.assertEqual(token.text(), '13')
+        self.assertEqual(token.location(), location)
+        self.assertEqual(token.value(), 13)
+
+
+    def test_can_be_pickled(self):
+        tokens = [
+            GrinToken(kind = GrinTokenKind.LITERAL_FLOAT, text = '1.5', location = GrinLocation(2, 4), value = 1.5),
+            GrinToken(kind = GrinTokenKind.IDENTIFIER, text = 'X', location = None, value = 'X'),
+            _LazilyLocatedGrinToken(GrinTokenKind.LITERAL_STRING, '"A"', 7, 3, 'A')
+        ]
+
+        for token in tokens:
+            with self.subTest(token = token.text()):
+                copy = pickle.loads(pickle.dumps(token))
+                self.assertIs(type(copy), type(token))
+                self.assertEqual(copy, token)
+
+
+    def test_lazy_locations_are_built_once(self):
+        token = _LazilyLocatedGrinToken(GrinTokenKind.IDENTIFIER, 'X', 7, 3, 'X')
+        self.assertFalse(hasattr(token, '__dict__'))
+        self.assertEqual(token.location(), GrinLocation(7, 3))
+        self.assertIs(token.location(), token.location())
+        self.assertEqual(pickle.loads(pickle.dumps(token)).location(), GrinLocation(7, 3))
+
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,154 @@
+from grin.lexing import GrinLexError
+from grin.location import GrinLocation
+from grin.parsing import GrinParseError, parse
+from grin.validation import validate, validate_file, validate_directory
+import os
+import random
+import tempfile
+import unittest
+
+
+
+class TestGrinValidation(unittest.TestCase):
+    def test_valid_program_has_no_errors(self):
+        self.assertEqual(validate([
+            'LET X 3',
+            'LOOP: ADD X -1.5',
+            '  GOSUB "LOOP" IF X >= 0',
+            'PRINT "done"',
+            'END',
+            '.'
+        ]), [])
+
+
+    def test_every_invalid_line_is_reported(self):
+        errors = validate([
+            'LET X',
+            'PRINT X',
+            'LET Y "abc',
+            'GOTO 3 IF X <',
+            'PRINT Y'
+        ])
+
+        self.assertEqual(len(errors), 3)
+        self.assertIsInstance(errors[0], GrinParseError)
+        self.assertEqual(errors[0].location(), GrinLocation(1, 6))
+        self.assertIsInstance(errors[1], GrinLexError)
+        self.assertEqual(errors[1].location().line(), 3)
+        self.assertIsInstance(errors[2], GrinParseError)
+        self.assertEqual(errors[2].location().line(), 4)
+
+
+    def test_errors_match_the_ones_parse_raises(self):
+        for line in ['LET 3 X', 'PRINT X Y', 'GOTO', 'X:', 'LET X @', 'LET X "é']:
+            with self.subTest(line = line):
+                with self.assertRaises((GrinLexError, GrinParseError)) as context:
+                    list(parse([line]))
+
+                errors = validate([line])
+                self.assertEqual(len(errors), 1)
+                self.assertIs(type(errors[0]), type(context.exception))
+                self.assertEqual(str(errors[0]), str(context.exception))
+
+
+    def test_duplicate_labels_are_reported_where_they_are_reused(self):
+        errors = validate([
+            'A: LET X 1',
+            'B: PRINT X',
+            '  A: PRINT X',
+            'B: END'
+        ])
+
+        self.assertEqual(len(errors), 2)
+        self.assertIn('Label A was already used on line 1', str(errors[0]))
+        self.assertEqual(errors[0].location(), GrinLocation(3, 3))
+        self.assertIn('Label B was already used on line 2', str(errors[1]))
+        self.assertEqual(errors[1].location(), GrinLocation(4, 1))
+
+
+    def test_non_ascii_labels_are_checked_too(self):
+        errors = validate(['A: PRINT "é"', 'A: PRINT "é"'])
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].location(), GrinLocation(2, 1))
+
+
+    def test_lines_after_dot_are_not_validated(self):
+        self.assertEqual(validate(['PRINT 1', '  .  ', 'this is not Grin']), [])
+
+
+    def test_agrees_with_parse_on_random_lines(self):
+        pieces = [
+            'LET', 'PRINT', 'INNUM', 'ADD', 'DIV', 'GOTO', 'GOSUB', 'RETURN', 'END', 'IF',
+            'X', 'LETTER', 'A1', 'IFX', '3', '-4', '5.', '5.5', '3.5.5', '4X', '"s"', '""',
+            ':', '=', '<', '<>', '<=', '>', '>=', '.', '-', ' ', '\t'
+        ]
+
+        generator = random.Random(33)
+
+        for _ in range(5000):
+            line = ''.join(
+                generator.choice(pieces) + generator.choice(['', ' '])
+                for _ in range(generator.randint(1, 7)))
+
+            try:
+                list(parse([line]))
+                valid = True
+            except (GrinLexError, GrinParseError):
+                valid = False
+
+            with self.subTest(line = line):
+                self.assertEqual(validate([line]) == [], valid)
+
+
+
+class TestGrinValidationFiles(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+
+    def write(self, name: str, content: bytes) -> str:
+        path = os.path.join(self.directory.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+
+        with open(path, 'wb') as file:
+            file.write(content)
+
+        return path
+
+
+    def test_file_report(self):
+        path = self.write('program.grin', b'LET X 1\nPRINT\nA: END\nA: END\n.\n')
+        report = validate_file(path)
+
+        self.assertEqual(report.path(), path)
+        self.assertFalse(report.is_valid())
+        self.assertEqual([error.location().line() for error in report.errors()], [2, 4])
+        self.assertEqual(report.line_count(), 5)
+        self.assertGreaterEqual(report.elapsed(), 0)
+
+
+    def test_undecodable_file_is_reported(self):
+        report = validate_file(self.write('bad.grin', b'PRINT "\xff"\n'))
+        self.assertEqual(len(report.errors()), 1)
+        self.assertIsInstance(report.errors()[0], UnicodeDecodeError)
+
+
+    def test_directory_reports_are_sorted_and_filtered(self):
+        self.write('b.grin', b'PRINT 1\n')
+        self.write('nested/a.grin', b'PRINT\n')
+        self.write('notes.txt', b'not a program\n')
+
+        for workers in (1, 2):
+            with self.subTest(workers = workers):
+                reports = validate_directory(self.directory.name, workers)
+                self.assertEqual(
+                    [os.path.relpath(report.path(), self.directory.name) for report in reports],
+                    ['b.grin', os.path.join('nested', 'a.grin')])
+                self.assertEqual([report.is_valid() for report in reports], [True, False])
+                self.assertEqual(str(reports[1].errors()[0]), str(validate(['PRINT'])[0]))
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
-import unittest, io, sys, contextlib
+import unittest, io, sys, contextlib, os, tempfile
+from unittest import mock
 from interpretermain import main
 
 
@@ -105,5 +106,29 @@ class TestInterpreterMain(unittest.TestCase):
         self.assertNotIn("5", output)  # Should not print X because END stops execution
 
 
+    def test_main_with_cache_directory(self):
+        """Test main() caches compiled programs when GRIN_CACHE_DIR is set."""
+        with tempfile.TemporaryDirectory() as directory, mock.patch.dict(os.environ, {"GRIN_CACHE_DIR": directory}):
+            for _ in range(2):
+                sys.stdin = io.StringIO('LET A 5\nL: ADD A 1\nGOTO "L" IF A < 7\nPRINT A\n.')
+                with contextlib.redirect_stdout(self.captured_output):
+                    main()
+
+            self.assertEqual(len(os.listdir(directory)), 1)
+
+        self.assertEqual(self.captured_output.getvalue().split(), ["7", "7"])
+
+    def test_main_with_cache_directory_reports_errors(self):
+        """Test main() reports parse errors the same way when GRIN_CACHE_DIR is set."""
+        with tempfile.TemporaryDirectory() as directory, mock.patch.dict(os.environ, {"GRIN_CACHE_DIR": directory}):
+            sys.stdin = io.StringIO("INVALID A B C\n.")
+            with contextlib.redirect_stdout(self.captured_output):
+                main()
+
+            self.assertEqual(os.listdir(directory), [])
+
+        self.assertIn("Error during parsing: Line 1 Column 9: GrinTokenKind.COLON", self.captured_output.getvalue())
+
+
 if __name__ == "__main__":
     unittest.main()